@@ -0,0 +1,87 @@
+"""Add counterparty_balances table (incremental customer/supplier balances)
+
+Revision ID: e5f6g7h8i9j0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f6g7h8i9j0"
+down_revision: Union[str, None] = "d4e5f6g7h8i9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "counterparty_balances",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("customer_id", sa.Integer(), nullable=True),
+        sa.Column("supplier_id", sa.Integer(), nullable=True),
+        sa.Column("balance", sa.Numeric(15, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "open_order_amount", sa.Numeric(15, 2), nullable=False, server_default="0"
+        ),
+        sa.Column(
+            "open_invoice_amount", sa.Numeric(15, 2), nullable=False, server_default="0"
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["customer_id"], ["customers.id"]),
+        sa.ForeignKeyConstraint(["supplier_id"], ["suppliers.id"]),
+    )
+
+    op.create_index(
+        "idx_cp_balance_customer", "counterparty_balances", ["customer_id"], unique=True
+    )
+    op.create_index(
+        "idx_cp_balance_supplier", "counterparty_balances", ["supplier_id"], unique=True
+    )
+
+    # Mevcut hareketlerden ilk bakiyeleri doldur
+    op.execute(
+        """
+        INSERT INTO counterparty_balances
+            (customer_id, balance, open_order_amount, open_invoice_amount,
+             created_at, updated_at, is_active)
+        SELECT c.id,
+            COALESCE((SELECT SUM(COALESCE(t.debit, 0) - COALESCE(t.credit, 0))
+                      FROM account_transactions t
+                      WHERE t.customer_id = c.id AND t.is_active = TRUE), 0),
+            COALESCE((SELECT SUM(o.total) FROM sales_orders o
+                      WHERE o.customer_id = c.id
+                        AND o.status IN ('confirmed', 'partial')), 0),
+            COALESCE((SELECT SUM(i.balance) FROM invoices i
+                      WHERE i.customer_id = c.id
+                        AND i.status IN ('issued', 'partial', 'overdue')), 0),
+            CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, TRUE
+        FROM customers c
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO counterparty_balances
+            (supplier_id, balance, open_order_amount, open_invoice_amount,
+             created_at, updated_at, is_active)
+        SELECT s.id,
+            COALESCE((SELECT SUM(COALESCE(t.credit, 0) - COALESCE(t.debit, 0))
+                      FROM account_transactions t
+                      WHERE t.supplier_id = s.id AND t.is_active = TRUE), 0),
+            0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, TRUE
+        FROM suppliers s
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_cp_balance_supplier", table_name="counterparty_balances")
+    op.drop_index("idx_cp_balance_customer", table_name="counterparty_balances")
+    op.drop_table("counterparty_balances")
@@ -0,0 +1,78 @@
+"""Add maintenance part reservations and plan link on maintenance work orders
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f6g7h8i9j0k1"
+down_revision: Union[str, None] = "e5f6g7h8i9j0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "maintenance_work_orders",
+        sa.Column("plan_id", sa.Integer(), nullable=True),
+    )
+    op.create_foreign_key(
+        "fk_mwo_plan",
+        "maintenance_work_orders",
+        "maintenance_plans",
+        ["plan_id"],
+        ["id"],
+    )
+    op.create_index("idx_wo_plan", "maintenance_work_orders", ["plan_id"])
+
+    op.create_index(
+        "idx_plan_active_next_date",
+        "maintenance_plans",
+        ["is_active", "next_maintenance_date"],
+    )
+
+    op.create_table(
+        "maintenance_part_reservations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("work_order_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Numeric(18, 4), nullable=False),
+        sa.Column(
+            "released_quantity", sa.Numeric(18, 4), nullable=False, server_default="0"
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(
+            ["work_order_id"], ["maintenance_work_orders.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+        sa.ForeignKeyConstraint(["warehouse_id"], ["warehouses.id"]),
+    )
+    op.create_index(
+        "idx_mpr_work_order", "maintenance_part_reservations", ["work_order_id"]
+    )
+    op.create_index(
+        "idx_mpr_item_warehouse",
+        "maintenance_part_reservations",
+        ["item_id", "warehouse_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_mpr_item_warehouse", table_name="maintenance_part_reservations")
+    op.drop_index("idx_mpr_work_order", table_name="maintenance_part_reservations")
+    op.drop_table("maintenance_part_reservations")
+    op.drop_index("idx_plan_active_next_date", table_name="maintenance_plans")
+    op.drop_index("idx_wo_plan", table_name="maintenance_work_orders")
+    op.drop_constraint("fk_mwo_plan", "maintenance_work_orders", type_="foreignkey")
+    op.drop_column("maintenance_work_orders", "plan_id")
@@ -0,0 +1,78 @@
+"""Add stock_counts and stock_count_lines tables (persistent stock count documents)
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "g7h8i9j0k1l2"
+down_revision: Union[str, None] = "f6g7h8i9j0k1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_counts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("count_no", sa.String(50), nullable=False),
+        sa.Column("count_date", sa.DateTime(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("include_zero", sa.Boolean(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="draft"),
+        sa.Column("frozen_at", sa.DateTime(), nullable=True),
+        sa.Column("applied_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["warehouse_id"], ["warehouses.id"]),
+        sa.ForeignKeyConstraint(["category_id"], ["item_categories.id"]),
+    )
+    op.create_index("ix_stock_counts_count_no", "stock_counts", ["count_no"], unique=True)
+    op.create_index("ix_stock_counts_status", "stock_counts", ["status"])
+
+    op.create_table(
+        "stock_count_lines",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("stock_count_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "system_quantity", sa.Numeric(18, 4), nullable=False, server_default="0"
+        ),
+        sa.Column("counted_quantity", sa.Numeric(18, 4), nullable=True),
+        sa.Column("unit_cost", sa.Numeric(18, 4), nullable=True),
+        sa.Column("note", sa.String(500), nullable=True),
+        sa.Column("counted_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(
+            ["stock_count_id"], ["stock_counts.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"]),
+    )
+    op.create_index(
+        "idx_count_line_item",
+        "stock_count_lines",
+        ["stock_count_id", "item_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_count_line_item", table_name="stock_count_lines")
+    op.drop_table("stock_count_lines")
+    op.drop_index("ix_stock_counts_status", table_name="stock_counts")
+    op.drop_index("ix_stock_counts_count_no", table_name="stock_counts")
+    op.drop_table("stock_counts")
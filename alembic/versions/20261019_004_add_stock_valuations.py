@@ -0,0 +1,81 @@
+"""Add stock_valuations summary table (item + warehouse stock valuation)
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "h8i9j0k1l2m3"
+down_revision: Union[str, None] = "g7h8i9j0k1l2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_valuations",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("warehouse_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("quantity", sa.Numeric(18, 4), nullable=False, server_default="0"),
+        sa.Column("total_value", sa.Numeric(18, 4), nullable=False, server_default="0"),
+        sa.Column("unit_cost", sa.Numeric(18, 4), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["warehouse_id"], ["warehouses.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["category_id"], ["item_categories.id"]),
+    )
+    op.create_index(
+        "idx_valuation_item_warehouse",
+        "stock_valuations",
+        ["item_id", "warehouse_id"],
+        unique=True,
+    )
+    op.create_index("idx_valuation_warehouse", "stock_valuations", ["warehouse_id"])
+    op.create_index("idx_valuation_category", "stock_valuations", ["category_id"])
+
+    # Mevcut bakiyelerden ilk doldurma
+    op.execute(
+        """
+        INSERT INTO stock_valuations (
+            item_id, warehouse_id, category_id, quantity, total_value, unit_cost,
+            created_at, updated_at, is_active
+        )
+        SELECT
+            b.item_id,
+            b.warehouse_id,
+            i.category_id,
+            COALESCE(SUM(b.quantity), 0),
+            COALESCE(SUM(b.quantity * COALESCE(b.unit_cost, 0)), 0),
+            CASE
+                WHEN COALESCE(SUM(b.quantity), 0) > 0
+                THEN COALESCE(SUM(b.quantity * COALESCE(b.unit_cost, 0)), 0)
+                     / SUM(b.quantity)
+                ELSE COALESCE(MAX(b.unit_cost), 0)
+            END,
+            CURRENT_TIMESTAMP,
+            CURRENT_TIMESTAMP,
+            TRUE
+        FROM stock_balances b
+        JOIN items i ON i.id = b.item_id
+        GROUP BY b.item_id, b.warehouse_id, i.category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_valuation_category", table_name="stock_valuations")
+    op.drop_index("idx_valuation_warehouse", table_name="stock_valuations")
+    op.drop_index("idx_valuation_item_warehouse", table_name="stock_valuations")
+    op.drop_table("stock_valuations")
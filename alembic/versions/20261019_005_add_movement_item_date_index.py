@@ -0,0 +1,29 @@
+"""Add (item_id, movement_date, id) index on stock_movements for ledger replay
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "i9j0k1l2m3n4"
+down_revision: Union[str, None] = "h8i9j0k1l2m3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_movement_item_date",
+        "stock_movements",
+        ["item_id", "movement_date", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_movement_item_date", table_name="stock_movements")
@@ -0,0 +1,197 @@
+"""Convert stock_movements, audit_logs and error_logs to monthly range partitions
+
+Sadece PostgreSQL'de çalışır; diğer veritabanlarında değişiklik yapmaz
+(bu durumda arşivleme tarih aralığına göre DELETE ile yapılır, bkz.
+database/partitioning.py).
+
+Her tablo için:
+1. Mevcut tablo <tablo>_legacy olarak yeniden adlandırılır
+2. Aynı kolonlarla RANGE (tarih) bölümlü ana tablo oluşturulur
+   (birincil anahtar bölüm anahtarını da içerir: (id, tarih))
+3. Verideki ilk aydan itibaren aylık bölümler + DEFAULT bölüm açılır
+4. Veri kopyalanır, index ve foreign key'ler ana tabloda yeniden oluşturulur
+   (UNIQUE index'lere bölüm anahtarı eklenir, bkz. _partitioned_index)
+5. id sekansı yeni tabloya devredilir, eski tablo silinir
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+import logging
+import re
+from datetime import date
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "j0k1l2m3n4o5"
+down_revision: Union[str, None] = "i9j0k1l2m3n4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# tablo -> bölüm anahtarı
+PARTITIONED_TABLES = {
+    "stock_movements": "movement_date",
+    "audit_logs": "created_at",
+    "error_logs": "created_at",
+}
+
+# Migration sırasında açılacak gelecek ay bölümü sayısı
+PREMAKE_MONTHS = 3
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _table_ddl(bind, table: str):
+    """Tablonun index ve foreign key tanımları ile id sekansı"""
+    indexes = bind.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :t"
+        ),
+        {"t": table},
+    ).all()
+    foreign_keys = bind.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = CAST(:t AS regclass) AND contype = 'f'"
+        ),
+        {"t": table},
+    ).all()
+    sequence = bind.execute(
+        sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}
+    ).scalar()
+    return indexes, foreign_keys, sequence
+
+
+def _partitioned_index(definition: str, key: str) -> str:
+    """
+    Bölümlü tabloda UNIQUE index bölüm anahtarını içermek zorundadır.
+    Anahtar kolon listesinde yoksa eklenir; teklik korunur ancak artık
+    (kolonlar, anahtar) bazındadır. Değişen her index loglanır.
+    """
+    if not definition.startswith("CREATE UNIQUE INDEX"):
+        return definition
+    match = re.search(r" USING \w+ \(", definition)
+    if match is None:
+        logger.warning("UNIQUE index çözümlenemedi, teklik kaldırıldı: %s", definition)
+        return definition.replace("CREATE UNIQUE INDEX", "CREATE INDEX", 1)
+
+    # Kolon listesinin kapanış parantezi (ifade index'lerinde iç parantezler olabilir)
+    depth, end = 0, None
+    for position in range(match.end() - 1, len(definition)):
+        if definition[position] == "(":
+            depth += 1
+        elif definition[position] == ")":
+            depth -= 1
+            if depth == 0:
+                end = position
+                break
+    columns = [c.strip() for c in definition[match.end():end].split(",")]
+    if key in columns:
+        return definition
+
+    logger.warning(
+        "UNIQUE index bölüm anahtarıyla genişletildi, teklik artık (%s, %s) bazında: %s",
+        ", ".join(columns),
+        key,
+        definition,
+    )
+    return f"{definition[:end]}, {key}{definition[end:]}"
+
+
+def _copy_structure(
+    table: str, legacy: str, indexes, foreign_keys, sequence, partition_key: Optional[str] = None
+):
+    """
+    Veriyi kopyala, eski tabloyu sil, index/FK'leri yeniden oluştur ve sekansı devret
+
+    partition_key verilirse (bölümlü hedef) UNIQUE index'ler bu anahtarla genişletilir.
+    """
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    op.execute(f"DROP TABLE {legacy}")
+
+    # Tanımlar yeniden adlandırmadan önce okunduğu için yeni tabloyu gösterir
+    for name, definition in indexes:
+        if name.endswith("_pkey"):
+            continue
+        if partition_key:
+            definition = _partitioned_index(definition, partition_key)
+        op.execute(definition)
+
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+
+def _rename_to_legacy(table: str) -> str:
+    legacy = f"{table}_legacy"
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER INDEX {table}_pkey RENAME TO {legacy}_pkey")
+    return legacy
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    today = date.today().replace(day=1)
+
+    for table, key in PARTITIONED_TABLES.items():
+        indexes, foreign_keys, sequence = _table_ddl(bind, table)
+        first = bind.execute(sa.text(f"SELECT MIN({key}) FROM {table}")).scalar()
+
+        legacy = _rename_to_legacy(table)
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({key})"
+        )
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})")
+
+        month = first.date().replace(day=1) if first else today
+        last = _add_months(today, PREMAKE_MONTHS)
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        _copy_structure(table, legacy, indexes, foreign_keys, sequence, partition_key=key)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for table in PARTITIONED_TABLES:
+        indexes, foreign_keys, sequence = _table_ddl(bind, table)
+        # Ana tablodaki index'ler bölümlere de yayılmıştır; sadece ana tanımlar alınır
+        legacy = _rename_to_legacy(table)
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+
+        # Bölümler ana tablo silinince birlikte silinir
+        _copy_structure(table, legacy, indexes, foreign_keys, sequence)
@@ -0,0 +1,36 @@
+"""Replace audit_logs date/record indexes with keyset pagination indexes
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "k1l2m3n4o5p6"
+down_revision: Union[str, None] = "j0k1l2m3n4o5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_audit_date_id", "audit_logs", ["created_at", "id"])
+    op.create_index(
+        "idx_audit_record_history",
+        "audit_logs",
+        ["table_name", "record_id", "created_at", "id"],
+    )
+    # Yeni index'lerin öneki oldukları için gereksiz
+    op.drop_index("idx_audit_date", table_name="audit_logs")
+    op.drop_index("idx_audit_table_record", table_name="audit_logs")
+
+
+def downgrade() -> None:
+    op.create_index("idx_audit_table_record", "audit_logs", ["table_name", "record_id"])
+    op.create_index("idx_audit_date", "audit_logs", ["created_at"])
+    op.drop_index("idx_audit_record_history", table_name="audit_logs")
+    op.drop_index("idx_audit_date_id", table_name="audit_logs")
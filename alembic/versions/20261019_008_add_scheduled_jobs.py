@@ -0,0 +1,72 @@
+"""Add scheduled_jobs and job_runs tables (headless job runner)
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "l2m3n4o5p6q7"
+down_revision: Union[str, None] = "k1l2m3n4o5p6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("description", sa.String(500), nullable=True),
+        sa.Column("cron", sa.String(100), nullable=False),
+        sa.Column(
+            "timeout_seconds", sa.Integer(), nullable=False, server_default="3600"
+        ),
+        sa.Column("next_run_at", sa.DateTime(), nullable=True),
+        sa.Column("locked_by", sa.String(200), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_started_at", sa.DateTime(), nullable=True),
+        sa.Column("last_finished_at", sa.DateTime(), nullable=True),
+        sa.Column("last_status", sa.String(20), nullable=True),
+        sa.Column("last_duration_ms", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_scheduled_job_name", "scheduled_jobs", ["name"], unique=True)
+    op.create_index("idx_scheduled_job_next_run", "scheduled_jobs", ["next_run_at"])
+
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("node", sa.String(200), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="running"),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("rows_affected", sa.Integer(), nullable=True),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["job_id"], ["scheduled_jobs.id"], ondelete="CASCADE"),
+    )
+    op.create_index("idx_job_run_job_started", "job_runs", ["job_id", "started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_job_run_job_started", table_name="job_runs")
+    op.drop_table("job_runs")
+    op.drop_index("idx_scheduled_job_next_run", table_name="scheduled_jobs")
+    op.drop_index("idx_scheduled_job_name", table_name="scheduled_jobs")
+    op.drop_table("scheduled_jobs")
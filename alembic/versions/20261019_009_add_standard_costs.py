@@ -0,0 +1,76 @@
+"""Add standard_costs snapshots and standard_cost_queue (cost roll-up)
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "m3n4o5p6q7r8"
+down_revision: Union[str, None] = "l2m3n4o5p6q7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "standard_costs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("bom_id", sa.Integer(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("level", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("material_cost", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column("scrap_cost", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column("labor_cost", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column("machine_cost", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column("overhead_cost", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column(
+            "by_product_credit", sa.Numeric(18, 6), nullable=False, server_default="0"
+        ),
+        sa.Column("total_cost", sa.Numeric(18, 6), nullable=False, server_default="0"),
+        sa.Column("valid_from", sa.DateTime(), nullable=False),
+        sa.Column("valid_to", sa.DateTime(), nullable=True),
+        sa.Column("is_current", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("trigger", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["bom_id"], ["bill_of_materials.id"], ondelete="SET NULL"
+        ),
+    )
+    op.create_index(
+        "idx_stdcost_item_version", "standard_costs", ["item_id", "version"], unique=True
+    )
+    op.create_index("idx_stdcost_current", "standard_costs", ["is_current", "item_id"])
+
+    op.create_table(
+        "standard_cost_queue",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_stdcost_queue_item", "standard_cost_queue", ["item_id"])
+    # İlk anlık görüntüler standard_cost işinin ilk çalışmasında
+    # (tablo boşken tam roll-up) oluşturulur.
+
+
+def downgrade() -> None:
+    op.drop_index("idx_stdcost_queue_item", table_name="standard_cost_queue")
+    op.drop_table("standard_cost_queue")
+    op.drop_index("idx_stdcost_current", table_name="standard_costs")
+    op.drop_index("idx_stdcost_item_version", table_name="standard_costs")
+    op.drop_table("standard_costs")
@@ -0,0 +1,15 @@
+"""
+Akıllı İş - Uygulama Sunucusu (HTTP/JSON API)
+
+İstemci tarafı hafiftir ve veritabanı katmanını yüklemez; sunucu
+tarafı için api.server modülünü doğrudan içe aktarın.
+"""
+
+from .client import ApiClient, ApiError, RemoteService, get_api_client
+
+__all__ = [
+    "ApiClient",
+    "ApiError",
+    "RemoteService",
+    "get_api_client",
+]
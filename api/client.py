@@ -0,0 +1,259 @@
+"""
+Akıllı İş - Uygulama Sunucusu İstemcisi
+
+İnce istemciler (operatör terminali vb.) için hafif adaptör. Yalnızca
+standart kütüphane kullanır; SQLAlchemy veya veritabanı sürücüsü
+gerektirmez.
+
+    client = ApiClient("http://sunucu:8765", token="...")
+    operator = client.service("production.operator")
+    operator.get_station_operations(3)   # -> list[dict]
+
+Uzak servis nesnesi yerel servisle aynı metot adlarını kullanır. Decimal
+değerler metin, tarih/saatler ISO metni olarak gelir. Sunucunun
+Cache-Control: max-age ile işaretlediği yanıtlar istemci tarafında da
+saklanır; aynı servise yapılan yazma çağrısı bu önbelleği temizler.
+
+ChangePoller, sunucunun /changes akışını uzun yoklama ile izler ve
+değişen tablo/kimlikleri callback(table, ids) ile bildirir.
+"""
+
+import http.client
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from config import API_CLIENT_TIMEOUT, API_SERVER_URL, API_TOKEN, CHANGE_FEED_WAIT_SECONDS
+
+
+class ApiError(Exception):
+    """Sunucunun döndürdüğü hata (servis istisnası veya HTTP hatası)"""
+
+    def __init__(self, message: str, error_type: str = None, status: int = None):
+        self.error_type = error_type
+        self.status = status
+        super().__init__(message)
+
+
+class RemoteService:
+    """Uzak servis vekili: remote.metot(*args, **kwargs)"""
+
+    def __init__(self, client: "ApiClient", name: str):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(*args, **kwargs):
+            return self._client.call(self._name, method, *args, **kwargs)
+
+        call.__name__ = method
+        return call
+
+    def __repr__(self):
+        return f"<RemoteService {self._name}>"
+
+
+class ApiClient:
+    """Kalıcı (keep-alive) bağlantılı JSON istemcisi; thread başına bir bağlantı"""
+
+    def __init__(self, base_url: str, token: str = "", timeout: float = API_CLIENT_TIMEOUT):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Geçersiz sunucu adresi: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+        self._cache: Dict[str, Dict[str, Tuple[float, Any]]] = {}
+        self._cache_lock = threading.Lock()
+
+    def service(self, name: str) -> RemoteService:
+        return RemoteService(self, name)
+
+    def health(self) -> bool:
+        try:
+            return self._request("GET", "/health")[1].get("status") == "ok"
+        except (ApiError, OSError):
+            return False
+
+    def call(self, service: str, method: str, *args, **kwargs) -> Any:
+        body = json.dumps({"args": list(args), "kwargs": kwargs}, default=str)
+        cache_key = f"{method}:{body}"
+
+        with self._cache_lock:
+            entry = self._cache.get(service, {}).get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        headers, data = self._request("POST", f"/api/{service}/{method}", body.encode("utf-8"))
+        result = data.get("result")
+
+        max_age = _max_age(headers.get("cache-control", ""))
+        with self._cache_lock:
+            if headers.get("x-api-write"):
+                self._cache.pop(service, None)
+            elif max_age:
+                self._cache.setdefault(service, {})[cache_key] = (
+                    time.monotonic() + max_age,
+                    result,
+                )
+        return result
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def changes(self, after: int = 0, epoch: str = "", tables: Iterable[str] = (), wait: float = 0) -> Dict:
+        """
+        Değişiklik akışı: {"epoch", "cursor", "changes": {tablo: [id] | None}, "reset"}
+        Yeni değişiklik yoksa sunucu en fazla wait saniye bekletir.
+        """
+        query = urlencode(
+            {"after": after, "epoch": epoch, "tables": ",".join(sorted(tables)), "wait": wait}
+        )
+        return self._request("GET", f"/changes?{query}")[1]
+
+    # ==================== HTTP ====================
+
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, path: str, body: bytes = None) -> Tuple[Dict[str, str], Dict]:
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        # Sunucudaki audit kayıtları oturumdaki kullanıcıyla yazılsın
+        user_id = _session_user_id()
+        if user_id is not None:
+            headers["X-User-Id"] = str(user_id)
+
+        reused = getattr(self._local, "conn", None) is not None
+        conn = self._connection()
+        try:
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # Sunucu boşta bekleyen keep-alive bağlantısını kapatmış olabilir;
+            # istek işlenmeden düştüğü için yeni bağlantıyla bir kez tekrarlanır
+            if not reused:
+                raise
+            conn = self._connection(fresh=True)
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+
+        raw = response.read()
+        response_headers = {k.lower(): v for k, v in response.getheaders()}
+        if response.getheader("Connection", "").lower() == "close":
+            conn.close()
+            self._local.conn = None
+
+        try:
+            data = json.loads(raw.decode("utf-8")) if raw else {}
+        except ValueError:
+            raise ApiError(f"Geçersiz sunucu yanıtı ({response.status})", status=response.status)
+
+        if response.status >= 400:
+            raise ApiError(
+                data.get("error") or response.reason,
+                error_type=data.get("type"),
+                status=response.status,
+            )
+        return response_headers, data
+
+
+class ChangePoller(threading.Thread):
+    """Sunucunun değişiklik akışını izler; callback poller thread'inde çağrılır"""
+
+    RETRY_SECONDS = 5.0
+
+    def __init__(
+        self,
+        tables: Iterable[str],
+        callback: Callable[[str, Optional[FrozenSet[int]]], None],
+        wait: float = CHANGE_FEED_WAIT_SECONDS,
+    ):
+        super().__init__(name="change-poller", daemon=True)
+        self.tables = frozenset(tables)
+        self.callback = callback
+        self.wait = wait
+        # Uzun yoklama isteği istemci zaman aşımından uzun sürebilir
+        self.client = ApiClient(API_SERVER_URL, API_TOKEN, timeout=wait + API_CLIENT_TIMEOUT)
+        self.connected = False
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        epoch, cursor = "", 0
+        while not self._stop_event.is_set():
+            try:
+                data = self.client.changes(cursor, epoch, self.tables, self.wait if epoch else 0)
+            except (ApiError, OSError) as e:
+                self.connected = False
+                self.last_error = str(e)
+                self._stop_event.wait(self.RETRY_SECONDS)
+                continue
+
+            self.connected = True
+            self.last_error = None
+            epoch, cursor = data["epoch"], data["cursor"]
+            if self._stop_event.is_set():
+                break
+            if data.get("reset"):
+                changes = dict.fromkeys(self.tables)
+            else:
+                changes = data.get("changes") or {}
+            for table, ids in changes.items():
+                try:
+                    self.callback(table, None if ids is None else frozenset(ids))
+                except Exception as e:
+                    print(f"Değişiklik bildirimi işlenemedi ({table}): {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _session_user_id() -> Optional[int]:
+    """Oturumdaki kullanıcı (veritabanı paketleri kurulu olmayan istemcide yok)"""
+    try:
+        from core.user_context import get_current_user_id
+    except ImportError:
+        return None
+    return get_current_user_id()
+
+
+def _max_age(cache_control: str) -> Optional[int]:
+    for part in cache_control.split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return int(value)
+    return None
+
+
+_client: Optional[ApiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_api_client() -> ApiClient:
+    """Yapılandırmadaki (API_SERVER_URL, API_TOKEN) paylaşılan istemci"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not API_SERVER_URL:
+                raise ApiError("API_SERVER_URL tanımlı değil")
+            _client = ApiClient(API_SERVER_URL, API_TOKEN)
+        return _client
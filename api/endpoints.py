@@ -0,0 +1,213 @@
+"""
+Akıllı İş - Uygulama Sunucusu Uç Noktaları
+
+Sunucunun dışarı açtığı servis metotlarının beyaz listesi. Her çağrı
+kendi session_scope()'unda yeni bir servis örneği ile çalışır; servisler
+get_session() üzerinden kapsamın session'ını kullanır.
+
+    POST /api/<servis>/<metot>  {"args": [...], "kwargs": {...}}
+    GET  /api/<servis>/<metot>?param=değer   (yalnızca okuma metotları)
+
+reads içindeki değer önbellek süresidir (saniye, None = önbelleğe
+alınmaz). Aynı servise yapılan her yazma çağrısı o servisin önbelleğini
+temizler; tables içindeki tablolardan biri herhangi bir istemcide
+değişince de (core.change_bus) önbellek temizlenir. feeds içindeki
+tabloların değişiklikleri ince istemcilere GET /changes akışıyla
+(uzun yoklama) duyurulur.
+"""
+
+import enum
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from config import API_REFERENCE_CACHE_TTL
+from core.reference_data import RefSnapshot
+from database.base import BaseModel
+
+
+REF = API_REFERENCE_CACHE_TTL
+
+
+@dataclass
+class Endpoint:
+    """Dışarı açılan servis: fabrika(session), izinli metotlar, önbelleği etkileyen ve canlı izlenen tablolar"""
+
+    factory: Callable[[Session], Any]
+    reads: Dict[str, Optional[int]] = field(default_factory=dict)
+    writes: Set[str] = field(default_factory=set)
+    tables: Tuple[str, ...] = ()
+    feeds: Tuple[str, ...] = ()
+
+    def allows(self, method: str) -> bool:
+        return method in self.reads or method in self.writes
+
+
+def _item_service(session):
+    from modules.inventory.services import ItemService
+
+    return ItemService()
+
+
+def _unit_service(session):
+    from modules.inventory.services import UnitService
+
+    return UnitService()
+
+
+def _category_service(session):
+    from modules.inventory.services import CategoryService
+
+    return CategoryService()
+
+
+def _warehouse_service(session):
+    from modules.inventory.services import WarehouseService
+
+    return WarehouseService()
+
+
+def _stock_service(session):
+    from modules.inventory.services import StockMovementService
+
+    return StockMovementService()
+
+
+def _operator_service(session):
+    from modules.production.operator_service import OperatorPanelService
+
+    return OperatorPanelService()
+
+
+def _maintenance_service(session):
+    from modules.maintenance.services import MaintenanceService
+
+    return MaintenanceService(session)
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    # Stok
+    "inventory.items": Endpoint(
+        _item_service,
+        reads={
+            "get_all": REF,
+            "get_by_id": None,
+            "get_by_code": None,
+            "get_by_barcode": None,
+            "search": None,
+        },
+        tables=("items",),
+    ),
+    "inventory.units": Endpoint(
+        _unit_service, reads={"get_all": REF, "get_by_id": REF}, tables=("units",)
+    ),
+    "inventory.categories": Endpoint(
+        _category_service,
+        reads={"get_all": REF, "get_root_categories": REF},
+        tables=("item_categories",),
+    ),
+    "inventory.warehouses": Endpoint(
+        _warehouse_service,
+        reads={"get_all": REF, "get_by_id": REF, "get_default": REF},
+        tables=("warehouses",),
+    ),
+    "inventory.stock": Endpoint(
+        _stock_service,
+        reads={
+            "get_available_quantity": None,
+            "get_stock_summary": None,
+            "get_by_item": None,
+        },
+    ),
+    # Üretim operasyonları (operatör paneli)
+    "production.operator": Endpoint(
+        _operator_service,
+        reads={
+            "get_stations": REF,
+            "get_shift_teams": REF,
+            "get_station_operations": None,
+            "get_operation": None,
+            "get_operations": None,
+            "get_operation_scraps": None,
+            "get_active_personnel": None,
+            "get_users": None,
+        },
+        writes={
+            "start_operation",
+            "pause_operation",
+            "complete_operation",
+            "report_scrap",
+            "create_partial_production",
+            "assign_personnel",
+            "remove_personnel",
+        },
+        tables=("work_stations", "shift_teams"),
+        feeds=("work_order_operations",),
+    ),
+    # Bakım
+    "maintenance": Endpoint(
+        _maintenance_service,
+        reads={
+            "get_equipment_list": REF,
+            "get_all_categories": REF,
+            "get_all_workstations": REF,
+            "get_maintenance_technicians": REF,
+            "get_equipment_by_id": None,
+            "get_active_downtimes": None,
+            "get_today_downtimes": None,
+            "get_active_work_orders": None,
+            "get_pending_requests": None,
+            "get_overdue_maintenance_plans": None,
+            "get_equipment_kpis": None,
+            "get_all_equipment_kpis": None,
+        },
+        writes={
+            "start_downtime",
+            "end_downtime",
+            "create_request",
+            "start_work_order",
+            "complete_work_order",
+            "update_work_order_notes",
+        },
+        tables=("equipments", "maintenance_categories", "work_stations", "users"),
+    ),
+}
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Servis dönüş değerini JSON'a uygun hale getirir
+
+    Model nesneleri kolon değerleriyle (ilişkiler hariç), referans veri
+    kayıtları alanlarıyla sözlüğe çevrilir.
+    Decimal hassasiyet kaybı olmaması için metin olarak gönderilir.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, RefSnapshot):
+        return to_jsonable(value.to_dict())
+    if isinstance(value, BaseModel):
+        return {
+            attr.key: to_jsonable(getattr(value, attr.key))
+            for attr in inspect(type(value)).column_attrs
+        }
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    return str(value)
+
+
+def feed_tables() -> Set[str]:
+    """Değişiklik akışıyla izlenebilen tablolar"""
+    return {table for endpoint in ENDPOINTS.values() for table in endpoint.feeds}
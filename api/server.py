@@ -0,0 +1,449 @@
+"""
+Akıllı İş - Uygulama Sunucusu (asyncio HTTP/JSON)
+
+Servis sınıflarını HTTP üzerinden sunar; istemciler veritabanına bağlanmaz.
+Bağlantılar asyncio ile karşılanır, servis çağrıları (SQLAlchemy senkron
+olduğundan) sabit boyutlu bir iş parçacığı havuzunda çalışır. Böylece tüm
+istemciler tek bir bağlantı havuzunu paylaşır; havuz boyutu
+API_SERVER_WORKERS ile sınırlanır.
+
+- Yalnızca standart kütüphane kullanır (HTTP/1.1, keep-alive)
+- Referans veri yanıtları önbelleğe alınır (bkz. api/endpoints.py); başka
+  istemcilerdeki değişiklikler core.change_bus ile önbelleği temizler
+- GET /changes?after=<imleç>&epoch=<e>&tables=a,b&wait=<sn>: izlenen
+  tablolardaki değişiklikleri (uzun yoklama) ince istemcilere iletir
+- API_TOKEN tanımlıysa Bearer doğrulaması yapılır
+- X-User-Id başlığındaki kullanıcı, servis çağrısı süresince kullanıcı
+  bağlamına (core.user_context) yazılır; audit kayıtları bu kullanıcıyla
+  oluşturulur. Başlık yalnızca API_TOKEN tanımlıyken (doğrulanmış
+  isteklerde) dikkate alınır; token yoksa yok sayılır.
+- Gövde uzunluğu (Content-Length) geçersizse 400 döner, bağlantı kapatılır
+
+Kullanım:
+    python server.py
+"""
+
+import asyncio
+import hmac
+import json
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Deque, Dict, FrozenSet, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from config import API_SERVER_WORKERS, API_TOKEN, CHANGE_FEED_SIZE, CHANGE_FEED_WAIT_SECONDS
+from core.user_context import UserContext, create_user_context, set_current_user
+from database.base import session_scope
+from database.models.user import User
+from api.endpoints import ENDPOINTS, Endpoint, feed_tables, to_jsonable
+
+
+# İstek sınırları
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 10 * 1024 * 1024
+# Boşta bekleyen keep-alive bağlantısı bu süre sonunda kapatılır (saniye)
+KEEP_ALIVE_TIMEOUT = 75
+
+
+class ApiRequestError(Exception):
+    """İstemciye HTTP durum kodu ile döndürülen hata"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+class ResponseCache:
+    """Servis bazlı, süreli yanıt önbelleği (yalnızca event loop thread'inden kullanılır)"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Tuple, Tuple[float, bytes]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, service: str, key: Tuple) -> Optional[bytes]:
+        entry = self._entries.get(service, {}).get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, service: str, key: Tuple, ttl: int, body: bytes) -> None:
+        self._entries.setdefault(service, {})[key] = (time.monotonic() + ttl, body)
+
+    def invalidate(self, service: str = None) -> None:
+        if service is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(service, None)
+
+
+class ChangeFeed:
+    """
+    İnce istemciler için tablo değişikliği akışı (yalnızca event loop
+    thread'inden kullanılır).
+
+    Her değişiklik artan bir imleçle saklanır; istemci son gördüğü imleci
+    gönderir, yeni değişiklik yoksa wait süresi kadar bekletilir. İmleç
+    saklanan aralığın dışındaysa veya sunucu yeniden başlamışsa (epoch
+    farklı) reset döner ve istemci ekranını tamamen yeniler.
+    """
+
+    def __init__(self, size: int = CHANGE_FEED_SIZE):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.cursor = 0
+        self._events: Deque[Tuple[int, str, Optional[FrozenSet[int]]]] = deque(maxlen=size)
+        self._wakeup = asyncio.Event()
+
+    def publish(self, table: str, ids: Optional[FrozenSet[int]]) -> None:
+        self.cursor += 1
+        self._events.append((self.cursor, table, ids))
+        # Bekleyenleri uyandır; sonraki beklemeler yeni event'i kullanır
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def collect(self, after: int, epoch: str, tables: Set[str]) -> Dict[str, Any]:
+        """after imlecinden sonraki değişiklikler (ids None = tablonun tamamı)"""
+        result = {"epoch": self.epoch, "cursor": self.cursor, "changes": {}, "reset": False}
+        if not epoch:
+            # İlk çağrı: istemci verisini kendisi yükledi, yalnızca imleç döner
+            return result
+        oldest = self._events[0][0] if self._events else self.cursor + 1
+        if epoch != self.epoch or after > self.cursor or after < oldest - 1:
+            result["reset"] = True
+            return result
+
+        changes: Dict[str, Optional[Set[int]]] = {}
+        for seq, table, ids in self._events:
+            if seq <= after or table not in tables:
+                continue
+            if ids is None or changes.get(table, set()) is None:
+                changes[table] = None
+            else:
+                changes.setdefault(table, set()).update(ids)
+        result["changes"] = {t: None if ids is None else sorted(ids) for t, ids in changes.items()}
+        return result
+
+    async def wait(self, after: int, epoch: str, tables: Set[str], timeout: float) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            result = self.collect(after, epoch, tables)
+            remaining = deadline - loop.time()
+            if result["changes"] or result["reset"] or not epoch or remaining <= 0:
+                return result
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+
+class ApiServer:
+    """asyncio tabanlı HTTP/JSON uygulama sunucusu"""
+
+    def __init__(self, host: str, port: int, workers: int = API_SERVER_WORKERS, token: str = API_TOKEN):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.cache = ResponseCache()
+        self.feed = ChangeFeed()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="api")
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._change_callback = None
+
+    async def start(self) -> None:
+        self._watch_changes(asyncio.get_running_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._change_callback is not None:
+            from core.change_bus import change_bus
+
+            change_bus.unsubscribe(self._change_callback)
+            self._change_callback = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    def _watch_changes(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Uç noktaların tablolarındaki değişikliklerde yanıt önbelleğini
+        temizler, izlenen tabloların değişikliklerini akışa ekler
+        """
+        from core.change_bus import change_bus
+
+        by_table: Dict[str, Set[str]] = {}
+        for name, endpoint in ENDPOINTS.items():
+            for table in endpoint.tables:
+                by_table.setdefault(table, set()).add(name)
+        feeds = feed_tables()
+
+        def on_change(table, ids):
+            # Bildirimler dinleyici thread'inden gelir; önbellek ve akış event loop'a ait
+            for name in by_table.get(table, ()):
+                loop.call_soon_threadsafe(self.cache.invalidate, name)
+            if table in feeds:
+                loop.call_soon_threadsafe(self.feed.publish, table, ids)
+
+        self._change_callback = on_change
+        change_bus.subscribe(set(by_table) | feeds, on_change)
+
+    # ==================== HTTP ====================
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ApiRequestError as e:
+                    # Gövdenin sınırı bilinmiyor; yanıtla ve bağlantıyı kapat
+                    self._write_response(writer, e.status, _error_body(e.status.phrase, str(e)), {}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+
+                try:
+                    status, payload, extra = await self._dispatch(method, target, headers, body)
+                except ApiRequestError as e:
+                    status, payload, extra = e.status, _error_body(e.status.phrase, str(e)), {}
+
+                self._write_response(writer, status, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            return None
+
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            raw = await reader.readline()
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = raw.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = headers.get("content-length", "").strip() or "0"
+        if not length.isdigit():
+            raise ApiRequestError(HTTPStatus.BAD_REQUEST, "Geçersiz Content-Length")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            return None
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+        return method.upper(), target, headers, body, keep_alive
+
+    @staticmethod
+    def _write_response(writer, status: HTTPStatus, payload: bytes, extra: Dict[str, str], keep_alive: bool):
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in extra.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+
+    # ==================== YÖNLENDİRME ====================
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        self.requests += 1
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["health"]:
+            return HTTPStatus.OK, _json({"status": "ok"}), {}
+
+        self._authenticate(headers)
+
+        if parts == ["changes"]:
+            if method != "GET":
+                raise ApiRequestError(HTTPStatus.METHOD_NOT_ALLOWED, "Değişiklik akışı GET ile okunur")
+            after, epoch, tables, wait = _feed_params(url.query)
+            result = await self.feed.wait(after, epoch, tables, wait)
+            return HTTPStatus.OK, _json(result), {"Cache-Control": "no-store"}
+
+        if parts == ["api"]:
+            listing = {
+                name: {"reads": sorted(ep.reads), "writes": sorted(ep.writes)}
+                for name, ep in ENDPOINTS.items()
+            }
+            return HTTPStatus.OK, _json(listing), {}
+
+        if len(parts) != 3 or parts[0] != "api":
+            raise ApiRequestError(HTTPStatus.NOT_FOUND, "Bilinmeyen adres")
+        service_name, method_name = parts[1], parts[2]
+        endpoint = ENDPOINTS.get(service_name)
+        if endpoint is None or not endpoint.allows(method_name):
+            raise ApiRequestError(HTTPStatus.NOT_FOUND, f"Bilinmeyen metot: {service_name}.{method_name}")
+
+        is_read = method_name in endpoint.reads
+        if method == "GET":
+            if not is_read:
+                raise ApiRequestError(HTTPStatus.METHOD_NOT_ALLOWED, "Yazma metotları POST ile çağrılmalı")
+            args, kwargs = [], {k: _query_value(v) for k, v in parse_qsl(url.query)}
+        elif method == "POST":
+            args, kwargs = _parse_body(body)
+        else:
+            raise ApiRequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"Desteklenmeyen metot: {method}")
+
+        ttl = endpoint.reads.get(method_name) if is_read else None
+        cache_key = (method_name, _canonical(args), _canonical(kwargs))
+        if ttl:
+            cached = self.cache.get(service_name, cache_key)
+            if cached is not None:
+                return HTTPStatus.OK, cached, {"Cache-Control": f"max-age={ttl}", "X-Cache": "hit"}
+
+        # Kimlik doğrulaması yoksa başlık herkesçe yazılabilir; güvenilmez
+        user_id = _user_id(headers) if self.token else None
+        loop = asyncio.get_running_loop()
+        status, payload = await loop.run_in_executor(
+            self.executor, _call_service, endpoint, method_name, args, kwargs, user_id
+        )
+
+        extra: Dict[str, str] = {}
+        if status == HTTPStatus.OK:
+            if ttl:
+                self.cache.put(service_name, cache_key, ttl, payload)
+                extra = {"Cache-Control": f"max-age={ttl}", "X-Cache": "miss"}
+            elif not is_read:
+                self.cache.invalidate(service_name)
+                extra = {"Cache-Control": "no-store", "X-Api-Write": "1"}
+            else:
+                extra = {"Cache-Control": "no-store"}
+        return status, payload, extra
+
+    def _authenticate(self, headers: Dict[str, str]) -> None:
+        if not self.token:
+            return
+        scheme, _, value = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(value.strip(), self.token):
+            raise ApiRequestError(HTTPStatus.UNAUTHORIZED, "Geçersiz veya eksik API anahtarı")
+
+
+def _call_service(
+    endpoint: Endpoint, method_name: str, args, kwargs, user_id: Optional[int] = None
+) -> Tuple[HTTPStatus, bytes]:
+    """
+    Servis metodunu iş parçacığında, kendi iş birimi içinde çalıştırır.
+
+    user_id verilmişse çağrı süresince o kullanıcının bağlamı ayarlanır ve
+    çağrı bitince temizlenir (havuzdaki thread bir sonraki isteğe
+    kullanıcısız başlar).
+    """
+    try:
+        with session_scope() as session:
+            if user_id is not None:
+                user = session.get(User, user_id)
+                if user is None or not user.is_active:
+                    return HTTPStatus.UNAUTHORIZED, _error_body(
+                        "Unauthorized", f"Geçersiz kullanıcı: {user_id}"
+                    )
+                set_current_user(create_user_context(user))
+            service = endpoint.factory(session)
+            result = getattr(service, method_name)(*args, **kwargs)
+            # Tembel ilişkiler session kapanmadan çözülsün
+            payload = _json({"result": to_jsonable(result)})
+        return HTTPStatus.OK, payload
+    except TypeError as e:
+        return HTTPStatus.BAD_REQUEST, _error_body("TypeError", str(e))
+    except Exception as e:
+        return HTTPStatus.UNPROCESSABLE_ENTITY, _error_body(type(e).__name__, str(e))
+    finally:
+        if user_id is not None:
+            set_current_user(UserContext())
+
+
+def _user_id(headers: Dict[str, str]) -> Optional[int]:
+    """İstemcinin oturumdaki kullanıcısı (X-User-Id başlığı)"""
+    value = headers.get("x-user-id", "").strip()
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ApiRequestError(HTTPStatus.BAD_REQUEST, "X-User-Id sayı olmalı")
+    return int(value)
+
+
+def _feed_params(query: str) -> Tuple[int, str, Set[str], float]:
+    params = dict(parse_qsl(query))
+    try:
+        after = int(params.get("after") or 0)
+        wait = min(max(float(params.get("wait") or 0), 0), CHANGE_FEED_WAIT_SECONDS)
+    except ValueError:
+        raise ApiRequestError(HTTPStatus.BAD_REQUEST, "after ve wait sayı olmalı")
+    feeds = feed_tables()
+    requested = _split_tables(params.get("tables", ""))
+    unknown = requested - feeds
+    if unknown:
+        raise ApiRequestError(HTTPStatus.BAD_REQUEST, f"İzlenmeyen tablo: {', '.join(sorted(unknown))}")
+    return after, params.get("epoch", ""), requested or feeds, wait
+
+
+def _split_tables(text: str) -> Set[str]:
+    return {t.strip() for t in text.split(",") if t.strip()}
+
+
+def _parse_body(body: bytes):
+    if not body:
+        return [], {}
+    try:
+        data = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        raise ApiRequestError(HTTPStatus.BAD_REQUEST, "Geçersiz JSON")
+    if not isinstance(data, dict):
+        raise ApiRequestError(HTTPStatus.BAD_REQUEST, "Gövde bir JSON nesnesi olmalı")
+    args, kwargs = data.get("args") or [], data.get("kwargs") or {}
+    if not isinstance(args, list) or not isinstance(kwargs, dict):
+        raise ApiRequestError(HTTPStatus.BAD_REQUEST, "args liste, kwargs nesne olmalı")
+    return args, kwargs
+
+
+def _query_value(text: str) -> Any:
+    """Sorgu parametresi: JSON olarak çözülebiliyorsa (sayı, true...) o tipte"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _json(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _error_body(error_type: str, message: str) -> bytes:
+    return _json({"error": message, "type": error_type})
@@ -16,9 +16,46 @@ from .settings import (
     DB_NAME,
     DB_USER,
     DB_PASSWORD,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_PGBOUNCER,
+    DB_REPLICA_URL,
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICA_CHECK_INTERVAL,
     get_database_url,
     DEBUG,
     SECRET_KEY,
+    MAINTENANCE_SCHEDULER_INTERVAL,
+    ARCHIVE_DIR,
+    AUDIT_LOG_RETENTION_MONTHS,
+    ERROR_LOG_RETENTION_MONTHS,
+    STOCK_MOVEMENT_RETENTION_MONTHS,
+    PARTITION_PREMAKE_MONTHS,
+    PARTITION_MAINTENANCE_INTERVAL,
+    JOB_RUNNER_POLL_INTERVAL,
+    API_SERVER_HOST,
+    API_SERVER_PORT,
+    API_SERVER_WORKERS,
+    API_SERVER_URL,
+    API_TOKEN,
+    API_REFERENCE_CACHE_TTL,
+    API_CLIENT_TIMEOUT,
+    REFERENCE_CACHE_CHECK_INTERVAL,
+    ATP_CACHE_MAX_AGE,
+    CHANGE_NOTIFY_ENABLED,
+    CHANGE_NOTIFY_CHANNEL,
+    CHANGE_NOTIFY_COALESCE_MS,
+    CHANGE_NOTIFY_LISTEN_URL,
+    LIVE_UPDATE_DEBOUNCE_MS,
+    LIVE_UPDATE_FALLBACK_SECONDS,
+    CHANGE_FEED_SIZE,
+    CHANGE_FEED_WAIT_SECONDS,
+    QUERY_INSTRUMENTATION,
+    SLOW_QUERY_THRESHOLD_MS,
+    N_PLUS_ONE_THRESHOLD,
+    SLOW_QUERY_LOG,
     ANTHROPIC_API_KEY,
     AI_MODEL,
     UI,
@@ -57,9 +94,46 @@ __all__ = [
     "DB_NAME",
     "DB_USER",
     "DB_PASSWORD",
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "DB_POOL_TIMEOUT",
+    "DB_POOL_RECYCLE",
+    "DB_PGBOUNCER",
+    "DB_REPLICA_URL",
+    "DB_REPLICA_MAX_LAG",
+    "DB_REPLICA_CHECK_INTERVAL",
     "get_database_url",
     "DEBUG",
     "SECRET_KEY",
+    "MAINTENANCE_SCHEDULER_INTERVAL",
+    "ARCHIVE_DIR",
+    "AUDIT_LOG_RETENTION_MONTHS",
+    "ERROR_LOG_RETENTION_MONTHS",
+    "STOCK_MOVEMENT_RETENTION_MONTHS",
+    "PARTITION_PREMAKE_MONTHS",
+    "PARTITION_MAINTENANCE_INTERVAL",
+    "JOB_RUNNER_POLL_INTERVAL",
+    "API_SERVER_HOST",
+    "API_SERVER_PORT",
+    "API_SERVER_WORKERS",
+    "API_SERVER_URL",
+    "API_TOKEN",
+    "API_REFERENCE_CACHE_TTL",
+    "API_CLIENT_TIMEOUT",
+    "REFERENCE_CACHE_CHECK_INTERVAL",
+    "ATP_CACHE_MAX_AGE",
+    "CHANGE_NOTIFY_ENABLED",
+    "CHANGE_NOTIFY_CHANNEL",
+    "CHANGE_NOTIFY_COALESCE_MS",
+    "CHANGE_NOTIFY_LISTEN_URL",
+    "LIVE_UPDATE_DEBOUNCE_MS",
+    "LIVE_UPDATE_FALLBACK_SECONDS",
+    "CHANGE_FEED_SIZE",
+    "CHANGE_FEED_WAIT_SECONDS",
+    "QUERY_INSTRUMENTATION",
+    "SLOW_QUERY_THRESHOLD_MS",
+    "N_PLUS_ONE_THRESHOLD",
+    "SLOW_QUERY_LOG",
     "ANTHROPIC_API_KEY",
     "AI_MODEL",
     "UI",
@@ -31,6 +31,24 @@ DB_NAME = os.getenv("DB_NAME", "akilli_is")
 DB_USER = os.getenv("DB_USER", "akilli_user")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "akilli123")
 
+# Bağlantı havuzu (istemci başına; N istemci en fazla
+# N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) bağlantı açar)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# PgBouncer (transaction pooling) arkasında: küçük havuz, sunucuda
+# hazırlanmış sorgu (prepared statement) durumu tutulmaz
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "False").lower() == "true"
+
+# Okuma kopyası (rapor, dashboard, MRP veri toplama). Boşsa tüm okumalar
+# birincil veritabanından yapılır. Yerel deneme için sqlite:/// URL'i de olur.
+DB_REPLICA_URL = os.getenv("DB_REPLICA_URL", "")
+# Kopya gecikmesi bu süreyi (saniye) aşarsa okumalar birincile döner
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "30"))
+# Gecikme kontrolü sonucunun geçerlilik süresi (saniye)
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "10"))
+
 
 def get_database_url() -> str:
     """Veritabanı bağlantı URL'i"""
@@ -49,6 +67,77 @@ def get_database_url() -> str:
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 SECRET_KEY = os.getenv("SECRET_KEY", "change-this-in-production")
 
+# Masaüstü istemcide periyodik bakım zamanlayıcısı (saniye, 0 = kapalı).
+# Varsayılan olarak kapalıdır: bakım planları jobs.py'deki maintenance_plans
+# işiyle site genelinde bir kez çalışır.
+MAINTENANCE_SCHEDULER_INTERVAL = int(os.getenv("MAINTENANCE_SCHEDULER_INTERVAL", "0"))
+
+# Büyük log/hareket tabloları: aylık bölümleme ve arşivleme
+# Saklama süreleri ay cinsindendir (0 = arşivleme kapalı). Stok hareketleri
+# bakiye yeniden hesaplama ve geçmiş tarihli stok için gerektiğinden
+# varsayılan olarak arşivlenmez.
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", str(DATA_DIR / "archive")))
+AUDIT_LOG_RETENTION_MONTHS = int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "24"))
+ERROR_LOG_RETENTION_MONTHS = int(os.getenv("ERROR_LOG_RETENTION_MONTHS", "12"))
+STOCK_MOVEMENT_RETENTION_MONTHS = int(os.getenv("STOCK_MOVEMENT_RETENTION_MONTHS", "0"))
+# Önceden oluşturulacak gelecek ay bölümü sayısı
+PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+# Masaüstü istemcide bölüm bakımı / arşivleme aralığı (saniye, 0 = kapalı).
+# Varsayılan olarak kapalıdır: jobs.py'deki partition_archive işi çalıştırır.
+PARTITION_MAINTENANCE_INTERVAL = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL", "0"))
+
+# Arka plan iş çalıştırıcısı (jobs.py): vadesi gelen işleri yoklama aralığı (saniye)
+JOB_RUNNER_POLL_INTERVAL = int(os.getenv("JOB_RUNNER_POLL_INTERVAL", "30"))
+
+# Uygulama sunucusu (server.py): servisleri HTTP/JSON API olarak sunar.
+# API_SERVER_URL tanımlıysa operatör paneli gibi ince istemciler veritabanına
+# bağlanmadan bu sunucuyu kullanır. API_TOKEN boş değilse istekler
+# "Authorization: Bearer <token>" başlığı ile doğrulanır.
+API_SERVER_HOST = os.getenv("API_SERVER_HOST", "127.0.0.1")
+API_SERVER_PORT = int(os.getenv("API_SERVER_PORT", "8765"))
+# Servis çağrılarını çalıştıran iş parçacığı sayısı (bağlantı havuzunu aşmamalı)
+API_SERVER_WORKERS = int(os.getenv("API_SERVER_WORKERS", str(DB_POOL_SIZE)))
+API_SERVER_URL = os.getenv("API_SERVER_URL", "")
+API_TOKEN = os.getenv("API_TOKEN", "")
+# Referans veri (depo, birim, istasyon...) yanıtlarının önbellek süresi (saniye)
+API_REFERENCE_CACHE_TTL = int(os.getenv("API_REFERENCE_CACHE_TTL", "300"))
+API_CLIENT_TIMEOUT = float(os.getenv("API_CLIENT_TIMEOUT", "15"))
+
+# Referans veri önbelleği (core/reference_data.py): tablo sürüm damgalarının
+# en fazla kaç saniyede bir kontrol edileceği (diğer istemcilerin değişiklikleri)
+REFERENCE_CACHE_CHECK_INTERVAL = int(os.getenv("REFERENCE_CACHE_CHECK_INTERVAL", "10"))
+
+# ATP projeksiyonlarının (modules/sales/atp.py) en uzun ömrü (saniye, 0 = sınırsız).
+# Bildirimleri kaçırılan değişikliklere karşı güvenlik ağıdır.
+ATP_CACHE_MAX_AGE = int(os.getenv("ATP_CACHE_MAX_AGE", "300"))
+
+# Önbellek geçersiz kılma bildirimleri (core/change_bus.py, PostgreSQL
+# LISTEN/NOTIFY). Art arda gelen bildirimler bu pencerede (ms) birleştirilir.
+# PgBouncer transaction pooling LISTEN'i taşımaz; DB_PGBOUNCER açıksa
+# dinleyici için doğrudan veritabanına giden URL verilmelidir.
+CHANGE_NOTIFY_ENABLED = os.getenv("CHANGE_NOTIFY_ENABLED", "True").lower() == "true"
+CHANGE_NOTIFY_CHANNEL = os.getenv("CHANGE_NOTIFY_CHANNEL", "akilli_is_changes")
+CHANGE_NOTIFY_COALESCE_MS = int(os.getenv("CHANGE_NOTIFY_COALESCE_MS", "250"))
+CHANGE_NOTIFY_LISTEN_URL = os.getenv("CHANGE_NOTIFY_LISTEN_URL", "")
+
+# Canlı ekranlar (operatör paneli, duruş panosu): değişen satırlar yerinde
+# güncellenir. Bildirimler bu pencere (ms) içinde birleştirilir; istemciler
+# arası bildirim yoksa (SQLite, dinleyici kapalı) ekran bu aralıkla (saniye)
+# tamamen yenilenir.
+LIVE_UPDATE_DEBOUNCE_MS = int(os.getenv("LIVE_UPDATE_DEBOUNCE_MS", "200"))
+LIVE_UPDATE_FALLBACK_SECONDS = int(os.getenv("LIVE_UPDATE_FALLBACK_SECONDS", "300"))
+# Uygulama sunucusunun /changes akışı: saklanan son değişiklik sayısı ve
+# uzun yoklamanın en fazla bekleme süresi (saniye)
+CHANGE_FEED_SIZE = int(os.getenv("CHANGE_FEED_SIZE", "1000"))
+CHANGE_FEED_WAIT_SECONDS = int(os.getenv("CHANGE_FEED_WAIT_SECONDS", "25"))
+
+# Sorgu ölçümü (geliştirici): sorgu süreleri, N+1 alarmı ve yavaş sorgu logu
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "False").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Aynı iş birimi içinde aynı sorgu bu sayıya ulaşınca N+1 alarmı verilir
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+SLOW_QUERY_LOG = Path(os.getenv("SLOW_QUERY_LOG", str(DATA_DIR / "logs" / "slow_queries.log")))
+
 # AI Asistan
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 AI_MODEL = "claude-sonnet-4-20250514"
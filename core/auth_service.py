@@ -3,7 +3,7 @@ Akıllı İş ERP - Auth Service
 Kullanıcı oturumu ve yetkilendirme yönetimi
 """
 
-from typing import Optional, List, Set
+from typing import FrozenSet, Optional, List, Set
 from database.models.user import User
 
 
@@ -17,6 +17,8 @@ class AuthService:
     _current_user: Optional[User] = None
     _permissions_cache: Set[str] = set()
     _roles_cache: Set[str] = set()
+    # Başka istemcide rol/izin değişti: sonraki kontrolde veritabanından yenilenir
+    _cache_stale: bool = False
 
     def __new__(cls):
         if cls._instance is None:
@@ -35,10 +37,12 @@ class AuthService:
         cls._current_user = None
         cls._permissions_cache.clear()
         cls._roles_cache.clear()
+        cls._cache_stale = False
 
     @classmethod
     def _cache_permissions(cls) -> None:
         """Kullanıcının izinlerini ve rollerini önbelleğe al"""
+        cls._cache_stale = False
         cls._permissions_cache.clear()
         cls._roles_cache.clear()
 
@@ -52,6 +56,46 @@ class AuthService:
             for perm in role.permissions:
                 cls._permissions_cache.add(perm.code)
 
+    @classmethod
+    def on_change(cls, table: str, ids: Optional[FrozenSet[int]]) -> None:
+        """
+        Değişiklik bildirimi (core.change_bus): rol veya izin tanımları
+        değiştiyse ya da aktif kullanıcının kaydı değiştiyse önbelleği
+        bayatlatır. Dinleyici thread'inden çağrılır; yenileme bir sonraki
+        yetki kontrolünde yapılır.
+        """
+        user = cls._current_user
+        if user is None:
+            return
+        if table == "users" and ids is not None and user.id not in ids:
+            return
+        cls._cache_stale = True
+
+    @classmethod
+    def _ensure_fresh(cls) -> None:
+        """Bayatlamış rol/izin önbelleğini veritabanından yeniden kurar"""
+        if not cls._cache_stale or cls._current_user is None:
+            return
+        cls._cache_stale = False
+
+        from database.base import session_scope
+
+        try:
+            with session_scope(commit=False) as session:
+                user = session.get(User, cls._current_user.id)
+                if user is None:
+                    return
+                roles = {role.code for role in user.roles}
+                permissions = {perm.code for role in user.roles for perm in role.permissions}
+        except Exception as e:
+            cls._cache_stale = True
+            print(f"Yetki önbelleği yenilenemedi: {e}")
+            return
+
+        # Okuyucular yarım küme görmesin diye referanslar birlikte değiştirilir
+        cls._roles_cache = roles
+        cls._permissions_cache = permissions
+
     @classmethod
     def get_current_user(cls) -> Optional[User]:
         """Aktif kullanıcıyı döndür"""
@@ -81,6 +125,7 @@ class AuthService:
         if cls._current_user.is_superuser:
             return True
 
+        cls._ensure_fresh()
         return permission_code in cls._permissions_cache
 
     @classmethod
@@ -89,6 +134,7 @@ class AuthService:
         if cls._current_user is None:
             return False
 
+        cls._ensure_fresh()
         return role_code in cls._roles_cache
 
     @classmethod
@@ -105,6 +151,7 @@ class AuthService:
         if cls._current_user.is_superuser:
             return True
 
+        cls._ensure_fresh()
         return any(code in cls._permissions_cache for code in permission_codes)
 
     @classmethod
@@ -119,6 +166,7 @@ class AuthService:
         if cls._current_user.is_superuser:
             return {"*"}  # Tüm modüller
 
+        cls._ensure_fresh()
         modules = set()
         for perm in cls._permissions_cache:
             if "." in perm:
@@ -164,6 +212,7 @@ class AuthService:
         if cls._current_user is None:
             return {}
 
+        cls._ensure_fresh()
         user = cls._current_user
         return {
             "id": user.id,
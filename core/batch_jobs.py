@@ -0,0 +1,107 @@
+"""
+Akıllı İş - Tekrarlayan Toplu İşler
+
+jobs.py çalıştırıcısının kayıt defteri. Her iş session alır ve etkilenen
+satır sayısını (int) ya da "rows" anahtarlı bir özet (dict) döndürür.
+Varsayılan cron ifadeleri yalnızca ilk kayıtta kullanılır; sonrasında
+scheduled_jobs tablosundan değiştirilebilir.
+
+Not: Servis sınıfları session_scope() içinde get_session() ile işin
+session'ını kullanır; kendi commit'leri işin transaction'ını kapatır.
+"""
+
+from sqlalchemy.orm import Session
+
+from core.job_scheduler import job_scheduler
+
+
+@job_scheduler.job(
+    "invoice_overdue",
+    "5 0 * * *",
+    "Vadesi geçmiş satış ve satınalma faturalarını işaretle",
+)
+def mark_overdue_invoices(session: Session) -> dict:
+    from modules.purchasing.services import PurchaseInvoiceService
+    from modules.sales.services import InvoiceService
+
+    sales = InvoiceService().check_overdue()
+    purchases = PurchaseInvoiceService().mark_overdue()
+    return {"rows": sales + purchases, "sales": sales, "purchases": purchases}
+
+
+@job_scheduler.job("quote_expiry", "10 0 * * *", "Süresi dolan satış tekliflerini işaretle")
+def expire_quotes(session: Session) -> int:
+    from modules.sales.services import SalesQuoteService
+
+    return SalesQuoteService().mark_expired()
+
+
+@job_scheduler.job(
+    "maintenance_plans",
+    "*/15 * * * *",
+    "Vadesi gelen periyodik bakım iş emirlerini oluştur",
+)
+def generate_maintenance_work_orders(session: Session) -> dict:
+    from modules.maintenance.scheduler import PreventiveMaintenanceScheduler
+
+    result = PreventiveMaintenanceScheduler(session).run()
+    result["rows"] = len(result["work_orders"])
+    return result
+
+
+@job_scheduler.job(
+    "mrp_run",
+    "0 2 * * *",
+    "Gece MRP çalıştırması (öneriler ekranda onaylanır)",
+    timeout_seconds=4 * 3600,
+)
+def run_mrp(session: Session) -> dict:
+    from modules.mrp.services import MRPService
+
+    service = MRPService()
+    try:
+        run = service.run_mrp()
+        return {
+            "rows": run.total_suggestions,
+            "run_no": run.run_no,
+            "items": run.total_items,
+            "shortages": run.items_with_shortage,
+        }
+    finally:
+        service.close()
+
+
+@job_scheduler.job(
+    "kpi_refresh",
+    "30 * * * *",
+    "Stok değerleme özet tablosunu (dashboard KPI) yeniden oluştur",
+)
+def refresh_kpis(session: Session) -> int:
+    from modules.inventory.valuation import stock_valuation
+
+    return stock_valuation.refresh_all(session)
+
+
+@job_scheduler.job(
+    "partition_archive",
+    "0 3 * * *",
+    "Aylık bölümleri aç ve saklama süresi dolan kayıtları arşivle",
+    timeout_seconds=6 * 3600,
+)
+def maintain_partitions(session: Session) -> dict:
+    from database.partitioning import PartitionMaintenanceService
+
+    result = PartitionMaintenanceService(session).run()
+    result["rows"] = sum(entry.get("rows", 0) for entry in result["archived"])
+    return result
+
+
+@job_scheduler.job(
+    "standard_cost",
+    "*/5 * * * *",
+    "Fiyatı, reçetesi veya rotası değişen ürünlerin standart maliyetlerini yeniden hesapla",
+)
+def roll_up_standard_costs(session: Session) -> dict:
+    from modules.production.costing import cost_rollup
+
+    return cost_rollup.process_queue(session)
@@ -0,0 +1,38 @@
+"""
+Akıllı İş - Uygulama Başlatma
+
+Veritabanına bağlanan tüm giriş noktaları (main.py, jobs.py, server.py)
+aynı ORM dinleyicilerini kaydetmelidir; aksi halde audit kayıtları, cari
+bakiyeler, stok değerlemesi, ATP, standart maliyet kuyruğu ve önbellek
+bildirimleri süreçten sürece farklılaşır. Yeni bir dinleyici yalnızca
+buraya eklenir.
+
+Kullanım:
+    from core.bootstrap import init_listeners
+    init_listeners()
+"""
+
+
+def init_listeners() -> None:
+    """ORM event dinleyicilerini kaydeder (tekrar çağrılabilir)"""
+    from database.audit_engine import audit_engine
+
+    audit_engine.init_listeners()
+    from modules.finance.balance_ledger import counterparty_ledger
+
+    counterparty_ledger.init_listeners()
+    from modules.inventory.valuation import stock_valuation
+
+    stock_valuation.init_listeners()
+    from modules.sales.atp import atp_engine
+
+    atp_engine.init_listeners()
+    from modules.production.costing import cost_rollup
+
+    cost_rollup.init_listeners()
+    from core.reference_data import reference_cache
+
+    reference_cache.init_listeners()
+    from core.change_bus import change_bus
+
+    change_bus.init_listeners()
@@ -0,0 +1,403 @@
+"""
+Akıllı İş - Değişiklik Bildirim Veri Yolu (PostgreSQL LISTEN/NOTIFY)
+
+Süreç içi önbellekler (izinler, hesap planı, referans veriler, reçete
+rotaları, API yanıtları...) başka bir istemci veriyi değiştirdiğinde
+bayatlar. Bu modül değişiklikleri tüm istemcilere duyurur:
+
+- Yayın: after_flush event'i değişen kayıtların tablo ve birincil
+  anahtarlarını toplar; commit öncesi aynı transaction içinde tek bir
+  pg_notify gönderilir. PostgreSQL bildirimi yalnızca commit'te iletir;
+  rollback edilen değişiklikler duyurulmaz. Hangi tabloların önemli
+  olduğuna her istemci kendi aboneliklerine göre karar verir.
+- Yerel dağıtım: commit sonrası aynı süreçteki abonelere hemen iletilir.
+- Dinleme: ChangeListenerThread havuz dışı ayrı bir bağlantıyla LISTEN
+  yapar; art arda gelen bildirimleri kısa bir pencerede birleştirip
+  abonelere tek seferde dağıtır. Bağlantı koparsa yeniden bağlanır ve
+  arada kaçan bildirimler için tüm abonelikleri geçersiz kılar.
+
+SQLite'ta NOTIFY olmadığından yalnızca yerel dağıtım çalışır; dinleyici
+başlatılmaz (referans veri önbelleği sürüm damgalarıyla yine güncellenir).
+
+Kullanım:
+    from core.change_bus import change_bus
+    change_bus.init_listeners()           # Uygulama başlangıcında çağır
+    listener = change_bus.start_listener()  # PostgreSQL'de arka plan thread'i
+
+    change_bus.subscribe(["price_lists"], lambda table, ids: cache.clear())
+"""
+
+import json
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from sqlalchemy import event, func, inspect, make_url, select as sa_select
+from sqlalchemy.orm import Session as DBSession
+
+from config import (
+    CHANGE_NOTIFY_CHANNEL,
+    CHANGE_NOTIFY_COALESCE_MS,
+    CHANGE_NOTIFY_ENABLED,
+    CHANGE_NOTIFY_LISTEN_URL,
+    DB_PGBOUNCER,
+)
+from database.base import get_engine
+
+
+# Session.info anahtarı: transaction boyunca değişen tablolar ve kimlikler
+_CHANGES_KEY = "change_bus_changes"
+
+# NOTIFY yükü sınırı 8000 bayt; aşılırsa kimlikler atılır (tüm tablo)
+MAX_PAYLOAD_BYTES = 7500
+# Tablo başına taşınan en fazla kimlik; fazlası "tüm tablo" sayılır
+MAX_IDS_PER_TABLE = 500
+
+# ids None ise tablonun tamamı değişmiş sayılır
+Changes = Dict[str, Optional[Set[int]]]
+Invalidator = Callable[[str, Optional[FrozenSet[int]]], None]
+
+
+def _merge(target: Changes, table: str, ids: Optional[Iterable[int]]) -> None:
+    """Değişikliği birleştirir (None baskındır, kimlik sayısı sınırlanır)"""
+    if ids is None:
+        target[table] = None
+        return
+    current = target.setdefault(table, set())
+    if current is None:
+        return
+    current.update(ids)
+    if len(current) > MAX_IDS_PER_TABLE:
+        target[table] = None
+
+
+class _Subscription:
+    __slots__ = ("tables", "callback", "local")
+
+    def __init__(self, tables: FrozenSet[str], callback: Invalidator, local: bool):
+        self.tables = tables
+        self.callback = callback
+        self.local = local
+
+
+class ChangeBus:
+    """
+    Tablo değişikliği yayını ve abonelik dağıtımı (singleton).
+
+    Aboneler callback(table, ids) ile çağrılır; ids değişen birincil
+    anahtarlardır (None = tablonun tamamı). Uzak bildirimler dinleyici
+    thread'inden gelir; callback'ler yalnızca önbelleği geçersiz kılmalı,
+    yeniden yüklemeyi bir sonraki okumaya bırakmalıdır.
+    """
+
+    _instance: Optional["ChangeBus"] = None
+    _listening: bool = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self.node = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.channel = CHANGE_NOTIFY_CHANNEL
+        self._subscriptions: List[_Subscription] = []
+        self._tables: FrozenSet[str] = frozenset()
+        self._lock = threading.Lock()
+        self.listener: Optional["ChangeListenerThread"] = None
+        self.sent = 0
+        self.received = 0
+        self.dispatched = 0
+        self.errors = 0
+
+    # =====================
+    # ABONELİK
+    # =====================
+
+    def subscribe(self, tables: Iterable[str], callback: Invalidator, local: bool = True) -> None:
+        """
+        Tablolardaki değişiklikler için callback kaydeder.
+
+        local=False ise yalnızca diğer istemcilerden gelen bildirimler
+        iletilir (kendi commit'lerini zaten izleyen önbellekler için).
+        """
+        with self._lock:
+            self._subscriptions.append(_Subscription(frozenset(tables), callback, local))
+            self._tables = frozenset().union(*(s.tables for s in self._subscriptions))
+
+    def unsubscribe(self, callback: Invalidator) -> None:
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s.callback is not callback]
+            self._tables = frozenset().union(*(s.tables for s in self._subscriptions))
+
+    @property
+    def tables(self) -> FrozenSet[str]:
+        """Bu süreçte abonesi olan tablolar"""
+        return self._tables
+
+    @property
+    def is_live(self) -> bool:
+        """Diğer istemcilerin değişiklikleri de dinleniyor mu (dinleyici çalışıyor)"""
+        return self.listener is not None and self.listener.is_alive()
+
+    def dispatch(self, changes: Changes, remote: bool = True) -> None:
+        """Değişiklikleri abonelere iletir; callback hataları dağıtımı kesmez"""
+        for sub in self._subscriptions:
+            if not remote and not sub.local:
+                continue
+            for table, ids in changes.items():
+                if table not in sub.tables:
+                    continue
+                try:
+                    sub.callback(table, None if ids is None else frozenset(ids))
+                    self.dispatched += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Önbellek geçersiz kılma hatası ({table}): {e}")
+
+    def invalidate_all(self) -> None:
+        """Tüm abonelikleri tablo bazında geçersiz kılar (kaçan bildirimler için)"""
+        self.dispatch({table: None for table in self._tables})
+
+    def receive(self, payloads: Iterable[str]) -> Changes:
+        """
+        Dinleyiciden gelen NOTIFY yüklerini birleştirip dağıtır.
+        Kendi gönderdiği ve çözülemeyen yükler atlanır. Döner: dağıtılan değişiklikler
+        """
+        changes: Changes = {}
+        for payload in payloads:
+            self.received += 1
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                continue
+            if data.get("o") == self.node:
+                continue
+            for table, ids in (data.get("t") or {}).items():
+                _merge(changes, table, ids)
+        if changes:
+            self.dispatch(changes)
+        return changes
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "node": self.node,
+            "tables": sorted(self._tables),
+            "live": self.is_live,
+            "sent": self.sent,
+            "received": self.received,
+            "dispatched": self.dispatched,
+            "errors": self.errors,
+        }
+
+    # =====================
+    # YAYIN (ORM DİNLEYİCİLERİ)
+    # =====================
+
+    def init_listeners(self) -> None:
+        """SQLAlchemy event listener'larını ve varsayılan abonelikleri kaydeder"""
+        if self._listening:
+            return
+        register_default_invalidators(self)
+        event.listen(DBSession, "after_flush", self._after_flush)
+        event.listen(DBSession, "do_orm_execute", self._on_execute)
+        event.listen(DBSession, "before_commit", self._before_commit)
+        event.listen(DBSession, "after_commit", self._after_commit)
+        event.listen(DBSession, "after_rollback", self._after_rollback)
+        ChangeBus._listening = True
+
+    def _after_flush(self, session: DBSession, flush_context) -> None:
+        changes = session.info.setdefault(_CHANGES_KEY, {})
+        changed = [*session.new, *session.deleted]
+        changed.extend(obj for obj in session.dirty if session.is_modified(obj))
+        for obj in changed:
+            table = getattr(obj, "__tablename__", None)
+            if table is not None:
+                # Yeni kayıtların kimlik anahtarı flush sonrası henüz atanmamıştır;
+                # birincil anahtar nesnenin kendisinden okunur
+                pk = inspect(obj).mapper.primary_key_from_instance(obj)[:1]
+                _merge(changes, table, None if None in pk else pk)
+
+    def _on_execute(self, orm_execute_state) -> None:
+        """
+        Session üzerinden toplu INSERT/UPDATE/DELETE: kimlikler bilinmediği
+        için tüm tablo (ör. MRP önerilerinden toplu iş emri oluşturma)
+        """
+        state = orm_execute_state
+        if not (state.is_insert or state.is_update or state.is_delete):
+            return
+        mapper = state.bind_mapper
+        if mapper is not None:
+            table = mapper.local_table.name
+        else:
+            # insert(Table) gibi eşlemesiz DML
+            table = getattr(getattr(state.statement, "table", None), "name", None)
+        if table is not None:
+            changes = state.session.info.setdefault(_CHANGES_KEY, {})
+            _merge(changes, table, None)
+
+    def _before_commit(self, session: DBSession) -> None:
+        """
+        Transaction başına tek pg_notify: commit'in kendi flush'ı bu
+        event'ten sonra çalıştığı için bekleyen değişiklikler önce flush edilir.
+        """
+        if not CHANGE_NOTIFY_ENABLED:
+            return
+        if session.new or session.dirty or session.deleted:
+            session.flush()
+        changes = session.info.get(_CHANGES_KEY)
+        if not changes:
+            return
+        connection = session.connection()
+        if connection.dialect.name != "postgresql":
+            return
+        connection.execute(sa_select(func.pg_notify(self.channel, self._payload(changes))))
+        self.sent += 1
+
+    def _payload(self, changes: Changes) -> str:
+        data = {
+            "o": self.node,
+            "t": {t: None if ids is None else sorted(ids) for t, ids in changes.items()},
+        }
+        payload = json.dumps(data, separators=(",", ":"))
+        if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+            data["t"] = {t: None for t in changes}
+            payload = json.dumps(data, separators=(",", ":"))
+        return payload
+
+    def _after_commit(self, session: DBSession) -> None:
+        changes = session.info.pop(_CHANGES_KEY, None)
+        if changes:
+            self.dispatch(changes, remote=False)
+
+    def _after_rollback(self, session: DBSession) -> None:
+        session.info.pop(_CHANGES_KEY, None)
+
+    # =====================
+    # DİNLEYİCİ
+    # =====================
+
+    def start_listener(self) -> Optional["ChangeListenerThread"]:
+        """
+        PostgreSQL'de dinleyici thread'ini başlatır.
+        SQLite'ta veya CHANGE_NOTIFY_ENABLED kapalıysa None döner.
+        """
+        if not CHANGE_NOTIFY_ENABLED or get_engine().dialect.name != "postgresql":
+            return None
+        if DB_PGBOUNCER and not CHANGE_NOTIFY_LISTEN_URL:
+            print("! PgBouncer arkasında CHANGE_NOTIFY_LISTEN_URL tanımlı değil: dinleyici kapalı")
+            return None
+        if self.is_live:
+            return self.listener
+        self.listener = ChangeListenerThread(self)
+        self.listener.start()
+        return self.listener
+
+
+class ChangeListenerThread(threading.Thread):
+    """LISTEN bağlantısını açık tutar ve gelen bildirimleri dağıtır"""
+
+    # select() bekleme süresi: durdurma isteği bu aralıkla fark edilir (saniye)
+    POLL_SECONDS = 1.0
+    RECONNECT_SECONDS = 5.0
+
+    def __init__(self, bus: ChangeBus, coalesce_ms: int = CHANGE_NOTIFY_COALESCE_MS):
+        super().__init__(name="change-listener", daemon=True)
+        self.bus = bus
+        self.coalesce_seconds = coalesce_ms / 1000
+        self.connected = False
+        self.batches = 0
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        first = True
+        while not self._stop_event.is_set():
+            try:
+                self._listen(invalidate=not first)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Değişiklik dinleyicisi hatası: {e}")
+            self.connected = False
+            first = False
+            self._stop_event.wait(self.RECONNECT_SECONDS)
+
+    def _connect(self):
+        """Havuz dışı, autocommit DBAPI (psycopg2) bağlantısı"""
+        engine = get_engine()
+        url = make_url(CHANGE_NOTIFY_LISTEN_URL) if CHANGE_NOTIFY_LISTEN_URL else engine.url
+        cargs, cparams = engine.dialect.create_connect_args(url)
+        conn = engine.dialect.connect(*cargs, **cparams)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.bus.channel}"')
+        return conn
+
+    def _listen(self, invalidate: bool) -> None:
+        conn = self._connect()
+        try:
+            self.connected = True
+            self.last_error = None
+            if invalidate:
+                # Bağlantı yokken gelen bildirimler kaçırılmış olabilir
+                self.bus.invalidate_all()
+
+            while not self._stop_event.is_set():
+                payloads = self._wait(conn, self.POLL_SECONDS)
+                if not payloads:
+                    continue
+                # Kısa pencerede gelen diğer bildirimleri de topla
+                deadline = time.monotonic() + self.coalesce_seconds
+                while (remaining := deadline - time.monotonic()) > 0:
+                    payloads.extend(self._wait(conn, remaining))
+                self.bus.receive(payloads)
+                self.batches += 1
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _wait(conn, timeout: float) -> List[str]:
+        if select.select([conn], [], [], timeout) == ([], [], []):
+            return []
+        conn.poll()
+        payloads = [n.payload for n in conn.notifies]
+        conn.notifies.clear()
+        return payloads
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def register_default_invalidators(bus: ChangeBus) -> None:
+    """Uygulamanın süreç içi önbelleklerini veri yoluna bağlar"""
+    from core.auth_service import AuthService
+    from core.reference_data import REF_TABLES, reference_cache
+    from modules.accounting.services import ChartOfAccountsCache
+    from modules.auth.services import PermissionService
+    from modules.maintenance.kpi_engine import KPIEngine
+    from modules.sales.atp import ATP_TABLES, atp_engine
+
+    # Referans veriler ve ATP rotaları kendi commit'lerini zaten izler
+    bus.subscribe(REF_TABLES, lambda table, ids: reference_cache.invalidate(table), local=False)
+    bus.subscribe(["permissions"], lambda table, ids: PermissionService.clear_cache())
+    bus.subscribe(["users", "roles", "permissions"], AuthService.on_change)
+    bus.subscribe(["accounts"], lambda table, ids: ChartOfAccountsCache.clear_cache())
+    bus.subscribe(
+        ["equipment_downtimes", "maintenance_work_orders"], lambda table, ids: KPIEngine.invalidate()
+    )
+    bus.subscribe(
+        ["bill_of_materials", "bom_lines"],
+        lambda table, ids: atp_engine.invalidate_routings(),
+        local=False,
+    )
+    # Stok ve belge değişiklikleri: ATP kendi commit'lerini after_flush ile izler
+    bus.subscribe(ATP_TABLES, atp_engine.invalidate_rows, local=False)
+
+
+# Singleton instance
+change_bus = ChangeBus()
@@ -0,0 +1,443 @@
+"""
+Akıllı İş - Zamanlanmış İş Çalıştırıcısı
+
+Tekrarlayan toplu işleri (vade/teklif süresi işaretleme, MRP, periyodik
+bakım, arşivleme, KPI yenileme) arayüzden bağımsız çalıştırır. PyQt6
+gerektirmez; giriş noktası proje kökündeki jobs.py'dir.
+
+- İşler kodda @job ile kaydedilir (bkz. core/batch_jobs.py); ilk
+  çalıştırmada scheduled_jobs tablosuna varsayılan cron ile yazılır.
+  Sonradan cron/is_active veritabanından değiştirilebilir.
+- Kilit: vadesi gelen iş, tek bir koşullu UPDATE ile alınır
+  (locked_until geçmiş VE next_run_at <= şimdi). Birden fazla sunucu
+  aynı anda yoklasa da işi yalnızca biri çalıştırır.
+- Her çalıştırma job_runs tablosuna süre, satır sayısı, sonuç ve hata ile
+  kaydedilir.
+
+Kullanım:
+    from core.job_scheduler import job_scheduler
+    job_scheduler.run_pending()        # vadesi gelenleri bir kez çalıştır
+    job_scheduler.run_job("mrp_run")   # zamanlamadan bağımsız çalıştır
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from database.base import session_scope
+from database.models.jobs import JobRun, JobRunStatus, ScheduledJob
+
+
+# ==================== CRON ====================
+
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (alt sınır, üst sınır) - dakika, saat, ayın günü, ay, haftanın günü
+CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class CronSchedule:
+    """
+    Beş alanlı cron ifadesi: dakika saat gün ay haftanın-günü
+
+    Desteklenen sözdizimi: *, sayı, a-b, */n, a-b/n, virgüllü listeler ve
+    @hourly/@daily/@weekly/@monthly/@yearly kısaltmaları. Haftanın günü
+    0 (veya 7) = Pazar. Gün ve haftanın günü birlikte kısıtlanmışsa
+    klasik cron'daki gibi ikisinden biri eşleşmesi yeterlidir.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Geçersiz cron ifadesi: {expression!r}")
+
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, CRON_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        if 7 in weekdays:
+            weekdays = (weekdays - {7}) | {0}
+        self.weekdays = weekdays
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step < 1:
+                    raise ValueError(f"Geçersiz cron adımı: {field!r}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(p) for p in part.split("-", 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron alanı aralık dışında: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # Python: Pazartesi=0, cron: Pazar=0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """moment'tan sonraki (dakika hassasiyetinde) ilk çalışma zamanı"""
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366 * 5)
+
+        while current <= limit:
+            if current.month not in self.months:
+                year = current.year + (current.month == 12)
+                month = current.month % 12 + 1
+                current = current.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(current):
+                current = (current + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if current.hour not in self.hours:
+                current = (current + timedelta(hours=1)).replace(minute=0)
+                continue
+            if current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+                continue
+            return current
+
+        raise ValueError(f"Cron ifadesi hiçbir zaman eşleşmiyor: {self.expression!r}")
+
+
+# ==================== KAYIT DEFTERİ ====================
+
+
+@dataclass
+class JobDefinition:
+    """Kodda tanımlı iş: fonksiyon(session) -> satır sayısı veya özet dict"""
+
+    name: str
+    func: Callable[[Session], Any]
+    cron: str
+    description: str = ""
+    timeout_seconds: int = 3600
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return str(value)
+
+
+class JobScheduler:
+    """
+    Zamanlanmış iş yöneticisi (Singleton)
+
+    İş fonksiyonları kendi session_scope()'ları içinde çalışır; içlerinde
+    oluşturulan servisler get_session() ile aynı session'ı kullanır.
+    """
+
+    _instance: Optional["JobScheduler"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._jobs = {}
+            cls._instance.node = f"{socket.gethostname()}:{os.getpid()}"
+        return cls._instance
+
+    # ---------- Kayıt ----------
+
+    def job(self, name: str, cron: str, description: str = "", timeout_seconds: int = 3600):
+        """
+        İş fonksiyonunu kaydeden dekoratör
+
+        Kullanım:
+            @job_scheduler.job("quote_expiry", "15 0 * * *", "Süresi dolan teklifler")
+            def expire_quotes(session) -> int: ...
+        """
+        CronSchedule(cron)  # Tanım anında doğrula
+
+        def decorator(func):
+            self._jobs[name] = JobDefinition(name, func, cron, description, timeout_seconds)
+            return func
+
+        return decorator
+
+    @property
+    def definitions(self) -> Dict[str, JobDefinition]:
+        return dict(self._jobs)
+
+    def sync_definitions(self, now: datetime = None) -> int:
+        """
+        Kayıtlı işleri scheduled_jobs tablosuna ekler (mevcut satırlara dokunmaz)
+
+        Returns:
+            int: Eklenen iş sayısı
+        """
+        now = now or datetime.now()
+        with session_scope() as session:
+            existing = {name for (name,) in session.query(ScheduledJob.name).all()}
+            added = [
+                ScheduledJob(
+                    name=definition.name,
+                    description=definition.description,
+                    cron=definition.cron,
+                    timeout_seconds=definition.timeout_seconds,
+                    next_run_at=CronSchedule(definition.cron).next_after(now),
+                )
+                for definition in self._jobs.values()
+                if definition.name not in existing
+            ]
+            session.add_all(added)
+        return len(added)
+
+    # ---------- Çalıştırma ----------
+
+    def run_pending(self, now: datetime = None) -> List[Dict[str, Any]]:
+        """
+        Vadesi gelen işleri sırayla çalıştırır (kilidi alınamayanlar atlanır)
+
+        Returns:
+            List[dict]: Çalıştırılan işlerin özetleri
+        """
+        now = now or datetime.now()
+        with session_scope(commit=False) as session:
+            due = (
+                session.query(ScheduledJob.id, ScheduledJob.name)
+                .filter(
+                    ScheduledJob.is_active == True,
+                    ScheduledJob.next_run_at <= now,
+                    or_(ScheduledJob.locked_until == None, ScheduledJob.locked_until < now),
+                )
+                .order_by(ScheduledJob.next_run_at)
+                .all()
+            )
+
+        results = []
+        for job_id, name in due:
+            if name not in self._jobs:
+                continue
+            summary = self._run(job_id, name, now, require_due=True)
+            if summary is not None:
+                results.append(summary)
+        return results
+
+    def run_job(self, name: str, only_if_due: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        İşi zamanlamadan bağımsız hemen çalıştırır (kilit yine uygulanır)
+
+        Args:
+            name: İş adı
+            only_if_due: True ise iş yalnızca vadesi geldiyse çalışır; böylece
+                aynı işi yoklayan birden fazla istemci onu zamanlama başına
+                bir kez çalıştırır
+
+        Returns:
+            dict veya None: Başka bir sunucu işi çalıştırıyorsa (ya da vadesi
+            gelmemişse) None
+        """
+        if name not in self._jobs:
+            raise KeyError(f"Tanımsız iş: {name}")
+        self.sync_definitions()
+        with session_scope(commit=False) as session:
+            job_id = session.query(ScheduledJob.id).filter(ScheduledJob.name == name).scalar()
+        return self._run(job_id, name, datetime.now(), require_due=only_if_due)
+
+    def _acquire(self, job_id: int, due_at: datetime, require_due: bool) -> bool:
+        """Koşullu UPDATE ile kilidi al; etkilenen satır yoksa başkası tutuyordur"""
+        now = datetime.now()
+        with session_scope() as session:
+            timeout = (
+                session.query(ScheduledJob.timeout_seconds)
+                .filter(ScheduledJob.id == job_id)
+                .scalar()
+            )
+            conditions = [
+                ScheduledJob.id == job_id,
+                ScheduledJob.is_active == True,
+                or_(ScheduledJob.locked_until == None, ScheduledJob.locked_until < now),
+            ]
+            if require_due:
+                conditions.append(ScheduledJob.next_run_at <= due_at)
+
+            result = session.execute(
+                update(ScheduledJob)
+                .where(*conditions)
+                .values(
+                    locked_by=self.node,
+                    locked_until=now + timedelta(seconds=timeout or 3600),
+                    last_started_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount == 1
+
+    def _run(self, job_id: int, name: str, due_at: datetime, require_due: bool) -> Optional[Dict[str, Any]]:
+        definition = self._jobs[name]
+        if not self._acquire(job_id, due_at, require_due):
+            return None
+
+        started = datetime.now()
+        with session_scope() as session:
+            run = JobRun(
+                job_id=job_id, node=self.node, status=JobRunStatus.RUNNING, started_at=started
+            )
+            session.add(run)
+            session.flush()
+            run_id = run.id
+
+        clock = time.perf_counter()
+        status, rows, result, error = JobRunStatus.SUCCESS, None, None, None
+        try:
+            with session_scope() as session:
+                result = definition.func(session)
+            if isinstance(result, dict):
+                rows = result.get("rows")
+            elif isinstance(result, int):
+                rows = result
+        except Exception as e:
+            status = JobRunStatus.FAILED
+            error = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+            print(f"İş hatası ({name}): {e}")
+        duration_ms = int((time.perf_counter() - clock) * 1000)
+        finished = datetime.now()
+
+        with session_scope() as session:
+            cron = session.query(ScheduledJob.cron).filter(ScheduledJob.id == job_id).scalar()
+            session.execute(
+                update(JobRun)
+                .where(JobRun.id == run_id)
+                .values(
+                    status=status,
+                    finished_at=finished,
+                    duration_ms=duration_ms,
+                    rows_affected=rows,
+                    result=(
+                        json.dumps(result, default=_json_default, ensure_ascii=False)
+                        if result is not None
+                        else None
+                    ),
+                    error=error,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.id == job_id, ScheduledJob.locked_by == self.node)
+                .values(
+                    locked_by=None,
+                    locked_until=None,
+                    next_run_at=CronSchedule(cron).next_after(finished),
+                    last_finished_at=finished,
+                    last_status=status,
+                    last_duration_ms=duration_ms,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        return {
+            "job": name,
+            "status": status.value,
+            "rows": rows,
+            "duration_ms": duration_ms,
+            "error": error,
+        }
+
+    # ---------- Durum ----------
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """Tüm işlerin zamanlama ve son çalıştırma bilgisi"""
+        with session_scope(commit=False) as session:
+            jobs = session.query(ScheduledJob).order_by(ScheduledJob.name).all()
+            return [
+                {
+                    "name": j.name,
+                    "cron": j.cron,
+                    "active": j.is_active,
+                    "next_run_at": j.next_run_at,
+                    "locked_by": j.locked_by,
+                    "last_status": j.last_status.value if j.last_status else None,
+                    "last_finished_at": j.last_finished_at,
+                    "last_duration_ms": j.last_duration_ms,
+                }
+                for j in jobs
+            ]
+
+    def get_history(self, name: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Son çalıştırma kayıtları (en yeni önce)"""
+        with session_scope(commit=False) as session:
+            query = session.query(JobRun, ScheduledJob.name).join(ScheduledJob)
+            if name:
+                query = query.filter(ScheduledJob.name == name)
+            rows = query.order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(limit).all()
+            return [
+                {
+                    "job": job_name,
+                    "node": run.node,
+                    "status": run.status.value,
+                    "started_at": run.started_at,
+                    "duration_ms": run.duration_ms,
+                    "rows": run.rows_affected,
+                    "error": run.error,
+                }
+                for run, job_name in rows
+            ]
+
+
+class JobRunnerThread(threading.Thread):
+    """Vadesi gelen işleri belirli aralıklarla yoklar"""
+
+    def __init__(self, poll_seconds: int = 30):
+        super().__init__(name="job-runner", daemon=True)
+        self.poll_seconds = poll_seconds
+        self.last_result: Optional[List[Dict[str, Any]]] = None
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        job_scheduler.sync_definitions()
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.poll_seconds)
+
+    def run_once(self):
+        try:
+            self.last_result = job_scheduler.run_pending()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"İş çalıştırıcı hatası: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# Global instance
+job_scheduler = JobScheduler()
@@ -0,0 +1,216 @@
+"""
+Akıllı İş - Etiket Veri Kaynakları
+
+Etiket kayıtlarını bellekte sözlük listesi kurmadan, akış halinde verir:
+- QuerySource: SQLAlchemy select sonucunu yield_per ile parça parça okur
+  (varsayılan olarak okuma kopyası session'ı)
+- CsvSource: CSV dosyasını satır satır okur
+- IterableSource: mevcut liste / üreteç (tablodan alınan veri gibi)
+
+fields eşlemesi etiket anahtarını kaynak sütununa (veya satırdan değer
+üreten fonksiyona) bağlar; verilmezse satır olduğu gibi kullanılır.
+
+Hazır kaynaklar: stock_card_source, work_order_source,
+goods_receipt_source.
+
+Kullanım:
+    source = stock_card_source(item_ids)
+    LabelSheetRenderer(elements, layout).render("etiket.pdf", source)
+"""
+
+import csv
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.replica import get_read_session
+
+
+# Sorgu kaynaklarında bir seferde okunan satır sayısı
+QUERY_BATCH_SIZE = 500
+
+FieldMap = Dict[str, Union[str, Callable[[Dict[str, Any]], Any]]]
+
+
+class LabelDataSource(ABC):
+    """Etiket kayıtlarını akış halinde veren kaynak (soyut temel sınıf)"""
+
+    def __init__(self, fields: Optional[FieldMap] = None):
+        self.fields = fields
+
+    @abstractmethod
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Kaynağın ham satırları"""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.fields:
+            yield from self.rows()
+            return
+
+        fields = list(self.fields.items())
+        for row in self.rows():
+            yield {
+                key: column(row) if callable(column) else row.get(column)
+                for key, column in fields
+            }
+
+
+class IterableSource(LabelDataSource):
+    """Liste veya üreteçten kayıtlar"""
+
+    def __init__(self, items: Iterable[Dict[str, Any]], fields: Optional[FieldMap] = None):
+        super().__init__(fields)
+        self.items = items
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        yield from self.items
+
+
+class QuerySource(LabelDataSource):
+    """
+    SQLAlchemy select sonucundan kayıtlar.
+
+    Sütun etiketleri (label) kayıt anahtarı olur. Satırlar batch_size'lık
+    parçalarla okunur (PostgreSQL'de sunucu taraflı cursor).
+    """
+
+    def __init__(
+        self,
+        statement,
+        fields: Optional[FieldMap] = None,
+        session: Optional[Session] = None,
+        batch_size: int = QUERY_BATCH_SIZE,
+    ):
+        super().__init__(fields)
+        self.statement = statement
+        self.session = session
+        self.batch_size = batch_size
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        session = self.session or get_read_session()
+        result = session.execute(
+            self.statement.execution_options(yield_per=self.batch_size)
+        )
+        try:
+            for row in result:
+                yield dict(row._mapping)
+        finally:
+            result.close()
+
+
+class CsvSource(LabelDataSource):
+    """
+    CSV dosyasından kayıtlar (ilk satır başlık).
+
+    Ayraç verilmezse dosyanın başından tespit edilir (; veya , gibi).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fields: Optional[FieldMap] = None,
+        delimiter: Optional[str] = None,
+        encoding: str = "utf-8-sig",
+    ):
+        super().__init__(fields)
+        self.path = path
+        self.delimiter = delimiter
+        self.encoding = encoding
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, newline="", encoding=self.encoding) as f:
+            delimiter = self.delimiter
+            if delimiter is None:
+                sample = f.read(4096)
+                f.seek(0)
+                try:
+                    delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+                except csv.Error:
+                    delimiter = ","
+            yield from csv.DictReader(f, delimiter=delimiter)
+
+
+# =====================
+# HAZIR KAYNAKLAR
+# =====================
+
+
+def stock_card_source(
+    item_ids: Optional[Sequence[int]] = None, session: Optional[Session] = None
+) -> QuerySource:
+    """
+    Stok kartı etiketleri: code, name, barcode, price, unit.
+
+    item_ids verilmezse tüm aktif stok kartları (koda göre).
+    """
+    from database.models.inventory import Item, Unit
+
+    statement = (
+        select(
+            Item.code.label("code"),
+            Item.name.label("name"),
+            Item.barcode.label("barcode"),
+            Item.sale_price.label("price"),
+            Unit.code.label("unit"),
+        )
+        .outerjoin(Unit, Unit.id == Item.unit_id)
+        .order_by(Item.code)
+    )
+    if item_ids is not None:
+        statement = statement.where(Item.id.in_(item_ids))
+    else:
+        statement = statement.where(Item.is_active.is_(True))
+    return QuerySource(statement, session=session)
+
+
+def work_order_source(
+    work_order_ids: Sequence[int], session: Optional[Session] = None
+) -> QuerySource:
+    """İş emri refakat kartları: wo_no, product, qty, completed, start, date"""
+    from database.models.inventory import Item
+    from database.models.production import WorkOrder
+
+    statement = (
+        select(
+            WorkOrder.order_no.label("wo_no"),
+            Item.code.label("product_code"),
+            Item.name.label("product"),
+            WorkOrder.planned_quantity.label("qty"),
+            WorkOrder.completed_quantity.label("completed"),
+            WorkOrder.planned_start.label("start"),
+            WorkOrder.planned_end.label("date"),
+        )
+        .join(Item, Item.id == WorkOrder.item_id)
+        .where(WorkOrder.id.in_(work_order_ids))
+        .order_by(WorkOrder.order_no)
+    )
+    return QuerySource(statement, session=session)
+
+
+def goods_receipt_source(receipt_id: int, session: Optional[Session] = None) -> QuerySource:
+    """
+    Mal kabul satırı etiketleri: receipt_no, receipt_date, code, name,
+    barcode, qty, lot, expiry.
+    """
+    from database.models.inventory import Item
+    from database.models.purchasing import GoodsReceipt, GoodsReceiptItem
+
+    statement = (
+        select(
+            GoodsReceipt.receipt_no.label("receipt_no"),
+            GoodsReceipt.receipt_date.label("receipt_date"),
+            Item.code.label("code"),
+            Item.name.label("name"),
+            Item.barcode.label("barcode"),
+            GoodsReceiptItem.quantity.label("qty"),
+            GoodsReceiptItem.lot_number.label("lot"),
+            GoodsReceiptItem.expiry_date.label("expiry"),
+        )
+        .join(GoodsReceipt, GoodsReceipt.id == GoodsReceiptItem.receipt_id)
+        .join(Item, Item.id == GoodsReceiptItem.item_id)
+        .where(GoodsReceiptItem.receipt_id == receipt_id)
+        .order_by(GoodsReceiptItem.id)
+    )
+    return QuerySource(statement, session=session)
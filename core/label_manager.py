@@ -1,9 +1,8 @@
 import os
 import tempfile
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
-from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
@@ -12,6 +11,11 @@ from PyQt6.QtPrintSupport import QPrinter
 from PyQt6.QtCore import QSizeF
 
 from utils.barcode_utils import generate_barcode
+from core.label_data import IterableSource, LabelDataSource
+from core.label_sheet import (
+    LabelSheetRenderer, SheetLayout, barcode_element, rect_element, text_element
+)
+from core.label_template import compile_template
 from database import SessionLocal
 from database.models.common import LabelTemplate
 
@@ -43,11 +47,8 @@ class LabelManager:
                         barcode_img.save(tmp.name)
                         item_data["barcode_path"] = tmp.name
 
-        # Render işlemi
-        rendered = content
-        for k, v in item_data.items():
-            rendered = rendered.replace(f"{{{{ {k} }}}}", str(v))
-            rendered = rendered.replace(f"{{{{{k}}}}}", str(v))
+        # Render işlemi (HTML/CSS blokları alan sanılmasın diye sadece {{ }})
+        rendered = compile_template(content, single_brace=False).render(item_data)
 
         # Container style
         style = (
@@ -183,112 +184,24 @@ class LabelManager:
         """
         JSON tabanlı görsel veriyi ReportLab ile PDF'e basar.
         DB'den bağımsız çalışabilir.
-        """
-        c = canvas.Canvas(file_name, pagesize=A4)
-        page_w, page_h = A4
-
-        lbl_w_mm = width_mm
-        lbl_h_mm = height_mm
-        lbl_w = lbl_w_mm * mm
-        lbl_h = lbl_h_mm * mm
-
-        # Sayfadaki konumlar
-        current_x = 10 * mm
-        current_y = page_h - 10 * mm - lbl_h
-
-        cols = int((page_w - 20 * mm) / lbl_w)
-        if cols < 1:
-            cols = 1
-
-        col_idx = 0
-
-        for item_data in items:
-            # Etiket çerçevesi
-            c.setLineWidth(0.5)
-            c.setStrokeColorRGB(0.8, 0.8, 0.8)
-            c.rect(current_x, current_y, lbl_w, lbl_h)
-            c.setStrokeColorRGB(0, 0, 0)  # Reset
-
-            # Öğeleri çiz
-            for v_item in visual_data.get("items", []):
-                vx = v_item.get("x", 0) * mm
-                vy = v_item.get("y", 0) * mm
-
-                item_type = v_item.get("type")
-
-                if item_type == "text":
-                    text = v_item.get("text", "")
-                    # Değişken değişimi
-                    for k, v in item_data.items():
-                        text = text.replace(f"{{{{ {k} }}}}", str(v))
-                        text = text.replace(f"{{{{{k}}}}}", str(v))
-
-                    font_family = v_item.get("font_family", "Helvetica")
-                    font_size = v_item.get("font_size", 12)
-
-                    c.setFont("Helvetica", font_size)
-                    if v_item.get("bold"):
-                        c.setFont("Helvetica-Bold", font_size)
-                    # Italic support via oblique if needed
-
-                    # Y koordinatı düzeltmesi
-                    draw_y = lbl_h - vy - font_size
-
-                    c.setFillColor(v_item.get("color", "black"))
-                    c.drawString(current_x + vx, current_y + draw_y, text)
-
-                elif item_type == "barcode":
-                    key = v_item.get("data_key", "{{ barcode }}")
-                    key = key.replace("{{ ", "").replace(" }}", "")
-                    code_val = item_data.get(key)
-
-                    bw = v_item.get("width", 30) * mm
-                    bh = v_item.get("height", 10) * mm
-
-                    if code_val:
-                        barcode_img = generate_barcode(str(code_val))
-                        if barcode_img:
-                            with tempfile.NamedTemporaryFile(
-                                suffix=".png", delete=False
-                            ) as tmp:
-                                barcode_img.save(tmp.name)
-                                draw_y = lbl_h - vy - bh
-                                c.drawImage(
-                                    tmp.name,
-                                    current_x + vx,
-                                    current_y + draw_y,
-                                    width=bw,
-                                    height=bh,
-                                )
-                                os.unlink(tmp.name)
-
-            # Konum güncelle
-            col_idx += 1
-            if col_idx >= cols:
-                col_idx = 0
-                current_x = 10 * mm
-                current_y -= lbl_h + 5 * mm
-            else:
-                current_x += lbl_w + 5 * mm
 
-            # Sayfa sonu
-            if current_y < 10 * mm:
-                c.showPage()
-                current_y = page_h - 10 * mm - lbl_h
-                current_x = 10 * mm
-                col_idx = 0
-
-        c.save()
+        Barkodlar vektörel çizilir, sabit öğeler form XObject olarak bir kez
+        kaydedilir. Yerleşim şablondaki "sheet" ayarından okunur (yoksa A4,
+        10 mm kenar, 5 mm aralık).
+        """
+        renderer = LabelSheetRenderer.from_template(visual_data, width_mm, height_mm)
+        return renderer.render(file_name, items)
 
     @staticmethod
-    def print_product_labels(parent, items: List[Dict]):
+    def print_product_labels(parent, items: Union[List[Dict], LabelDataSource]):
         """
         Seçili ürünler için etiket PDF'i oluşturur.
 
         Args:
-            items: Etiket basılacak ürünlerin listesi (Code, Name, Price vb. içermeli)
+            items: Tablodan alınan ürün listesi (Kod, Stok Adı, Satış Fiyatı)
+                veya code/name/price veren veri kaynağı (stock_card_source)
         """
-        if not items:
+        if isinstance(items, list) and not items:
             QMessageBox.warning(parent, "Uyarı", "Etiket basılacak ürün seçilmedi!")
             return
 
@@ -303,66 +216,33 @@ class LabelManager:
             if not file_name:
                 return
 
-            c = canvas.Canvas(file_name, pagesize=A4)
-            width, height = A4
-
-            # Etiket ayarları (Örn: 3 sütunlu, 40mm yükseklik)
-            margin_x = 10 * mm
-            margin_y = 10 * mm
-            col_width = (width - 2 * margin_x) / 3
-            row_height = 40 * mm
-
-            x = margin_x
-            y = height - margin_y - row_height
-
-            for item in items:
-                # Çerçeve çiz
-                c.rect(x, y, col_width - 2 * mm, row_height - 2 * mm)
-
-                # Ürün Adı (Kısa)
-                name = item.get("Stok Adı", "Ürün")[:20]
-                c.setFont("Helvetica-Bold", 10)
-                c.drawString(x + 5 * mm, y + row_height - 10 * mm, name)
-
-                # Fiyat
-                price = item.get("Satış Fiyatı", "")
-                c.setFont("Helvetica", 12)
-                c.drawString(x + 5 * mm, y + row_height - 15 * mm, f"{price}")
-
-                # Barkod (Code128)
-                code = item.get("Kod", "0000")
-                if code:
-                    barcode_img = generate_barcode(code)
-                    if barcode_img:
-                        # Geçici dosyaya kaydet ve PDF'e ekle
-                        with tempfile.NamedTemporaryFile(
-                            suffix=".png", delete=False
-                        ) as tmp:
-                            barcode_img.save(tmp.name)
-                            # Görüntüyü boyutlandırıp ekle
-                            c.drawImage(
-                                tmp.name,
-                                x + 5 * mm,
-                                y + 5 * mm,
-                                width=40 * mm,
-                                height=15 * mm,
-                            )
-                            os.unlink(tmp.name)
-
-                # Konum güncelleme
-                x += col_width
-                if x > width - margin_x - col_width:
-                    x = margin_x
-                    y -= row_height
-
-                # Sayfa sonu kontrolü
-                if y < margin_y:
-                    c.showPage()
-                    y = height - margin_y - row_height
-
-            c.save()
-
-            QMessageBox.information(parent, "Başarılı", "Etiketler oluşturuldu.")
+            # Etiket ayarları (3 sütunlu, 40mm yükseklik)
+            col_width = (A4[0] / mm - 20) / 3
+            row_height = 40
+            layout = SheetLayout(
+                label_width_mm=col_width, label_height_mm=row_height,
+                gap_x_mm=0, gap_y_mm=0, columns=3,
+            )
+            elements = [
+                rect_element(0, 2, col_width - 2, row_height - 2),
+                text_element(5, 10, "{name|default:Ürün|truncate:20}", 10, bold=True),
+                text_element(5, 15, "{price|money}", 12),
+                barcode_element(5, row_height - 20, 40, 15, "{code|default:0000}"),
+            ]
+
+            if not isinstance(items, LabelDataSource):
+                items = IterableSource(
+                    items, {"name": "Stok Adı", "price": "Satış Fiyatı", "code": "Kod"}
+                )
+            result = LabelSheetRenderer(elements, layout).render(file_name, items)
+            if not result["labels"]:
+                os.remove(file_name)
+                QMessageBox.warning(parent, "Uyarı", "Etiket basılacak ürün bulunamadı!")
+                return
+
+            QMessageBox.information(
+                parent, "Başarılı", f"{result['labels']} etiket oluşturuldu."
+            )
 
             # Dosyayı aç
             if sys.platform == "darwin":
@@ -374,11 +254,15 @@ class LabelManager:
             QMessageBox.critical(parent, "Hata", f"Etiket oluşturma hatası:\n{str(e)}")
 
     @staticmethod
-    def print_work_order_labels(parent, items: List[Dict]):
+    def print_work_order_labels(parent, items: Union[List[Dict], LabelDataSource]):
         """
         Seçili iş emirleri için refakatçi etiketi oluşturur.
+
+        Args:
+            items: Tablodan alınan iş emri listesi veya wo_no/product/qty/date
+                veren veri kaynağı (work_order_source)
         """
-        if not items:
+        if isinstance(items, list) and not items:
             QMessageBox.warning(parent, "Uyarı", "Etiket basılacak iş emri seçilmedi!")
             return
 
@@ -393,76 +277,42 @@ class LabelManager:
             if not file_name:
                 return
 
-            c = canvas.Canvas(file_name, pagesize=A4)
-            width, height = A4
-
             # Etiket ayarları (Daha büyük etiket: 2 sütunlu, 70mm yükseklik)
-            margin_x = 10 * mm
-            margin_y = 10 * mm
-            col_width = (width - 2 * margin_x) / 2
-            row_height = 70 * mm
-
-            x = margin_x
-            y = height - margin_y - row_height
-
-            for item in items:
-                # Çerçeve çiz
-                c.rect(x, y, col_width - 5 * mm, row_height - 5 * mm)
-
-                # Başlık: İş Emri
-                c.setFont("Helvetica-Bold", 14)
-                c.drawString(
-                    x + 5 * mm, y + row_height - 10 * mm, "İŞ EMRİ / REFAKATÇİ KARTI"
+            col_width = (A4[0] / mm - 20) / 2
+            row_height = 70
+            layout = SheetLayout(
+                label_width_mm=col_width, label_height_mm=row_height,
+                gap_x_mm=0, gap_y_mm=0, columns=2,
+            )
+            # Çerçeve ve başlık tüm etiketlerde aynıdır (form olarak bir kez çizilir)
+            elements = [
+                rect_element(0, 5, col_width - 5, row_height - 5),
+                text_element(5, 10, "İŞ EMRİ / REFAKATÇİ KARTI", 14, bold=True),
+                text_element(5, 20, "No: {wo_no}", 12, bold=True),
+                text_element(5, 30, "Ürün: {product|default:Ürün|truncate:30}", 10),
+                text_element(5, 40, "Miktar: {qty|number:0}", 10),
+                text_element(5, 45, "Tarih: {date|date:%d.%m.%Y %H:%M}", 10),
+                barcode_element(5, row_height - 22, 50, 15, "{wo_no}"),
+            ]
+
+            if not isinstance(items, LabelDataSource):
+                items = IterableSource(
+                    items,
+                    {
+                        "wo_no": "İş Emri No",
+                        "product": "Mamul",
+                        "qty": "Miktar",
+                        "date": "Planlanan Bitiş",
+                    },
                 )
-
-                # WO No
-                wo_no = item.get("İş Emri No", "")
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(x + 5 * mm, y + row_height - 20 * mm, f"No: {wo_no}")
-
-                # Ürün
-                product = item.get("Mamul", "Ürün")[:30]
-                c.setFont("Helvetica", 10)
-                c.drawString(x + 5 * mm, y + row_height - 30 * mm, f"Ürün: {product}")
-
-                # Miktar ve Tarih
-                qty = item.get("Miktar", "")
-                date_val = item.get("Planlanan Bitiş", "")
-                c.drawString(x + 5 * mm, y + row_height - 40 * mm, f"Miktar: {qty}")
-                c.drawString(x + 5 * mm, y + row_height - 45 * mm, f"Tarih: {date_val}")
-
-                # Barkod (WO No)
-                if wo_no:
-                    barcode_img = generate_barcode(wo_no)
-                    if barcode_img:
-                        with tempfile.NamedTemporaryFile(
-                            suffix=".png", delete=False
-                        ) as tmp:
-                            barcode_img.save(tmp.name)
-                            c.drawImage(
-                                tmp.name,
-                                x + 5 * mm,
-                                y + 5 * mm,
-                                width=50 * mm,
-                                height=20 * mm,
-                            )
-                            os.unlink(tmp.name)
-
-                # Konum güncelleme
-                x += col_width
-                if x > width - margin_x - col_width:
-                    x = margin_x
-                    y -= row_height
-
-                # Sayfa sonu kontrolü
-                if y < margin_y:
-                    c.showPage()
-                    y = height - margin_y - row_height
-
-            c.save()
+            result = LabelSheetRenderer(elements, layout).render(file_name, items)
+            if not result["labels"]:
+                os.remove(file_name)
+                QMessageBox.warning(parent, "Uyarı", "Etiket basılacak iş emri bulunamadı!")
+                return
 
             QMessageBox.information(
-                parent, "Başarılı", "İş emri etiketleri oluşturuldu."
+                parent, "Başarılı", f"{result['labels']} iş emri etiketi oluşturuldu."
             )
 
             if sys.platform == "darwin":
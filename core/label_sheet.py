@@ -0,0 +1,601 @@
+"""
+Akıllı İş - Etiket Sayfası Oluşturucu
+
+Yüksek adetli etiket PDF'leri için ReportLab tabanlı renderer:
+- Code128 / Code39 / EAN / QR barkodlar görsel dosyası yerine ReportLab'in
+  vektörel barkodlarıyla çizilir (geçici PNG yok, dosya boyutu küçük)
+- Şablonun veri içermeyen öğeleri (çerçeve, sabit metin, şekil, logo) bir
+  kez PDF form XObject olarak kaydedilir ve her etikette referansla basılır
+- Etiketler SheetLayout ile sayfaya dizilir (sütun/satır, kenar boşluğu,
+  aralık, doldurma yönü, kopya sayısı) veya rulo yazıcı için tek tek basılır
+
+Hem görsel editörün ({"type", "x", "y"}) hem de etiket tasarımcısının
+({"type", "geometry"}) JSON şablon biçimini okur. Metin ve barkod verisi
+core.label_template ile derlenir ({name|truncate:20}, {code|ean13} gibi).
+Qt gerektirmez.
+
+Kullanım:
+    layout = SheetLayout(label_width_mm=70, label_height_mm=37, columns=3, rows=8)
+    renderer = LabelSheetRenderer.from_template(visual_data, 70, 37, layout)
+    renderer.render("etiketler.pdf", records)  # sözlükler veya core.label_data kaynağı
+"""
+
+import base64
+import os
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode import code39, code128, createBarcodeDrawing, qr
+from reportlab.graphics.shapes import Drawing, Group
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from core.label_template import compile_template
+
+
+# Sabit öğelerin form XObject adı
+STATIC_FORM = "label_static"
+
+# Şablondaki barkod türü -> ReportLab barkod adı
+SYMBOLOGIES = {
+    "code128": "Code128",
+    "code39": "Standard39",
+    "ean13": "EAN13",
+    "ean8": "EAN8",
+    "qr": "QR",
+}
+
+# Punto -> mm
+PT_TO_MM = 25.4 / 72
+
+# Türkçe karakterleri (ş, ğ, ı, İ) içeren TTF fontlar (normal, kalın).
+# Standart Helvetica bu karakterleri basamaz; hiçbiri yoksa ona düşülür.
+FONT_CANDIDATES = [
+    ("C:/Windows/Fonts/arial.ttf", "C:/Windows/Fonts/arialbd.ttf"),
+    ("/Library/Fonts/Arial.ttf", "/Library/Fonts/Arial Bold.ttf"),
+    ("/System/Library/Fonts/Supplemental/Arial.ttf",
+     "/System/Library/Fonts/Supplemental/Arial Bold.ttf"),
+    ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+     "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"),
+]
+
+_fonts: Optional[Dict[str, str]] = None
+
+
+def label_font(name: str) -> str:
+    """Helvetica ailesi adını kayıtlı Türkçe destekli TTF font adına çevirir"""
+    global _fonts
+    if _fonts is None:
+        _fonts = {}
+        for regular, bold in FONT_CANDIDATES:
+            if os.path.exists(regular) and os.path.exists(bold):
+                try:
+                    pdfmetrics.registerFont(TTFont("LabelSans", regular))
+                    pdfmetrics.registerFont(TTFont("LabelSans-Bold", bold))
+                except Exception as e:
+                    print(f"Etiket fontu yüklenemedi ({regular}): {e}")
+                    continue
+                _fonts = {
+                    "Helvetica": "LabelSans",
+                    "Helvetica-Bold": "LabelSans-Bold",
+                    "Helvetica-Oblique": "LabelSans",
+                }
+                break
+    return _fonts.get(name, name)
+
+
+# =====================
+# YERLEŞİM
+# =====================
+
+
+@dataclass
+class SheetLayout:
+    """
+    Etiketlerin sayfaya yerleşimi (ölçüler mm).
+
+    columns / rows 0 ise sayfaya sığan kadar hesaplanır. order="column"
+    etiketleri önce sütun boyunca doldurur. copies her kaydın kaç kez
+    basılacağını belirtir.
+    """
+
+    label_width_mm: float
+    label_height_mm: float
+    page_width_mm: float = 210.0
+    page_height_mm: float = 297.0
+    margin_left_mm: float = 10.0
+    margin_top_mm: float = 10.0
+    gap_x_mm: float = 5.0
+    gap_y_mm: float = 5.0
+    columns: int = 0
+    rows: int = 0
+    order: str = "row"
+    copies: int = 1
+
+    @classmethod
+    def roll(cls, label_width_mm: float, label_height_mm: float, copies: int = 1) -> "SheetLayout":
+        """Rulo (termal) yazıcı: her sayfa tek etiket"""
+        return cls(
+            label_width_mm=label_width_mm,
+            label_height_mm=label_height_mm,
+            page_width_mm=label_width_mm,
+            page_height_mm=label_height_mm,
+            margin_left_mm=0,
+            margin_top_mm=0,
+            gap_x_mm=0,
+            gap_y_mm=0,
+            columns=1,
+            rows=1,
+            copies=copies,
+        )
+
+    @classmethod
+    def from_dict(
+        cls, data: Optional[Dict[str, Any]], label_width_mm: float, label_height_mm: float
+    ) -> "SheetLayout":
+        """Şablondaki "sheet" ayarlarından yerleşim (yoksa A4 varsayılanı)"""
+        data = data or {}
+        if data.get("page") == "roll":
+            return cls.roll(label_width_mm, label_height_mm, int(data.get("copies", 1)))
+
+        known = {f.name for f in fields(cls)} - {"label_width_mm", "label_height_mm"}
+        options = {key: value for key, value in data.items() if key in known}
+        return cls(label_width_mm=label_width_mm, label_height_mm=label_height_mm, **options)
+
+    @property
+    def page_size(self) -> Tuple[float, float]:
+        return self.page_width_mm * mm, self.page_height_mm * mm
+
+    def grid(self) -> Tuple[int, int]:
+        """Sayfa başına (sütun, satır) sayısı"""
+        columns = self.columns or int(
+            (self.page_width_mm - 2 * self.margin_left_mm + self.gap_x_mm)
+            // (self.label_width_mm + self.gap_x_mm)
+        )
+        rows = self.rows or int(
+            (self.page_height_mm - 2 * self.margin_top_mm + self.gap_y_mm)
+            // (self.label_height_mm + self.gap_y_mm)
+        )
+        return max(columns, 1), max(rows, 1)
+
+    def slots(self) -> List[Tuple[float, float]]:
+        """Sayfadaki etiket konumları (sol alt köşe, punto) doldurma sırasıyla"""
+        columns, rows = self.grid()
+        cells = [(col, row) for row in range(rows) for col in range(columns)]
+        if self.order == "column":
+            cells.sort(key=lambda cell: (cell[0], cell[1]))
+
+        page_height = self.page_height_mm * mm
+        return [
+            (
+                (self.margin_left_mm + col * (self.label_width_mm + self.gap_x_mm)) * mm,
+                page_height
+                - (self.margin_top_mm + row * (self.label_height_mm + self.gap_y_mm)) * mm
+                - self.label_height_mm * mm,
+            )
+            for col, row in cells
+        ]
+
+
+# =====================
+# ŞABLON ÖĞELERİ
+# =====================
+
+
+@dataclass
+class LabelElement:
+    """
+    Etiket öğesi (konumlar etiketin sol üst köşesinden mm).
+
+    Metinlerde baseline_mm yazının taban çizgisinin üstten uzaklığıdır.
+    text, metin içeriği ya da barkod/QR verisi için şablondur.
+    """
+
+    kind: str
+    x_mm: float
+    y_mm: float
+    width_mm: float = 0.0
+    height_mm: float = 0.0
+    text: str = ""
+    baseline_mm: float = 0.0
+    rotation: float = 0.0
+    style: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def dynamic(self) -> bool:
+        """Kayda göre değişen öğe mi? (değilse form XObject'e girer)"""
+        return self.kind in ("text", "barcode", "qrcode") and not self.template.is_static
+
+    @property
+    def template(self):
+        """Derlenmiş metin / barkod verisi şablonu (önbellekten)"""
+        return compile_template(self.text)
+
+
+def text_element(
+    x_mm: float, baseline_mm: float, text: str, font_size: float = 10,
+    bold: bool = False, align: str = "left", width_mm: float = 0, color: str = "#000000",
+) -> LabelElement:
+    return LabelElement(
+        "text", x_mm, baseline_mm, width_mm=width_mm, text=text, baseline_mm=baseline_mm,
+        style={"font": "Helvetica-Bold" if bold else "Helvetica",
+               "font_size": font_size, "align": align, "color": color},
+    )
+
+
+def barcode_element(
+    x_mm: float, y_mm: float, width_mm: float, height_mm: float, value: str,
+    symbology: str = "code128", show_text: bool = True,
+) -> LabelElement:
+    return LabelElement(
+        "barcode", x_mm, y_mm, width_mm, height_mm, text=value,
+        style={"symbology": symbology, "show_text": show_text},
+    )
+
+
+def rect_element(
+    x_mm: float, y_mm: float, width_mm: float, height_mm: float,
+    stroke_color: str = "#000000", stroke_width: float = 1.0,
+) -> LabelElement:
+    return LabelElement(
+        "rectangle", x_mm, y_mm, width_mm, height_mm,
+        style={"stroke_color": stroke_color, "stroke_width": stroke_width},
+    )
+
+
+def compile_elements(visual_data: Dict[str, Any]) -> List[LabelElement]:
+    """Görsel editör veya tasarımcı JSON'unu öğe listesine çevirir"""
+    elements = []
+    for item in visual_data.get("items", []):
+        if "geometry" in item:
+            element = _designer_element(item)
+        else:
+            element = _editor_element(item)
+        if element:
+            elements.append(element)
+    return elements
+
+
+def _editor_element(item: Dict[str, Any]) -> Optional[LabelElement]:
+    """Görsel editör biçimi: x/y mm, metin y + punto aşağıdan yazılır"""
+    x_mm, y_mm = item.get("x", 0), item.get("y", 0)
+    item_type = item.get("type")
+
+    if item_type == "text":
+        font_size = item.get("font_size", 12)
+        return text_element(
+            x_mm, y_mm + font_size * PT_TO_MM, item.get("text", ""), font_size,
+            bold=item.get("bold", False), color=item.get("color", "black"),
+        )
+    if item_type == "barcode":
+        key = item.get("data_key", "{{ barcode }}")
+        return barcode_element(x_mm, y_mm, item.get("width", 30), item.get("height", 10), key)
+    return None
+
+
+def _designer_element(item: Dict[str, Any]) -> Optional[LabelElement]:
+    """Tasarımcı biçimi: geometry kutusu, data_key varsa içeriğin yerine geçer"""
+    geometry = item.get("geometry", {})
+    x_mm = geometry.get("x_mm", 0.0)
+    y_mm = geometry.get("y_mm", 0.0)
+    w_mm = geometry.get("width_mm", 20.0)
+    h_mm = geometry.get("height_mm", 10.0)
+    rotation = geometry.get("rotation", 0)
+    item_type = item.get("type")
+    data_key = item.get("data_key")
+    style = item.get("style", {})
+
+    if item_type == "text":
+        font = "Helvetica"
+        if style.get("bold"):
+            font = "Helvetica-Bold"
+        elif style.get("italic"):
+            font = "Helvetica-Oblique"
+        return LabelElement(
+            "text", x_mm, y_mm, w_mm, h_mm, text=data_key or item.get("text", ""),
+            baseline_mm=y_mm + h_mm / 2, rotation=rotation,
+            style={"font": font, "font_size": style.get("font_size", 12),
+                   "align": style.get("alignment", "left"),
+                   "color": style.get("color", "#000000")},
+        )
+    if item_type == "barcode":
+        return LabelElement(
+            "barcode", x_mm, y_mm, w_mm, h_mm,
+            text=data_key or item.get("barcode_data", ""), rotation=rotation,
+            style={"symbology": item.get("barcode_type", "code128"),
+                   "show_text": item.get("show_text", True)},
+        )
+    if item_type == "qrcode":
+        return LabelElement(
+            "qrcode", x_mm, y_mm, w_mm, h_mm,
+            text=data_key or item.get("qr_data", ""), rotation=rotation,
+            style={"level": item.get("error_level", "M")},
+        )
+    if item_type in ("rectangle", "line", "ellipse"):
+        return LabelElement(item_type, x_mm, y_mm, w_mm, h_mm, rotation=rotation, style=style)
+    if item_type == "image":
+        return LabelElement(
+            "image", x_mm, y_mm, w_mm, h_mm, rotation=rotation,
+            style={"image_data": item.get("image_data"), "image_path": item.get("image_path"),
+                   "keep_aspect": item.get("aspect_mode", "keep") != "ignore"},
+        )
+    return None
+
+
+# =====================
+# VEKTÖREL BARKOD
+# =====================
+
+
+def draw_barcode(
+    c: canvas.Canvas, value: str, x: float, y: float, width: float, height: float,
+    symbology: str = "code128", show_text: bool = True,
+) -> bool:
+    """
+    Barkodu verilen kutuya (punto) vektörel olarak çizer.
+
+    Returns:
+        bool: Çizildi mi (geçersiz veri için False)
+    """
+    try:
+        name = SYMBOLOGIES.get((symbology or "code128").lower(), "Code128")
+        if name == "QR":
+            size = min(width, height)
+            return draw_qrcode(c, value, x + (width - size) / 2, y + (height - size) / 2, size)
+
+        if name in ("Code128", "Standard39"):
+            # Çubuk genişliği kutuya sığacak şekilde modül sayısından hesaplanır
+            font_size = min(8.0, height * 0.25) if show_text else 0
+            bar_height = height - font_size
+            widget_class = code128.Code128 if name == "Code128" else code39.Standard39
+            options = {"quiet": False, "humanReadable": show_text, "fontSize": font_size}
+            if name == "Standard39":
+                options["checksum"] = 0
+            modules = widget_class(value, barWidth=1, barHeight=bar_height, **options).width
+            widget = widget_class(
+                value, barWidth=width / modules, barHeight=bar_height, **options
+            )
+            widget.drawOn(c, x, y + font_size)
+            return True
+
+        drawing = createBarcodeDrawing(
+            name, value=value, width=width, height=height, humanReadable=show_text
+        )
+        renderPDF.draw(drawing, c, x, y)
+        return True
+    except Exception as e:
+        print(f"Barkod çizim hatası ({symbology}: {value}): {e}")
+        return False
+
+
+def draw_qrcode(
+    c: canvas.Canvas, value: str, x: float, y: float, size: float, level: str = "M"
+) -> bool:
+    """QR kodu kare kutuya (punto) vektörel olarak çizer"""
+    try:
+        modules = _qr_modules(value, level)
+        x0, y0, x1, y1 = modules.getBounds()
+        sx, sy = size / (x1 - x0), size / (y1 - y0)
+        drawing = Drawing(size, size)
+        drawing.add(Group(modules, transform=(sx, 0, 0, sy, -x0 * sx, -y0 * sy)))
+        renderPDF.draw(drawing, c, x, y)
+        return True
+    except Exception as e:
+        print(f"QR kod çizim hatası ({value}): {e}")
+        return False
+
+
+@lru_cache(maxsize=1024)
+def _qr_modules(value: str, level: str) -> Group:
+    """
+    QR kodunu bir kez kodlar ve modüllerini döner (aynı değer için önbellekten).
+
+    createBarcodeDrawing boyutlandırma için widget'ı iki kez çizer; burada
+    tek çizim kutuya ölçeklenir ve kopya/tekrar eden değerler yeniden
+    kodlanmaz.
+    """
+    return qr.QrCodeWidget(value, barLevel=level, barBorder=0).draw()
+
+
+# =====================
+# RENDERER
+# =====================
+
+
+class LabelSheetRenderer:
+    """Form XObject + vektörel barkod ile etiket sayfası PDF'i üretir"""
+
+    def __init__(
+        self,
+        elements: List[LabelElement],
+        layout: SheetLayout,
+        draw_frame: bool = False,
+    ):
+        self.layout = layout
+        self.draw_frame = draw_frame
+        self.static_elements = [e for e in elements if not e.dynamic]
+        self.dynamic_elements = [e for e in elements if e.dynamic]
+        self._images: Dict[int, ImageReader] = {}
+
+    @classmethod
+    def from_template(
+        cls,
+        visual_data: Dict[str, Any],
+        width_mm: float,
+        height_mm: float,
+        layout: SheetLayout = None,
+        draw_frame: bool = True,
+    ) -> "LabelSheetRenderer":
+        """JSON şablondan renderer (şablondaki "sheet" ayarı yerleşimi belirler)"""
+        if layout is None:
+            layout = SheetLayout.from_dict(visual_data.get("sheet"), width_mm, height_mm)
+        return cls(compile_elements(visual_data), layout, draw_frame=draw_frame)
+
+    def render(self, file_name, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Kayıtları etiket olarak PDF'e basar.
+
+        file_name: dosya yolu veya yazılabilir dosya nesnesi
+
+        Returns:
+            Dict: {"labels", "pages", "failed_barcodes"}
+        """
+        layout = self.layout
+        c = canvas.Canvas(file_name, pagesize=layout.page_size, pageCompression=1)
+        label_width = layout.label_width_mm * mm
+        label_height = layout.label_height_mm * mm
+
+        # Sabit öğeler tek sefer çizilir
+        c.beginForm(STATIC_FORM, 0, 0, label_width, label_height)
+        if self.draw_frame:
+            c.setLineWidth(0.5)
+            c.setStrokeColorRGB(0.8, 0.8, 0.8)
+            c.rect(0, 0, label_width, label_height)
+            c.setStrokeColorRGB(0, 0, 0)
+        for element in self.static_elements:
+            self._draw(c, element, {})
+        c.endForm()
+
+        slots = layout.slots()
+        per_page = len(slots)
+        copies = max(int(layout.copies or 1), 1)
+        self._failed_barcodes = 0
+        count = 0
+
+        for record in records:
+            for _ in range(copies):
+                if count and count % per_page == 0:
+                    c.showPage()
+                x, y = slots[count % per_page]
+                c.saveState()
+                c.translate(x, y)
+                c.doForm(STATIC_FORM)
+                for element in self.dynamic_elements:
+                    self._draw(c, element, record)
+                c.restoreState()
+                count += 1
+
+        c.save()
+        return {
+            "labels": count,
+            "pages": (count + per_page - 1) // per_page if count else 0,
+            "failed_barcodes": self._failed_barcodes,
+        }
+
+    def _draw(self, c: canvas.Canvas, element: LabelElement, record: Dict[str, Any]) -> None:
+        label_height = self.layout.label_height_mm
+        x = element.x_mm * mm
+        w = element.width_mm * mm
+        h = element.height_mm * mm
+        # PDF koordinatları sol alttan başlar
+        y = (label_height - element.y_mm - element.height_mm) * mm
+
+        c.saveState()
+        if element.rotation:
+            cx, cy = x + w / 2, y + h / 2
+            c.translate(cx, cy)
+            c.rotate(element.rotation)
+            c.translate(-cx, -cy)
+
+        kind = element.kind
+        style = element.style
+
+        if kind == "text":
+            text = element.template.render(record)
+            baseline = (label_height - element.baseline_mm) * mm
+            c.setFont(label_font(style.get("font", "Helvetica")), style.get("font_size", 12))
+            c.setFillColor(colors.toColor(style.get("color", "#000000"), colors.black))
+            align = style.get("align", "left")
+            if align == "center":
+                c.drawCentredString(x + w / 2, baseline, text)
+            elif align == "right":
+                c.drawRightString(x + w, baseline, text)
+            else:
+                c.drawString(x, baseline, text)
+
+        elif kind in ("barcode", "qrcode"):
+            # Kayıtta karşılığı olmayan barkod basılmaz
+            value = element.template.render(record, strict=True)
+            if value:
+                if kind == "qrcode":
+                    size = min(w, h)
+                    drawn = draw_qrcode(
+                        c, value, x + (w - size) / 2, y + (h - size) / 2, size,
+                        style.get("level", "M"),
+                    )
+                else:
+                    drawn = draw_barcode(
+                        c, value, x, y, w, h,
+                        style.get("symbology", "code128"), style.get("show_text", True),
+                    )
+                if not drawn:
+                    self._failed_barcodes += 1
+
+        elif kind in ("rectangle", "line", "ellipse"):
+            self._draw_shape(c, element, x, y, w, h)
+
+        elif kind == "image":
+            image = self._image(element)
+            if image:
+                c.drawImage(
+                    image, x, y, w, h, mask="auto",
+                    preserveAspectRatio=style.get("keep_aspect", True),
+                )
+
+        c.restoreState()
+
+    @staticmethod
+    def _draw_shape(c: canvas.Canvas, element: LabelElement, x, y, w, h) -> None:
+        style = element.style
+        c.setStrokeColor(colors.toColor(style.get("stroke_color", "#000000"), colors.black))
+        c.setLineWidth(style.get("stroke_width", 1.0))
+        line_style = style.get("line_style", "solid")
+        if line_style == "dash":
+            c.setDash(6, 3)
+        elif line_style == "dot":
+            c.setDash(1, 2)
+        elif line_style == "dash_dot":
+            c.setDash([6, 2, 1, 2])
+
+        fill = 0
+        if style.get("fill_color"):
+            c.setFillColor(colors.toColor(style["fill_color"], colors.white))
+            fill = 1
+
+        if element.kind == "rectangle":
+            radius = style.get("corner_radius", 0)
+            if radius:
+                c.roundRect(x, y, w, h, radius, stroke=1, fill=fill)
+            else:
+                c.rect(x, y, w, h, stroke=1, fill=fill)
+        elif element.kind == "line":
+            c.line(x, y + h, x + w, y)
+        else:
+            c.ellipse(x, y, x + w, y + h, stroke=1, fill=fill)
+
+    def _image(self, element: LabelElement) -> Optional[ImageReader]:
+        """Görüntü bir kez okunur (form içinde zaten tek sefer çizilir)"""
+        key = id(element)
+        if key not in self._images:
+            style = element.style
+            try:
+                if style.get("image_data"):
+                    data = style["image_data"]
+                    if "," in data and data.startswith("data:"):
+                        data = data.split(",", 1)[1]
+                    self._images[key] = ImageReader(BytesIO(base64.b64decode(data)))
+                elif style.get("image_path"):
+                    self._images[key] = ImageReader(style["image_path"])
+                else:
+                    self._images[key] = None
+            except Exception as e:
+                print(f"Etiket görüntüsü okunamadı: {e}")
+                self._images[key] = None
+        return self._images[key]
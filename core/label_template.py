@@ -0,0 +1,263 @@
+"""
+Akıllı İş - Derlenmiş Etiket Şablonları
+
+Şablon metni bir kez ayrıştırılıp sabit metin ve alan parçalarına
+bölünür; her kayıt için sadece alanlar çözülür (her kayıtta her anahtar
+için str.replace döngüsü yok). Derlenen şablonlar önbellekte tutulur.
+
+Yer tutucu biçimleri:
+    {{ key }}, {{key}}, {key}        -> değer
+    {urun.adi}                       -> iç içe sözlük / nesne alanı
+    {price|money}                    -> biçimlendirici
+    {tarih|date:%d.%m.%Y}            -> argümanlı biçimlendirici
+    {code|pad:12|ean13}              -> zincirleme
+
+Biçimlendiriciler: date, decimal, number, money, pad, upper, lower,
+truncate, default, ean13, ean8, gs1 (FORMATTERS, register_formatter ile
+genişletilebilir).
+
+Kullanım:
+    template = compile_template("{name|truncate:20} - {price|money}")
+    template.render({"name": "Vida", "price": Decimal("12.5")})
+"""
+
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+# Alan ifadesi: anahtar ve isteğe bağlı |biçimlendirici:argüman zinciri
+_EXPR = r"[\w.]+(?:\s*\|\s*\w+(?::[^{}|]*)?)*"
+_DOUBLE = re.compile(r"\{\{\s*(" + _EXPR + r")\s*\}\}")
+_ANY = re.compile(r"\{\{\s*(" + _EXPR + r")\s*\}\}|\{(" + _EXPR + r")\}")
+
+# Kayıtta bulunmayan alan işareti
+_MISSING = object()
+
+DEFAULT_DATE_FORMAT = "%d.%m.%Y"
+
+
+# =====================
+# BİÇİMLENDİRİCİLER
+# =====================
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    try:
+        return Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _format_date(value: Any, arg: Optional[str]) -> Any:
+    fmt = arg or DEFAULT_DATE_FORMAT
+    if isinstance(value, (date, datetime)):
+        return value.strftime(fmt)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).strftime(fmt)
+        except ValueError:
+            return value
+    return value
+
+
+def _format_decimal(value: Any, arg: Optional[str]) -> Any:
+    number = _to_decimal(value)
+    if number is None:
+        return value
+    return f"{number:.{int(arg or 2)}f}"
+
+
+def _format_number(value: Any, arg: Optional[str]) -> Any:
+    number = _to_decimal(value)
+    if number is None:
+        return value
+    return f"{number:,.{int(arg or 2)}f}"
+
+
+def _format_money(value: Any, arg: Optional[str]) -> Any:
+    number = _to_decimal(value)
+    if number is None:
+        return value
+    return f"{arg or '₺'}{number:,.2f}"
+
+
+def _format_pad(value: Any, arg: Optional[str]) -> Any:
+    """pad:13 -> soldan 0 ile 13 haneye, pad:10:_ -> '_' ile"""
+    width, _, fill = (arg or "0").partition(":")
+    return str(value).rjust(int(width or 0), fill or "0")
+
+
+def _format_truncate(value: Any, arg: Optional[str]) -> Any:
+    return str(value)[: int(arg or 20)]
+
+
+def _format_default(value: Any, arg: Optional[str]) -> Any:
+    return value if value not in (None, "") else (arg or "")
+
+
+def gs1_check_digit(digits: str) -> str:
+    """GS1 (EAN/UPC/GTIN) mod 10 kontrol hanesi"""
+    total = sum(
+        int(digit) * (3 if index % 2 == 0 else 1)
+        for index, digit in enumerate(reversed(digits))
+    )
+    return str((10 - total % 10) % 10)
+
+
+def _check_digit(length: int) -> Callable[[Any, Optional[str]], Any]:
+    """length-1 haneli veriye kontrol hanesi ekler (tam uzunluktaysa dokunmaz)"""
+
+    def formatter(value: Any, arg: Optional[str]) -> Any:
+        digits = str(value).strip()
+        if not digits.isdigit():
+            return value
+        if length and len(digits) < length - 1:
+            digits = digits.rjust(length - 1, "0")
+        if length and len(digits) != length - 1:
+            return digits
+        return digits + gs1_check_digit(digits)
+
+    return formatter
+
+
+FORMATTERS: Dict[str, Callable[[Any, Optional[str]], Any]] = {
+    "date": _format_date,
+    "decimal": _format_decimal,
+    "number": _format_number,
+    "money": _format_money,
+    "pad": _format_pad,
+    "upper": lambda value, arg: str(value).upper(),
+    "lower": lambda value, arg: str(value).lower(),
+    "truncate": _format_truncate,
+    "default": _format_default,
+    "ean13": _check_digit(13),
+    "ean8": _check_digit(8),
+    "gs1": _check_digit(0),
+}
+
+
+def register_formatter(name: str, func: Callable[[Any, Optional[str]], Any]) -> None:
+    """Yeni biçimlendirici ekler (func(değer, argüman) -> değer)"""
+    FORMATTERS[name] = func
+    compile_template.cache_clear()
+
+
+# =====================
+# ŞABLON
+# =====================
+
+
+class TemplateField:
+    """Şablondaki tek bir yer tutucu"""
+
+    __slots__ = ("key", "path", "filters", "raw")
+
+    def __init__(self, expression: str, raw: str):
+        key, *filters = [part.strip() for part in expression.split("|")]
+        self.key = key
+        self.path = key.split(".") if "." in key else None
+        self.raw = raw
+        self.filters: List[Tuple[Callable, Optional[str]]] = []
+        for spec in filters:
+            name, sep, arg = spec.partition(":")
+            formatter = FORMATTERS.get(name)
+            if formatter is None:
+                raise ValueError(f"Bilinmeyen biçimlendirici: {name}")
+            self.filters.append((formatter, arg if sep else None))
+
+    def resolve(self, record: Any) -> Any:
+        """Kayıttaki değer (yoksa _MISSING)"""
+        if isinstance(record, dict) and self.key in record:
+            return record[self.key]
+        if self.path is None:
+            return _MISSING
+
+        value = record
+        for part in self.path:
+            if isinstance(value, dict):
+                value = value.get(part, _MISSING)
+            else:
+                value = getattr(value, part, _MISSING)
+            if value is _MISSING or value is None:
+                return value
+        return value
+
+    def format(self, value: Any) -> str:
+        for formatter, arg in self.filters:
+            value = formatter(value, arg)
+        return "" if value is None else str(value)
+
+
+class CompiledTemplate:
+    """Sabit metin ve alan parçalarına ayrılmış şablon"""
+
+    __slots__ = ("source", "segments", "fields")
+
+    def __init__(self, source: str, single_brace: bool = True):
+        self.source = source or ""
+        self.segments: List[Union[str, TemplateField]] = []
+        self.fields: List[TemplateField] = []
+
+        pattern = _ANY if single_brace else _DOUBLE
+        position = 0
+        for match in pattern.finditer(self.source):
+            if match.start() > position:
+                self.segments.append(self.source[position:match.start()])
+            field = TemplateField(match.group(1) or match.group(2), match.group(0))
+            self.segments.append(field)
+            self.fields.append(field)
+            position = match.end()
+        if position < len(self.source):
+            self.segments.append(self.source[position:])
+
+    @property
+    def is_static(self) -> bool:
+        """Kayda göre değişmeyen şablon mu?"""
+        return not self.fields
+
+    def render(self, record: Any, strict: bool = False) -> Optional[str]:
+        """
+        Şablonu kayıtla doldurur.
+
+        Kayıtta olmayan alanlar olduğu gibi bırakılır; strict=True ise
+        None döner (ör. verisi olmayan barkod hiç basılmaz).
+        """
+        if not self.fields:
+            return self.source
+
+        parts = []
+        for segment in self.segments:
+            if segment.__class__ is str:
+                parts.append(segment)
+                continue
+            value = segment.resolve(record)
+            if value is _MISSING:
+                if strict:
+                    return None
+                parts.append(segment.raw)
+            else:
+                parts.append(segment.format(value))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str, single_brace: bool = True) -> CompiledTemplate:
+    """
+    Şablonu derler (aynı metin için önbellekten döner).
+
+    single_brace=False yalnızca {{ key }} biçimini tanır (HTML/CSS
+    içeriğindeki { } blokları alan sanılmasın diye).
+    """
+    return CompiledTemplate(source, single_brace)
+
+
+def render_template_text(source: str, record: Any, single_brace: bool = True) -> str:
+    """compile_template(source).render(record) kısayolu"""
+    return compile_template(source or "", single_brace).render(record)
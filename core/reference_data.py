@@ -0,0 +1,406 @@
+"""
+Akıllı İş - Referans Veri Önbelleği
+
+Birim, depo, para birimi, kategori, iş istasyonu, vardiya, vardiya ekibi ve
+tedarikçi gibi küçük ve sık okunan tabloları süreç genelinde bellekte
+tutar. Formlar combo kutularını her açılışta veritabanına gitmeden buradan
+doldurur.
+
+- Kayıtlar ORM nesnesi değil, session'a bağlı olmayan salt okunur
+  __slots__ nesneleridir (UnitRef, WarehouseRef...). Thread'ler arasında
+  güvenle paylaşılır, tembel yükleme veya DetachedInstanceError oluşmaz.
+- Geçerlilik, tablo başına sürüm damgası (kayıt sayısı, max(updated_at),
+  max(id)) ile denetlenir. Tüm tabloların damgası tek sorguda ve en fazla
+  REFERENCE_CACHE_CHECK_INTERVAL saniyede bir okunur; başka bir istemcinin
+  yaptığı değişiklik en geç bu süre sonunda görülür.
+- Bu süreçte yapılan değişiklikler commit anında ilgili tabloyu hemen
+  geçersiz kılar (after_flush + after_commit dinleyicileri).
+
+Kullanım:
+    from core.reference_data import reference_cache
+    reference_cache.init_listeners()  # Uygulama başlangıcında çağır
+
+    for unit in reference_cache.units():
+        combo.addItem(f"{unit.code} - {unit.name}", unit.id)
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, literal, select, union_all
+from sqlalchemy.orm import Session as DBSession
+
+from config import REFERENCE_CACHE_CHECK_INTERVAL
+from database.base import get_engine
+from database.models.calendar import ProductionShift
+from database.models.common import Currency
+from database.models.inventory import ItemCategory, Unit, Warehouse
+from database.models.production import WorkStation
+from database.models.purchasing import Supplier
+from database.models.shift_teams import ShiftTeam
+
+
+# Session.info anahtarı: flush edilen referans tabloları (commit'te geçersiz kılınır)
+_TOUCHED_KEY = "reference_tables"
+
+
+class RefSnapshot:
+    """
+    Salt okunur referans kaydı
+
+    Alanlar alt sınıfın __slots__ tanımından gelir ve yalnızca kurucuda
+    atanır; sonradan değiştirme girişimi AttributeError verir.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} salt okunurdur")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} salt okunurdur")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __hash__(self):
+        return hash((type(self), self._values()))
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(id={self.id}, code={self.code!r})>"
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.__slots__, self._values()))
+
+
+class UnitRef(RefSnapshot):
+    __slots__ = ("id", "code", "name", "short_name", "is_active")
+
+
+class WarehouseRef(RefSnapshot):
+    __slots__ = (
+        "id",
+        "code",
+        "name",
+        "short_name",
+        "warehouse_type",
+        "is_default",
+        "is_production",
+        "allow_negative",
+        "is_active",
+    )
+
+
+class CurrencyRef(RefSnapshot):
+    __slots__ = ("id", "code", "name", "symbol", "decimal_places", "is_default", "is_active")
+
+
+class CategoryRef(RefSnapshot):
+    __slots__ = ("id", "code", "name", "parent_id", "level", "path", "icon", "color", "is_active")
+
+
+class WorkStationRef(RefSnapshot):
+    __slots__ = (
+        "id",
+        "code",
+        "name",
+        "station_type",
+        "warehouse_id",
+        "default_operation_name",
+        "default_setup_time",
+        "default_run_time_per_unit",
+        "is_external",
+        "supplier_id",
+        "is_active",
+    )
+
+
+class ShiftRef(RefSnapshot):
+    __slots__ = ("id", "code", "name", "start_time", "end_time", "break_minutes", "is_active")
+
+
+class ShiftTeamRef(RefSnapshot):
+    __slots__ = ("id", "code", "name", "color", "is_active")
+
+
+class SupplierRef(RefSnapshot):
+    __slots__ = ("id", "code", "name", "short_name", "city", "is_active")
+
+
+@dataclass(frozen=True)
+class RefTable:
+    """Önbelleğe alınan tablo: model, kayıt sınıfı ve sıralama kolonu"""
+
+    model: type
+    snapshot: type
+    order_by: str = "code"
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+    def select(self):
+        columns = [getattr(self.model, field) for field in self.snapshot.__slots__]
+        return select(*columns).order_by(getattr(self.model, self.order_by))
+
+
+REF_TABLES: Dict[str, RefTable] = {
+    t.name: t
+    for t in (
+        RefTable(Unit, UnitRef),
+        RefTable(Warehouse, WarehouseRef),
+        RefTable(Currency, CurrencyRef),
+        RefTable(ItemCategory, CategoryRef, order_by="name"),
+        RefTable(WorkStation, WorkStationRef),
+        RefTable(ProductionShift, ShiftRef, order_by="start_time"),
+        RefTable(ShiftTeam, ShiftTeamRef),
+        RefTable(Supplier, SupplierRef, order_by="name"),
+    )
+}
+
+_MODEL_TABLES = {t.model: t.name for t in REF_TABLES.values()}
+
+
+class _Entry:
+    """Bir tablonun yüklenmiş hali"""
+
+    __slots__ = ("version", "rows", "by_id")
+
+    def __init__(self, version: Tuple, rows: List[RefSnapshot]):
+        self.version = version
+        self.rows = rows
+        self.by_id = {r.id: r for r in rows}
+
+
+class ReferenceDataCache:
+    """
+    Süreç genelinde referans veri önbelleği (singleton).
+
+    Okumalar kilitsizdir: tablo girdisi yeniden yüklenince sözlükteki
+    referans tek adımda değiştirilir. Yükleme ve damga kontrolü kilit
+    altında yapılır; aynı anda gelen istekler tek sorgu çalıştırır.
+    """
+
+    _instance: Optional["ReferenceDataCache"] = None
+    _listening: bool = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self._entries: Dict[str, _Entry] = {}
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self.check_interval = REFERENCE_CACHE_CHECK_INTERVAL
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+        self.invalidations = 0
+
+    # =====================
+    # OKUMA
+    # =====================
+
+    def get_all(self, table: str, active_only: bool = True) -> List[RefSnapshot]:
+        """Tablonun kayıtları (kopya liste; kayıtlar paylaşılır)"""
+        rows = self._entry(table).rows
+        if active_only:
+            return [r for r in rows if r.is_active]
+        return list(rows)
+
+    def get(self, table: str, record_id: Optional[int]) -> Optional[RefSnapshot]:
+        if record_id is None:
+            return None
+        return self._entry(table).by_id.get(record_id)
+
+    def units(self, active_only: bool = True) -> List[UnitRef]:
+        return self.get_all("units", active_only)
+
+    def warehouses(self, active_only: bool = True) -> List[WarehouseRef]:
+        return self.get_all("warehouses", active_only)
+
+    def currencies(self, active_only: bool = True) -> List[CurrencyRef]:
+        return self.get_all("currencies", active_only)
+
+    def categories(self, active_only: bool = True) -> List[CategoryRef]:
+        return self.get_all("item_categories", active_only)
+
+    def work_stations(self, active_only: bool = True) -> List[WorkStationRef]:
+        return self.get_all("work_stations", active_only)
+
+    def shifts(self, active_only: bool = True) -> List[ShiftRef]:
+        return self.get_all("production_shifts", active_only)
+
+    def shift_teams(self, active_only: bool = True) -> List[ShiftTeamRef]:
+        return self.get_all("shift_teams", active_only)
+
+    def suppliers(self, active_only: bool = True) -> List[SupplierRef]:
+        return self.get_all("suppliers", active_only)
+
+    def default_warehouse(self) -> Optional[WarehouseRef]:
+        return next((w for w in self.warehouses() if w.is_default), None)
+
+    def default_currency(self) -> Optional[CurrencyRef]:
+        return next((c for c in self.currencies() if c.is_default), None)
+
+    # =====================
+    # GEÇERLİLİK
+    # =====================
+
+    def invalidate(self, table: str = None) -> None:
+        """
+        Tabloyu (verilmezse tümünü) geçersiz kılar; sonraki okuma yeniden yükler.
+        Bilinmeyen tablo adları yok sayılır.
+        """
+        with self._lock:
+            if table is None:
+                self._entries.clear()
+                self._checked_at = 0.0
+            elif table in REF_TABLES:
+                self._entries.pop(table, None)
+            else:
+                return
+            self.invalidations += 1
+
+    def check_versions(self, force: bool = False) -> Set[str]:
+        """
+        Sürüm damgalarını okuyup değişen tabloları geçersiz kılar.
+        Döner: değişen (yüklü) tabloların adları
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.check_interval:
+                return set()
+            versions = self._read_versions()
+            self._checked_at = now
+            self.version_checks += 1
+
+            changed = {
+                name
+                for name, entry in self._entries.items()
+                if entry.version != versions.get(name)
+            }
+            for name in changed:
+                del self._entries[name]
+            return changed
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "version_checks": self.version_checks,
+            "invalidations": self.invalidations,
+            "loaded": sorted(self._entries),
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.version_checks = self.invalidations = 0
+
+    # =====================
+    # YÜKLEME
+    # =====================
+
+    def _entry(self, table: str) -> _Entry:
+        if table not in REF_TABLES:
+            raise KeyError(f"Referans tablosu değil: {table}")
+
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.check_versions()
+
+        entry = self._entries.get(table)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(table)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            entry = self._load(table)
+            self._entries[table] = entry
+            return entry
+
+    def _load(self, table: str) -> _Entry:
+        ref = REF_TABLES[table]
+        with get_engine().connect() as conn:
+            version = tuple(conn.execute(self._version_query(ref.model)).one())
+            rows = [ref.snapshot(*row) for row in conn.execute(ref.select())]
+        return _Entry(version, rows)
+
+    @staticmethod
+    def _version_query(model, label: str = None):
+        stamp = select(
+            func.count(model.id),
+            func.max(model.updated_at),
+            func.max(model.id),
+        )
+        if label is None:
+            return stamp
+        return stamp.add_columns(literal(label).label("name"))
+
+    def _read_versions(self) -> Dict[str, Tuple]:
+        """Tüm tabloların damgaları tek sorguda (UNION ALL)"""
+        query = union_all(
+            *(self._version_query(t.model, name) for name, t in REF_TABLES.items())
+        )
+        with get_engine().connect() as conn:
+            return {row[3]: tuple(row[:3]) for row in conn.execute(query)}
+
+    # =====================
+    # ORM DİNLEYİCİLERİ
+    # =====================
+
+    def init_listeners(self) -> None:
+        """SQLAlchemy event listener'larını kaydeder (tekrar çağrılabilir)"""
+        if self._listening:
+            return
+        event.listen(DBSession, "after_flush", self._after_flush)
+        event.listen(DBSession, "do_orm_execute", self._on_execute)
+        event.listen(DBSession, "after_commit", self._after_commit)
+        event.listen(DBSession, "after_rollback", self._after_rollback)
+        ReferenceDataCache._listening = True
+
+    def _after_flush(self, session: DBSession, flush_context) -> None:
+        touched = None
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            table = _MODEL_TABLES.get(type(obj))
+            if table is not None:
+                if touched is None:
+                    touched = session.info.setdefault(_TOUCHED_KEY, set())
+                touched.add(table)
+
+    def _on_execute(self, orm_execute_state) -> None:
+        """Toplu ORM UPDATE/DELETE ifadeleri de tabloyu işaretler"""
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        table = _MODEL_TABLES.get(mapper.class_) if mapper is not None else None
+        if table is not None:
+            orm_execute_state.session.info.setdefault(_TOUCHED_KEY, set()).add(table)
+
+    def _after_commit(self, session: DBSession) -> None:
+        for table in session.info.pop(_TOUCHED_KEY, ()):
+            self.invalidate(table)
+
+    def _after_rollback(self, session: DBSession) -> None:
+        session.info.pop(_TOUCHED_KEY, None)
+
+
+# Singleton instance
+reference_cache = ReferenceDataCache()
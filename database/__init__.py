@@ -7,15 +7,20 @@ from database.base import (
     BaseModel,
     get_engine,
     get_session,
+    session_scope,
     SessionLocal,
     init_database,
 )
+from database.replica import get_read_session, read_only
 
 __all__ = [
     "Base",
     "BaseModel",
     "get_engine",
     "get_session",
+    "session_scope",
     "SessionLocal",
     "init_database",
+    "get_read_session",
+    "read_only",
 ]
@@ -2,13 +2,24 @@
 Akıllı İş - Veritabanı Bağlantısı ve Base Model
 """
 
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
 from sqlalchemy import create_engine, Column, Integer, DateTime, Boolean, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base, Session, scoped_session
-from sqlalchemy.pool import QueuePool
 
-from config import get_database_url
+from config import (
+    get_database_url,
+    QUERY_INSTRUMENTATION,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_PGBOUNCER,
+)
+from database.pool import MeteredQueuePool
 
 # Base model
 Base = declarative_base()
@@ -18,38 +29,131 @@ _engine = None
 _SessionFactory = None
 _ScopedSession = None
 
+# PgBouncer modunda havuz üst sınırları (asıl havuzlama PgBouncer'dadır)
+PGBOUNCER_POOL_SIZE = 2
+PGBOUNCER_MAX_OVERFLOW = 3
+
+# session_scope() ile açılmış iş biriminin session'ı (thread bazlı)
+_SCOPE_KEY = "unit_of_work"
+_scope_local = threading.local()
+
+
+class AppSession(Session):
+    """
+    Uygulama session'ı.
+
+    session_scope() içindeyken close() çağrıları yok sayılır; aynı iş
+    biriminde çalışan servislerden biri session'ı kapatıp diğerinin
+    nesnelerini ayırmasın diye session'ı sadece kapsam kapatır.
+    """
+
+    def close(self) -> None:
+        if self.info.get(_SCOPE_KEY):
+            return
+        super().close()
+
+
+def _engine_options(url: str) -> dict:
+    """Havuz ayarları (config) ve PgBouncer uyumlu bağlantı parametreleri"""
+    pool_size, max_overflow = DB_POOL_SIZE, DB_MAX_OVERFLOW
+    connect_args = {}
+    if DB_PGBOUNCER:
+        pool_size = min(pool_size, PGBOUNCER_POOL_SIZE)
+        max_overflow = min(max_overflow, PGBOUNCER_MAX_OVERFLOW)
+        # psycopg2 sunucu tarafı prepared statement kullanmaz; psycopg 3
+        # otomatik hazırlamayı kapatmadan transaction pooling ile çalışmaz
+        if make_url(url).get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+
+    return {
+        "poolclass": MeteredQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,  # Bağlantı sağlığını kontrol et
+        "connect_args": connect_args,
+        "echo": False,
+    }
+
 
 def get_engine():
     """Veritabanı engine'i döndürür (singleton)"""
     global _engine
     if _engine is None:
-        _engine = create_engine(
-            get_database_url(),
-            poolclass=QueuePool,
-            pool_size=20,  # Artırıldı: 5 -> 20
-            max_overflow=30,  # Artırıldı: 10 -> 30
-            pool_timeout=60,  # Artırıldı: 30 -> 60
-            pool_recycle=1800,
-            pool_pre_ping=True,  # Bağlantı sağlığını kontrol et
-            echo=False,
-        )
+        url = get_database_url()
+        _engine = create_engine(url, **_engine_options(url))
+        if QUERY_INSTRUMENTATION:
+            from database.instrumentation import query_instrumentation
+
+            query_instrumentation.install(_engine)
     return _engine
 
 
-def get_session() -> Session:
-    """Yeni bir veritabanı session'ı döndürür (scoped)"""
+def _get_session_factory() -> sessionmaker:
     global _SessionFactory, _ScopedSession
     if _SessionFactory is None:
         _SessionFactory = sessionmaker(
             bind=get_engine(),
+            class_=AppSession,
             autocommit=False,
             autoflush=False,
             expire_on_commit=False,  # Commit sonrası objeleri expire etme
         )
         _ScopedSession = scoped_session(_SessionFactory)
+    return _SessionFactory
+
+
+def get_session() -> Session:
+    """
+    Veritabanı session'ı döndürür.
+
+    session_scope() içinde o kapsamın session'ını, dışında thread'e bağlı
+    (scoped) session'ı döndürür.
+    """
+    current = getattr(_scope_local, "session", None)
+    if current is not None:
+        return current
+    _get_session_factory()
     return _ScopedSession()
 
 
+@contextmanager
+def session_scope(commit: bool = True) -> Iterator[Session]:
+    """
+    Açık iş birimi: kendine ait bir session açar, blok sonunda commit
+    (hata varsa rollback) eder ve kapatır.
+
+    Blok içinde oluşturulan servisler get_session() üzerinden aynı
+    session'ı kullanır; close() çağrıları kapsam bitene kadar etkisizdir.
+    Arka plan thread'leri UI thread'inin session'ına dokunmadan bununla
+    çalışmalıdır. İç içe çağrılar dıştaki iş birimine katılır.
+
+    Kullanım:
+        with session_scope() as session:
+            PreventiveMaintenanceScheduler(session).run()
+    """
+    current = getattr(_scope_local, "session", None)
+    if current is not None:
+        yield current
+        return
+
+    session = _get_session_factory()()
+    session.info[_SCOPE_KEY] = True
+    _scope_local.session = session
+    try:
+        yield session
+        if commit:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _scope_local.session = None
+        session.info.pop(_SCOPE_KEY, None)
+        session.close()
+
+
 # Geriye dönük uyumluluk için alias
 SessionLocal = get_session
 
@@ -0,0 +1,387 @@
+"""
+Akıllı İş - Sorgu Ölçümü (Geliştirici)
+
+Engine üzerindeki before/after_cursor_execute event'leri ile her SQL
+sorgusunun süresini ölçer. Servis çağrıları track_queries() bağlam
+yöneticisi veya @tracked dekoratörü ile işaretlenir; çağrı başına sorgu
+sayısı ve veritabanı süresi toplanır. Aynı iş birimi (işaretli çağrı veya
+tek bir transaction) içinde aynı SQL metni N_PLUS_ONE_THRESHOLD kez
+çalışırsa N+1 alarmı üretilir. Eşiği aşan sorgular bellekte kayan bir
+listede tutulur ve dönen (rotating) log dosyasına yazılır.
+
+Varsayılan olarak kapalıdır (QUERY_INSTRUMENTATION=true ile açılır veya
+geliştirme ekranından çalışma anında açılıp kapatılır).
+
+Kullanım:
+    from database.instrumentation import query_instrumentation, tracked
+
+    class ReportsService:
+        @tracked()
+        def get_stock_aging(self, ...):
+            ...
+
+    with query_instrumentation.track("stok raporu"):
+        ...
+"""
+
+import functools
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from config import (
+    QUERY_INSTRUMENTATION,
+    SLOW_QUERY_THRESHOLD_MS,
+    N_PLUS_ONE_THRESHOLD,
+    SLOW_QUERY_LOG,
+)
+
+
+# Bellekte tutulan son kayıt sayıları
+SLOW_QUERY_HISTORY = 200
+ALARM_HISTORY = 200
+CALL_HISTORY = 500
+# İstatistik tutulan farklı SQL metni üst sınırı
+MAX_STATEMENTS = 1000
+# Yavaş sorgu log dosyası boyutu ve yedek sayısı
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Transaction bazlı sayaçların connection.info anahtarları
+_START_KEY = "query_instrumentation_start"
+_COUNTER_KEY = "query_instrumentation_statements"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str, limit: int = None) -> str:
+    """SQL metnini tek satıra indirir (istenirse kısaltır)"""
+    text = _WHITESPACE.sub(" ", statement or "").strip()
+    if limit and len(text) > limit:
+        text = text[: limit - 3] + "..."
+    return text
+
+
+class QueryScope:
+    """Tek bir işaretli çağrının (iş biriminin) sorgu sayaçları"""
+
+    __slots__ = ("name", "count", "db_ms", "statements", "alarmed", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.db_ms = 0.0
+        self.statements: Counter = Counter()
+        self.alarmed = set()
+        self.started = time.perf_counter()
+
+    @property
+    def repeated(self) -> int:
+        """Birden fazla çalışan farklı sorgu sayısı"""
+        return sum(1 for count in self.statements.values() if count > 1)
+
+
+class QueryInstrumentation:
+    """
+    Sorgu ölçüm katmanı (singleton).
+
+    Ölçüm kapalıyken event listener'lar hiçbir şey yapmaz ve @tracked ile
+    işaretli metotlar doğrudan çağrılır.
+    """
+
+    _instance: Optional["QueryInstrumentation"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self._enabled = QUERY_INSTRUMENTATION
+        self._engines = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._logger: Optional[logging.Logger] = None
+        self.slow_threshold_ms = SLOW_QUERY_THRESHOLD_MS
+        self.n_plus_one_threshold = N_PLUS_ONE_THRESHOLD
+        self.log_path = SLOW_QUERY_LOG
+        self.reset()
+
+    # =====================
+    # KURULUM
+    # =====================
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def install(self, engine) -> None:
+        """Engine'e event listener'ları ekler (tekrar çağrılabilir)"""
+        if id(engine) in self._engines:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "commit", self._end_transaction)
+        event.listen(engine, "rollback", self._end_transaction)
+        self._engines.add(id(engine))
+
+    def enable(self) -> None:
+        """Ölçümü çalışma anında açar"""
+        from database.base import get_engine
+
+        self.install(get_engine())
+        self._enabled = True
+
+    def disable(self) -> None:
+        self._enabled = False
+
+    def reset(self) -> None:
+        """Toplanan istatistikleri temizler"""
+        with self._lock:
+            self.total_queries = 0
+            self.total_ms = 0.0
+            self.since = datetime.now()
+            self._slow_queries = deque(maxlen=SLOW_QUERY_HISTORY)
+            self._alarms = deque(maxlen=ALARM_HISTORY)
+            self._calls = deque(maxlen=CALL_HISTORY)
+            self._call_totals: Dict[str, Dict] = {}
+            self._statement_totals: Dict[str, List] = {}
+
+    # =====================
+    # EVENT'LER
+    # =====================
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        if self._enabled:
+            conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if self._enabled:
+            self._record(conn, statement, elapsed_ms)
+
+    def _end_transaction(self, conn):
+        conn.info.pop(_COUNTER_KEY, None)
+
+    def _scopes(self) -> List[QueryScope]:
+        scopes = getattr(self._local, "scopes", None)
+        if scopes is None:
+            scopes = self._local.scopes = []
+        return scopes
+
+    def _record(self, conn, statement: str, elapsed_ms: float) -> None:
+        scopes = self._scopes()
+        scope_name = scopes[-1].name if scopes else None
+
+        with self._lock:
+            self.total_queries += 1
+            self.total_ms += elapsed_ms
+            totals = self._statement_totals.get(statement)
+            if totals is None and len(self._statement_totals) < MAX_STATEMENTS:
+                totals = self._statement_totals[statement] = [0, 0.0, 0.0]
+            if totals is not None:
+                totals[0] += 1
+                totals[1] += elapsed_ms
+                totals[2] = max(totals[2], elapsed_ms)
+
+        if scopes:
+            # Sorgu iç içe tüm işaretli çağrılara sayılır; alarm en içteki verir
+            for scope in scopes:
+                scope.count += 1
+                scope.db_ms += elapsed_ms
+                scope.statements[statement] += 1
+            scope = scopes[-1]
+            repeat = scope.statements[statement]
+            if repeat >= self.n_plus_one_threshold and statement not in scope.alarmed:
+                scope.alarmed.add(statement)
+                self._alarm(scope.name, statement, repeat)
+        else:
+            # İşaretsiz sorgular transaction bazında izlenir
+            counter = conn.info.setdefault(_COUNTER_KEY, Counter())
+            counter[statement] += 1
+            if counter[statement] == self.n_plus_one_threshold:
+                self._alarm("transaction", statement, counter[statement])
+
+        if elapsed_ms >= self.slow_threshold_ms:
+            self._slow(scope_name, statement, elapsed_ms)
+
+    def _alarm(self, scope_name: str, statement: str, count: int) -> None:
+        with self._lock:
+            self._alarms.append(
+                {
+                    "time": datetime.now(),
+                    "scope": scope_name,
+                    "statement": normalize_statement(statement),
+                    "count": count,
+                }
+            )
+
+    def _slow(self, scope_name: Optional[str], statement: str, elapsed_ms: float) -> None:
+        text = normalize_statement(statement)
+        now = datetime.now()
+        with self._lock:
+            self._slow_queries.append(
+                {
+                    "time": now,
+                    "scope": scope_name,
+                    "elapsed_ms": elapsed_ms,
+                    "statement": text,
+                }
+            )
+        try:
+            self._get_logger().warning(
+                "%.1f ms [%s] %s", elapsed_ms, scope_name or "-", text
+            )
+        except OSError:
+            # Log dosyası yazılamıyorsa bellekteki liste yeterli
+            pass
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            logger = logging.getLogger("akilli_is.slow_query")
+            logger.setLevel(logging.WARNING)
+            logger.propagate = False
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                self.log_path,
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    # =====================
+    # ÇAĞRI İŞARETLEME
+    # =====================
+
+    @contextmanager
+    def track(self, name: str):
+        """
+        Blok içindeki sorguları tek bir iş birimi olarak sayar.
+
+        Ölçüm kapalıysa hiçbir şey yapmaz (None döner).
+        """
+        if not self._enabled:
+            yield None
+            return
+
+        scopes = self._scopes()
+        scope = QueryScope(name)
+        scopes.append(scope)
+        try:
+            yield scope
+        finally:
+            scopes.remove(scope)
+            self._finish(scope)
+
+    def _finish(self, scope: QueryScope) -> None:
+        wall_ms = (time.perf_counter() - scope.started) * 1000
+        with self._lock:
+            self._calls.append(
+                {
+                    "time": datetime.now(),
+                    "name": scope.name,
+                    "queries": scope.count,
+                    "db_ms": scope.db_ms,
+                    "wall_ms": wall_ms,
+                    "repeated": scope.repeated,
+                }
+            )
+            totals = self._call_totals.setdefault(
+                scope.name,
+                {"calls": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0},
+            )
+            totals["calls"] += 1
+            totals["queries"] += scope.count
+            totals["db_ms"] += scope.db_ms
+            totals["max_queries"] = max(totals["max_queries"], scope.count)
+
+    # =====================
+    # RAPOR
+    # =====================
+
+    def snapshot(self, top: int = 50) -> Dict:
+        """Geliştirme ekranı için toplanan istatistikler"""
+        with self._lock:
+            statements = sorted(
+                self._statement_totals.items(), key=lambda kv: kv[1][1], reverse=True
+            )[:top]
+            calls = sorted(
+                self._call_totals.items(), key=lambda kv: kv[1]["db_ms"], reverse=True
+            )
+            return {
+                "enabled": self._enabled,
+                "since": self.since,
+                "total_queries": self.total_queries,
+                "total_ms": self.total_ms,
+                "slow_threshold_ms": self.slow_threshold_ms,
+                "n_plus_one_threshold": self.n_plus_one_threshold,
+                "log_path": str(self.log_path),
+                "slow_queries": list(reversed(self._slow_queries)),
+                "alarms": list(reversed(self._alarms)),
+                "recent_calls": list(reversed(self._calls)),
+                "calls": [
+                    {"name": name, **totals,
+                     "avg_queries": totals["queries"] / totals["calls"]}
+                    for name, totals in calls
+                ],
+                "statements": [
+                    {
+                        "statement": normalize_statement(statement),
+                        "count": count,
+                        "total_ms": total_ms,
+                        "max_ms": max_ms,
+                    }
+                    for statement, (count, total_ms, max_ms) in statements
+                ],
+            }
+
+
+# Singleton instance
+query_instrumentation = QueryInstrumentation()
+
+
+def track_queries(name: str):
+    """query_instrumentation.track() kısayolu"""
+    return query_instrumentation.track(name)
+
+
+def tracked(name: str = None):
+    """
+    Servis metodunu iş birimi olarak işaretleyen dekoratör.
+
+    name verilmezse "Sınıf.metot" kullanılır.
+    """
+
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not query_instrumentation.enabled:
+                return func(*args, **kwargs)
+            with query_instrumentation.track(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
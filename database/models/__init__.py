@@ -27,6 +27,9 @@ from database.models.inventory import (
     WarehouseLocation,
     StockBalance,
     StockMovement,
+    StockCount,
+    StockCountLine,
+    StockValuation,
     ItemType,
     StockMovementType,
 )
@@ -64,6 +67,9 @@ __all__ = [
     "WarehouseLocation",
     "StockBalance",
     "StockMovement",
+    "StockCount",
+    "StockCountLine",
+    "StockValuation",
     "ItemType",
     "StockMovementType",
     # Common
@@ -88,6 +94,8 @@ from .production import (
     WorkOrderOperation,
     WorkOrderStatus,
     WorkOrderPriority,
+    StandardCost,
+    StandardCostQueue,
 )
 from .calendar import ProductionShift, ProductionHoliday, WorkstationSchedule
 from .shift_teams import ShiftTeam, RotationPattern, RotationSchedule
@@ -145,6 +153,7 @@ from database.models.finance import (
     ReceiptAllocation,
     Payment,
     PaymentAllocation,
+    CounterpartyBalance,
 )
 
 # Muhasebe modülü
@@ -218,9 +227,17 @@ from database.models.maintenance import (
     MaintenanceRequest,
     MaintenanceWorkOrder,
     MaintenanceWorkOrderPart,
+    MaintenancePartReservation,
     MaintenancePriority,
     MaintenanceStatus,
     WorkOrderStatus,
     MaintenanceType,
     CriticalityLevel,
 )
+
+# Zamanlanmış işler
+from database.models.jobs import (
+    ScheduledJob,
+    JobRun,
+    JobRunStatus,
+)
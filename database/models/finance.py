@@ -298,3 +298,42 @@ class PaymentAllocation(BaseModel):
     __table_args__ = (
         Index("idx_payment_allocation", "payment_id", "reference_type", "reference_id"),
     )
+
+
+# === CARI BAKIYE / RISK DEFTERI ===
+
+
+class CounterpartyBalance(BaseModel):
+    """
+    Cari bazinda artimli tutulan bakiye ve risk tablosu
+
+    Siparis, fatura, tahsilat ve odeme degisiklikleri ile ayni transaction
+    icinde guncellenir (bkz. modules/finance/balance_ledger.py).
+    """
+
+    __tablename__ = "counterparty_balances"
+
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True)
+
+    # Cari hesap bakiyesi (musteri: borc - alacak, tedarikci: alacak - borc)
+    balance = Column(Numeric(15, 2), default=0, nullable=False)
+
+    # Musteri riski: onayli/kismi siparisler + acik fatura bakiyeleri
+    open_order_amount = Column(Numeric(15, 2), default=0, nullable=False)
+    open_invoice_amount = Column(Numeric(15, 2), default=0, nullable=False)
+
+    __table_args__ = (
+        Index("idx_cp_balance_customer", "customer_id", unique=True),
+        Index("idx_cp_balance_supplier", "supplier_id", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<CounterpartyBalance c={self.customer_id} s={self.supplier_id}>"
+
+    @property
+    def exposure(self) -> Decimal:
+        """Kredi limiti kontrolunde kullanilan toplam risk"""
+        return (self.open_order_amount or Decimal(0)) + (
+            self.open_invoice_amount or Decimal(0)
+        )
@@ -507,6 +507,7 @@ class StockMovement(BaseModel):
 
     __table_args__ = (
         Index("idx_movement_item", "item_id"),
+        Index("idx_movement_item_date", "item_id", "movement_date", "id"),
         Index("idx_movement_date", "movement_date"),
         Index("idx_movement_type_date", "movement_type", "movement_date"),
         Index("idx_movement_document", "document_type", "document_no"),
@@ -516,3 +517,108 @@ class StockMovement(BaseModel):
 
     def __repr__(self):
         return f"<StockMovement(type={self.movement_type.value}, item={self.item_code}, qty={self.quantity})>"
+
+
+class StockCount(BaseModel):
+    """Stok sayım belgeleri"""
+
+    __tablename__ = "stock_counts"
+
+    count_no = Column(String(50), unique=True, nullable=False, index=True)
+    count_date = Column(DateTime, default=datetime.now, nullable=False)
+
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("item_categories.id"), nullable=True)
+    include_zero = Column(Boolean, default=False)
+
+    description = Column(Text, nullable=True)
+
+    # draft, in_progress, completed, applied, cancelled
+    status = Column(String(20), default="draft", nullable=False, index=True)
+
+    # Sistem miktarlarının donduruldugu an
+    frozen_at = Column(DateTime, nullable=True)
+    applied_at = Column(DateTime, nullable=True)
+
+    # İlişkiler
+    warehouse = relationship("Warehouse")
+    category = relationship("ItemCategory")
+    lines = relationship(
+        "StockCountLine", back_populates="stock_count", cascade="all, delete-orphan"
+    )
+
+    def __repr__(self):
+        return f"<StockCount(no={self.count_no}, status={self.status})>"
+
+
+class StockCountLine(BaseModel):
+    """Stok sayım satırları (dondurulmuş sistem miktarı + sayılan miktar)"""
+
+    __tablename__ = "stock_count_lines"
+
+    stock_count_id = Column(
+        Integer, ForeignKey("stock_counts.id", ondelete="CASCADE"), nullable=False
+    )
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+
+    system_quantity = Column(Numeric(18, 4), default=0, nullable=False)
+    counted_quantity = Column(Numeric(18, 4), nullable=True)
+    unit_cost = Column(Numeric(18, 4), default=0)
+
+    note = Column(String(500), nullable=True)
+    counted_at = Column(DateTime, nullable=True)
+
+    # İlişkiler
+    stock_count = relationship("StockCount", back_populates="lines")
+    item = relationship("Item")
+
+    __table_args__ = (
+        Index("idx_count_line_item", "stock_count_id", "item_id", unique=True),
+    )
+
+    @property
+    def difference(self) -> Decimal:
+        """Sayım farkı (sayılmadıysa 0)"""
+        if self.counted_quantity is None:
+            return Decimal(0)
+        return self.counted_quantity - (self.system_quantity or Decimal(0))
+
+    def __repr__(self):
+        return f"<StockCountLine(count={self.stock_count_id}, item={self.item_id})>"
+
+
+class StockValuation(BaseModel):
+    """
+    Stok değerleme özet tablosu (ürün + depo bazlı)
+
+    stock_balances satırlarından türetilir; bakiye değişiklikleri ile aynı
+    transaction içinde yenilenir (bkz. modules/inventory/valuation.py).
+    Raporlar ve dashboard stok KPI'ları bu tabloyu okur.
+    """
+
+    __tablename__ = "stock_valuations"
+
+    item_id = Column(
+        Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False
+    )
+    warehouse_id = Column(
+        Integer, ForeignKey("warehouses.id", ondelete="CASCADE"), nullable=False
+    )
+    category_id = Column(Integer, ForeignKey("item_categories.id"), nullable=True)
+
+    quantity = Column(Numeric(18, 4), default=0, nullable=False)
+    total_value = Column(Numeric(18, 4), default=0, nullable=False)
+    # Miktar ağırlıklı ortalama maliyet (stok yoksa son bilinen maliyet)
+    unit_cost = Column(Numeric(18, 4), default=0, nullable=False)
+
+    __table_args__ = (
+        Index("idx_valuation_item_warehouse", "item_id", "warehouse_id", unique=True),
+        Index("idx_valuation_warehouse", "warehouse_id"),
+        Index("idx_valuation_category", "category_id"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<StockValuation(item_id={self.item_id}, "
+            f"warehouse_id={self.warehouse_id}, value={self.total_value})>"
+        )
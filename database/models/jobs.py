@@ -0,0 +1,95 @@
+"""
+Akıllı İş - Zamanlanmış İş Modelleri
+Arka plan iş çalıştırıcısının (jobs.py) tanımları, kilitleri ve geçmişi
+"""
+
+import enum
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime,
+    ForeignKey, Enum as SQLEnum, Index,
+)
+from sqlalchemy.orm import relationship
+
+from database.base import BaseModel
+
+
+class JobRunStatus(enum.Enum):
+    """İş çalıştırma durumları"""
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+class ScheduledJob(BaseModel):
+    """
+    Zamanlanmış iş tanımı ve çalıştırma kilidi
+
+    Satırlar kod içindeki kayıt defterinden (core/batch_jobs.py) oluşturulur;
+    cron ifadesi ve is_active sonradan veritabanında değiştirilebilir.
+    Kilit, locked_until geçmişteyken yapılan tek bir koşullu UPDATE ile
+    alınır; böylece aynı işi birden fazla sunucu aynı anda çalıştırmaz.
+    Kilidi tutan süreç çökerse kilit locked_until sonunda kendiliğinden düşer.
+    """
+
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String(100), nullable=False)
+    description = Column(String(500), nullable=True)
+    cron = Column(String(100), nullable=False)
+    # Kilit süresi (saniye); iş bu süreden uzun sürerse kilit düşer
+    timeout_seconds = Column(Integer, default=3600, nullable=False)
+
+    next_run_at = Column(DateTime, nullable=True)
+    locked_by = Column(String(200), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    last_status = Column(
+        SQLEnum(JobRunStatus, values_callable=lambda x: [e.value for e in x]),
+        nullable=True,
+    )
+    last_duration_ms = Column(Integer, nullable=True)
+
+    runs = relationship("JobRun", back_populates="job", lazy="dynamic")
+
+    __table_args__ = (
+        Index("idx_scheduled_job_name", "name", unique=True),
+        Index("idx_scheduled_job_next_run", "next_run_at"),
+    )
+
+    def __repr__(self):
+        return f"<ScheduledJob(name={self.name}, cron={self.cron})>"
+
+
+class JobRun(BaseModel):
+    """Zamanlanmış işin tek bir çalıştırma kaydı"""
+
+    __tablename__ = "job_runs"
+
+    job_id = Column(
+        Integer, ForeignKey("scheduled_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    node = Column(String(200), nullable=False)
+    status = Column(
+        SQLEnum(JobRunStatus, values_callable=lambda x: [e.value for e in x]),
+        default=JobRunStatus.RUNNING,
+        nullable=False,
+    )
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    # İşin etkilediği satır sayısı
+    rows_affected = Column(Integer, nullable=True)
+    # İşin döndürdüğü özet (JSON metni)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    job = relationship("ScheduledJob", back_populates="runs")
+
+    __table_args__ = (
+        Index("idx_job_run_job_started", "job_id", "started_at"),
+    )
+
+    def __repr__(self):
+        return f"<JobRun(job_id={self.job_id}, status={self.status})>"
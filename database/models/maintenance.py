@@ -379,6 +379,9 @@ class MaintenanceWorkOrder(BaseModel):
     # Kontrol Listesi
     checklist_id = Column(Integer, ForeignKey("maintenance_checklists.id"), nullable=True)
 
+    # Periyodik bakım planından oluşturulduysa
+    plan_id = Column(Integer, ForeignKey("maintenance_plans.id"), nullable=True)
+
     # İlişkiler
     request = relationship("MaintenanceRequest", back_populates="work_orders")
     equipment = relationship("Equipment", back_populates="work_orders")
@@ -388,11 +391,13 @@ class MaintenanceWorkOrder(BaseModel):
     attachments = relationship("WorkOrderAttachment", back_populates="work_order", cascade="all, delete-orphan")
     checklist_results = relationship("WorkOrderChecklistResult", back_populates="work_order", cascade="all, delete-orphan")
     downtimes = relationship("EquipmentDowntime", back_populates="work_order")
+    reservations = relationship("MaintenancePartReservation", back_populates="work_order", cascade="all, delete-orphan")
 
     __table_args__ = (
         Index("idx_wo_status", "status"),
         Index("idx_wo_equipment", "equipment_id"),
         Index("idx_wo_assigned", "assigned_to_id"),
+        Index("idx_wo_plan", "plan_id"),
     )
 
     def __repr__(self):
@@ -424,6 +429,36 @@ class MaintenanceWorkOrderPart(BaseModel):
         return f"<MaintenanceWorkOrderPart {self.item_id}>"
 
 
+class MaintenancePartReservation(BaseModel):
+    """İş emri için rezerve edilen yedek parçalar"""
+    __tablename__ = "maintenance_part_reservations"
+
+    work_order_id = Column(Integer, ForeignKey("maintenance_work_orders.id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False)
+
+    quantity = Column(Numeric(18, 4), nullable=False)
+    released_quantity = Column(Numeric(18, 4), default=0)
+
+    # İlişkiler
+    work_order = relationship("MaintenanceWorkOrder", back_populates="reservations")
+    item = relationship("Item")
+    warehouse = relationship("Warehouse")
+
+    __table_args__ = (
+        Index("idx_mpr_work_order", "work_order_id"),
+        Index("idx_mpr_item_warehouse", "item_id", "warehouse_id"),
+    )
+
+    @property
+    def open_quantity(self):
+        """Henüz serbest bırakılmamış miktar"""
+        return (self.quantity or 0) - (self.released_quantity or 0)
+
+    def __repr__(self):
+        return f"<MaintenancePartReservation {self.work_order_id}-{self.item_id}>"
+
+
 class WorkOrderAttachment(BaseModel):
     """İş emri dosya ekleri"""
     __tablename__ = "work_order_attachments"
@@ -507,6 +542,7 @@ class MaintenancePlan(BaseModel):
     __table_args__ = (
         Index("idx_plan_equipment", "equipment_id"),
         Index("idx_plan_next_date", "next_maintenance_date"),
+        Index("idx_plan_active_next_date", "is_active", "next_maintenance_date"),
     )
 
     def __repr__(self):
@@ -539,3 +539,72 @@ class WorkOrderByProduct(BaseModel):
         Index("idx_wobyprod_wo", "work_order_id"),
         Index("idx_wobyprod_item", "item_id"),
     )
+
+
+class StandardCost(BaseModel):
+    """
+    Standart maliyet anlık görüntüleri (ürün başına sürümlü)
+
+    Üretilen ürünlerin reçete ve rotasından çok seviyeli olarak hesaplanır
+    (bkz. modules/production/costing.py). Tutarlar 1 birim mamul içindir.
+    Değerler değiştiğinde yeni sürüm yazılır; önceki sürümün valid_to alanı
+    kapatılır. Teklifler ve sapma raporları bu tabloyu okur.
+    """
+
+    __tablename__ = "standard_costs"
+
+    item_id = Column(
+        Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False
+    )
+    bom_id = Column(
+        Integer, ForeignKey("bill_of_materials.id", ondelete="SET NULL"), nullable=True
+    )
+    version = Column(Integer, nullable=False, default=1)
+    # Reçete yüksekliği: 1 = yalnızca satın alınan bileşenler
+    level = Column(Integer, nullable=False, default=1)
+
+    material_cost = Column(Numeric(18, 6), nullable=False, default=0)
+    scrap_cost = Column(Numeric(18, 6), nullable=False, default=0)
+    labor_cost = Column(Numeric(18, 6), nullable=False, default=0)
+    machine_cost = Column(Numeric(18, 6), nullable=False, default=0)
+    overhead_cost = Column(Numeric(18, 6), nullable=False, default=0)
+    by_product_credit = Column(Numeric(18, 6), nullable=False, default=0)
+    total_cost = Column(Numeric(18, 6), nullable=False, default=0)
+
+    valid_from = Column(DateTime, nullable=False, default=datetime.now)
+    valid_to = Column(DateTime, nullable=True)
+    is_current = Column(Boolean, nullable=False, default=True)
+    # full / change
+    trigger = Column(String(20), nullable=True)
+
+    item = relationship("Item", foreign_keys=[item_id])
+    bom = relationship("BillOfMaterials")
+
+    __table_args__ = (
+        Index("idx_stdcost_item_version", "item_id", "version", unique=True),
+        Index("idx_stdcost_current", "is_current", "item_id"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<StandardCost(item_id={self.item_id}, v{self.version}, "
+            f"total={self.total_cost})>"
+        )
+
+
+class StandardCostQueue(BaseModel):
+    """
+    Standart maliyeti yeniden hesaplanacak ürünler
+
+    Alış fiyatı, reçete, rota veya istasyon ücreti değişikliklerinde aynı
+    transaction içinde yazılır; roll-up işi bu ürünleri ve üst
+    montajlarını yeniden hesaplayıp kuyruğu boşaltır.
+    """
+
+    __tablename__ = "standard_cost_queue"
+
+    item_id = Column(Integer, nullable=False)
+    # price / bom / routing / station
+    reason = Column(String(20), nullable=True)
+
+    __table_args__ = (Index("idx_stdcost_queue_item", "item_id"),)
@@ -206,8 +206,9 @@ class AuditLog(BaseModel):
         Index("idx_audit_user", "user_id"),
         Index("idx_audit_action", "action"),
         Index("idx_audit_module", "module"),
-        Index("idx_audit_date", "created_at"),
-        Index("idx_audit_table_record", "table_name", "record_id"),
+        # Keyset sayfalama (created_at, id) ve kayıt geçmişi için
+        Index("idx_audit_date_id", "created_at", "id"),
+        Index("idx_audit_record_history", "table_name", "record_id", "created_at", "id"),
     )
 
     def __repr__(self):
@@ -0,0 +1,446 @@
+"""
+Akıllı İş - Bölümlü Tablo Bakımı ve Arşivleme
+
+stock_movements, audit_logs ve error_logs tabloları PostgreSQL'de aylık
+RANGE bölümlüdür (bkz. alembic 20261019_006). Bu modül:
+- Gelecek aylar için bölümleri önceden açar (DEFAULT bölüme düşmüş satırlar
+  varsa yeni bölüme taşınır)
+- Saklama süresini aşan ayları sıkıştırılmış JSON Lines dosyasına aktarır,
+  ardından bölümü ayırıp siler (bölümsüz tablolarda tarih aralığı DELETE)
+
+Sorgular bölüm anahtarı üzerinde yarı açık aralık ([başlangıç, bitiş))
+kullanır; böylece PostgreSQL sadece ilgili ay bölümlerini tarar.
+
+Kullanım:
+    from database.partitioning import PartitionMaintenanceService
+    PartitionMaintenanceService(session).run()
+"""
+
+import gzip
+import json
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from config import (
+    ARCHIVE_DIR,
+    AUDIT_LOG_RETENTION_MONTHS,
+    ERROR_LOG_RETENTION_MONTHS,
+    PARTITION_PREMAKE_MONTHS,
+    STOCK_MOVEMENT_RETENTION_MONTHS,
+)
+from database.models.development import ErrorLog
+from database.models.inventory import StockMovement
+from database.models.user import AuditLog
+
+
+# tablo -> (model, bölüm anahtarı kolonu, saklama süresi (ay))
+PARTITIONED_TABLES = {
+    "stock_movements": (StockMovement, "movement_date", STOCK_MOVEMENT_RETENTION_MONTHS),
+    "audit_logs": (AuditLog, "created_at", AUDIT_LOG_RETENTION_MONTHS),
+    "error_logs": (ErrorLog, "created_at", ERROR_LOG_RETENTION_MONTHS),
+}
+
+# Bölümsüz tablolarda tek DELETE'te silinen satır sayısı
+DELETE_CHUNK_SIZE = 5000
+# Arşiv dosyasına yazarken cursor'dan çekilen satır sayısı
+FETCH_SIZE = 2000
+
+
+def add_months(value: date, months: int) -> date:
+    """Ayın ilk gününe göre ay ekle/çıkar"""
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def month_range(value: date):
+    """Verilen tarihin ayı için yarı açık aralık [ayın 1'i, sonraki ayın 1'i)"""
+    start = date(value.year, value.month, 1)
+    return (
+        datetime.combine(start, datetime.min.time()),
+        datetime.combine(add_months(start, 1), datetime.min.time()),
+    )
+
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.name
+    return str(value)
+
+
+def estimate_count(session: Session, query, exact_limit: int = 10000):
+    """
+    Büyük tablolar için sayfa toplamı.
+
+    Önce en fazla exact_limit + 1 satır sayılır; sınır aşılırsa PostgreSQL
+    planlayıcısının tahmini (EXPLAIN) kullanılır. Tam COUNT(*) yapılmaz.
+
+    Returns:
+        (adet, tahmini_mi)
+    """
+    limited = query.order_by(None).limit(exact_limit + 1).subquery()
+    count = session.execute(select(func.count()).select_from(limited)).scalar() or 0
+    if count <= exact_limit:
+        return count, False
+
+    if session.get_bind().dialect.name == "postgresql":
+        statement = query.order_by(None).statement
+        compiled = statement.compile(dialect=session.get_bind().dialect)
+        plan = session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        return max(estimate, count), True
+
+    return count, True
+
+
+class PartitionMaintenanceService:
+    """Aylık bölüm açma ve saklama süresi dolan ayları arşivleme"""
+
+    def __init__(self, session: Session, archive_dir: Path = None):
+        self.session = session
+        self.archive_dir = Path(archive_dir or ARCHIVE_DIR)
+
+    @property
+    def is_postgresql(self) -> bool:
+        return self.session.get_bind().dialect.name == "postgresql"
+
+    def is_partitioned(self, table: str) -> bool:
+        if not self.is_postgresql:
+            return False
+        return bool(
+            self.session.execute(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table pt "
+                    "JOIN pg_class c ON c.oid = pt.partrelid "
+                    "WHERE c.relname = :t AND pg_table_is_visible(c.oid)"
+                ),
+                {"t": table},
+            ).scalar()
+        )
+
+    def list_partitions(self, table: str) -> List[str]:
+        """Tablonun aylık bölümleri (DEFAULT hariç, isim sırasıyla)"""
+        rows = self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :t AND pg_table_is_visible(p.oid) "
+                "ORDER BY c.relname"
+            ),
+            {"t": table},
+        ).scalars()
+        prefix = f"{table}_p"
+        return [name for name in rows if name.startswith(prefix)]
+
+    @staticmethod
+    def partition_month(table: str, partition: str) -> Optional[date]:
+        suffix = partition[len(table) + 2 :]
+        try:
+            return datetime.strptime(suffix, "%Y%m").date()
+        except ValueError:
+            return None
+
+    # =====================
+    # BÖLÜM AÇMA
+    # =====================
+
+    def ensure_partitions(self, months_ahead: int = None, today: date = None) -> List[str]:
+        """
+        Bu ay ve sonraki months_ahead ay için eksik bölümleri açar.
+
+        Returns:
+            List[str]: Oluşturulan bölüm isimleri
+        """
+        months_ahead = PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+        today = (today or date.today()).replace(day=1)
+        created = []
+
+        for table, (_, key, _) in PARTITIONED_TABLES.items():
+            if not self.is_partitioned(table):
+                continue
+            existing = set(self.list_partitions(table))
+            for offset in range(months_ahead + 1):
+                month = add_months(today, offset)
+                name = f"{table}_p{month:%Y%m}"
+                if name in existing:
+                    continue
+                self._create_partition(table, key, name, month)
+                created.append(name)
+
+        self.session.commit()
+        return created
+
+    def _create_partition(self, table: str, key: str, name: str, month: date):
+        """Bölüm aç; DEFAULT bölümde bu aya ait satır varsa yeni bölüme taşı"""
+        lower, upper = month_range(month)
+        params = {"lower": lower, "upper": upper}
+        bounds = f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+
+        has_default_rows = self.session.execute(
+            text(
+                f"SELECT 1 FROM {table}_default "
+                f"WHERE {key} >= :lower AND {key} < :upper LIMIT 1"
+            ),
+            params,
+        ).scalar()
+
+        if not has_default_rows:
+            self.session.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+            return
+
+        self.session.execute(
+            text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        self.session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {table}_default "
+                f"WHERE {key} >= :lower AND {key} < :upper RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            params,
+        )
+        self.session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+
+    # =====================
+    # ARŞİVLEME
+    # =====================
+
+    def archive_expired(self, today: date = None) -> List[Dict]:
+        """
+        Saklama süresi dolan ayları arşivler ve siler.
+
+        Returns:
+            List[Dict]: {"table", "month", "rows", "file"} kayıtları
+        """
+        today = (today or date.today()).replace(day=1)
+        results = []
+
+        for table, (model, key, retention) in PARTITIONED_TABLES.items():
+            if retention <= 0:
+                continue
+            cutoff = add_months(today, -retention)
+            for month in self._expired_months(table, model, key, cutoff):
+                results.append(self.archive_month(table, month))
+
+        return results
+
+    def _expired_months(self, table: str, model, key: str, cutoff: date) -> List[date]:
+        """cutoff ayından önceki, verisi bulunan aylar"""
+        if self.is_partitioned(table):
+            months = [self.partition_month(table, p) for p in self.list_partitions(table)]
+            months = [m for m in months if m and m < cutoff]
+            # DEFAULT bölüme düşmüş eski satırlar
+            oldest = self.session.execute(
+                text(f"SELECT MIN({key}) FROM {table}_default")
+            ).scalar()
+            if oldest and oldest.date() < cutoff:
+                months.append(oldest.date().replace(day=1))
+            return sorted(set(months))
+
+        # Bölümsüz tablo: verisi olan ayları index üzerinden atlayarak bul
+        column = getattr(model, key)
+        cutoff_at = datetime.combine(cutoff, datetime.min.time())
+        months = []
+        lower = None
+        while True:
+            query = self.session.query(func.min(column)).filter(column < cutoff_at)
+            if lower is not None:
+                query = query.filter(column >= lower)
+            oldest = query.scalar()
+            if oldest is None:
+                break
+            month = oldest.date().replace(day=1)
+            months.append(month)
+            lower = month_range(month)[1]
+        return months
+
+    def archive_month(self, table: str, month: date) -> Dict:
+        """
+        Bir ayın satırlarını gzip JSON Lines dosyasına yazar, sonra siler.
+
+        Bölümlü tabloda ay bölümü ve DEFAULT bölüm dışa aktarımdan önce
+        SHARE modunda kilitlenir; aktarım ile silme aynı transaction'da
+        yapıldığından arada eklenen satır arşivlenmeden silinmez (bu ayın
+        dışındaki bölümlere yazım etkilenmez). Bölümsüz tabloda yalnızca
+        aktarılan en büyük id'ye kadar olan satırlar silinir.
+
+        Aynı ay tekrar arşivlenirse (geç tarihli satırlar) önceki dosyanın
+        üzerine yazılmaz; yeni dosya sıra numarasıyla oluşturulur.
+        """
+        model, key, _ = PARTITIONED_TABLES[table]
+        column = getattr(model, key)
+        lower, upper = month_range(month)
+        path = self._archive_path(table, month)
+
+        # Önceki işlerin transaction'ı kilitlerden önce kapansın
+        self.session.commit()
+        try:
+            partitioned = self.is_partitioned(table)
+            partition = f"{table}_p{month:%Y%m}"
+            has_partition = partitioned and partition in self.list_partitions(table)
+            if partitioned:
+                locked = [f"{table}_default"] + ([partition] if has_partition else [])
+                self.session.execute(text(f"LOCK TABLE {', '.join(locked)} IN SHARE MODE"))
+
+            rows, max_id = self._export(model, column, lower, upper, path)
+
+            if partitioned:
+                if has_partition:
+                    self.session.execute(
+                        text(f"ALTER TABLE {table} DETACH PARTITION {partition}")
+                    )
+                    self.session.execute(text(f"DROP TABLE {partition}"))
+                self.session.execute(
+                    text(
+                        f"DELETE FROM {table}_default "
+                        f"WHERE {key} >= :lower AND {key} < :upper"
+                    ),
+                    {"lower": lower, "upper": upper},
+                )
+                self.session.commit()
+            else:
+                self.session.commit()
+                if max_id is not None:
+                    self._delete_range(model, column, lower, upper, max_id)
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return {
+            "table": table,
+            "month": month,
+            "rows": rows,
+            "file": str(path) if rows else None,
+        }
+
+    def _archive_path(self, table: str, month: date) -> Path:
+        """Ayın ilk boş arşiv dosyası: tablo_YYYYMM.jsonl.gz, sonra _2, _3..."""
+        directory = self.archive_dir / table
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{table}_{month:%Y%m}.jsonl.gz"
+        sequence = 1
+        while path.exists():
+            sequence += 1
+            path = directory / f"{table}_{month:%Y%m}_{sequence}.jsonl.gz"
+        return path
+
+    def _export(self, model, column, lower: datetime, upper: datetime, path: Path):
+        """
+        Ay aralığını session'ın transaction'ında akıtarak dosyaya yazar
+
+        Returns:
+            (satır sayısı, en büyük id): satır yoksa dosya oluşturulmaz
+        """
+        table = model.__table__
+        query = (
+            select(table)
+            .where(column >= lower, column < upper)
+            .order_by(column, table.c.id)
+            .execution_options(stream_results=True, yield_per=FETCH_SIZE)
+        )
+        count, max_id = 0, None
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+
+        result = self.session.connection().execute(query)
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+                for row in result.mappings():
+                    handle.write(json.dumps(dict(row), default=_json_default, ensure_ascii=False))
+                    handle.write("\n")
+                    count += 1
+                    if max_id is None or row["id"] > max_id:
+                        max_id = row["id"]
+        finally:
+            result.close()
+
+        if not count:
+            temp_path.unlink()
+            return 0, None
+
+        # Yarım kalan dosya arşiv yerine geçmesin; mevcut arşivin üzerine yazılmaz
+        if path.exists():
+            raise FileExistsError(f"Arşiv dosyası zaten var: {path}")
+        temp_path.rename(path)
+        return count, max_id
+
+    def _delete_range(self, model, column, lower: datetime, upper: datetime, max_id: int):
+        """Bölümsüz tabloda ay aralığını (max_id'ye kadar) parça parça siler"""
+        while True:
+            ids = [
+                row_id
+                for (row_id,) in self.session.query(model.id)
+                .filter(column >= lower, column < upper, model.id <= max_id)
+                .limit(DELETE_CHUNK_SIZE)
+                .all()
+            ]
+            if not ids:
+                break
+            self.session.execute(
+                delete(model)
+                .where(model.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+
+    def run(self, today: date = None) -> Dict:
+        """Bölüm açma + arşivleme"""
+        return {
+            "created": self.ensure_partitions(today=today),
+            "archived": self.archive_expired(today=today),
+        }
+
+
+class PartitionMaintenanceThread(threading.Thread):
+    """
+    Bölüm bakımını belirli aralıklarla arka planda çalıştırır
+
+    DDL ve arşivleme site genelinde tek yerden yapılmalıdır; thread bu
+    yüzden partition_archive işini scheduled_jobs kilidiyle ve yalnızca
+    vadesi geldiyse çalıştırır (jobs.py ile aynı kilit).
+    """
+
+    JOB_NAME = "partition_archive"
+
+    def __init__(self, interval_seconds: int = 86400):
+        super().__init__(name="partition-maintenance", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.last_result: Optional[Dict] = None
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval_seconds)
+
+    def run_once(self):
+        from core.job_scheduler import job_scheduler
+        import core.batch_jobs  # noqa: F401  (işleri kaydeder)
+
+        try:
+            summary = job_scheduler.run_job(self.JOB_NAME, only_if_due=True)
+            if summary is None:
+                return
+            self.last_result = summary
+            self.last_error = summary["error"]
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Bölüm bakımı hatası: {e}")
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,99 @@
+"""
+Akıllı İş - Bağlantı Havuzu Ölçümü
+
+QueuePool'dan bağlantı alma (checkout) bekleme sürelerini ve zaman
+aşımlarını sayar. Havuz dolduğunda iş parçacıkları DB_POOL_TIMEOUT
+saniyeye kadar bekler; bu bekleme süreleri havuz boyutunun yetersiz
+olduğunu gösteren ilk işarettir.
+
+Kullanım:
+    from database.pool import pool_metrics
+    pool_metrics.snapshot(get_engine())
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+# Yüzdelik hesabı için tutulan son bekleme süresi sayısı
+WAIT_HISTORY = 1000
+
+
+class PoolMetrics:
+    """Bağlantı havuzu bekleme istatistikleri (singleton)"""
+
+    _instance: Optional["PoolMetrics"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance.reset()
+        return cls._instance
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self._waits = deque(maxlen=WAIT_HISTORY)
+
+    def record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._waits.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, engine=None) -> Dict:
+        """Bekleme istatistikleri ve (engine verilirse) havuzun anlık durumu"""
+        with self._lock:
+            waits = sorted(self._waits)
+            result = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+                "p95_wait_ms": waits[int(len(waits) * 0.95) - 1] if waits else 0.0,
+                "max_wait_ms": self.max_wait_ms,
+            }
+
+        pool = getattr(engine, "pool", None)
+        if isinstance(pool, QueuePool):
+            result.update(
+                {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0),
+                    "max_overflow": pool._max_overflow,
+                }
+            )
+        return result
+
+
+# Singleton instance
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """Checkout bekleme süresini pool_metrics'e yazan QueuePool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_wait((time.perf_counter() - started) * 1000)
+        return record
@@ -0,0 +1,208 @@
+"""
+Akıllı İş - Okuma Kopyası Yönlendirmesi
+
+DB_REPLICA_URL tanımlıysa rapor, dashboard ve MRP veri toplama gibi ağır
+okuma yolları sipariş girişiyle yarışmasın diye okuma kopyasına (hot
+standby) bağlı session kullanır. Kopyanın gecikmesi belirli aralıklarla
+ölçülür; gecikme DB_REPLICA_MAX_LAG'ı aşarsa ya da kopyaya ulaşılamazsa
+okumalar birincil veritabanına döner.
+
+Yerelde iki PostgreSQL yerine bir SQLite dosyası da kopya olarak
+verilebilir (gecikme 0 kabul edilir).
+
+Kullanım:
+    from database.replica import get_read_session, read_only
+
+    class ReportsService:
+        def __init__(self):
+            self.session = get_read_session()
+
+    class AccountingService(ServiceBase):
+        @read_only
+        def get_trial_balance(self, ...):
+            ...
+"""
+
+import functools
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker, scoped_session
+
+from config import (
+    QUERY_INSTRUMENTATION,
+    DB_REPLICA_URL,
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICA_CHECK_INTERVAL,
+)
+from database.base import AppSession, _engine_options, _scope_local, get_session
+
+
+# Kopya gecikmesi (saniye). WAL alınan ve uygulanan konumlar aynıysa
+# kopya günceldir; boşta bekleyen birincilde son işlem zamanı eskidiği
+# için sadece zaman farkına bakmak yanlış alarm verir.
+POSTGRESQL_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaRouter:
+    """Okuma kopyası engine'i ve gecikme kontrolü (singleton)"""
+
+    _instance: Optional["ReplicaRouter"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self.url = DB_REPLICA_URL
+        self.max_lag = DB_REPLICA_MAX_LAG
+        self.check_interval = DB_REPLICA_CHECK_INTERVAL
+        self._engine = None
+        self._scoped: Optional[scoped_session] = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.fallbacks = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url)
+
+    def get_engine(self):
+        """Okuma kopyası engine'i (singleton)"""
+        if self._engine is None:
+            self._engine = create_engine(self.url, **_engine_options(self.url))
+            if QUERY_INSTRUMENTATION:
+                from database.instrumentation import query_instrumentation
+
+                query_instrumentation.install(self._engine)
+        return self._engine
+
+    def lag_seconds(self) -> Optional[float]:
+        """
+        Kopya gecikmesi (check_interval boyunca önbellekte tutulur).
+
+        Returns:
+            Optional[float]: Gecikme (saniye), kopyaya ulaşılamıyorsa None
+        """
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return self._lag
+            self._checked_at = time.monotonic()
+
+            try:
+                engine = self.get_engine()
+                if engine.dialect.name == "postgresql":
+                    with engine.connect() as conn:
+                        self._lag = float(conn.execute(text(POSTGRESQL_LAG_SQL)).scalar() or 0)
+                else:
+                    with engine.connect() as conn:
+                        conn.execute(text("SELECT 1"))
+                    self._lag = 0.0
+                self.last_error = None
+            except Exception as e:
+                self._lag = None
+                self.last_error = str(e)
+                print(f"Okuma kopyası kontrol hatası: {e}")
+            return self._lag
+
+    def is_usable(self) -> bool:
+        """Kopya tanımlı, ulaşılabilir ve gecikmesi eşiğin altında mı?"""
+        if not self.configured:
+            return False
+        lag = self.lag_seconds()
+        return lag is not None and lag <= self.max_lag
+
+    def invalidate(self) -> None:
+        """Bir sonraki okumada gecikmeyi yeniden ölçtür"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def session(self) -> Session:
+        """Kopyaya bağlı (thread bazlı) session"""
+        if self._scoped is None:
+            with self._lock:
+                if self._scoped is None:
+                    self._scoped = scoped_session(
+                        sessionmaker(
+                            bind=self.get_engine(),
+                            class_=AppSession,
+                            autocommit=False,
+                            autoflush=False,
+                            expire_on_commit=False,
+                        )
+                    )
+        return self._scoped()
+
+    def status(self) -> Dict:
+        """Geliştirme ekranı için kopya durumu (ölçüm yapmaz)"""
+        return {
+            "configured": self.configured,
+            "lag": self._lag,
+            "max_lag": self.max_lag,
+            "usable": self.configured and self._lag is not None and self._lag <= self.max_lag,
+            "fallbacks": self.fallbacks,
+            "last_error": self.last_error,
+        }
+
+
+# Singleton instance
+replica_router = ReplicaRouter()
+
+
+def get_read_session(ignore_scope: bool = False) -> Session:
+    """
+    Salt okunur işler için session döndürür.
+
+    Kopya kullanılabiliyorsa kopyaya bağlı session, değilse (tanımsız,
+    ulaşılamaz veya gecikmeli) get_session(). session_scope() içinde
+    iş biriminin tutarlılığı için her zaman kapsamın session'ı döner.
+
+    Args:
+        ignore_scope: True ise session_scope() içinde de kopya kullanılır.
+            Kapsamın henüz commit edilmemiş yazılarını görmesi gerekmeyen
+            ağır okumalar (ör. MRP veri toplama) içindir; çağıran kopya
+            session'ını kendisi kapatmalıdır.
+    """
+    if not ignore_scope and getattr(_scope_local, "session", None) is not None:
+        return get_session()
+    if not replica_router.configured:
+        return get_session()
+    if not replica_router.is_usable():
+        replica_router.fallbacks += 1
+        return get_session()
+    return replica_router.session()
+
+
+def read_only(method):
+    """
+    Servis metodunu okuma kopyasındaki session ile çalıştırır.
+
+    Metot süresince self.session kopya session'ı ile değiştirilir; yazma
+    yapan metotlarda kullanılmamalıdır.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not replica_router.configured:
+            return method(self, *args, **kwargs)
+
+        primary = self.session
+        self.session = get_read_session()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.session = primary
+
+    return wrapper
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Akıllı İş - Arka Plan İş Çalıştırıcısı (arayüzsüz)
+
+Tekrarlayan toplu işleri (fatura vadesi, teklif süresi, MRP, periyodik bakım,
+KPI yenileme, arşivleme) PyQt6 olmadan çalıştırır. Birden fazla sunucuda
+aynı anda çalışabilir; her iş scheduled_jobs kilidi ile tek sunucuda koşar.
+
+Kullanım:
+    python jobs.py               # Sürekli çalış (JOB_RUNNER_POLL_INTERVAL)
+    python jobs.py pending       # Vadesi gelenleri bir kez çalıştır (cron/systemd timer)
+    python jobs.py once mrp_run  # Tek işi hemen çalıştır
+    python jobs.py list          # İşler ve zamanlamaları
+    python jobs.py history [iş]  # Son çalıştırmalar
+"""
+
+import argparse
+import signal
+import sys
+from pathlib import Path
+
+# Proje kök dizinini Python path'ine ekle
+ROOT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config import JOB_RUNNER_POLL_INTERVAL
+from core.bootstrap import init_listeners
+from core.job_scheduler import JobRunnerThread, job_scheduler
+import core.batch_jobs  # noqa: F401  (işleri kaydeder)
+
+
+def print_results(results):
+    for r in results:
+        mark = "✓" if r["status"] == "success" else "✗"
+        print(f"{mark} {r['job']}: {r['rows']} satır, {r['duration_ms']} ms")
+        if r["error"]:
+            print(r["error"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Akıllı İş arka plan iş çalıştırıcısı")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("run", help="Sürekli çalış")
+    sub.add_parser("pending", help="Vadesi gelen işleri bir kez çalıştır")
+    once = sub.add_parser("once", help="Tek işi hemen çalıştır")
+    once.add_argument("name", choices=sorted(job_scheduler.definitions))
+    sub.add_parser("list", help="İşleri listele")
+    history = sub.add_parser("history", help="Son çalıştırmalar")
+    history.add_argument("name", nargs="?")
+    history.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    command = args.command or "run"
+
+    init_listeners()
+    job_scheduler.sync_definitions()
+
+    if command == "list":
+        for j in job_scheduler.get_status():
+            state = "aktif" if j["active"] else "pasif"
+            lock = f" [kilit: {j['locked_by']}]" if j["locked_by"] else ""
+            print(
+                f"{j['name']:<20} {j['cron']:<15} {state:<6} "
+                f"sonraki={j['next_run_at']} son={j['last_status']}{lock}"
+            )
+        return 0
+
+    if command == "history":
+        for h in job_scheduler.get_history(args.name, args.limit):
+            print(
+                f"{h['started_at']} {h['job']:<20} {h['status']:<8} "
+                f"{h['rows']} satır {h['duration_ms']} ms ({h['node']})"
+            )
+        return 0
+
+    if command == "once":
+        result = job_scheduler.run_job(args.name)
+        if result is None:
+            print(f"{args.name} başka bir sunucuda çalışıyor")
+            return 1
+        print_results([result])
+        return 0 if result["status"] == "success" else 1
+
+    if command == "pending":
+        results = job_scheduler.run_pending()
+        print_results(results)
+        return 0 if all(r["status"] == "success" for r in results) else 1
+
+    # Uzun süre çalışırken diğer istemcilerin değişikliklerini de izle
+    from core.change_bus import change_bus
+
+    change_bus.start_listener()
+    runner = JobRunnerThread(JOB_RUNNER_POLL_INTERVAL)
+    signal.signal(signal.SIGTERM, lambda *_: runner.stop())
+    print(f"✓ İş çalıştırıcı başlatıldı ({job_scheduler.node})")
+    runner.start()
+    try:
+        while runner.is_alive():
+            runner.join(1)
+    except KeyboardInterrupt:
+        runner.stop()
+        runner.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,7 +17,7 @@ from PyQt6.QtGui import QFont, QIcon
 from config import APP_NAME, APP_VERSION, UI, ICONS_DIR
 
 # Auth ve Audit sistemi
-from database.audit_engine import audit_engine
+from core.bootstrap import init_listeners
 from core.session_manager import session_manager
 from core.user_context import get_current_user, set_current_user, create_user_context
 
@@ -30,17 +30,47 @@ class ApplicationController:
         self.splash = None
         self.login = None
         self.main_window = None
+        self.maintenance_scheduler = None
+        self.partition_maintenance = None
         self.current_user = None
         self._db_session = None
 
     def start(self):
         """Uygulama akışını başlat: Splash -> Login -> MainWindow"""
-        # Audit engine'i başlat
-        audit_engine.init_listeners()
+        # ORM dinleyicilerini (audit, bakiyeler, önbellekler...) başlat
+        init_listeners()
         print("✓ Audit engine başlatıldı")
 
+        self._start_background_jobs()
         self._show_splash()
 
+    def _start_background_jobs(self):
+        """Arka plan zamanlayıcılarını başlat"""
+        from config import MAINTENANCE_SCHEDULER_INTERVAL, PARTITION_MAINTENANCE_INTERVAL
+        from core.change_bus import change_bus
+
+        self.change_listener = change_bus.start_listener()
+        if self.change_listener:
+            print("✓ Değişiklik bildirimleri dinleniyor")
+
+        if MAINTENANCE_SCHEDULER_INTERVAL > 0:
+            from modules.maintenance.scheduler import MaintenanceSchedulerThread
+
+            self.maintenance_scheduler = MaintenanceSchedulerThread(
+                MAINTENANCE_SCHEDULER_INTERVAL
+            )
+            self.maintenance_scheduler.start()
+            print("✓ Bakım zamanlayıcısı başlatıldı")
+
+        if PARTITION_MAINTENANCE_INTERVAL > 0:
+            from database.partitioning import PartitionMaintenanceThread
+
+            self.partition_maintenance = PartitionMaintenanceThread(
+                PARTITION_MAINTENANCE_INTERVAL
+            )
+            self.partition_maintenance.start()
+            print("✓ Bölüm bakımı / arşivleme başlatıldı")
+
     def _show_splash(self):
         """Splash screen göster"""
         from ui.screens import SplashScreen
@@ -184,8 +214,11 @@ def main_direct():
 
     apply_global_theme(app)
 
-    # Audit engine'i başlat
-    audit_engine.init_listeners()
+    # ORM dinleyicilerini (audit, bakiyeler, önbellekler...) başlat
+    init_listeners()
+    from core.change_bus import change_bus
+
+    change_bus.start_listener()
     print("✓ Audit engine başlatıldı")
 
     # Dev modunda admin kullanıcısını otomatik ayarla
@@ -215,7 +248,52 @@ def main_direct():
     sys.exit(app.exec())
 
 
+def main_operator():
+    """
+    Operatör terminali: yalnızca operatör panelini açar
+
+    API_SERVER_URL tanımlıysa veritabanına bağlanmaz; tüm işlemler
+    uygulama sunucusu (server.py) üzerinden yapılır.
+    """
+    from config import API_SERVER_URL
+
+    app = QApplication(sys.argv)
+    app.setApplicationName(f"{APP_NAME} - Operatör")
+    app.setApplicationVersion(APP_VERSION)
+    app.setOrganizationName("Akıllı İş")
+
+    font = QFont(UI["FONT_FAMILY"], UI["FONT_SIZE"])
+    app.setFont(font)
+
+    from config.theme_manager import apply_global_theme
+
+    apply_global_theme(app)
+
+    if API_SERVER_URL:
+        from api.client import get_api_client
+
+        if not get_api_client().health():
+            print(f"! Uygulama sunucusuna ulaşılamıyor: {API_SERVER_URL}")
+        print(f"✓ Uygulama sunucusu: {API_SERVER_URL}")
+    else:
+        init_listeners()
+        from core.change_bus import change_bus
+
+        change_bus.start_listener()
+
+    from modules.production.views.operator_panel import OperatorPanel
+
+    panel = OperatorPanel()
+    panel.setWindowTitle(OperatorPanel.page_title)
+    panel.showMaximized()
+    sys.exit(app.exec())
+
+
 if __name__ == "__main__":
+    # Operatör terminali: python main.py --operator
+    if "--operator" in sys.argv:
+        main_operator()
+
     # Normal başlatma (Splash -> Login -> Main)
     main()
 
@@ -2,7 +2,20 @@
 Akıllı İş - Modüller
 """
 
-from .inventory import InventoryModule
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "InventoryModule": ".inventory",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     "InventoryModule",
@@ -2,8 +2,9 @@
 Akıllı İş - Muhasebe Modülü
 """
 
-from .services import AccountingService
+from .services import AccountingService, ChartOfAccountsCache
 
 __all__ = [
     "AccountingService",
+    "ChartOfAccountsCache",
 ]
@@ -2,6 +2,7 @@
 Akıllı İş - Muhasebe Servisleri
 """
 
+from bisect import bisect_left
 from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Dict, Optional, Tuple
@@ -9,6 +10,7 @@ from sqlalchemy import func, and_, desc
 from sqlalchemy.orm import Session
 
 from database.base import get_session
+from database.replica import read_only
 from database.models.accounting import (
     Account,
     AccountType,
@@ -20,6 +22,159 @@ from database.models.accounting import (
 from modules.inventory.services import ServiceBase
 
 
+class ChartOfAccountsCache:
+    """
+    Hesap planı cache'i (süreç içi).
+
+    Hesap planı tek sorguyla yüklenir ve şu indeksler bir kez kurulur:
+    - id -> hesap özeti, kod -> id
+    - parent_id -> alt hesaplar (komşuluk listesi, O(n) ağaç kurulumu)
+    - sıralı kod listesi (önek aralıkları ile "1 ile başlayan tüm hesaplar")
+
+    Hesap planı değiştiğinde (create/update/delete/seed) clear_cache() çağrılır.
+    """
+
+    _accounts: Dict[int, Dict] = {}
+    _code_to_id: Dict[str, int] = {}
+    _children: Dict[Optional[int], List[int]] = {}
+    _sorted_codes: List[str] = []
+    _cache_loaded: bool = False
+
+    @classmethod
+    def load_cache(cls, session: Session) -> None:
+        """Tüm hesapları tek sorguyla yükler ve indeksleri kurar"""
+        rows = session.query(
+            Account.id,
+            Account.code,
+            Account.name,
+            Account.account_type,
+            Account.parent_id,
+            Account.level,
+            Account.is_detail,
+            Account.is_active,
+            Account.opening_debit,
+            Account.opening_credit,
+        ).order_by(Account.code).all()
+
+        accounts = {}
+        code_to_id = {}
+        children: Dict[Optional[int], List[int]] = {}
+        for row in rows:
+            accounts[row.id] = {
+                "id": row.id,
+                "code": row.code,
+                "name": row.name,
+                "account_type": row.account_type,
+                "parent_id": row.parent_id,
+                "level": row.level,
+                "is_detail": bool(row.is_detail),
+                "is_active": bool(row.is_active),
+                "opening_debit": row.opening_debit or Decimal(0),
+                "opening_credit": row.opening_credit or Decimal(0),
+            }
+            code_to_id[row.code] = row.id
+            # Satırlar koda göre sıralı geldiği için alt listeler de sıralı
+            children.setdefault(row.parent_id, []).append(row.id)
+
+        # Referansları tek seferde değiştir (okuyucular yarım indeks görmesin)
+        cls._accounts = accounts
+        cls._code_to_id = code_to_id
+        cls._children = children
+        cls._sorted_codes = [row.code for row in rows]
+        cls._cache_loaded = True
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Cache'i geçersiz kılar, sonraki erişimde yeniden yüklenir"""
+        cls._cache_loaded = False
+
+    @classmethod
+    def ensure_loaded(cls, session: Session) -> None:
+        if not cls._cache_loaded:
+            cls.load_cache(session)
+
+    @classmethod
+    def get(cls, session: Session, account_id: int) -> Optional[Dict]:
+        """ID ile hesap özeti"""
+        cls.ensure_loaded(session)
+        return cls._accounts.get(account_id)
+
+    @classmethod
+    def get_id_by_code(cls, session: Session, code: str) -> Optional[int]:
+        """Kod ile hesap ID'si (tam eşleşme)"""
+        cls.ensure_loaded(session)
+        return cls._code_to_id.get(code)
+
+    @classmethod
+    def resolve_code(cls, session: Session, code: str) -> int:
+        """
+        Hesap kodunu ID'ye çözer.
+
+        Tam eşleşme yoksa en yakın muavin (is_detail) üst hesaba düşer
+        ("120.01" tanımlı değilse ve "120" muavin hesapsa "120" kullanılır).
+        Grup hesaplarına kayıt atılmaz; muavin üst hesap yoksa hata verir.
+        """
+        cls.ensure_loaded(session)
+        account_id = cls._code_to_id.get(code)
+        if account_id is not None:
+            return account_id
+
+        candidate = code
+        while "." in candidate:
+            candidate = candidate.rsplit(".", 1)[0]
+            account_id = cls._code_to_id.get(candidate)
+            if account_id is not None and cls._accounts[account_id]["is_detail"]:
+                return account_id
+        raise ValueError(f"Hesap bulunamadı: {code}")
+
+    @classmethod
+    def get_prefix_ids(
+        cls, session: Session, prefix: str, detail_only: bool = False
+    ) -> List[int]:
+        """Belirli kodla başlayan hesapların ID'leri (sıralı kod aralığı)"""
+        cls.ensure_loaded(session)
+        codes = cls._sorted_codes
+        start = bisect_left(codes, prefix)
+        end = bisect_left(codes, prefix + "\uffff", lo=start)
+
+        ids = []
+        for code in codes[start:end]:
+            account = cls._accounts[cls._code_to_id[code]]
+            if detail_only and not account["is_detail"]:
+                continue
+            ids.append(account["id"])
+        return ids
+
+    @classmethod
+    def build_tree(cls, session: Session, active_only: bool = True) -> List[Dict]:
+        """Hiyerarşik hesap ağacı (komşuluk listesinden, O(n))"""
+        cls.ensure_loaded(session)
+        accounts = cls._accounts
+        children = cls._children
+
+        def build_node(account_id: int) -> Dict:
+            account = accounts[account_id]
+            return {
+                "id": account["id"],
+                "code": account["code"],
+                "name": account["name"],
+                "account_type": account["account_type"].value,
+                "level": account["level"],
+                "is_detail": account["is_detail"],
+                "children": [
+                    build_node(child_id)
+                    for child_id in children.get(account_id, [])
+                    if not active_only or accounts[child_id]["is_active"]
+                ],
+            }
+
+        return [
+            build_node(account_id)
+            for account_id in children.get(None, [])
+            if not active_only or accounts[account_id]["is_active"]
+        ]
+
+
 class AccountingService(ServiceBase):
     """Muhasebe servisi"""
 
@@ -40,24 +195,7 @@ class AccountingService(ServiceBase):
 
     def get_account_tree(self) -> List[Dict]:
         """Hiyerarşik hesap ağacı"""
-        accounts = self.get_all_accounts()
-
-        # Kök hesapları bul (parent_id = None)
-        root_accounts = [a for a in accounts if a.parent_id is None]
-
-        def build_tree(account):
-            children = [a for a in accounts if a.parent_id == account.id]
-            return {
-                "id": account.id,
-                "code": account.code,
-                "name": account.name,
-                "account_type": account.account_type.value,
-                "level": account.level,
-                "is_detail": account.is_detail,
-                "children": [build_tree(c) for c in children],
-            }
-
-        return [build_tree(a) for a in root_accounts]
+        return ChartOfAccountsCache.build_tree(self.session)
 
     def get_account_by_id(self, account_id: int) -> Optional[Account]:
         """ID ile hesap getir"""
@@ -72,6 +210,7 @@ class AccountingService(ServiceBase):
         account = Account(**data)
         self.session.add(account)
         self.session.commit()
+        ChartOfAccountsCache.clear_cache()
         return account
 
     def update_account(self, account_id: int, data: Dict) -> Account:
@@ -82,6 +221,7 @@ class AccountingService(ServiceBase):
                 if hasattr(account, key):
                     setattr(account, key, value)
             self.session.commit()
+            ChartOfAccountsCache.clear_cache()
         return account
 
     def delete_account(self, account_id: int) -> bool:
@@ -99,6 +239,7 @@ class AccountingService(ServiceBase):
 
             self.session.delete(account)
             self.session.commit()
+            ChartOfAccountsCache.clear_cache()
             return True
         return False
 
@@ -135,27 +276,41 @@ class AccountingService(ServiceBase):
 
     def generate_journal_no(self) -> str:
         """Yevmiye numarası oluştur"""
+        return self.allocate_journal_numbers(1)[0]
+
+    def allocate_journal_numbers(self, count: int) -> List[str]:
+        """Ardışık yevmiye numaralarını blok halinde ayır (tek sorgu)"""
         year = date.today().year
         prefix = f"YV-{year}-"
 
+        # 99999'dan sonra numara uzar; önce uzunluğa göre sırala
         last = (
-            self.session.query(JournalEntry)
+            self.session.query(JournalEntry.entry_no)
             .filter(JournalEntry.entry_no.like(f"{prefix}%"))
-            .order_by(desc(JournalEntry.entry_no))
+            .order_by(desc(func.length(JournalEntry.entry_no)), desc(JournalEntry.entry_no))
             .first()
         )
 
+        start = 1
         if last:
             try:
-                last_num = int(last.entry_no.replace(prefix, ""))
-                return f"{prefix}{last_num + 1:05d}"
+                start = int(last.entry_no.replace(prefix, "")) + 1
             except ValueError:
                 pass
 
-        return f"{prefix}00001"
+        return [f"{prefix}{num:05d}" for num in range(start, start + count)]
+
+    def resolve_account_code(self, code: str) -> int:
+        """Hesap kodunu ID'ye çözer (hesap planı cache'inden)"""
+        return ChartOfAccountsCache.resolve_code(self.session, code)
 
     def create_journal(self, lines_data: List[Dict], **data) -> JournalEntry:
-        """Yevmiye fişi oluştur"""
+        """
+        Yevmiye fişi oluştur
+
+        Satırlarda account_id yerine account_code ("120.01") verilebilir;
+        kod hesap planı cache'inden çözülür.
+        """
         # Numara ata
         data["entry_no"] = self.generate_journal_no()
 
@@ -166,6 +321,11 @@ class AccountingService(ServiceBase):
 
         # Satırları ekle
         for i, line_data in enumerate(lines_data):
+            if "account_code" in line_data:
+                line_data = dict(line_data)
+                line_data["account_id"] = self.resolve_account_code(
+                    line_data.pop("account_code")
+                )
             line = JournalEntryLine(
                 journal_entry_id=journal.id, line_order=i, **line_data
             )
@@ -213,6 +373,7 @@ class AccountingService(ServiceBase):
     # RAPORLAR
     # =====================
 
+    @read_only
     def get_ledger(
         self, account_id: int, start_date: date = None, end_date: date = None
     ) -> Dict:
@@ -286,6 +447,7 @@ class AccountingService(ServiceBase):
             "total_credit": sum(m["credit"] for m in movements),
         }
 
+    @read_only
     def get_trial_balance(self, as_of_date: date = None) -> Dict:
         """Mizan raporu"""
         if not as_of_date:
@@ -365,38 +527,40 @@ class AccountingService(ServiceBase):
             },
         }
 
+    @read_only
     def get_balance_sheet(self, as_of_date: date = None) -> Dict:
         """Bilanço raporu"""
         if not as_of_date:
             as_of_date = date.today()
 
-        def get_group_total(start_code: str) -> Decimal:
-            """Belirli kodla başlayan hesapların toplamı"""
-            accounts = (
-                self.session.query(Account)
-                .filter(Account.code.like(f"{start_code}%"))
-                .all()
+        # Tüm hesapların hareket bakiyesi tek gruplu sorguda
+        movement_rows = (
+            self.session.query(
+                JournalEntryLine.account_id,
+                func.coalesce(func.sum(JournalEntryLine.debit), 0)
+                - func.coalesce(func.sum(JournalEntryLine.credit), 0),
+            )
+            .join(JournalEntry)
+            .filter(
+                JournalEntry.status == JournalEntryStatus.POSTED,
+                JournalEntry.entry_date <= as_of_date,
             )
+            .group_by(JournalEntryLine.account_id)
+            .all()
+        )
+        movements = {
+            account_id: Decimal(amount or 0) for account_id, amount in movement_rows
+        }
 
+        def get_group_total(start_code: str) -> Decimal:
+            """Belirli kodla başlayan hesapların toplamı"""
             total = Decimal(0)
-            for account in accounts:
-                if not account.is_detail:
-                    continue
-
-                lines = (
-                    self.session.query(JournalEntryLine)
-                    .join(JournalEntry)
-                    .filter(
-                        JournalEntryLine.account_id == account.id,
-                        JournalEntry.status == JournalEntryStatus.POSTED,
-                        JournalEntry.entry_date <= as_of_date,
-                    )
-                    .all()
-                )
-
-                opening = (account.opening_debit or 0) - (account.opening_credit or 0)
-                movements = sum((l.debit or 0) - (l.credit or 0) for l in lines)
-                total += opening + movements
+            for account_id in ChartOfAccountsCache.get_prefix_ids(
+                self.session, start_code, detail_only=True
+            ):
+                account = ChartOfAccountsCache.get(self.session, account_id)
+                opening = account["opening_debit"] - account["opening_credit"]
+                total += opening + movements.get(account_id, Decimal(0))
 
             return total
 
@@ -526,6 +690,7 @@ class AccountingService(ServiceBase):
             code_to_id[code] = account.id
 
         self.session.commit()
+        ChartOfAccountsCache.clear_cache()
 
     def close(self):
         if self.session:
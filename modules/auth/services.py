@@ -5,11 +5,11 @@ Kullanıcı, rol ve izin yönetimi için servis sınıfları.
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Set, Any
+from typing import Optional, List, Dict, Set, Any, Tuple
 from functools import lru_cache
 
 from sqlalchemy.orm import Session as DBSession, joinedload
-from sqlalchemy import or_
+from sqlalchemy import or_, tuple_
 
 from database.models.user import User, Role, Permission, AuditLog, user_roles, role_permissions
 from core.user_context import get_current_user, get_audit_user_info
@@ -45,9 +45,9 @@ class PermissionService:
 
     @classmethod
     def clear_cache(cls) -> None:
-        """Cache'i temizler"""
-        cls._permission_cache.clear()
+        """Cache'i temizler (değişiklik bildirimi ile başka thread'den de çağrılır)"""
         cls._cache_loaded = False
+        cls._permission_cache = {}
 
     @classmethod
     def get_permission(cls, db: DBSession, code: str) -> Optional[Permission]:
@@ -489,6 +489,43 @@ class AuthService:
 
         return user
 
+    # Audit log sayfalaması (created_at, id) üzerinde keyset ile yapılır;
+    # OFFSET gibi önceki sayfaları taramaz.
+    AUDIT_ORDER = (AuditLog.created_at.desc(), AuditLog.id.desc())
+
+    @staticmethod
+    def audit_cursor(log) -> Tuple[datetime, int]:
+        """Sonraki sayfa için imleç (son satırın created_at, id değeri)"""
+        return (log.created_at, log.id)
+
+    @staticmethod
+    def audit_page(query, before: Optional[Tuple[datetime, int]] = None, limit: int = 100):
+        """Sorgunun imleçten sonraki sayfası (yeniden eskiye)"""
+        if before:
+            query = query.filter(
+                tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*before)
+            )
+        return query.order_by(*AuthService.AUDIT_ORDER).limit(limit).all()
+
+    @staticmethod
+    def iter_audit_logs(query, batch_size: int = 1000):
+        """
+        Sorgu sonucunu keyset ile parça parça akıtır (satır sınırı yok).
+
+        ORM nesnesi yerine kolon satırları döner; dışa aktarımda session
+        büyümez.
+        """
+        rows_query = query.with_entities(*AuditLog.__table__.columns)
+        before = None
+        while True:
+            rows = AuthService.audit_page(rows_query, before, batch_size)
+            if not rows:
+                break
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            before = AuthService.audit_cursor(rows[-1])
+
     @staticmethod
     def get_audit_logs(
         db: DBSession,
@@ -501,8 +538,14 @@ class AuthService:
         end_date: Optional[datetime] = None,
         limit: int = 100,
         offset: int = 0,
+        before: Optional[Tuple[datetime, int]] = None,
     ) -> List[AuditLog]:
-        """Audit logları getirir"""
+        """
+        Audit logları getirir
+
+        Sonraki sayfa için son kaydın audit_cursor() değeri before olarak
+        verilmelidir; offset sadece geriye dönük uyumluluk için vardır.
+        """
         query = db.query(AuditLog)
 
         if user_id:
@@ -520,26 +563,23 @@ class AuthService:
         if end_date:
             query = query.filter(AuditLog.created_at <= end_date)
 
-        return (
-            query.order_by(AuditLog.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
+        if offset and not before:
+            return query.order_by(*AuthService.AUDIT_ORDER).offset(offset).limit(limit).all()
+        return AuthService.audit_page(query, before, limit)
 
     @staticmethod
     def get_record_history(
         db: DBSession,
         table_name: str,
         record_id: int,
+        limit: Optional[int] = 100,
+        before: Optional[Tuple[datetime, int]] = None,
     ) -> List[AuditLog]:
-        """Belirli bir kaydın tüm geçmişini getirir"""
-        return (
-            db.query(AuditLog)
-            .filter(
-                AuditLog.table_name == table_name,
-                AuditLog.record_id == record_id,
-            )
-            .order_by(AuditLog.created_at.desc())
-            .all()
+        """Belirli bir kaydın geçmişi (en yeniden, sayfalı; limit=None tümü)"""
+        query = db.query(AuditLog).filter(
+            AuditLog.table_name == table_name,
+            AuditLog.record_id == record_id,
         )
+        if limit is None:
+            return query.order_by(*AuthService.AUDIT_ORDER).all()
+        return AuthService.audit_page(query, before, limit)
@@ -9,7 +9,8 @@ from typing import List, Dict, Optional
 from sqlalchemy import func, and_, or_, desc
 from sqlalchemy.orm import Session
 
-from database import get_session
+from database import get_read_session
+from database.instrumentation import tracked
 from database.models.sales import (
     Customer,
     SalesOrder,
@@ -19,7 +20,12 @@ from database.models.sales import (
 )
 from database.models.purchasing import Supplier, PurchaseOrder, PurchaseOrderStatus
 from database.models.production import WorkOrder, WorkOrderStatus
-from database.models.inventory import Item, StockBalance, StockMovement, Warehouse
+from database.models.inventory import (
+    Item,
+    StockMovement,
+    StockValuation,
+    Warehouse,
+)
 from database.models.finance import Receipt, Payment, PaymentStatus
 
 
@@ -27,8 +33,10 @@ class DashboardService:
     """Dashboard için özet veri servisi"""
 
     def __init__(self):
-        self.session: Session = get_session()
+        # Salt okunur: okuma kopyası varsa oradan okunur
+        self.session: Session = get_read_session()
 
+    @tracked()
     def get_kpis(self) -> Dict:
         """
         Tüm KPI verilerini tek seferde getir
@@ -131,27 +139,33 @@ class DashboardService:
     # === STOK KPI'LARI ===
 
     def _get_stock_stats(self) -> Dict:
-        """Stok değeri ve kritik stok sayısı"""
-        # Toplam stok değeri (miktar * maliyet)
+        """Stok değeri ve kritik stok sayısı (stock_valuations özetinden)"""
+        # Toplam stok değeri (miktar ağırlıklı maliyet ile)
         total_value = self.session.query(
-            func.coalesce(
-                func.sum(StockBalance.quantity * StockBalance.unit_cost), Decimal(0)
-            )
+            func.coalesce(func.sum(StockValuation.total_value), Decimal(0))
         ).scalar() or Decimal(0)
 
         # Kritik stok seviyesindeki ürünler
         # (mevcut miktar < minimum stok)
+        item_totals = (
+            self.session.query(
+                StockValuation.item_id,
+                func.sum(StockValuation.quantity).label("quantity"),
+            )
+            .group_by(StockValuation.item_id)
+            .subquery()
+        )
         critical_items = (
             self.session.query(func.count(Item.id))
+            .outerjoin(item_totals, item_totals.c.item_id == Item.id)
             .filter(
                 Item.is_active == True,
                 Item.min_stock.isnot(None),
                 Item.min_stock > 0,
+                func.coalesce(item_totals.c.quantity, 0) < Item.min_stock,
             )
-            .join(StockBalance, StockBalance.item_id == Item.id, isouter=True)
-            .group_by(Item.id)
-            .having(func.coalesce(func.sum(StockBalance.quantity), 0) < Item.min_stock)
-            .count()
+            .scalar()
+            or 0
         )
 
         return {
@@ -218,6 +232,7 @@ class DashboardService:
 
     # === SON HAREKETLER ===
 
+    @tracked()
     def get_recent_movements(self, limit: int = 5) -> List[Dict]:
         """Son stok hareketlerini getir"""
         movements = (
@@ -250,6 +265,7 @@ class DashboardService:
 
     # === YAKLAŞAN GÖREVLER ===
 
+    @tracked()
     def get_upcoming_tasks(self, limit: int = 5) -> List[Dict]:
         """Yaklaşan görevler ve hatırlatmalar"""
         tasks = []
@@ -342,6 +358,7 @@ class DashboardService:
 
     # === TREND VERİLERİ (Grafikler için) ===
 
+    @tracked()
     def get_revenue_trend(self, days: int = 7) -> List[int]:
         """Son N günün ciro trendi (grafik için normalize edilmiş)"""
         today = date.today()
@@ -360,6 +377,7 @@ class DashboardService:
 
         return values if any(values) else [10, 25, 15, 30, 40, 35, 50]  # Fallback
 
+    @tracked()
     def get_work_order_trend(self, days: int = 7) -> List[int]:
         """Son N günün tamamlanan iş emri trendi"""
         today = date.today()
@@ -6,12 +6,13 @@ Hata Kayıtları ve Loglama
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
     QPushButton, QLabel, QComboBox, QCheckBox, QMessageBox,
-    QHeaderView, QAbstractItemView, QGroupBox, QTextEdit, QDialog
+    QHeaderView, QAbstractItemView, QGroupBox, QTextEdit, QDialog, QTabWidget
 )
 from PyQt6.QtCore import Qt
 from datetime import datetime, timedelta
 
 from modules.development.services import ErrorLogService
+from modules.development.views.query_panel import QueryPerformancePanel
 from database.models.development import ErrorSeverity
 
 class ErrorDetailDialog(QDialog):
@@ -76,7 +77,7 @@ class ErrorDetailDialog(QDialog):
         layout.addWidget(close_btn)
 
 class DevelopmentModule(QWidget):
-    """Geliştirme modülü - Hata kayıtları"""
+    """Geliştirme modülü - Hata kayıtları ve sorgu performansı"""
 
     page_title = "⚙️ Geliştirme"
 
@@ -87,7 +88,13 @@ class DevelopmentModule(QWidget):
         self.load_data()
 
     def setup_ui(self):
-        layout = QVBoxLayout(self)
+        main_layout = QVBoxLayout(self)
+
+        self.tabs = QTabWidget()
+        main_layout.addWidget(self.tabs)
+
+        errors_tab = QWidget()
+        layout = QVBoxLayout(errors_tab)
 
         # Başlık
         header = QLabel("<h2>⚙️ Hata Kayıtları</h2>")
@@ -166,6 +173,12 @@ class DevelopmentModule(QWidget):
 
         layout.addLayout(btn_layout)
 
+        self.tabs.addTab(errors_tab, "🐞 Hata Kayıtları")
+
+        # Sorgu performansı (N+1, yavaş sorgular)
+        self.query_panel = QueryPerformancePanel()
+        self.tabs.addTab(self.query_panel, "⏱️ Sorgu Performansı")
+
     def _get_service(self):
         if self.service is None:
             self.service = ErrorLogService()
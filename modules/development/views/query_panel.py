@@ -0,0 +1,210 @@
+"""
+Akıllı İş - Sorgu Performansı Paneli
+Yavaş sorgular, N+1 alarmları, servis çağrısı başına sorgu sayıları
+bağlantı havuzu bekleme süreleri ve okuma kopyası durumu
+"""
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QCheckBox, QHeaderView, QAbstractItemView, QTabWidget
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from database import get_engine
+from database.instrumentation import query_instrumentation
+from database.pool import pool_metrics
+from database.replica import replica_router
+
+# Otomatik yenileme aralığı (ms)
+REFRESH_INTERVAL = 5000
+
+
+def _number_item(value, decimals: int = 0) -> QTableWidgetItem:
+    item = QTableWidgetItem(f"{value:,.{decimals}f}")
+    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+class QueryPerformancePanel(QWidget):
+    """Sorgu ölçümü sonuçlarını gösteren geliştirici paneli"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+        self.load_data()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._auto_refresh)
+        self.timer.start(REFRESH_INTERVAL)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        header = QLabel("<h2>⏱️ Sorgu Performansı</h2>")
+        layout.addWidget(header)
+
+        # Kontroller
+        control_layout = QHBoxLayout()
+
+        self.enabled_check = QCheckBox("Ölçüm açık")
+        self.enabled_check.setChecked(query_instrumentation.enabled)
+        self.enabled_check.toggled.connect(self.toggle_instrumentation)
+        control_layout.addWidget(self.enabled_check)
+
+        control_layout.addStretch()
+
+        refresh_btn = QPushButton("🔄 Yenile")
+        refresh_btn.clicked.connect(self.load_data)
+        control_layout.addWidget(refresh_btn)
+
+        reset_btn = QPushButton("🧹 Sıfırla")
+        reset_btn.clicked.connect(self.reset_stats)
+        control_layout.addWidget(reset_btn)
+
+        layout.addLayout(control_layout)
+
+        # Özet
+        self.summary_label = QLabel()
+        self.summary_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.summary_label)
+
+        # Bağlantı havuzu
+        self.pool_label = QLabel()
+        layout.addWidget(self.pool_label)
+
+        # Okuma kopyası
+        self.replica_label = QLabel()
+        layout.addWidget(self.replica_label)
+
+        # Tablolar
+        self.tabs = QTabWidget()
+
+        self.slow_table = self._create_table(["Zaman", "Süre (ms)", "Çağrı", "SQL"])
+        self.tabs.addTab(self.slow_table, "🐢 Yavaş Sorgular")
+
+        self.alarm_table = self._create_table(["Zaman", "Çağrı", "Tekrar", "SQL"])
+        self.tabs.addTab(self.alarm_table, "🔁 N+1 Alarmları")
+
+        self.call_table = self._create_table(
+            ["Çağrı", "Adet", "Sorgu", "Ort. Sorgu", "Maks. Sorgu", "DB (ms)"]
+        )
+        self.tabs.addTab(self.call_table, "📊 Servis Çağrıları")
+
+        self.statement_table = self._create_table(
+            ["Adet", "Toplam (ms)", "Maks. (ms)", "SQL"]
+        )
+        self.tabs.addTab(self.statement_table, "💰 En Pahalı Sorgular")
+
+        layout.addWidget(self.tabs)
+
+    def _create_table(self, headers) -> QTableWidget:
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setStretchLastSection(True)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setWordWrap(False)
+        return table
+
+    def _auto_refresh(self):
+        if self.isVisible() and query_instrumentation.enabled:
+            self.load_data()
+
+    def toggle_instrumentation(self, checked: bool):
+        if checked:
+            query_instrumentation.enable()
+        else:
+            query_instrumentation.disable()
+        self.load_data()
+
+    def reset_stats(self):
+        query_instrumentation.reset()
+        pool_metrics.reset()
+        self.load_data()
+
+    def load_data(self):
+        """Toplanan istatistikleri tablolara yükle"""
+        stats = query_instrumentation.snapshot()
+
+        state = "🟢 Açık" if stats["enabled"] else "⚪ Kapalı"
+        self.summary_label.setText(
+            f"{state} | {stats['since'].strftime('%H:%M:%S')} itibarıyla "
+            f"<b>{stats['total_queries']:,}</b> sorgu, <b>{stats['total_ms']:,.0f}</b> ms | "
+            f"Yavaş sorgu eşiği: {stats['slow_threshold_ms']} ms | "
+            f"N+1 eşiği: {stats['n_plus_one_threshold']} | "
+            f"Log: {stats['log_path']}"
+        )
+
+        pool = pool_metrics.snapshot(get_engine())
+        pool_text = (
+            f"Havuz: {pool['checkouts']:,} bağlantı alma | "
+            f"bekleme ort. {pool['avg_wait_ms']:.1f} ms, p95 {pool['p95_wait_ms']:.1f} ms, "
+            f"maks. {pool['max_wait_ms']:.1f} ms | zaman aşımı: <b>{pool['timeouts']}</b>"
+        )
+        if "size" in pool:
+            pool_text += (
+                f" | kullanımda {pool['checked_out']}, boşta {pool['idle']}, "
+                f"boyut {pool['size']} + {pool['overflow']}/{pool['max_overflow']} taşma"
+            )
+        self.pool_label.setText(pool_text)
+
+        replica = replica_router.status()
+        if not replica["configured"]:
+            replica_text = "Okuma kopyası: tanımlı değil (tüm okumalar birincilden)"
+        elif replica["lag"] is None:
+            replica_text = (
+                f"Okuma kopyası: 🔴 ulaşılamıyor ({replica['last_error'] or 'henüz ölçülmedi'})"
+            )
+        else:
+            state = "🟢 kullanılıyor" if replica["usable"] else "🟡 gecikmeli, birincil kullanılıyor"
+            replica_text = (
+                f"Okuma kopyası: {state} | gecikme {replica['lag']:.1f} sn "
+                f"(eşik {replica['max_lag']:.0f} sn)"
+            )
+        self.replica_label.setText(
+            f"{replica_text} | birincile dönüş: {replica['fallbacks']}"
+        )
+
+        self.slow_table.setRowCount(len(stats["slow_queries"]))
+        for row, query in enumerate(stats["slow_queries"]):
+            self.slow_table.setItem(row, 0, QTableWidgetItem(query["time"].strftime("%H:%M:%S")))
+            self.slow_table.setItem(row, 1, _number_item(query["elapsed_ms"], 1))
+            self.slow_table.setItem(row, 2, QTableWidgetItem(query["scope"] or "-"))
+            self.slow_table.setItem(row, 3, self._statement_item(query["statement"]))
+
+        self.alarm_table.setRowCount(len(stats["alarms"]))
+        for row, alarm in enumerate(stats["alarms"]):
+            self.alarm_table.setItem(row, 0, QTableWidgetItem(alarm["time"].strftime("%H:%M:%S")))
+            self.alarm_table.setItem(row, 1, QTableWidgetItem(alarm["scope"]))
+            self.alarm_table.setItem(row, 2, _number_item(alarm["count"]))
+            self.alarm_table.setItem(row, 3, self._statement_item(alarm["statement"]))
+
+        self.call_table.setRowCount(len(stats["calls"]))
+        for row, call in enumerate(stats["calls"]):
+            self.call_table.setItem(row, 0, QTableWidgetItem(call["name"]))
+            self.call_table.setItem(row, 1, _number_item(call["calls"]))
+            self.call_table.setItem(row, 2, _number_item(call["queries"]))
+            self.call_table.setItem(row, 3, _number_item(call["avg_queries"], 1))
+            self.call_table.setItem(row, 4, _number_item(call["max_queries"]))
+            self.call_table.setItem(row, 5, _number_item(call["db_ms"], 1))
+
+        self.statement_table.setRowCount(len(stats["statements"]))
+        for row, statement in enumerate(stats["statements"]):
+            self.statement_table.setItem(row, 0, _number_item(statement["count"]))
+            self.statement_table.setItem(row, 1, _number_item(statement["total_ms"], 1))
+            self.statement_table.setItem(row, 2, _number_item(statement["max_ms"], 1))
+            self.statement_table.setItem(row, 3, self._statement_item(statement["statement"]))
+
+        alarm_count = len(stats["alarms"])
+        self.tabs.setTabText(
+            1, f"🔁 N+1 Alarmları ({alarm_count})" if alarm_count else "🔁 N+1 Alarmları"
+        )
+
+    @staticmethod
+    def _statement_item(statement: str) -> QTableWidgetItem:
+        item = QTableWidgetItem(statement[:300])
+        item.setToolTip(statement)
+        return item
@@ -7,14 +7,26 @@ from .services import (
     ReceiptService,
     PaymentService,
     ReconciliationService,
+    BatchPostingService,
 )
 
-from .views import (
-    AccountStatementModule,
-    ReceiptModule,
-    PaymentModule,
-    ReconciliationModule,
-)
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "AccountStatementModule": ".views",
+    "ReceiptModule": ".views",
+    "PaymentModule": ".views",
+    "ReconciliationModule": ".views",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     # Services
@@ -22,6 +34,7 @@ __all__ = [
     "ReceiptService",
     "PaymentService",
     "ReconciliationService",
+    "BatchPostingService",
     # Modules
     "AccountStatementModule",
     "ReceiptModule",
@@ -0,0 +1,405 @@
+"""
+Akıllı İş - Cari Bakiye / Risk Defteri
+
+Müşteri ve tedarikçi bakiyelerini counterparty_balances tablosunda artımlı
+olarak tutar. SQLAlchemy before_flush event'i ile cari hareket, sipariş ve
+fatura değişikliklerinin bakiye etkisi hesaplanır ve aynı transaction içinde
+atomik UPDATE ile uygulanır. Böylece kredi kontrolü ve bakiye ekranları
+tüm geçmişi toplamak yerine tek satır okur.
+
+Kullanım:
+    from modules.finance.balance_ledger import counterparty_ledger
+    counterparty_ledger.init_listeners()  # Uygulama başlangıcında çağır
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, insert, update
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm.attributes import get_history
+
+from database.models.finance import AccountTransaction, CounterpartyBalance
+from database.models.sales import (
+    Invoice,
+    InvoiceStatus,
+    SalesOrder,
+    SalesOrderStatus,
+)
+
+
+# Riske dahil edilen belge durumları
+OPEN_ORDER_STATUSES = (SalesOrderStatus.CONFIRMED, SalesOrderStatus.PARTIAL)
+OPEN_INVOICE_STATUSES = (
+    InvoiceStatus.ISSUED,
+    InvoiceStatus.PARTIAL,
+    InvoiceStatus.OVERDUE,
+)
+
+# Bakiye alanları (delta listesindeki sıra)
+LEDGER_FIELDS = ("balance", "open_order_amount", "open_invoice_amount")
+
+# ("customer" | "supplier", id) -> [balance, open_order_amount, open_invoice_amount]
+Deltas = Dict[Tuple[str, int], List[Decimal]]
+
+
+class CounterpartyLedger:
+    """
+    Cari bakiye defteri (before_flush ile artımlı güncelleme).
+
+    Toplu INSERT gibi ORM event'lerini atlayan yollar apply_deltas() ile
+    bakiyeyi kendisi günceller. Tutarlılık kontrolü ve yeniden oluşturma için
+    check_consistency() / rebuild() kullanılır.
+    """
+
+    _instance: Optional["CounterpartyLedger"] = None
+    _listening: bool = False
+    _enabled: bool = True
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def init_listeners(self) -> None:
+        """SQLAlchemy event listener'ını kaydeder (tekrar çağrılabilir)"""
+        if self._listening:
+            return
+        event.listen(DBSession, "before_flush", self._before_flush)
+        CounterpartyLedger._listening = True
+
+    def enable(self) -> None:
+        self._enabled = True
+
+    def disable(self) -> None:
+        """Artımlı güncellemeyi kapatır (toplu veri aktarımı sonrası rebuild() gerekir)"""
+        self._enabled = False
+
+    # =====================
+    # OKUMA
+    # =====================
+
+    def get_customer_balance(self, session: DBSession, customer_id: int) -> Decimal:
+        """Müşteri bakiyesi (Borç - Alacak)"""
+        row = self._get_row(session, "customer", customer_id)
+        if row is None:
+            return self._compute(session, "customer", customer_id)[0]
+        return Decimal(row.balance or 0)
+
+    def get_supplier_balance(self, session: DBSession, supplier_id: int) -> Decimal:
+        """Tedarikçi bakiyesi (Alacak - Borç)"""
+        row = self._get_row(session, "supplier", supplier_id)
+        if row is None:
+            return self._compute(session, "supplier", supplier_id)[0]
+        return Decimal(row.balance or 0)
+
+    def get_customer_exposure(self, session: DBSession, customer_id: int) -> Decimal:
+        """Müşteri riski (açık siparişler + açık fatura bakiyeleri)"""
+        row = self._get_row(session, "customer", customer_id)
+        if row is None:
+            _, orders, invoices = self._compute(session, "customer", customer_id)
+            return orders + invoices
+        return Decimal(row.exposure)
+
+    def get_customer_exposures(
+        self, session: DBSession, customer_ids: Iterable[int]
+    ) -> Dict[int, Decimal]:
+        """Birden çok müşterinin riski (tek sorgu; satırı olmayanlar hesaplanır)"""
+        customer_ids = set(customer_ids)
+        if not customer_ids:
+            return {}
+
+        exposures = {
+            customer_id: Decimal(exposure)
+            for customer_id, exposure in session.query(
+                CounterpartyBalance.customer_id,
+                CounterpartyBalance.open_order_amount
+                + CounterpartyBalance.open_invoice_amount,
+            ).filter(CounterpartyBalance.customer_id.in_(customer_ids))
+        }
+        for customer_id in customer_ids - set(exposures):
+            _, orders, invoices = self._compute(session, "customer", customer_id)
+            exposures[customer_id] = orders + invoices
+        return exposures
+
+    def _get_row(self, session: DBSession, kind: str, entity_id: int):
+        column = self._key_column(kind)
+        return (
+            session.query(
+                CounterpartyBalance.balance,
+                CounterpartyBalance.open_order_amount,
+                CounterpartyBalance.open_invoice_amount,
+                (
+                    CounterpartyBalance.open_order_amount
+                    + CounterpartyBalance.open_invoice_amount
+                ).label("exposure"),
+            )
+            .filter(column == entity_id)
+            .first()
+        )
+
+    # =====================
+    # ARTIMLI GÜNCELLEME
+    # =====================
+
+    def _before_flush(self, session: DBSession, flush_context, instances) -> None:
+        """Flush edilecek değişikliklerin bakiye etkisini uygular"""
+        if not self._enabled:
+            return
+
+        deltas: Deltas = {}
+
+        for obj in session.new:
+            self._collect(deltas, obj, old=False, new=True)
+        for obj in session.dirty:
+            if session.is_modified(obj):
+                self._collect(deltas, obj, old=True, new=True)
+        for obj in session.deleted:
+            self._collect(deltas, obj, old=True, new=False)
+
+        if deltas:
+            self.apply_deltas(session, deltas)
+
+    def _collect(self, deltas: Deltas, obj: Any, old: bool, new: bool) -> None:
+        """Nesnenin eski katkısını çıkarır, yeni katkısını ekler"""
+        if not isinstance(obj, (AccountTransaction, SalesOrder, Invoice)):
+            return
+
+        if old:
+            for key, index, amount in self._contributions(obj, self._old_value):
+                self._add(deltas, key, index, -amount)
+        if new:
+            for key, index, amount in self._contributions(obj, getattr):
+                self._add(deltas, key, index, amount)
+
+    def _contributions(self, obj: Any, value_of) -> List[Tuple]:
+        """Nesnenin bakiye alanlarına katkısı: [(anahtar, alan indeksi, tutar)]"""
+        result = []
+
+        if isinstance(obj, AccountTransaction):
+            # Yeni nesnede is_active henüz None olabilir (varsayılan INSERT'te atanır)
+            if value_of(obj, "is_active") is False:
+                return result
+            debit = Decimal(value_of(obj, "debit") or 0)
+            credit = Decimal(value_of(obj, "credit") or 0)
+            customer_id = value_of(obj, "customer_id")
+            supplier_id = value_of(obj, "supplier_id")
+            if customer_id:
+                result.append((("customer", customer_id), 0, debit - credit))
+            if supplier_id:
+                result.append((("supplier", supplier_id), 0, credit - debit))
+
+        elif isinstance(obj, SalesOrder):
+            customer_id = value_of(obj, "customer_id")
+            if customer_id and value_of(obj, "status") in OPEN_ORDER_STATUSES:
+                total = Decimal(value_of(obj, "total") or 0)
+                result.append((("customer", customer_id), 1, total))
+
+        elif isinstance(obj, Invoice):
+            customer_id = value_of(obj, "customer_id")
+            if customer_id and value_of(obj, "status") in OPEN_INVOICE_STATUSES:
+                balance = Decimal(value_of(obj, "balance") or 0)
+                result.append((("customer", customer_id), 2, balance))
+
+        return result
+
+    @staticmethod
+    def _old_value(obj: Any, attr: str) -> Any:
+        """Flush öncesi (veritabanındaki) değer"""
+        history = get_history(obj, attr)
+        if history.deleted:
+            return history.deleted[0]
+        if history.unchanged:
+            return history.unchanged[0]
+        if history.added:
+            # Önceki değer yüklenmemişti; değişiklik yokmuş gibi davran
+            return history.added[0]
+        return getattr(obj, attr)
+
+    @staticmethod
+    def _add(deltas: Deltas, key: Tuple[str, int], index: int, amount: Decimal):
+        if not amount:
+            return
+        values = deltas.setdefault(key, [Decimal(0), Decimal(0), Decimal(0)])
+        values[index] += amount
+
+    def apply_deltas(self, session: DBSession, deltas: Deltas) -> None:
+        """
+        Bakiye farklarını aynı transaction içinde atomik olarak uygular.
+
+        Satırı olmayan cari için bakiye mevcut veritabanı durumundan hesaplanıp
+        farkla birlikte eklenir.
+        """
+        now = datetime.now()
+        for (kind, entity_id), values in deltas.items():
+            if not any(values):
+                continue
+            column = self._key_column(kind)
+            result = session.execute(
+                update(CounterpartyBalance)
+                .where(column == entity_id)
+                .values(
+                    balance=CounterpartyBalance.balance + values[0],
+                    open_order_amount=CounterpartyBalance.open_order_amount
+                    + values[1],
+                    open_invoice_amount=CounterpartyBalance.open_invoice_amount
+                    + values[2],
+                    updated_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                continue
+
+            base = self._compute(session, kind, entity_id)
+            row = {field: base[i] + values[i] for i, field in enumerate(LEDGER_FIELDS)}
+            row[column.key] = entity_id
+            session.execute(insert(CounterpartyBalance).values(**row))
+
+    # =====================
+    # HESAPLAMA / KONTROL
+    # =====================
+
+    @staticmethod
+    def _key_column(kind: str):
+        if kind == "customer":
+            return CounterpartyBalance.customer_id
+        if kind == "supplier":
+            return CounterpartyBalance.supplier_id
+        raise ValueError(f"Geçersiz cari tipi: {kind}")
+
+    def _compute(
+        self, session: DBSession, kind: str, entity_id: int = None
+    ) -> Tuple[Decimal, Decimal, Decimal]:
+        """Tek cari için bakiyeleri kaynak tablolardan hesapla"""
+        totals = self._compute_all(session, kind, entity_id)
+        return totals.get(entity_id, (Decimal(0), Decimal(0), Decimal(0)))
+
+    def _compute_all(
+        self, session: DBSession, kind: str, entity_id: int = None
+    ) -> Dict[int, Tuple[Decimal, Decimal, Decimal]]:
+        """Bakiyeleri kaynak tablolardan gruplu sorgularla hesapla"""
+        if kind == "customer":
+            key = AccountTransaction.customer_id
+            amount = func.coalesce(func.sum(AccountTransaction.debit), 0) - func.coalesce(
+                func.sum(AccountTransaction.credit), 0
+            )
+        else:
+            key = AccountTransaction.supplier_id
+            amount = func.coalesce(func.sum(AccountTransaction.credit), 0) - func.coalesce(
+                func.sum(AccountTransaction.debit), 0
+            )
+
+        query = session.query(key, amount).filter(
+            key.isnot(None), AccountTransaction.is_active == True
+        )
+        if entity_id is not None:
+            query = query.filter(key == entity_id)
+
+        result: Dict[int, List[Decimal]] = {}
+        for row_id, value in query.group_by(key).all():
+            result.setdefault(row_id, [Decimal(0)] * 3)[0] = Decimal(value or 0)
+
+        if kind == "customer":
+            orders = session.query(
+                SalesOrder.customer_id, func.coalesce(func.sum(SalesOrder.total), 0)
+            ).filter(SalesOrder.status.in_(OPEN_ORDER_STATUSES))
+            invoices = session.query(
+                Invoice.customer_id, func.coalesce(func.sum(Invoice.balance), 0)
+            ).filter(Invoice.status.in_(OPEN_INVOICE_STATUSES))
+            if entity_id is not None:
+                orders = orders.filter(SalesOrder.customer_id == entity_id)
+                invoices = invoices.filter(Invoice.customer_id == entity_id)
+
+            for row_id, value in orders.group_by(SalesOrder.customer_id).all():
+                result.setdefault(row_id, [Decimal(0)] * 3)[1] = Decimal(value or 0)
+            for row_id, value in invoices.group_by(Invoice.customer_id).all():
+                result.setdefault(row_id, [Decimal(0)] * 3)[2] = Decimal(value or 0)
+
+        return {row_id: tuple(values) for row_id, values in result.items()}
+
+    def check_consistency(self, session: DBSession) -> List[Dict]:
+        """
+        Defter ile kaynak tablolar arasındaki farkları listeler.
+
+        Returns:
+            List[Dict]: {"kind", "id", "field", "ledger", "actual"} kayıtları
+        """
+        drifts = []
+        for kind in ("customer", "supplier"):
+            column = self._key_column(kind)
+            actual = self._compute_all(session, kind)
+            ledger = {
+                row[0]: (
+                    Decimal(row[1] or 0),
+                    Decimal(row[2] or 0),
+                    Decimal(row[3] or 0),
+                )
+                for row in session.query(
+                    column,
+                    CounterpartyBalance.balance,
+                    CounterpartyBalance.open_order_amount,
+                    CounterpartyBalance.open_invoice_amount,
+                )
+                .filter(column.isnot(None))
+                .all()
+            }
+
+            zero = (Decimal(0), Decimal(0), Decimal(0))
+            for entity_id in set(actual) | set(ledger):
+                expected = actual.get(entity_id, zero)
+                stored = ledger.get(entity_id, zero)
+                for i, field in enumerate(LEDGER_FIELDS):
+                    if expected[i] != stored[i]:
+                        drifts.append(
+                            {
+                                "kind": kind,
+                                "id": entity_id,
+                                "field": field,
+                                "ledger": stored[i],
+                                "actual": expected[i],
+                            }
+                        )
+        return drifts
+
+    def rebuild(self, session: DBSession) -> int:
+        """
+        Defteri kaynak tablolardan yeniden oluşturur (sadece farklı satırları yazar).
+
+        Returns:
+            int: Düzeltilen alan sayısı
+        """
+        drifts = self.check_consistency(session)
+        if not drifts:
+            return 0
+
+        deltas: Deltas = {}
+        for drift in drifts:
+            self._add(
+                deltas,
+                (drift["kind"], drift["id"]),
+                LEDGER_FIELDS.index(drift["field"]),
+                drift["actual"] - drift["ledger"],
+            )
+
+        try:
+            # Farkı uygula; satırı olmayan cariler kaynak tablodan hesaplanır
+            for (kind, entity_id), values in deltas.items():
+                if self._get_row(session, kind, entity_id) is None:
+                    base = self._compute(session, kind, entity_id)
+                    values[:] = [Decimal(0)] * 3
+                    row = {f: base[i] for i, f in enumerate(LEDGER_FIELDS)}
+                    row[self._key_column(kind).key] = entity_id
+                    session.execute(insert(CounterpartyBalance).values(**row))
+            self.apply_deltas(session, deltas)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return len(drifts)
+
+
+# Singleton instance
+counterparty_ledger = CounterpartyLedger()
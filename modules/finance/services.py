@@ -5,7 +5,7 @@ Akıllı İş - Finans Modülü Servisleri
 from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional, Dict, Tuple
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import desc, and_, or_, func, insert
 from sqlalchemy.orm import joinedload
 
 from database.base import get_session
@@ -21,6 +21,7 @@ from database.models.finance import (
 )
 from database.models.sales import Customer, Invoice, InvoiceStatus
 from database.models.purchasing import Supplier
+from modules.finance.balance_ledger import counterparty_ledger
 
 
 class AccountTransactionService:
@@ -28,26 +29,34 @@ class AccountTransactionService:
 
     def __init__(self):
         self.session = get_session()
+        counterparty_ledger.init_listeners()
 
     def generate_transaction_no(self) -> str:
         """Otomatik hareket numarası oluştur"""
+        return self.allocate_transaction_numbers(1)[0]
+
+    def allocate_transaction_numbers(self, count: int) -> List[str]:
+        """Ardışık hareket numaralarını blok halinde ayır (tek sorgu)"""
         today = date.today()
         prefix = f"CHK{today.strftime('%Y%m')}"
 
+        # 9999'dan sonra numara uzar; önce uzunluğa göre sırala
         last = (
-            self.session.query(AccountTransaction)
+            self.session.query(AccountTransaction.transaction_no)
             .filter(AccountTransaction.transaction_no.like(f"{prefix}%"))
-            .order_by(desc(AccountTransaction.transaction_no))
+            .order_by(
+                desc(func.length(AccountTransaction.transaction_no)),
+                desc(AccountTransaction.transaction_no),
+            )
             .first()
         )
 
         if last:
-            last_num = int(last.transaction_no[-4:])
-            new_num = last_num + 1
+            start = int(last.transaction_no[len(prefix):]) + 1
         else:
-            new_num = 1
+            start = 1
 
-        return f"{prefix}{new_num:04d}"
+        return [f"{prefix}{num:04d}" for num in range(start, start + count)]
 
     def get_customer_statement(
         self, customer_id: int, date_from: date = None, date_to: date = None
@@ -89,29 +98,11 @@ class AccountTransactionService:
 
     def get_customer_balance(self, customer_id: int) -> Decimal:
         """Müşteri bakiyesi (Borç - Alacak)"""
-        result = (
-            self.session.query(
-                func.coalesce(func.sum(AccountTransaction.debit), 0)
-                - func.coalesce(func.sum(AccountTransaction.credit), 0)
-            )
-            .filter(AccountTransaction.customer_id == customer_id)
-            .filter(AccountTransaction.is_active == True)
-            .scalar()
-        )
-        return Decimal(result) if result else Decimal(0)
+        return counterparty_ledger.get_customer_balance(self.session, customer_id)
 
     def get_supplier_balance(self, supplier_id: int) -> Decimal:
         """Tedarikçi bakiyesi (Alacak - Borç, tedarikçiye borcumuz)"""
-        result = (
-            self.session.query(
-                func.coalesce(func.sum(AccountTransaction.credit), 0)
-                - func.coalesce(func.sum(AccountTransaction.debit), 0)
-            )
-            .filter(AccountTransaction.supplier_id == supplier_id)
-            .filter(AccountTransaction.is_active == True)
-            .scalar()
-        )
-        return Decimal(result) if result else Decimal(0)
+        return counterparty_ledger.get_supplier_balance(self.session, supplier_id)
 
     def create_from_invoice(self, invoice: Invoice) -> AccountTransaction:
         """Fatura kesildiğinde cari hesap hareketi oluştur"""
@@ -121,7 +112,7 @@ class AccountTransactionService:
             transaction_type=TransactionType.INVOICE,
             customer_id=invoice.customer_id,
             invoice_id=invoice.id,
-            debit=invoice.total_amount,  # Müşteri borçlanır
+            debit=invoice.total,  # Müşteri borçlanır
             credit=Decimal(0),
             description=f"Fatura: {invoice.invoice_no}",
         )
@@ -142,7 +133,7 @@ class AccountTransactionService:
             supplier_id=invoice.supplier_id,
             purchase_invoice_id=invoice.id,
             debit=Decimal(0),
-            credit=invoice.total_amount,  # Tedarikçiye borcumuz artar
+            credit=invoice.total,  # Tedarikçiye borcumuz artar
             description=f"Satınalma Faturası: {invoice.invoice_no}",
         )
         self.session.add(transaction)
@@ -153,9 +144,15 @@ class AccountTransactionService:
 
         return transaction
 
-    def _create_journal_entry(self, transaction: AccountTransaction):
+    @staticmethod
+    def build_journal_lines(
+        transaction_type: TransactionType,
+        debit: Decimal,
+        credit: Decimal,
+        payment_method: PaymentMethod = None,
+    ) -> List[Dict]:
         """
-        Cari hareketten otomatik yevmiye fişi oluştur
+        Cari hareket için yevmiye satırlarını hesap kodlarıyla üret
 
         Tekdüzen Hesap Planı:
         - 100: Kasa
@@ -167,99 +164,62 @@ class AccountTransactionService:
         - 600: Yurt İçi Satışlar
         - 153: Ticari Mallar
         """
+        debit = debit or Decimal(0)
+        credit = credit or Decimal(0)
+        kasa_hesap = "100.01" if payment_method == PaymentMethod.CASH else "102.01"
+
+        if transaction_type == TransactionType.INVOICE:
+            # Satış Faturası: 120 Alıcılar (B) / 600 Satışlar + 391 KDV (A)
+            kdv_orani = Decimal("0.20")  # %20 KDV
+            kdv_tutari = debit * kdv_orani / (1 + kdv_orani)
+            net_tutar = debit - kdv_tutari
+
+            return [
+                {"account_code": "120.01", "debit": debit, "credit": Decimal(0)},
+                {"account_code": "600.01", "debit": Decimal(0), "credit": net_tutar},
+                {"account_code": "391.01", "debit": Decimal(0), "credit": kdv_tutari},
+            ]
+
+        if transaction_type == TransactionType.PURCHASE_INVOICE:
+            # Satınalma Faturası: 153 Tic.Mal + 191 KDV (B) / 320 Satıcılar (A)
+            kdv_orani = Decimal("0.20")
+            kdv_tutari = credit * kdv_orani / (1 + kdv_orani)
+            net_tutar = credit - kdv_tutari
+
+            return [
+                {"account_code": "153.01", "debit": net_tutar, "credit": Decimal(0)},
+                {"account_code": "191.01", "debit": kdv_tutari, "credit": Decimal(0)},
+                {"account_code": "320.01", "debit": Decimal(0), "credit": credit},
+            ]
+
+        if transaction_type == TransactionType.RECEIPT:
+            # Tahsilat: 100/102 Kasa/Banka (B) / 120 Alıcılar (A)
+            return [
+                {"account_code": kasa_hesap, "debit": credit, "credit": Decimal(0)},
+                {"account_code": "120.01", "debit": Decimal(0), "credit": credit},
+            ]
+
+        if transaction_type == TransactionType.PAYMENT:
+            # Ödeme: 320 Satıcılar (B) / 100/102 Kasa/Banka (A)
+            return [
+                {"account_code": "320.01", "debit": debit, "credit": Decimal(0)},
+                {"account_code": kasa_hesap, "debit": Decimal(0), "credit": debit},
+            ]
+
+        return []
+
+    def _create_journal_entry(self, transaction: AccountTransaction):
+        """Cari hareketten otomatik yevmiye fişi oluştur"""
         try:
             from modules.accounting.services import AccountingService
 
             accounting = AccountingService()
-            lines_data = []
-
-            if transaction.transaction_type == TransactionType.INVOICE:
-                # Satış Faturası: 120 Alıcılar (B) / 600 Satışlar + 391 KDV (A)
-                kdv_orani = Decimal("0.20")  # %20 KDV
-                kdv_tutari = transaction.debit * kdv_orani / (1 + kdv_orani)
-                net_tutar = transaction.debit - kdv_tutari
-
-                lines_data = [
-                    {
-                        "account_code": "120.01",
-                        "debit": transaction.debit,
-                        "credit": Decimal(0),
-                    },
-                    {
-                        "account_code": "600.01",
-                        "debit": Decimal(0),
-                        "credit": net_tutar,
-                    },
-                    {
-                        "account_code": "391.01",
-                        "debit": Decimal(0),
-                        "credit": kdv_tutari,
-                    },
-                ]
-
-            elif transaction.transaction_type == TransactionType.PURCHASE_INVOICE:
-                # Satınalma Faturası: 153 Tic.Mal + 191 KDV (B) / 320 Satıcılar (A)
-                kdv_orani = Decimal("0.20")
-                kdv_tutari = transaction.credit * kdv_orani / (1 + kdv_orani)
-                net_tutar = transaction.credit - kdv_tutari
-
-                lines_data = [
-                    {
-                        "account_code": "153.01",
-                        "debit": net_tutar,
-                        "credit": Decimal(0),
-                    },
-                    {
-                        "account_code": "191.01",
-                        "debit": kdv_tutari,
-                        "credit": Decimal(0),
-                    },
-                    {
-                        "account_code": "320.01",
-                        "debit": Decimal(0),
-                        "credit": transaction.credit,
-                    },
-                ]
-
-            elif transaction.transaction_type == TransactionType.RECEIPT:
-                # Tahsilat: 100/102 Kasa/Banka (B) / 120 Alıcılar (A)
-                kasa_hesap = (
-                    "100.01"
-                    if transaction.payment_method == PaymentMethod.CASH
-                    else "102.01"
-                )
-                lines_data = [
-                    {
-                        "account_code": kasa_hesap,
-                        "debit": transaction.credit,
-                        "credit": Decimal(0),
-                    },
-                    {
-                        "account_code": "120.01",
-                        "debit": Decimal(0),
-                        "credit": transaction.credit,
-                    },
-                ]
-
-            elif transaction.transaction_type == TransactionType.PAYMENT:
-                # Ödeme: 320 Satıcılar (B) / 100/102 Kasa/Banka (A)
-                kasa_hesap = (
-                    "100.01"
-                    if transaction.payment_method == PaymentMethod.CASH
-                    else "102.01"
-                )
-                lines_data = [
-                    {
-                        "account_code": "320.01",
-                        "debit": transaction.debit,
-                        "credit": Decimal(0),
-                    },
-                    {
-                        "account_code": kasa_hesap,
-                        "debit": Decimal(0),
-                        "credit": transaction.debit,
-                    },
-                ]
+            lines_data = self.build_journal_lines(
+                transaction.transaction_type,
+                transaction.debit,
+                transaction.credit,
+                transaction.payment_method,
+            )
 
             if lines_data:
                 journal = accounting.create_journal(
@@ -770,6 +730,14 @@ class ReconciliationService:
         self.session = get_session()
         self.transaction_service = AccountTransactionService()
 
+    def check_balance_ledger(self) -> List[Dict]:
+        """Cari bakiye defteri ile hareketler arasındaki farklar"""
+        return counterparty_ledger.check_consistency(self.session)
+
+    def rebuild_balance_ledger(self) -> int:
+        """Cari bakiye defterini hareketlerden yeniden oluştur"""
+        return counterparty_ledger.rebuild(self.session)
+
     def get_customer_open_items(self, customer_id: int) -> Dict:
         """Müşteri açık kalemleri"""
         # Bakiye
@@ -892,3 +860,397 @@ class ReconciliationService:
             "total_credit": sum(t.credit or Decimal(0) for t in transactions),
             "closing_balance": balance,
         }
+
+
+class BatchPostingService:
+    """
+    Toplu cari hareket ve yevmiye kaydı (ay sonu fatura/tahsilat/ödeme aktarımı)
+
+    Belgeler partiler halinde işlenir. Her partide:
+    - hareket ve yevmiye numaraları blok halinde ayrılır (parti başına tek sorgu)
+    - JournalEntry, AccountTransaction ve JournalEntryLine satırları toplu INSERT
+      ile eklenir, hareketler yevmiyelere INSERT sırasında bağlanır
+    - tek commit yapılır; hata olursa parti tamamen geri alınır
+
+    dry_run=True ile hiçbir şey yazılmadan bakiye etkisi döndürülür.
+    """
+
+    BATCH_SIZE = 1000
+
+    # Belge tipi -> (cari hareket FK alanı, yevmiye referans tipi)
+    _REFERENCE_FIELDS = {
+        TransactionType.INVOICE: ("invoice_id", "invoice"),
+        TransactionType.PURCHASE_INVOICE: ("purchase_invoice_id", "purchase_invoice"),
+        TransactionType.RECEIPT: ("receipt_id", "receipt"),
+        TransactionType.PAYMENT: ("payment_id", "payment"),
+    }
+
+    def __init__(self, batch_size: int = None):
+        self.session = get_session()
+        self.transaction_service = AccountTransactionService()
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+    def post_documents(
+        self,
+        documents: List,
+        dry_run: bool = False,
+        create_journals: bool = True,
+        post_journals: bool = False,
+    ) -> Dict:
+        """
+        Fatura, satınalma faturası, tahsilat ve ödemeleri toplu olarak cariye işle
+
+        Args:
+            documents: Invoice / PurchaseInvoice / Receipt / Payment nesneleri
+            dry_run: True ise yazmadan sadece bakiye etkisini hesapla
+            create_journals: Yevmiye fişlerini de oluştur
+            post_journals: Yevmiye fişlerini doğrudan deftere işle (POSTED)
+
+        Returns:
+            Dict: İşlenen/atlanan belge sayıları ve bakiye etkisi
+        """
+        specs = [self._document_to_spec(doc) for doc in documents]
+        specs = self._skip_already_posted(specs)
+        skipped = len(documents) - len(specs)
+
+        if create_journals:
+            self._resolve_journal_lines(specs)
+
+        result = self._balance_effect(specs)
+        result["skipped"] = skipped
+        result["dry_run"] = dry_run
+        result["transaction_ids"] = []
+
+        if dry_run:
+            return result
+
+        for start in range(0, len(specs), self.batch_size):
+            batch = specs[start : start + self.batch_size]
+            result["transaction_ids"].extend(
+                self._post_batch(batch, create_journals, post_journals)
+            )
+
+        return result
+
+    def post_pending(
+        self,
+        date_from: date = None,
+        date_to: date = None,
+        dry_run: bool = False,
+        **kwargs,
+    ) -> Dict:
+        """Henüz cariye işlenmemiş tüm belgeleri (ay sonu) toplu işle"""
+        from database.models.purchasing import PurchaseInvoice, PurchaseInvoiceStatus
+
+        sources = [
+            (
+                Invoice,
+                Invoice.invoice_date,
+                AccountTransaction.invoice_id,
+                Invoice.status.in_(
+                    [InvoiceStatus.ISSUED, InvoiceStatus.PARTIAL, InvoiceStatus.OVERDUE]
+                ),
+            ),
+            (
+                PurchaseInvoice,
+                PurchaseInvoice.invoice_date,
+                AccountTransaction.purchase_invoice_id,
+                PurchaseInvoice.status.in_(
+                    [
+                        PurchaseInvoiceStatus.RECEIVED,
+                        PurchaseInvoiceStatus.PARTIAL,
+                        PurchaseInvoiceStatus.OVERDUE,
+                    ]
+                ),
+            ),
+            (
+                Receipt,
+                Receipt.receipt_date,
+                AccountTransaction.receipt_id,
+                Receipt.status == PaymentStatus.COMPLETED,
+            ),
+            (
+                Payment,
+                Payment.payment_date,
+                AccountTransaction.payment_id,
+                Payment.status == PaymentStatus.COMPLETED,
+            ),
+        ]
+
+        documents = []
+        for model, date_column, fk_column, status_filter in sources:
+            posted = (
+                self.session.query(AccountTransaction.id)
+                .filter(fk_column == model.id, AccountTransaction.is_active == True)
+                .exists()
+            )
+            query = self.session.query(model).filter(
+                status_filter, model.is_active == True, ~posted
+            )
+            if date_from:
+                query = query.filter(date_column >= date_from)
+            if date_to:
+                query = query.filter(date_column <= date_to)
+            documents.extend(query.order_by(date_column, model.id).all())
+
+        return self.post_documents(documents, dry_run=dry_run, **kwargs)
+
+    def _document_to_spec(self, doc) -> Dict:
+        """Kaynak belgeyi cari hareket tanımına çevir"""
+        from database.models.purchasing import PurchaseInvoice
+
+        spec = {
+            "customer_id": None,
+            "supplier_id": None,
+            "payment_method": None,
+            "reference_no": None,
+            "debit": Decimal(0),
+            "credit": Decimal(0),
+            "source_id": doc.id,
+        }
+
+        if isinstance(doc, Invoice):
+            amount = doc.total or Decimal(0)
+            spec.update(
+                transaction_type=TransactionType.INVOICE,
+                transaction_date=doc.invoice_date,
+                customer_id=doc.customer_id,
+                debit=amount,
+                document_no=doc.invoice_no,
+                description=f"Fatura: {doc.invoice_no}",
+            )
+        elif isinstance(doc, PurchaseInvoice):
+            amount = doc.total or Decimal(0)
+            spec.update(
+                transaction_type=TransactionType.PURCHASE_INVOICE,
+                transaction_date=doc.invoice_date,
+                supplier_id=doc.supplier_id,
+                credit=amount,
+                document_no=doc.invoice_no,
+                description=f"Satınalma Faturası: {doc.invoice_no}",
+            )
+        elif isinstance(doc, Receipt):
+            spec.update(
+                transaction_type=TransactionType.RECEIPT,
+                transaction_date=doc.receipt_date,
+                customer_id=doc.customer_id,
+                credit=doc.amount,
+                payment_method=doc.payment_method,
+                reference_no=doc.check_no,
+                document_no=doc.receipt_no,
+                description=f"Tahsilat: {doc.receipt_no}",
+            )
+        elif isinstance(doc, Payment):
+            spec.update(
+                transaction_type=TransactionType.PAYMENT,
+                transaction_date=doc.payment_date,
+                supplier_id=doc.supplier_id,
+                debit=doc.amount,
+                payment_method=doc.payment_method,
+                reference_no=doc.check_no,
+                document_no=doc.payment_no,
+                description=f"Ödeme: {doc.payment_no}",
+            )
+        else:
+            raise ValueError(f"Desteklenmeyen belge tipi: {type(doc).__name__}")
+
+        return spec
+
+    def _skip_already_posted(self, specs: List[Dict]) -> List[Dict]:
+        """Zaten cari hareketi olan belgeleri ayıkla (belge tipi başına tek sorgu)"""
+        posted = set()
+        for transaction_type, (fk_field, _) in self._REFERENCE_FIELDS.items():
+            ids = [s["source_id"] for s in specs if s["transaction_type"] == transaction_type]
+            if not ids:
+                continue
+            fk_column = getattr(AccountTransaction, fk_field)
+            for start in range(0, len(ids), self.batch_size):
+                rows = (
+                    self.session.query(fk_column)
+                    .filter(
+                        fk_column.in_(ids[start : start + self.batch_size]),
+                        AccountTransaction.is_active == True,
+                    )
+                    .all()
+                )
+                posted.update((transaction_type, row[0]) for row in rows)
+
+        return [
+            s for s in specs if (s["transaction_type"], s["source_id"]) not in posted
+        ]
+
+    def _resolve_journal_lines(self, specs: List[Dict]):
+        """Yevmiye satırlarını üret ve hesap kodlarını ID'ye çöz (yazmadan önce)"""
+        from modules.accounting.services import ChartOfAccountsCache
+
+        for spec in specs:
+            lines = AccountTransactionService.build_journal_lines(
+                spec["transaction_type"],
+                spec["debit"],
+                spec["credit"],
+                spec["payment_method"],
+            )
+            for line in lines:
+                account_id = ChartOfAccountsCache.resolve_code(
+                    self.session, line.pop("account_code")
+                )
+                line["account_id"] = account_id
+                line["account_code"] = ChartOfAccountsCache.get(
+                    self.session, account_id
+                )["code"]
+            spec["journal_lines"] = lines
+
+    def _balance_effect(self, specs: List[Dict]) -> Dict:
+        """Belgelerin cari ve hesap bakiyelerine etkisi"""
+        customers: Dict[int, Decimal] = {}
+        suppliers: Dict[int, Decimal] = {}
+        accounts: Dict[str, Dict[str, Decimal]] = {}
+
+        for spec in specs:
+            if spec["customer_id"]:
+                customers[spec["customer_id"]] = (
+                    customers.get(spec["customer_id"], Decimal(0))
+                    + spec["debit"]
+                    - spec["credit"]
+                )
+            if spec["supplier_id"]:
+                suppliers[spec["supplier_id"]] = (
+                    suppliers.get(spec["supplier_id"], Decimal(0))
+                    + spec["credit"]
+                    - spec["debit"]
+                )
+            for line in spec.get("journal_lines", []):
+                totals = accounts.setdefault(
+                    line["account_code"],
+                    {"debit": Decimal(0), "credit": Decimal(0)},
+                )
+                totals["debit"] += line["debit"]
+                totals["credit"] += line["credit"]
+
+        return {
+            "documents": len(specs),
+            "total_debit": sum((s["debit"] for s in specs), Decimal(0)),
+            "total_credit": sum((s["credit"] for s in specs), Decimal(0)),
+            "customers": customers,
+            "suppliers": suppliers,
+            "accounts": accounts,
+        }
+
+    def _post_batch(
+        self, specs: List[Dict], create_journals: bool, post_journals: bool
+    ) -> List[int]:
+        """Bir partiyi tek transaction'da toplu INSERT ile yaz"""
+        from modules.accounting.services import AccountingService
+        from database.models.accounting import (
+            JournalEntry,
+            JournalEntryLine,
+            JournalEntryStatus,
+        )
+
+        try:
+            transaction_nos = self.transaction_service.allocate_transaction_numbers(
+                len(specs)
+            )
+
+            # 1. Yevmiye fişleri
+            journal_ids: Dict[str, int] = {}
+            journal_specs = [s for s in specs if s.get("journal_lines")]
+            if create_journals and journal_specs:
+                accounting = AccountingService()
+                entry_nos = accounting.allocate_journal_numbers(len(journal_specs))
+                now = datetime.now()
+                journal_rows = []
+                for spec, entry_no in zip(journal_specs, entry_nos):
+                    spec["entry_no"] = entry_no
+                    _, reference_type = self._REFERENCE_FIELDS[
+                        spec["transaction_type"]
+                    ]
+                    journal_rows.append(
+                        {
+                            "entry_no": entry_no,
+                            "entry_date": spec["transaction_date"],
+                            "description": spec["description"],
+                            "reference_type": reference_type,
+                            "reference_id": spec["source_id"],
+                            "reference_no": spec["document_no"],
+                            "status": (
+                                JournalEntryStatus.POSTED
+                                if post_journals
+                                else JournalEntryStatus.DRAFT
+                            ),
+                            "posted_at": now if post_journals else None,
+                        }
+                    )
+                self.session.execute(insert(JournalEntry), journal_rows)
+                journal_ids = dict(
+                    self.session.query(JournalEntry.entry_no, JournalEntry.id)
+                    .filter(JournalEntry.entry_no.in_(entry_nos))
+                    .all()
+                )
+
+                line_rows = []
+                for spec in journal_specs:
+                    journal_id = journal_ids[spec["entry_no"]]
+                    for order, line in enumerate(spec["journal_lines"]):
+                        line_rows.append(
+                            {
+                                "journal_entry_id": journal_id,
+                                "account_id": line["account_id"],
+                                "debit": line["debit"],
+                                "credit": line["credit"],
+                                "line_order": order,
+                            }
+                        )
+                self.session.execute(insert(JournalEntryLine), line_rows)
+
+            # 2. Cari hareketler (yevmiyeye bağlı olarak)
+            transaction_rows = []
+            for spec, transaction_no in zip(specs, transaction_nos):
+                fk_field, _ = self._REFERENCE_FIELDS[spec["transaction_type"]]
+                # Tüm satırlar aynı kolon setine sahip olmalı (executemany)
+                references = {field: None for field, _ in self._REFERENCE_FIELDS.values()}
+                references[fk_field] = spec["source_id"]
+                transaction_rows.append(
+                    {
+                        "transaction_no": transaction_no,
+                        "transaction_date": spec["transaction_date"],
+                        "transaction_type": spec["transaction_type"],
+                        "customer_id": spec["customer_id"],
+                        "supplier_id": spec["supplier_id"],
+                        **references,
+                        "journal_entry_id": journal_ids.get(spec.get("entry_no")),
+                        "debit": spec["debit"],
+                        "credit": spec["credit"],
+                        "payment_method": spec["payment_method"],
+                        "reference_no": spec["reference_no"],
+                        "description": spec["description"],
+                    }
+                )
+            self.session.execute(insert(AccountTransaction), transaction_rows)
+
+            # Toplu INSERT ORM event'lerini atladığı için cari defteri burada güncelle
+            effect = self._balance_effect(specs)
+            deltas = {}
+            for customer_id, amount in effect["customers"].items():
+                deltas[("customer", customer_id)] = [amount, Decimal(0), Decimal(0)]
+            for supplier_id, amount in effect["suppliers"].items():
+                deltas[("supplier", supplier_id)] = [amount, Decimal(0), Decimal(0)]
+            counterparty_ledger.apply_deltas(self.session, deltas)
+            transaction_ids = [
+                row[0]
+                for row in self.session.query(AccountTransaction.id)
+                .filter(AccountTransaction.transaction_no.in_(transaction_nos))
+                .order_by(AccountTransaction.transaction_no)
+                .all()
+            ]
+
+            self.session.commit()
+            return transaction_ids
+
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def close(self):
+        if self.session:
+            self.session.close()
@@ -2,24 +2,39 @@
 Akıllı İş - Stok Modülü
 """
 
-from .module import InventoryModule
 from .services import (
     ItemService,
     UnitService,
     CategoryService,
     WarehouseService,
     StockMovementService,
+    StockCountService,
+    StockValuationService,
+    StockReplayService,
 )
-from .views import (
-    StockListPage,
-    StockFormPage,
-    WarehouseModule,
-    MovementModule,
-    CategoryModule,
-    StockReportsModule,
-    StockCountModule,
-    UnitModule,
-)
+
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "InventoryModule": ".module",
+    "StockListPage": ".views",
+    "StockFormPage": ".views",
+    "WarehouseModule": ".views",
+    "MovementModule": ".views",
+    "CategoryModule": ".views",
+    "StockReportsModule": ".views",
+    "StockCountModule": ".views",
+    "UnitModule": ".views",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     "InventoryModule",
@@ -28,6 +43,9 @@ __all__ = [
     "CategoryService",
     "WarehouseService",
     "StockMovementService",
+    "StockCountService",
+    "StockValuationService",
+    "StockReplayService",
     "StockListPage",
     "StockFormPage",
     "WarehouseModule",
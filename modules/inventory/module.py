@@ -5,7 +5,8 @@ Akıllı İş - Stok Modülü Ana Widget
 from PyQt6.QtWidgets import QWidget, QStackedWidget, QVBoxLayout, QMessageBox
 from PyQt6.QtCore import pyqtSignal
 
-from .services import ItemService, UnitService, CategoryService
+from core.reference_data import reference_cache
+from .services import ItemService
 from .views import StockListPage, StockFormPage
 
 
@@ -15,8 +16,6 @@ class InventoryModule(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.item_service = None
-        self.unit_service = None
-        self.category_service = None
         self.current_item = None
         self.setup_ui()
         self.load_data()
@@ -42,22 +41,12 @@ class InventoryModule(QWidget):
         """Servisleri al (lazy loading)"""
         if self.item_service is None:
             self.item_service = ItemService()
-        if self.unit_service is None:
-            self.unit_service = UnitService()
-        if self.category_service is None:
-            self.category_service = CategoryService()
             
     def _close_services(self):
         """Servisleri kapat"""
         if self.item_service:
             self.item_service.close()
             self.item_service = None
-        if self.unit_service:
-            self.unit_service.close()
-            self.unit_service = None
-        if self.category_service:
-            self.category_service.close()
-            self.category_service = None
             
     def load_data(self):
         """Verileri yükle"""
@@ -117,11 +106,11 @@ class InventoryModule(QWidget):
             form.cancelled.connect(self.show_list)
             
             # Birimleri yükle
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             form.load_units(units)
             
             # Kategorileri yükle
-            categories = self.category_service.get_all()
+            categories = reference_cache.categories()
             form.load_categories(categories)
             
             # Otomatik kod üretme
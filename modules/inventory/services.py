@@ -9,16 +9,18 @@ KRİTİK DÜZELTMELER:
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
-from sqlalchemy import func, and_
+from typing import Optional, List, Dict, Iterable
+from sqlalchemy import func, and_, case, insert, literal, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from database import get_session
 from database.models import (
-    Item, Unit, Warehouse, ItemCategory,
-    StockMovement, StockMovementType, StockBalance
+    Item, Unit, Warehouse, ItemCategory, ItemBarcode,
+    StockMovement, StockMovementType, StockBalance,
+    StockCount, StockCountLine, StockValuation,
 )
+from modules.inventory.valuation import stock_valuation, status_case
 
 # Alias for backward compatibility
 Category = ItemCategory
@@ -674,40 +676,14 @@ class StockMovementService(ServiceBase):
         """
         Bakiyeyi hareketlerden yeniden hesapla (reconcile)
         Bakiye tutarsızlığı şüphesi varsa kullanılır.
+
+        Hesaplama StockReplayService ile yapılır (ağırlıklı ortalama maliyet).
         """
-        # Tüm hareketleri al
-        movements = self.session.query(StockMovement).filter(
-            StockMovement.item_id == item_id,
-            (StockMovement.from_warehouse_id == warehouse_id) |
-            (StockMovement.to_warehouse_id == warehouse_id)
-        ).order_by(StockMovement.movement_date).all()
-        
-        quantity = Decimal(0)
-        total_value = Decimal(0)
-        
-        for m in movements:
-            if m.to_warehouse_id == warehouse_id:
-                # Giriş
-                quantity += m.quantity
-                total_value += m.quantity * m.unit_price
-            if m.from_warehouse_id == warehouse_id:
-                # Çıkış
-                quantity -= m.quantity
-                total_value -= m.quantity * m.unit_price
-        
-        # Bakiyeyi güncelle veya oluştur
+        StockReplayService().rebuild(item_ids=[item_id], warehouse_id=warehouse_id)
+
         balance = self.get_balance(item_id, warehouse_id)
-        if not balance:
-            balance = StockBalance(
-                item_id=item_id,
-                warehouse_id=warehouse_id,
-            )
-            self.session.add(balance)
-        
-        balance.quantity = max(Decimal(0), quantity)
-        balance.unit_cost = total_value / quantity if quantity > 0 else Decimal(0)
-        
-        self.session.commit()
+        if balance:
+            self.session.refresh(balance)
         return balance
 
     def reserve_stock(
@@ -804,3 +780,1176 @@ class StockMovementService(ServiceBase):
 
         self.session.commit()
         return True
+
+
+class StockCountService(ServiceBase):
+    """
+    Stok sayım belgesi servisi
+
+    Sayım başlatıldığında depo bakiyeleri stock_count_lines tablosuna tek
+    INSERT ... SELECT ile dondurulur. Sayılan miktarlar el terminali veya
+    CSV'den parça parça işlenir ve her parça kaydedildiği için yarım kalan
+    sayıma devam edilebilir. Farklar SQL ile hesaplanır ve tüm sayım
+    fazlası/eksiği hareketleri tek transaction'da işlenir.
+    """
+
+    CHUNK_SIZE = 1000
+    OPEN_STATUSES = ("draft", "in_progress", "completed")
+
+    def __init__(self, allow_negative_stock: bool = False):
+        super().__init__()
+        self.allow_negative_stock = allow_negative_stock
+
+    # === Belge ===
+
+    def get_all(self, status: str = None) -> List[dict]:
+        """Sayım listesi (satır sayıları ve fark tutarı SQL ile)"""
+        counted = StockCountLine.counted_quantity != None
+        diff_amount = case(
+            (
+                counted,
+                (StockCountLine.counted_quantity - StockCountLine.system_quantity)
+                * func.coalesce(StockCountLine.unit_cost, 0),
+            ),
+            else_=0,
+        )
+        query = (
+            self.session.query(
+                StockCount,
+                Warehouse.name,
+                func.count(StockCountLine.id),
+                func.count(StockCountLine.counted_quantity),
+                func.coalesce(func.sum(diff_amount), 0),
+            )
+            .outerjoin(Warehouse, Warehouse.id == StockCount.warehouse_id)
+            .outerjoin(StockCountLine, StockCountLine.stock_count_id == StockCount.id)
+            .group_by(StockCount.id, Warehouse.name)
+            .order_by(StockCount.count_date.desc())
+        )
+        if status:
+            query = query.filter(StockCount.status == status)
+
+        return [
+            self._to_dict(count, warehouse_name, item_count, counted_items, amount)
+            for count, warehouse_name, item_count, counted_items, amount in query.all()
+        ]
+
+    def get_by_id(self, count_id: int) -> Optional[StockCount]:
+        return self.session.query(StockCount).filter(StockCount.id == count_id).first()
+
+    def get_count_data(self, count_id: int) -> Optional[dict]:
+        """Form için başlık ve satırlar"""
+        count = self.get_by_id(count_id)
+        if not count:
+            return None
+        summary = self.get_summary(count_id)
+        data = self._to_dict(
+            count,
+            count.warehouse.name if count.warehouse else "-",
+            summary["item_count"],
+            summary["counted_items"],
+            summary["difference_amount"],
+        )
+        data["lines"] = self.get_lines(count_id)
+        return data
+
+    @staticmethod
+    def _to_dict(count, warehouse_name, item_count, counted_items, amount) -> dict:
+        return {
+            "id": count.id,
+            "count_no": count.count_no,
+            "count_date": count.count_date,
+            "warehouse_id": count.warehouse_id,
+            "warehouse_name": warehouse_name or "-",
+            "category_id": count.category_id,
+            "include_zero": count.include_zero,
+            "description": count.description,
+            "status": count.status,
+            "item_count": item_count or 0,
+            "counted_items": counted_items or 0,
+            "difference_amount": float(amount or 0),
+        }
+
+    def generate_count_no(self) -> str:
+        """Sıradaki sayım numarası (SYM000001)"""
+        last = 0
+        for (count_no,) in self.session.query(StockCount.count_no).filter(
+            StockCount.count_no.like("SYM%")
+        ):
+            try:
+                last = max(last, int(count_no[3:]))
+            except ValueError:
+                continue
+        return f"SYM{last + 1:06d}"
+
+    def create(
+        self,
+        warehouse_id: int,
+        count_date: datetime = None,
+        description: str = None,
+        count_no: str = None,
+        category_id: int = None,
+        include_zero: bool = False,
+    ) -> StockCount:
+        """Sayım belgesi oluştur ve sistem miktarlarını dondur"""
+        try:
+            count = StockCount(
+                count_no=count_no or self.generate_count_no(),
+                count_date=count_date or datetime.now(),
+                warehouse_id=warehouse_id,
+                category_id=category_id,
+                include_zero=include_zero,
+                description=description,
+                status="draft",
+            )
+            self.session.add(count)
+            self.session.flush()
+
+            self._freeze(count)
+            self.session.commit()
+            return count
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def _balance_subquery(self, warehouse_id: int):
+        """Depo bazında ürün miktarı ve ağırlıklı ortalama maliyet"""
+        return (
+            select(
+                StockBalance.item_id.label("item_id"),
+                func.sum(StockBalance.quantity).label("quantity"),
+                (
+                    func.sum(StockBalance.quantity * StockBalance.unit_cost)
+                    / func.nullif(func.sum(StockBalance.quantity), 0)
+                ).label("unit_cost"),
+            )
+            .where(StockBalance.warehouse_id == warehouse_id)
+            .group_by(StockBalance.item_id)
+            .subquery()
+        )
+
+    def _freeze(self, count: StockCount) -> int:
+        """Depo bakiyelerini sayım satırlarına INSERT ... SELECT ile kopyala"""
+        balances = self._balance_subquery(count.warehouse_id)
+        now = datetime.utcnow()
+        quantity = func.coalesce(balances.c.quantity, 0)
+
+        source = (
+            select(
+                literal(count.id),
+                Item.id,
+                quantity,
+                func.coalesce(
+                    func.nullif(balances.c.unit_cost, 0), Item.purchase_price, 0
+                ),
+                literal(now),
+                literal(now),
+                literal(True),
+            )
+            .select_from(Item)
+            .outerjoin(balances, balances.c.item_id == Item.id)
+            .where(Item.is_active == True)
+        )
+        if count.category_id:
+            source = source.where(Item.category_id == count.category_id)
+        if not count.include_zero:
+            source = source.where(quantity != 0)
+
+        result = self.session.execute(
+            insert(StockCountLine).from_select(
+                [
+                    "stock_count_id",
+                    "item_id",
+                    "system_quantity",
+                    "unit_cost",
+                    "created_at",
+                    "updated_at",
+                    "is_active",
+                ],
+                source,
+            )
+        )
+        count.frozen_at = now
+        return result.rowcount
+
+    def update_header(self, count_id: int, **kwargs) -> Optional[StockCount]:
+        count = self.get_by_id(count_id)
+        if not count:
+            return None
+        for key in ("count_no", "count_date", "description"):
+            if kwargs.get(key) is not None:
+                setattr(count, key, kwargs[key])
+        self.session.commit()
+        return count
+
+    def _get_open_count(self, count_id: int) -> StockCount:
+        count = self.get_by_id(count_id)
+        if not count:
+            raise ValueError("Sayım bulunamadı!")
+        if count.status not in self.OPEN_STATUSES:
+            raise ValueError(f"{count.count_no} sayımı değiştirilemez (durum: {count.status})")
+        return count
+
+    def complete(self, count_id: int) -> StockCount:
+        count = self._get_open_count(count_id)
+        count.status = "completed"
+        self.session.commit()
+        return count
+
+    def cancel(self, count_id: int) -> StockCount:
+        count = self._get_open_count(count_id)
+        count.status = "cancelled"
+        self.session.commit()
+        return count
+
+    def delete(self, count_id: int) -> bool:
+        count = self.get_by_id(count_id)
+        if not count:
+            return False
+        if count.status == "applied":
+            raise ValueError("Uygulanmış sayım silinemez!")
+        self.session.delete(count)
+        self.session.commit()
+        return True
+
+    # === Satırlar ===
+
+    def get_lines(
+        self,
+        count_id: int,
+        only_counted: bool = False,
+        only_differences: bool = False,
+        offset: int = 0,
+        limit: int = None,
+    ) -> List[dict]:
+        """Sayım satırları (sayfalı okunabilir)"""
+        query = (
+            self.session.query(
+                StockCountLine.id,
+                StockCountLine.item_id,
+                Item.code,
+                Item.name,
+                Unit.code,
+                StockCountLine.system_quantity,
+                StockCountLine.counted_quantity,
+                StockCountLine.unit_cost,
+                StockCountLine.note,
+            )
+            .join(Item, Item.id == StockCountLine.item_id)
+            .outerjoin(Unit, Unit.id == Item.unit_id)
+            .filter(StockCountLine.stock_count_id == count_id)
+        )
+        if only_counted or only_differences:
+            query = query.filter(StockCountLine.counted_quantity != None)
+        if only_differences:
+            query = query.filter(
+                StockCountLine.counted_quantity != StockCountLine.system_quantity
+            )
+        query = query.order_by(Item.code).offset(offset)
+        if limit:
+            query = query.limit(limit)
+
+        return [
+            {
+                "line_id": row[0],
+                "item_id": row[1],
+                "item_code": row[2],
+                "item_name": row[3],
+                "unit_code": row[4] or "ADET",
+                "system_quantity": row[5] or Decimal(0),
+                "counted_quantity": row[6],
+                "unit_cost": row[7] or Decimal(0),
+                "note": row[8] or "",
+            }
+            for row in query.all()
+        ]
+
+    def save_lines(self, count_id: int, lines: List[dict]) -> int:
+        """Formdaki sayılan miktar ve notları toplu kaydet"""
+        count = self._get_open_count(count_id)
+        existing = dict(
+            self.session.query(StockCountLine.item_id, StockCountLine.id).filter(
+                StockCountLine.stock_count_id == count_id
+            )
+        )
+        now = datetime.utcnow()
+        updates = [
+            {
+                "id": existing[line["item_id"]],
+                "counted_quantity": line.get("counted_quantity"),
+                "note": line.get("note") or None,
+                "counted_at": now if line.get("counted_quantity") is not None else None,
+            }
+            for line in lines
+            if line.get("item_id") in existing
+        ]
+        try:
+            if updates:
+                self.session.execute(update(StockCountLine), updates)
+            if count.status == "draft" and any(
+                u["counted_quantity"] is not None for u in updates
+            ):
+                count.status = "in_progress"
+            self.session.commit()
+            return len(updates)
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def _resolve_codes(self, codes) -> Dict[str, tuple]:
+        """Stok kodu / barkod -> (item_id, çarpan)"""
+        codes = list(codes)
+        resolved: Dict[str, tuple] = {}
+        for barcode, item_id, multiplier in self.session.query(
+            ItemBarcode.barcode, ItemBarcode.item_id, ItemBarcode.quantity
+        ).filter(ItemBarcode.barcode.in_(codes)):
+            resolved[barcode] = (item_id, Decimal(str(multiplier or 1)))
+        for barcode, item_id in self.session.query(Item.barcode, Item.id).filter(
+            Item.barcode.in_(codes)
+        ):
+            resolved[barcode] = (item_id, Decimal(1))
+        for code, item_id in self.session.query(Item.code, Item.id).filter(
+            Item.code.in_(codes)
+        ):
+            resolved[code] = (item_id, Decimal(1))
+        return resolved
+
+    def record_entries(
+        self, count_id: int, entries: Iterable, mode: str = "add"
+    ) -> dict:
+        """
+        El terminali / CSV girişlerini parça parça işle
+
+        Args:
+            count_id: Sayım ID
+            entries: (stok kodu veya barkod, miktar) ikilileri; üreteç olabilir
+            mode: "add" mevcut sayılana ekler, "set" ilk görüldüğünde üzerine yazar
+
+        Returns:
+            dict: processed, updated, added, unknown (bilinmeyen kodlar)
+        """
+        count = self._get_open_count(count_id)
+        summary = {"processed": 0, "updated": 0, "added": 0, "unknown": []}
+        seen = set()
+
+        chunk = []
+        for entry in entries:
+            chunk.append(entry)
+            if len(chunk) >= self.CHUNK_SIZE:
+                self._record_chunk(count, chunk, mode, seen, summary)
+                chunk = []
+        if chunk:
+            self._record_chunk(count, chunk, mode, seen, summary)
+        return summary
+
+    def _record_chunk(self, count: StockCount, chunk, mode, seen, summary):
+        resolved = self._resolve_codes({str(code).strip() for code, _ in chunk})
+
+        totals: Dict[int, Decimal] = {}
+        for code, qty in chunk:
+            summary["processed"] += 1
+            match = resolved.get(str(code).strip())
+            if not match:
+                summary["unknown"].append(str(code))
+                continue
+            item_id, multiplier = match
+            totals[item_id] = totals.get(item_id, Decimal(0)) + Decimal(str(qty)) * multiplier
+
+        if not totals:
+            return
+
+        lines = {
+            item_id: (line_id, counted)
+            for line_id, item_id, counted in self.session.query(
+                StockCountLine.id, StockCountLine.item_id, StockCountLine.counted_quantity
+            ).filter(
+                StockCountLine.stock_count_id == count.id,
+                StockCountLine.item_id.in_(list(totals)),
+            )
+        }
+
+        now = datetime.utcnow()
+        updates = []
+        for item_id, qty in totals.items():
+            if item_id not in lines:
+                continue
+            line_id, counted = lines[item_id]
+            if mode == "add" or item_id in seen:
+                qty = (counted or Decimal(0)) + qty
+            updates.append({"id": line_id, "counted_quantity": qty, "counted_at": now})
+        seen.update(totals)
+
+        # Dondurulmuş listede olmayan ürünler: güncel bakiye sistem miktarı olur
+        new_items = [item_id for item_id in totals if item_id not in lines]
+        inserts = []
+        if new_items:
+            balances = self._balance_subquery(count.warehouse_id)
+            query = (
+                self.session.query(
+                    Item.id, Item.category_id, balances.c.quantity, balances.c.unit_cost,
+                    Item.purchase_price,
+                )
+                .outerjoin(balances, balances.c.item_id == Item.id)
+                .filter(Item.id.in_(new_items))
+            )
+            for item_id, category_id, qty, unit_cost, purchase_price in query:
+                if count.category_id and category_id != count.category_id:
+                    summary["unknown"].append(str(item_id))
+                    continue
+                inserts.append(
+                    {
+                        "stock_count_id": count.id,
+                        "item_id": item_id,
+                        "system_quantity": qty or Decimal(0),
+                        "counted_quantity": totals[item_id],
+                        "unit_cost": unit_cost or purchase_price or Decimal(0),
+                        "counted_at": now,
+                    }
+                )
+
+        try:
+            if updates:
+                self.session.execute(update(StockCountLine), updates)
+            if inserts:
+                self.session.execute(insert(StockCountLine), inserts)
+            if count.status == "draft":
+                count.status = "in_progress"
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        summary["updated"] += len(updates)
+        summary["added"] += len(inserts)
+
+    def import_file(self, count_id: int, file_path: str, mode: str = "set") -> dict:
+        """
+        CSV dosyasından sayım sonuçlarını aktar (kod;miktar)
+
+        Dosya satır satır okunur; başlık satırı ve ayraç (; , veya sekme)
+        otomatik algılanır.
+        """
+        import csv
+
+        def rows():
+            with open(file_path, newline="", encoding="utf-8-sig") as f:
+                sample = f.read(4096)
+                f.seek(0)
+                try:
+                    dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+                except csv.Error:
+                    dialect = csv.excel
+                for row in csv.reader(f, dialect):
+                    if len(row) < 2 or not row[0].strip():
+                        continue
+                    try:
+                        qty = Decimal(row[1].strip().replace(",", "."))
+                    except Exception:
+                        continue  # başlık veya hatalı satır
+                    yield row[0].strip(), qty
+
+        return self.record_entries(count_id, rows(), mode=mode)
+
+    # === Farklar ve uygulama ===
+
+    def get_summary(self, count_id: int) -> dict:
+        """Sayım özeti (SQL ile)"""
+        diff = StockCountLine.counted_quantity - StockCountLine.system_quantity
+        row = (
+            self.session.query(
+                func.count(StockCountLine.id),
+                func.count(StockCountLine.counted_quantity),
+                func.coalesce(
+                    func.sum(case((diff > 0, diff * StockCountLine.unit_cost), else_=0)), 0
+                ),
+                func.coalesce(
+                    func.sum(case((diff < 0, diff * StockCountLine.unit_cost), else_=0)), 0
+                ),
+            )
+            .filter(StockCountLine.stock_count_id == count_id)
+            .one()
+        )
+        return {
+            "item_count": row[0],
+            "counted_items": row[1],
+            "surplus_amount": float(row[2]),
+            "shortage_amount": float(row[3]),
+            "difference_amount": float(row[2] + row[3]),
+        }
+
+    def get_variances(self, count_id: int) -> List[dict]:
+        """Sayılan ve sistem miktarı farklı satırlar"""
+        return self.get_lines(count_id, only_differences=True)
+
+    def apply(self, count_id: int) -> dict:
+        """
+        Sayım farklarını tek transaction'da stoklara uygula
+
+        Sayım fazlaları SAYIM_FAZLA (giriş, sayım birim maliyetiyle), eksikler
+        SAYIM_EKSIK (çıkış, mevcut stok maliyetiyle) hareketi olarak işlenir.
+        Bakiye güncellemesi StockMovementService._update_balances ile aynı
+        ağırlıklı ortalama kuralını izler.
+        """
+        try:
+            count = (
+                self.session.query(StockCount)
+                .filter(StockCount.id == count_id)
+                .with_for_update()
+                .first()
+            )
+            if not count:
+                raise ValueError("Sayım bulunamadı!")
+            if count.status not in self.OPEN_STATUSES:
+                raise ValueError(f"{count.count_no} sayımı uygulanamaz (durum: {count.status})")
+
+            warehouse_id = count.warehouse_id
+            variances = (
+                self.session.query(
+                    StockCountLine.item_id,
+                    StockCountLine.counted_quantity - StockCountLine.system_quantity,
+                    StockCountLine.unit_cost,
+                    StockCountLine.note,
+                    Item.code,
+                    Item.name,
+                    Item.unit_id,
+                    Item.purchase_price,
+                )
+                .join(Item, Item.id == StockCountLine.item_id)
+                .filter(
+                    StockCountLine.stock_count_id == count_id,
+                    StockCountLine.counted_quantity != None,
+                    StockCountLine.counted_quantity != StockCountLine.system_quantity,
+                )
+                .all()
+            )
+
+            balances: Dict[int, StockBalance] = {}
+            item_ids = [v[0] for v in variances]
+            for start in range(0, len(item_ids), self.CHUNK_SIZE):
+                for balance in (
+                    self.session.query(StockBalance)
+                    .filter(
+                        StockBalance.warehouse_id == warehouse_id,
+                        StockBalance.item_id.in_(item_ids[start:start + self.CHUNK_SIZE]),
+                    )
+                    .order_by(StockBalance.id)
+                ):
+                    balances.setdefault(balance.item_id, balance)
+
+            now = datetime.now()
+            movements = []
+            new_balances = []
+            surplus = shortage = 0
+            total_amount = Decimal(0)
+
+            for item_id, diff, unit_cost, note, code, name, unit_id, purchase_price in variances:
+                quantity = abs(Decimal(str(diff)))
+                balance = balances.get(item_id)
+
+                if diff > 0:
+                    movement_type = StockMovementType.SAYIM_FAZLA
+                    cost = Decimal(str(unit_cost or 0))
+                    if balance:
+                        new_quantity = balance.quantity + quantity
+                        if new_quantity > 0:
+                            balance.unit_cost = (
+                                balance.quantity * (balance.unit_cost or Decimal(0))
+                                + quantity * cost
+                            ) / new_quantity
+                        balance.quantity = new_quantity
+                    else:
+                        new_balances.append(
+                            {
+                                "item_id": item_id,
+                                "warehouse_id": warehouse_id,
+                                "quantity": quantity,
+                                "unit_cost": cost,
+                            }
+                        )
+                    surplus += 1
+                    description = f"Sayım fazlası: {note or ''}"
+                    from_wh, to_wh = None, warehouse_id
+                else:
+                    movement_type = StockMovementType.SAYIM_EKSIK
+                    available = balance.available_quantity if balance else Decimal(0)
+                    if not self.allow_negative_stock and available < quantity:
+                        raise NegativeStockError(
+                            code, count.warehouse.name if count.warehouse else str(warehouse_id),
+                            available, quantity,
+                        )
+                    if balance and balance.quantity > 0:
+                        cost = balance.unit_cost or Decimal(0)
+                    else:
+                        cost = purchase_price or Decimal(0)
+                    if balance:
+                        balance.quantity -= quantity
+                        if balance.quantity <= 0:
+                            balance.quantity = Decimal(0)
+                    else:
+                        new_balances.append(
+                            {
+                                "item_id": item_id,
+                                "warehouse_id": warehouse_id,
+                                "quantity": -quantity,
+                                "unit_cost": cost,
+                            }
+                        )
+                    shortage += 1
+                    description = f"Sayım eksiği: {note or ''}"
+                    from_wh, to_wh = warehouse_id, None
+
+                total_amount += (quantity if diff > 0 else -quantity) * cost
+                movements.append(
+                    {
+                        "movement_type": movement_type,
+                        "movement_date": now,
+                        "document_type": "stock_count",
+                        "document_no": count.count_no,
+                        "document_date": count.count_date,
+                        "item_id": item_id,
+                        "item_code": code,
+                        "item_name": name,
+                        "from_warehouse_id": from_wh,
+                        "to_warehouse_id": to_wh,
+                        "quantity": quantity,
+                        "unit_id": unit_id,
+                        "unit_price": cost,
+                        "total_price": quantity * cost,
+                        "description": description,
+                    }
+                )
+
+            for start in range(0, len(movements), self.CHUNK_SIZE):
+                self.session.execute(
+                    insert(StockMovement), movements[start:start + self.CHUNK_SIZE]
+                )
+            if new_balances:
+                self.session.execute(insert(StockBalance), new_balances)
+                # Toplu INSERT ORM event'lerini atlar; değerleme özetini elle yenile
+                stock_valuation.refresh_items(
+                    self.session, [b["item_id"] for b in new_balances]
+                )
+
+            count.status = "applied"
+            count.applied_at = datetime.utcnow()
+            self.session.commit()
+
+            return {
+                "movements": len(movements),
+                "surplus": surplus,
+                "shortage": shortage,
+                "amount": float(total_amount),
+            }
+        except Exception:
+            self.session.rollback()
+            raise
+
+
+class StockValuationService(ServiceBase):
+    """
+    Stok değerleme raporları
+
+    Rakamlar stock_valuations özet tablosundan gruplu sorgularla okunur
+    (bkz. modules/inventory/valuation.py). Birim maliyet depolar arası miktar
+    ağırlıklı ortalamadır; maliyeti olmayan ürünlerde alış fiyatı kullanılır.
+    """
+
+    def _item_select(self, category_id: int = None, warehouse_id: int = None, active_only: bool = True):
+        """Ürün bazlı miktar, değer ve durum (tüm ürünler, bakiyesi olmayanlar dahil)"""
+        totals = select(
+            StockValuation.item_id,
+            func.sum(StockValuation.quantity).label("quantity"),
+            func.sum(StockValuation.total_value).label("total_value"),
+        ).group_by(StockValuation.item_id)
+        if warehouse_id:
+            totals = totals.where(StockValuation.warehouse_id == warehouse_id)
+        totals = totals.subquery()
+
+        quantity = func.coalesce(totals.c.quantity, 0)
+        query = (
+            select(
+                Item.id.label("item_id"),
+                Item.category_id,
+                quantity.label("quantity"),
+                func.coalesce(totals.c.total_value, 0).label("total_value"),
+                status_case(quantity).label("status"),
+            )
+            .select_from(Item)
+            .outerjoin(totals, totals.c.item_id == Item.id)
+        )
+        if active_only:
+            query = query.where(Item.is_active == True)
+        if category_id:
+            query = query.where(Item.category_id == category_id)
+        return query
+
+    def get_item_valuations(
+        self, category_id: int = None, warehouse_id: int = None, active_only: bool = True
+    ) -> List[dict]:
+        """Ürün bazlı değerleme satırları (stok raporu formatında)"""
+        items = self._item_select(category_id, warehouse_id, active_only).subquery()
+        rows = self.session.execute(
+            select(
+                Item.code,
+                Item.name,
+                ItemCategory.name.label("category"),
+                Unit.code.label("unit"),
+                Item.min_stock,
+                Item.reorder_quantity,
+                Item.lead_time_days,
+                Item.purchase_price,
+                items.c.quantity,
+                items.c.total_value,
+                items.c.status,
+            )
+            .join(Item, Item.id == items.c.item_id)
+            .outerjoin(ItemCategory, ItemCategory.id == Item.category_id)
+            .outerjoin(Unit, Unit.id == Item.unit_id)
+            .order_by(Item.code)
+        ).all()
+
+        result = []
+        for row in rows:
+            quantity = Decimal(row.quantity or 0)
+            value = Decimal(row.total_value or 0)
+            if quantity > 0 and value > 0:
+                unit_cost = value / quantity
+            else:
+                unit_cost = Decimal(row.purchase_price or 0)
+                value = quantity * unit_cost
+            result.append(
+                {
+                    "code": row.code,
+                    "name": row.name,
+                    "category": row.category or "-",
+                    "unit": row.unit or "",
+                    "quantity": float(quantity),
+                    "min_stock": float(row.min_stock or 0),
+                    "unit_cost": float(unit_cost),
+                    "total_value": float(value),
+                    "status": row.status,
+                    "reorder_qty": float(row.reorder_quantity or 0),
+                    "lead_time": row.lead_time_days or 0,
+                }
+            )
+        return result
+
+    def get_category_valuations(self, warehouse_id: int = None) -> List[dict]:
+        """Kategori bazlı toplamlar ve durum sayıları"""
+        items = self._item_select(warehouse_id=warehouse_id).subquery()
+
+        def status_count(status: str):
+            return func.sum(case((items.c.status == status, 1), else_=0))
+
+        rows = self.session.execute(
+            select(
+                items.c.category_id,
+                ItemCategory.name,
+                func.count(items.c.item_id).label("item_count"),
+                func.sum(items.c.quantity).label("quantity"),
+                func.sum(items.c.total_value).label("total_value"),
+                status_count("low").label("low"),
+                status_count("critical").label("critical"),
+                status_count("out_of_stock").label("out_of_stock"),
+            )
+            .outerjoin(ItemCategory, ItemCategory.id == items.c.category_id)
+            .group_by(items.c.category_id, ItemCategory.name)
+            .order_by(func.sum(items.c.total_value).desc())
+        ).all()
+
+        return [
+            {
+                "category_id": row.category_id,
+                "category": row.name or "-",
+                "item_count": row.item_count or 0,
+                "quantity": float(row.quantity or 0),
+                "total_value": float(row.total_value or 0),
+                "low": int(row.low or 0),
+                "critical": int(row.critical or 0),
+                "out_of_stock": int(row.out_of_stock or 0),
+            }
+            for row in rows
+        ]
+
+    def get_warehouse_valuations(self) -> List[dict]:
+        """Depo bazlı toplamlar"""
+        rows = (
+            self.session.query(
+                StockValuation.warehouse_id,
+                Warehouse.name,
+                func.count(StockValuation.item_id).label("item_count"),
+                func.sum(StockValuation.quantity).label("quantity"),
+                func.sum(StockValuation.total_value).label("total_value"),
+            )
+            .join(Warehouse, Warehouse.id == StockValuation.warehouse_id)
+            .filter(StockValuation.quantity != 0)
+            .group_by(StockValuation.warehouse_id, Warehouse.name)
+            .order_by(Warehouse.name)
+            .all()
+        )
+        return [
+            {
+                "warehouse_id": row.warehouse_id,
+                "warehouse": row.name,
+                "item_count": row.item_count or 0,
+                "quantity": float(row.quantity or 0),
+                "total_value": float(row.total_value or 0),
+            }
+            for row in rows
+        ]
+
+    def get_warehouse_items(self, warehouse_id: int = None) -> List[dict]:
+        """Depo + ürün bazlı değerleme satırları"""
+        query = (
+            self.session.query(
+                StockValuation.warehouse_id,
+                Warehouse.name.label("warehouse"),
+                Item.code,
+                Item.name,
+                Unit.code.label("unit"),
+                StockValuation.quantity,
+                StockValuation.unit_cost,
+                StockValuation.total_value,
+            )
+            .join(Warehouse, Warehouse.id == StockValuation.warehouse_id)
+            .join(Item, Item.id == StockValuation.item_id)
+            .outerjoin(Unit, Unit.id == Item.unit_id)
+            .filter(StockValuation.quantity != 0)
+        )
+        if warehouse_id:
+            query = query.filter(StockValuation.warehouse_id == warehouse_id)
+
+        return [
+            {
+                "warehouse_id": row.warehouse_id,
+                "warehouse": row.warehouse,
+                "code": row.code,
+                "name": row.name,
+                "unit": row.unit or "",
+                "quantity": float(row.quantity or 0),
+                "unit_cost": float(row.unit_cost or 0),
+                "total_value": float(row.total_value or 0),
+            }
+            for row in query.order_by(Warehouse.name, Item.code).all()
+        ]
+
+    def get_report_data(self, category_id: int = None, warehouse_id: int = None) -> dict:
+        """Stok raporu verisi (özet kartlar, ürünler, kritik ürünler ve kırılımlar)"""
+        items = self.get_item_valuations(category_id, warehouse_id)
+        critical_items = [
+            i for i in items if i["status"] in ("out_of_stock", "critical", "low")
+        ]
+
+        return {
+            "total_items": len(items),
+            "total_value": sum(i["total_value"] for i in items),
+            "low_stock": sum(1 for i in items if i["status"] in ("low", "critical")),
+            "out_of_stock": sum(1 for i in items if i["status"] == "out_of_stock"),
+            "items": items,
+            "critical_items": critical_items,
+            "categories": self.get_category_valuations(warehouse_id),
+            "warehouses": self.get_warehouse_valuations(),
+            "warehouse_items": self.get_warehouse_items(),
+        }
+
+    def refresh(self) -> int:
+        """Özet tabloyu tüm bakiyelerden yeniden oluştur"""
+        return stock_valuation.refresh_all(self.session)
+
+
+class StockReplayService(ServiceBase):
+    """
+    Stok hareketi defteri yeniden oynatma (replay) motoru
+
+    stock_movements tablosu ürün ve tarih sırasıyla sunucu taraflı cursor
+    üzerinden akıtılır; her ürün için miktar ve ağırlıklı ortalama maliyet
+    StockMovementService._update_balances ile birebir aynı kurallarla
+    yeniden hesaplanır. Sonuç:
+    - rebuild(): stock_balances ile karşılaştırılır, farklar raporlanır ve
+      toplu UPDATE/INSERT ile düzeltilir
+    - stock_as_of(): belirli bir tarihteki miktar ve değer (veri değiştirmez)
+
+    Not: rebuild() çalışırken yapılan stok hareketleri düzeltmeyi
+    bozabilir; yoğun olmayan saatlerde çalıştırılmalıdır.
+    """
+
+    # Cursor'dan tek seferde çekilen hareket sayısı
+    FETCH_SIZE = 5000
+    # Tek seferde karşılaştırılıp yazılan ürün sayısı
+    CHUNK_SIZE = 500
+    # Maliyet karşılaştırma toleransı (yuvarlama zinciri farkları için)
+    COST_TOLERANCE = Decimal("0.001")
+    PRECISION = Decimal("0.0001")
+
+    def _stream(self, item_ids: Iterable[int] = None, as_of: datetime = None):
+        """
+        Hareketleri ürün bazında gruplayıp akıtır.
+
+        Ayrı bir bağlantıda sunucu taraflı cursor kullanılır; böylece yazma
+        tarafındaki commit'ler okuma cursor'ını kapatmaz.
+
+        Yields:
+            (item_id, {warehouse_id: [quantity, unit_cost]}, hareket sayısı)
+        """
+        query = (
+            select(
+                StockMovement.item_id,
+                StockMovement.from_warehouse_id,
+                StockMovement.to_warehouse_id,
+                StockMovement.quantity,
+                StockMovement.unit_price,
+            )
+            .where(StockMovement.is_active == True)
+            .order_by(
+                StockMovement.item_id, StockMovement.movement_date, StockMovement.id
+            )
+        )
+        if item_ids is not None:
+            query = query.where(StockMovement.item_id.in_(list(item_ids)))
+        if as_of is not None:
+            query = query.where(StockMovement.movement_date <= as_of)
+
+        connection = self.session.get_bind().connect()
+        try:
+            result = connection.execution_options(
+                stream_results=True, yield_per=self.FETCH_SIZE
+            ).execute(query)
+
+            current_item, state, count = None, {}, 0
+            for item_id, from_wh, to_wh, quantity, unit_price in result:
+                if item_id != current_item:
+                    if current_item is not None:
+                        yield current_item, state, count
+                    current_item, state, count = item_id, {}, 0
+                self._apply(
+                    state,
+                    from_wh,
+                    to_wh,
+                    Decimal(quantity or 0),
+                    Decimal(unit_price or 0),
+                )
+                count += 1
+            if current_item is not None:
+                yield current_item, state, count
+        finally:
+            connection.close()
+
+    def _apply(
+        self,
+        state: Dict[int, list],
+        from_warehouse_id: Optional[int],
+        to_warehouse_id: Optional[int],
+        quantity: Decimal,
+        unit_price: Decimal,
+    ):
+        """Tek hareketi depo durumlarına uygular (_update_balances ile aynı)"""
+        movement_cost = unit_price
+
+        if from_warehouse_id:
+            balance = state.get(from_warehouse_id)
+            # Çıkış maliyeti = mevcut stok maliyeti; stok yoksa hareketteki fiyat
+            if balance and balance[0] > 0:
+                movement_cost = balance[1]
+            if balance:
+                balance[0] -= quantity
+                if balance[0] <= 0:
+                    balance[0] = Decimal(0)
+            else:
+                state[from_warehouse_id] = [-quantity, movement_cost]
+
+        if to_warehouse_id:
+            balance = state.get(to_warehouse_id)
+            if balance:
+                new_quantity = balance[0] + quantity
+                if new_quantity > 0:
+                    balance[1] = (
+                        (balance[0] * balance[1] + quantity * movement_cost) / new_quantity
+                    ).quantize(self.PRECISION)
+                balance[0] = new_quantity
+            else:
+                state[to_warehouse_id] = [quantity, movement_cost]
+
+    def stock_as_of(
+        self, as_of: datetime, item_ids: Iterable[int] = None, warehouse_id: int = None
+    ) -> List[dict]:
+        """
+        Belirli tarihteki stok miktarı, maliyeti ve değeri (veri değiştirmez)
+
+        Returns:
+            List[dict]: {"item_id", "warehouse_id", "quantity", "unit_cost", "value"}
+        """
+        rows = []
+        for item_id, state, _ in self._stream(item_ids, as_of):
+            for wh_id, (quantity, unit_cost) in sorted(state.items()):
+                if warehouse_id and wh_id != warehouse_id:
+                    continue
+                if quantity == 0:
+                    continue
+                rows.append(
+                    {
+                        "item_id": item_id,
+                        "warehouse_id": wh_id,
+                        "quantity": quantity,
+                        "unit_cost": unit_cost,
+                        "value": (quantity * unit_cost).quantize(self.PRECISION),
+                    }
+                )
+        return rows
+
+    def rebuild(
+        self,
+        item_ids: Iterable[int] = None,
+        warehouse_id: int = None,
+        dry_run: bool = False,
+    ) -> dict:
+        """
+        Bakiyeleri hareketlerden yeniden hesaplar ve farkları düzeltir.
+
+        Args:
+            item_ids: Sadece bu ürünler (None = tüm ürünler)
+            warehouse_id: Sadece bu deponun bakiyeleri karşılaştırılır/yazılır
+            dry_run: True ise sadece fark raporu döner
+
+        Returns:
+            dict: {"items", "movements", "drifts", "updated", "inserted", "skipped"}
+        """
+        item_ids = sorted(set(item_ids)) if item_ids is not None else None
+        summary = {
+            "items": 0,
+            "movements": 0,
+            "drifts": [],
+            "updated": 0,
+            "inserted": 0,
+            "skipped": 0,
+        }
+
+        seen = set()
+        buffer: Dict[int, Dict[int, list]] = {}
+        for item_id, state, count in self._stream(item_ids):
+            seen.add(item_id)
+            buffer[item_id] = state
+            summary["items"] += 1
+            summary["movements"] += count
+            if len(buffer) >= self.CHUNK_SIZE:
+                self._reconcile_chunk(buffer, warehouse_id, dry_run, summary)
+                buffer = {}
+
+        # Hiç hareketi olmayan ama bakiyesi bulunan ürünler
+        orphan_query = self.session.query(StockBalance.item_id).filter(
+            StockBalance.quantity != 0
+        )
+        if item_ids is not None:
+            orphan_query = orphan_query.filter(StockBalance.item_id.in_(item_ids))
+        if warehouse_id:
+            orphan_query = orphan_query.filter(StockBalance.warehouse_id == warehouse_id)
+        for (item_id,) in orphan_query.distinct().all():
+            if item_id not in seen:
+                buffer[item_id] = {}
+                if len(buffer) >= self.CHUNK_SIZE:
+                    self._reconcile_chunk(buffer, warehouse_id, dry_run, summary)
+                    buffer = {}
+
+        if buffer:
+            self._reconcile_chunk(buffer, warehouse_id, dry_run, summary)
+
+        return summary
+
+    def _reconcile_chunk(
+        self,
+        states: Dict[int, Dict[int, list]],
+        warehouse_id: Optional[int],
+        dry_run: bool,
+        summary: dict,
+    ):
+        """Ürün grubunun yeniden hesaplanan bakiyelerini kayıtlarla karşılaştır/yaz"""
+        query = self.session.query(
+            StockBalance.id,
+            StockBalance.item_id,
+            StockBalance.warehouse_id,
+            StockBalance.quantity,
+            StockBalance.unit_cost,
+        ).filter(StockBalance.item_id.in_(list(states)))
+        if warehouse_id:
+            query = query.filter(StockBalance.warehouse_id == warehouse_id)
+
+        stored: Dict[tuple, list] = {}
+        for row in query.order_by(StockBalance.id).all():
+            stored.setdefault((row.item_id, row.warehouse_id), []).append(row)
+
+        keys = set(stored)
+        for item_id, state in states.items():
+            for wh_id in state:
+                if not warehouse_id or wh_id == warehouse_id:
+                    keys.add((item_id, wh_id))
+
+        updates, inserts, changed_items = [], [], set()
+        for item_id, wh_id in sorted(keys):
+            rows = stored.get((item_id, wh_id), [])
+            stored_qty = sum((Decimal(r.quantity or 0) for r in rows), Decimal(0))
+            stored_cost = Decimal(rows[0].unit_cost or 0) if rows else Decimal(0)
+
+            replayed = states.get(item_id, {}).get(wh_id)
+            if replayed:
+                quantity, unit_cost = replayed
+            else:
+                # Hareketi olmayan bakiye: miktar sıfırlanır, maliyet korunur
+                quantity, unit_cost = Decimal(0), stored_cost
+            quantity = quantity.quantize(self.PRECISION)
+            unit_cost = Decimal(unit_cost).quantize(self.PRECISION)
+
+            qty_drift = stored_qty.quantize(self.PRECISION) != quantity
+            cost_drift = abs(stored_cost - unit_cost) > self.COST_TOLERANCE and (
+                quantity > 0 or stored_qty > 0
+            )
+            if not rows and quantity == 0:
+                continue
+            if not (qty_drift or cost_drift):
+                continue
+
+            drift = {
+                "item_id": item_id,
+                "warehouse_id": wh_id,
+                "stored_quantity": stored_qty,
+                "replayed_quantity": quantity,
+                "stored_cost": stored_cost,
+                "replayed_cost": unit_cost,
+                "lots": len(rows) > 1,
+            }
+            summary["drifts"].append(drift)
+
+            if len(rows) > 1:
+                # Lot bazlı bölünmüş bakiyeler otomatik düzeltilmez
+                summary["skipped"] += 1
+            elif rows:
+                changed_items.add(item_id)
+                updates.append(
+                    {"id": rows[0].id, "quantity": quantity, "unit_cost": unit_cost}
+                )
+            else:
+                changed_items.add(item_id)
+                inserts.append(
+                    {
+                        "item_id": item_id,
+                        "warehouse_id": wh_id,
+                        "quantity": quantity,
+                        "unit_cost": unit_cost,
+                    }
+                )
+
+        if dry_run or not (updates or inserts):
+            return
+
+        try:
+            if updates:
+                self.session.execute(update(StockBalance), updates)
+            if inserts:
+                self.session.execute(insert(StockBalance), inserts)
+            # Toplu yazım ORM event'lerini atlar; değerleme özetini elle yenile
+            stock_valuation.refresh_items(self.session, changed_items)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        summary["updated"] += len(updates)
+        summary["inserted"] += len(inserts)
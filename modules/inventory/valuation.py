@@ -0,0 +1,256 @@
+"""
+Akıllı İş - Stok Değerleme Defteri
+
+Ürün + depo bazlı stok miktarı, değeri ve ağırlıklı ortalama maliyeti
+stock_valuations tablosunda tutar. SQLAlchemy after_flush event'i ile
+değişen stok bakiyelerinin ürünleri tespit edilir ve bu ürünlerin özet
+satırları aynı transaction içinde tek bir gruplu INSERT ... SELECT ile
+yeniden yazılır. Böylece stok raporu ve dashboard KPI'ları tüm ürün ve
+bakiyeleri dolaşmak yerine özet tablodan toplam okur.
+
+Kullanım:
+    from modules.inventory.valuation import stock_valuation
+    stock_valuation.init_listeners()  # Uygulama başlangıcında çağır
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, case, delete, event, func, literal, select
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm.attributes import get_history
+
+from database.models.inventory import Item, StockBalance, StockValuation
+
+
+# IN listesi başına ürün sayısı
+CHUNK_SIZE = 1000
+
+VALUATION_FIELDS = ("quantity", "total_value", "unit_cost")
+
+
+class StockValuationLedger:
+    """
+    Stok değerleme defteri (after_flush ile ürün bazlı yenileme).
+
+    Toplu INSERT/UPDATE gibi ORM event'lerini atlayan yollar refresh_items()
+    ile özet satırlarını kendisi yeniler. Tutarlılık kontrolü ve tam yeniden
+    oluşturma için check_consistency() / refresh_all() kullanılır.
+    """
+
+    _instance: Optional["StockValuationLedger"] = None
+    _listening: bool = False
+    _enabled: bool = True
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def init_listeners(self) -> None:
+        """SQLAlchemy event listener'ını kaydeder (tekrar çağrılabilir)"""
+        if self._listening:
+            return
+        event.listen(DBSession, "after_flush", self._after_flush)
+        StockValuationLedger._listening = True
+
+    def enable(self) -> None:
+        self._enabled = True
+
+    def disable(self) -> None:
+        """Artımlı yenilemeyi kapatır (toplu veri aktarımı sonrası refresh_all() gerekir)"""
+        self._enabled = False
+
+    # =====================
+    # ARTIMLI GÜNCELLEME
+    # =====================
+
+    def _after_flush(self, session: DBSession, flush_context) -> None:
+        """Flush edilen bakiye değişikliklerinin ürünlerini yeniler"""
+        if not self._enabled:
+            return
+
+        item_ids: Set[int] = set()
+        for obj in session.new:
+            if isinstance(obj, StockBalance):
+                item_ids.add(obj.item_id)
+        for obj in session.dirty:
+            if isinstance(obj, StockBalance) and session.is_modified(obj):
+                item_ids.add(obj.item_id)
+                # Bakiye başka ürüne taşındıysa eski ürün de yenilenir
+                item_ids.update(get_history(obj, "item_id").deleted or ())
+            elif isinstance(obj, Item) and get_history(obj, "category_id").has_changes():
+                item_ids.add(obj.id)
+        for obj in session.deleted:
+            if isinstance(obj, StockBalance):
+                item_ids.add(obj.item_id)
+
+        item_ids.discard(None)
+        if item_ids:
+            self.refresh_items(session, item_ids)
+
+    def refresh_items(self, session: DBSession, item_ids: Iterable[int]) -> int:
+        """
+        Verilen ürünlerin özet satırlarını bakiyelerden yeniden yazar.
+
+        Çağıran transaction'ın içinde çalışır; commit etmez.
+
+        Returns:
+            int: Yazılan özet satırı sayısı
+        """
+        ids = sorted({i for i in item_ids if i is not None})
+        connection = session.connection()
+        table = StockValuation.__table__
+        written = 0
+
+        for start in range(0, len(ids), CHUNK_SIZE):
+            chunk = ids[start : start + CHUNK_SIZE]
+            connection.execute(delete(table).where(table.c.item_id.in_(chunk)))
+            result = connection.execute(self._insert_from_balances(chunk))
+            written += result.rowcount or 0
+
+        return written
+
+    def refresh_all(self, session: DBSession) -> int:
+        """
+        Özet tabloyu tüm bakiyelerden yeniden oluşturur ve commit eder.
+
+        Returns:
+            int: Yazılan özet satırı sayısı
+        """
+        connection = session.connection()
+        try:
+            connection.execute(delete(StockValuation.__table__))
+            result = connection.execute(self._insert_from_balances())
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return result.rowcount or 0
+
+    @staticmethod
+    def _aggregate_select(item_ids: List[int] = None):
+        """Bakiyeleri ürün + depo bazında toplayan SELECT"""
+        quantity = func.coalesce(func.sum(StockBalance.quantity), 0)
+        value = func.coalesce(
+            func.sum(StockBalance.quantity * func.coalesce(StockBalance.unit_cost, 0)),
+            0,
+        )
+        unit_cost = case(
+            (quantity > 0, value / quantity),
+            # Stok yoksa son bilinen maliyet korunur (_update_balances ile aynı)
+            else_=func.coalesce(func.max(StockBalance.unit_cost), 0),
+        )
+
+        query = (
+            select(
+                StockBalance.item_id,
+                StockBalance.warehouse_id,
+                Item.category_id,
+                quantity.label("quantity"),
+                value.label("total_value"),
+                unit_cost.label("unit_cost"),
+            )
+            .join(Item, Item.id == StockBalance.item_id)
+            .group_by(StockBalance.item_id, StockBalance.warehouse_id, Item.category_id)
+        )
+        if item_ids is not None:
+            query = query.where(StockBalance.item_id.in_(item_ids))
+        return query
+
+    def _insert_from_balances(self, item_ids: List[int] = None):
+        aggregate = self._aggregate_select(item_ids).subquery()
+        now = datetime.now()
+        table = StockValuation.__table__
+        return table.insert().from_select(
+            [
+                "item_id",
+                "warehouse_id",
+                "category_id",
+                "quantity",
+                "total_value",
+                "unit_cost",
+                "created_at",
+                "updated_at",
+                "is_active",
+            ],
+            select(
+                aggregate.c.item_id,
+                aggregate.c.warehouse_id,
+                aggregate.c.category_id,
+                aggregate.c.quantity,
+                aggregate.c.total_value,
+                aggregate.c.unit_cost,
+                literal(now),
+                literal(now),
+                literal(True),
+            ),
+        )
+
+    # =====================
+    # KONTROL
+    # =====================
+
+    def check_consistency(self, session: DBSession) -> List[Dict]:
+        """
+        Özet tablo ile stok bakiyeleri arasındaki farkları listeler.
+
+        Returns:
+            List[Dict]: {"item_id", "warehouse_id", "field", "stored", "actual"}
+        """
+        actual = {
+            (row.item_id, row.warehouse_id): row
+            for row in session.execute(self._aggregate_select()).all()
+        }
+        stored = {
+            (row.item_id, row.warehouse_id): row
+            for row in session.query(
+                StockValuation.item_id,
+                StockValuation.warehouse_id,
+                StockValuation.quantity,
+                StockValuation.total_value,
+                StockValuation.unit_cost,
+            ).all()
+        }
+
+        drifts = []
+        for key in set(actual) | set(stored):
+            expected_row = actual.get(key)
+            stored_row = stored.get(key)
+            for field in VALUATION_FIELDS:
+                expected = self._round(getattr(expected_row, field, 0))
+                current = self._round(getattr(stored_row, field, 0))
+                if expected != current:
+                    drifts.append(
+                        {
+                            "item_id": key[0],
+                            "warehouse_id": key[1],
+                            "field": field,
+                            "stored": current,
+                            "actual": expected,
+                        }
+                    )
+        return drifts
+
+    @staticmethod
+    def _round(value) -> Decimal:
+        return Decimal(str(value or 0)).quantize(Decimal("0.0001"))
+
+
+def status_case(quantity):
+    """
+    Stok durumu sınıflandırması (Item.stock_status ile aynı kurallar).
+
+    quantity: ürünün toplam miktarını veren SQL ifadesi
+    """
+    return case(
+        (quantity <= 0, "out_of_stock"),
+        (and_(Item.min_stock > 0, quantity <= Item.min_stock), "critical"),
+        (and_(Item.reorder_point > 0, quantity <= Item.reorder_point), "low"),
+        else_="normal",
+    )
+
+
+# Singleton instance
+stock_valuation = StockValuationLedger()
@@ -6,7 +6,8 @@ from datetime import datetime
 from PyQt6.QtWidgets import QWidget, QStackedWidget, QVBoxLayout, QMessageBox
 from PyQt6.QtCore import pyqtSignal
 
-from modules.inventory.services import StockMovementService, ItemService, WarehouseService
+from core.reference_data import reference_cache
+from modules.inventory.services import StockMovementService, ItemService
 from modules.inventory.views.movement_list import MovementListPage
 from modules.inventory.views.movement_form import MovementFormPage
 
@@ -19,7 +20,6 @@ class MovementModule(QWidget):
         super().__init__(parent)
         self.movement_service = None
         self.item_service = None
-        self.warehouse_service = None
         self.setup_ui()
         self.load_data()
         
@@ -44,8 +44,6 @@ class MovementModule(QWidget):
             self.movement_service = StockMovementService()
         if self.item_service is None:
             self.item_service = ItemService()
-        if self.warehouse_service is None:
-            self.warehouse_service = WarehouseService()
             
     def _close_services(self):
         if self.movement_service:
@@ -54,9 +52,6 @@ class MovementModule(QWidget):
         if self.item_service:
             self.item_service.close()
             self.item_service = None
-        if self.warehouse_service:
-            self.warehouse_service.close()
-            self.warehouse_service = None
             
     def load_data(self):
         try:
@@ -121,7 +116,7 @@ class MovementModule(QWidget):
             form.load_items(items)
             
             # Depoları yükle
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
             form.load_warehouses(warehouses)
             
             self.stack.addWidget(form)
@@ -31,9 +31,11 @@ class StockReportsPage(QWidget):
 
     page_title = "Stok Raporları"
     refresh_requested = pyqtSignal()
+    filter_changed = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.warehouse_items = []
         self.setup_ui()
 
     def setup_ui(self):
@@ -120,11 +122,13 @@ class StockReportsPage(QWidget):
         filter_layout.addWidget(QLabel("Kategori:"))
         self.status_category_combo = QComboBox()
         self.status_category_combo.addItem("Tümü", None)
+        self.status_category_combo.currentIndexChanged.connect(self.filter_changed.emit)
         filter_layout.addWidget(self.status_category_combo)
 
         filter_layout.addWidget(QLabel("Depo:"))
         self.status_warehouse_combo = QComboBox()
         self.status_warehouse_combo.addItem("Tümü", None)
+        self.status_warehouse_combo.currentIndexChanged.connect(self.filter_changed.emit)
         filter_layout.addWidget(self.status_warehouse_combo)
 
         filter_layout.addStretch()
@@ -229,6 +233,7 @@ class StockReportsPage(QWidget):
         filter_layout.addWidget(QLabel("Depo:"))
         self.wh_report_combo = QComboBox()
         self.wh_report_combo.addItem("Tüm Depolar", None)
+        self.wh_report_combo.currentIndexChanged.connect(self._filter_warehouse_table)
         filter_layout.addWidget(self.wh_report_combo)
         filter_layout.addStretch()
         layout.addLayout(filter_layout)
@@ -301,6 +306,17 @@ class StockReportsPage(QWidget):
         # Kritik stok tablosu
         self._load_critical_table(data.get("critical_items", []))
 
+        # Depo raporu
+        self.warehouse_items = data.get("warehouse_items", [])
+        self._filter_warehouse_table()
+
+    def get_filters(self) -> dict:
+        """Stok durum raporu filtreleri"""
+        return {
+            "category_id": self.status_category_combo.currentData(),
+            "warehouse_id": self.status_warehouse_combo.currentData(),
+        }
+
     def _update_card(self, card: MiniStatCard, value: str):
         """Kart değerini güncelle"""
         card.update_value(value)
@@ -401,13 +417,17 @@ class StockReportsPage(QWidget):
 
     def load_categories(self, categories: list):
         """Kategori combolarını yükle"""
+        self.status_category_combo.blockSignals(True)
         self.status_category_combo.clear()
         self.status_category_combo.addItem("Tümü", None)
         for cat in categories:
             self.status_category_combo.addItem(cat.name, cat.id)
+        self.status_category_combo.blockSignals(False)
 
     def load_warehouses(self, warehouses: list):
         """Depo combolarını yükle"""
+        self.status_warehouse_combo.blockSignals(True)
+        self.wh_report_combo.blockSignals(True)
         self.status_warehouse_combo.clear()
         self.status_warehouse_combo.addItem("Tümü", None)
 
@@ -417,3 +437,38 @@ class StockReportsPage(QWidget):
         for wh in warehouses:
             self.status_warehouse_combo.addItem(wh.name, wh.id)
             self.wh_report_combo.addItem(wh.name, wh.id)
+
+        self.status_warehouse_combo.blockSignals(False)
+        self.wh_report_combo.blockSignals(False)
+
+    def _filter_warehouse_table(self):
+        """Depo raporunu seçili depoya göre göster"""
+        warehouse_id = self.wh_report_combo.currentData()
+        rows = [
+            r for r in self.warehouse_items
+            if warehouse_id is None or r.get("warehouse_id") == warehouse_id
+        ]
+        self._load_warehouse_table(rows)
+
+    def _load_warehouse_table(self, rows: list):
+        """Depo bazlı rapor tablosunu yükle"""
+        self.warehouse_table.setRowCount(len(rows))
+
+        for row, data in enumerate(rows):
+            self.warehouse_table.setItem(row, 0, QTableWidgetItem(data.get("warehouse", "")))
+            self.warehouse_table.setItem(row, 1, QTableWidgetItem(data.get("code", "")))
+            self.warehouse_table.setItem(row, 2, QTableWidgetItem(data.get("name", "")))
+
+            for col, text in (
+                (3, f"{data.get('quantity', 0):,.2f}"),
+                (5, f"₺{data.get('unit_cost', 0):,.2f}"),
+                (6, f"₺{data.get('total_value', 0):,.2f}"),
+            ):
+                cell = QTableWidgetItem(text)
+                cell.setTextAlignment(
+                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                )
+                self.warehouse_table.setItem(row, col, cell)
+
+            self.warehouse_table.setItem(row, 4, QTableWidgetItem(data.get("unit", "")))
+            self.warehouse_table.setItem(row, 7, QTableWidgetItem("-"))
@@ -9,7 +9,7 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QLineEdit, QTextEdit, QComboBox, QDoubleSpinBox, QFrame,
     QFormLayout, QMessageBox, QTableWidget, QTableWidgetItem,
-    QHeaderView, QDateTimeEdit, QAbstractItemView, QCheckBox
+    QHeaderView, QDateTimeEdit, QAbstractItemView, QCheckBox, QFileDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QDateTime
 from PyQt6.QtGui import QColor
@@ -22,12 +22,13 @@ class StockCountFormPage(QWidget):
     saved = pyqtSignal(dict)
     cancelled = pyqtSignal()
     completed = pyqtSignal(dict)  # Sayım tamamlandı
+    load_requested = pyqtSignal(dict)  # Depodan ürün yükleme (sayım başlatma)
+    import_requested = pyqtSignal(dict, str)  # CSV / el terminali dosyası
     
     def __init__(self, count_data: Optional[dict] = None, parent=None):
         super().__init__(parent)
         self.count_data = count_data
         self.is_edit_mode = count_data is not None
-        self.items_data = []
         self.count_lines = []
         self.setup_ui()
         if self.is_edit_mode:
@@ -117,6 +118,10 @@ class StockCountFormPage(QWidget):
         load_btn.clicked.connect(self._load_items_from_warehouse)
         load_layout.addWidget(load_btn)
         
+        import_btn = QPushButton("📥 Dosyadan Aktar (CSV)")
+        import_btn.clicked.connect(self._import_file)
+        load_layout.addWidget(import_btn)
+        
         load_layout.addStretch()
         
         # Sıfır stokları dahil et
@@ -191,10 +196,14 @@ class StockCountFormPage(QWidget):
         self.table.setShowGrid(False)
     def load_warehouses(self, warehouses: list):
         """Depoları yükle"""
+        self.warehouse_combo.blockSignals(True)
         self.warehouse_combo.clear()
         self.warehouse_combo.addItem("Seçiniz...", None)
         for wh in warehouses:
             self.warehouse_combo.addItem(f"{wh.code} - {wh.name}", wh.id)
+        self.warehouse_combo.blockSignals(False)
+        if self.count_data:
+            self._select_header_combos()
             
     def load_categories(self, categories: list):
         """Kategorileri yükle"""
@@ -202,18 +211,8 @@ class StockCountFormPage(QWidget):
         self.category_combo.addItem("Tüm Kategoriler", None)
         for cat in categories:
             self.category_combo.addItem(cat.name, cat.id)
-            
-    def set_items_data(self, items: list):
-        """Stok kartlarını ayarla"""
-        self.items_data = []
-        for item in items:
-            self.items_data.append({
-                "id": item.id,
-                "code": item.code,
-                "name": item.name,
-                "unit_code": item.unit.code if item.unit else "ADET",
-                "unit_cost": float(item.purchase_price or 0),
-            })
+        if self.count_data:
+            self._select_header_combos()
             
     def _on_warehouse_changed(self):
         """Depo değiştiğinde"""
@@ -222,38 +221,38 @@ class StockCountFormPage(QWidget):
         self._refresh_table()
         
     def _load_items_from_warehouse(self):
-        """Depodan ürünleri yükle"""
+        """Depodan ürünleri yükle (sistem miktarları sayım belgesine dondurulur)"""
         warehouse_id = self.warehouse_combo.currentData()
         if not warehouse_id:
             QMessageBox.warning(self, "Uyarı", "Lütfen bir depo seçin!")
             return
         
-        # Bu sinyal ile parent'tan veri isteyeceğiz
-        # Şimdilik items_data'yı kullan
-        include_zero = self.include_zero_check.isChecked()
-        category_id = self.category_combo.currentData()
+        data = self.get_form_data()
+        data["category_id"] = self.category_combo.currentData()
+        data["include_zero"] = self.include_zero_check.isChecked()
+        self.load_requested.emit(data)
         
-        self.count_lines = []
-        for item in self.items_data:
-            # TODO: Gerçek stok bakiyesini al
-            system_qty = 0  # Burası servis'ten gelecek
-            
-            if not include_zero and system_qty == 0:
-                continue
-                
-            self.count_lines.append({
-                "item_id": item["id"],
-                "item_code": item["code"],
-                "item_name": item["name"],
-                "unit_code": item["unit_code"],
-                "system_quantity": Decimal(str(system_qty)),
-                "counted_quantity": None,  # Henüz sayılmadı
-                "unit_cost": Decimal(str(item["unit_cost"])),
-                "note": "",
-            })
+    def _import_file(self):
+        """Sayım sonuçlarını CSV dosyasından aktar"""
+        if not self._validate():
+            return
         
-        self._refresh_table()
-        QMessageBox.information(self, "Bilgi", f"{len(self.count_lines)} ürün yüklendi.")
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Sayım Dosyası Seç", "", "CSV Dosyaları (*.csv *.txt)"
+        )
+        if not file_path:
+            return
+        
+        data = self.get_form_data()
+        data["category_id"] = self.category_combo.currentData()
+        data["include_zero"] = self.include_zero_check.isChecked()
+        self.import_requested.emit(data, file_path)
+        
+    def set_count_data(self, count_data: dict):
+        """Kaydedilmiş sayım belgesini forma yükle"""
+        self.count_data = count_data
+        self.is_edit_mode = True
+        self.load_data()
         
     def _refresh_table(self):
         """Tabloyu yenile"""
@@ -351,12 +350,29 @@ class StockCountFormPage(QWidget):
             return
         
         self.count_no_input.setText(self.count_data.get("count_no", ""))
-        self.description_input.setPlainText(self.count_data.get("description", ""))
+        self.description_input.setPlainText(self.count_data.get("description") or "")
+        if isinstance(self.count_data.get("count_date"), datetime):
+            self.datetime_input.setDateTime(QDateTime(self.count_data["count_date"]))
+        self._select_header_combos()
         
         # Satırları yükle
         self.count_lines = self.count_data.get("lines", [])
         self._refresh_table()
         
+    def _select_header_combos(self):
+        """Depo ve kategori seçimini belgeye göre ayarla (kayıtlı sayımda kilitli)"""
+        warehouse_index = self.warehouse_combo.findData(self.count_data.get("warehouse_id"))
+        if warehouse_index >= 0:
+            self.warehouse_combo.blockSignals(True)
+            self.warehouse_combo.setCurrentIndex(warehouse_index)
+            self.warehouse_combo.blockSignals(False)
+        category_index = self.category_combo.findData(self.count_data.get("category_id"))
+        if category_index >= 0:
+            self.category_combo.setCurrentIndex(category_index)
+        if self.count_data.get("id"):
+            self.warehouse_combo.setEnabled(False)
+            self.category_combo.setEnabled(False)
+        
     def _on_save(self, status: str):
         """Kaydet"""
         if not self._validate():
@@ -378,6 +394,7 @@ class StockCountFormPage(QWidget):
         
     def get_form_data(self) -> dict:
         return {
+            "id": self.count_data.get("id") if self.count_data else None,
             "count_no": self.count_no_input.text().strip() or None,
             "count_date": self.datetime_input.dateTime().toPyDateTime(),
             "warehouse_id": self.warehouse_combo.currentData(),
@@ -27,6 +27,7 @@ from config import COLORS
 from config.styles import get_button_style, BTN_HEIGHT_NORMAL, ICONS
 from database.models import ItemType
 from core.export_manager import ExportManager
+from core.label_data import stock_card_source
 from core.label_manager import LabelManager
 
 
@@ -317,8 +318,19 @@ class StockListPage(QWidget):
 
     def _print_labels(self):
         """Etiket yazdırma işlemini başlat"""
-        data = self._get_export_data()
-        LabelManager.print_product_labels(self, data)
+        # Etiket verisi tablodaki kartların id'leriyle veritabanından akıtılır
+        item_ids = self._visible_ids()
+        LabelManager.print_product_labels(
+            self, stock_card_source(item_ids) if item_ids else []
+        )
+
+    def _visible_ids(self) -> list:
+        """Filtrede görünen satırların stok kartı id'leri"""
+        return [
+            self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            for row in range(self.table.rowCount())
+            if not self.table.isRowHidden(row) and self.table.item(row, 0)
+        ]
 
     def get_filters(self) -> dict:
         """Mevcut filtreleri döndür"""
@@ -12,26 +12,38 @@ Bu modül şunları içerir:
 """
 
 from modules.maintenance.services import MaintenanceService
-from modules.maintenance.views import (
-    EquipmentListWidget,
-    EquipmentDialog,
-    EquipmentDetailDialog,
-    MaintenanceRequestWidget,
-    RequestDialog,
-    WorkOrderManagerWidget,
-    WorkOrderDialog,
-    WorkOrderDetailsDialog,
-    MaintenancePlanWidget,
-    PlanDialog,
-    MaintenanceCalendarWidget,
-    DowntimeTrackerWidget,
-    DowntimeStartDialog,
-    ChecklistEditorWidget,
-    ChecklistDialog,
-    ReportingWidget,
-    KPIDashboardWidget,
-    CostAnalysisWidget,
-)
+
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "EquipmentListWidget": ".views",
+    "EquipmentDialog": ".views",
+    "EquipmentDetailDialog": ".views",
+    "MaintenanceRequestWidget": ".views",
+    "RequestDialog": ".views",
+    "WorkOrderManagerWidget": ".views",
+    "WorkOrderDialog": ".views",
+    "WorkOrderDetailsDialog": ".views",
+    "MaintenancePlanWidget": ".views",
+    "PlanDialog": ".views",
+    "MaintenanceCalendarWidget": ".views",
+    "DowntimeTrackerWidget": ".views",
+    "DowntimeStartDialog": ".views",
+    "ChecklistEditorWidget": ".views",
+    "ChecklistDialog": ".views",
+    "ReportingWidget": ".views",
+    "KPIDashboardWidget": ".views",
+    "CostAnalysisWidget": ".views",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     # Service
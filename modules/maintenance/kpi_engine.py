@@ -0,0 +1,438 @@
+"""
+Akıllı İş - Bakım ve Üretim KPI Motoru
+Duruş ve iş emri geçmişinden MTBF, MTTR, kullanılabilirlik ve OEE hesaplar.
+
+Tüm ekipmanlar için birkaç gruplu sorgu çalıştırılır; hesaplamalar pandas
+ile toplu yapılır. Aynı ekipmanın çakışan duruş aralıkları birleştirilerek
+duruş süresinin iki kez sayılması engellenir. Sonuçlar sınıf seviyesinde
+önbelleğe alınır; duruş veya iş emri değiştiğinde invalidate() çağrılır.
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database.models.maintenance import (
+    Equipment,
+    EquipmentDowntime,
+    MaintenanceWorkOrder,
+    WorkOrderStatus as MaintenanceWorkOrderStatus,
+)
+from database.models.production import (
+    WorkOrder,
+    WorkOrderOperation,
+    WorkOrderStatus,
+    WorkStation,
+)
+from database.models.inventory import Item
+
+
+EQUIPMENT_KPI_COLUMNS = [
+    "equipment_id",
+    "equipment_code",
+    "equipment_name",
+    "work_station_id",
+    "mtbf",
+    "mttr",
+    "availability",
+    "failure_count",
+    "total_downtime",
+    "total_cost",
+]
+
+STATION_OEE_COLUMNS = [
+    "work_station_id",
+    "station_code",
+    "station_name",
+    "day",
+    "planned_hours",
+    "downtime_hours",
+    "availability",
+    "performance",
+    "quality",
+    "oee",
+]
+
+
+class KPIEngine:
+    """Bakım ve üretim KPI hesaplayıcısı (önbellekli)"""
+
+    CACHE_TTL_SECONDS = 300
+
+    _cache: Dict[Tuple, Tuple[float, Any]] = {}
+
+    # ==================== ÖNBELLEK ====================
+
+    @classmethod
+    def invalidate(cls):
+        """Önbelleği temizle (duruş/iş emri değişikliklerinden sonra)"""
+        cls._cache = {}
+
+    @classmethod
+    def _cached(cls, key: Tuple, loader):
+        entry = cls._cache.get(key)
+        now = time.monotonic()
+        if entry and now - entry[0] < cls.CACHE_TTL_SECONDS:
+            return entry[1].copy()
+
+        value = loader()
+        cls._cache[key] = (now, value)
+        return value.copy()
+
+    # ==================== DURUŞ ARALIKLARI ====================
+
+    @staticmethod
+    def _load_downtimes(
+        session: Session, window_start: datetime, window_end: datetime
+    ) -> pd.DataFrame:
+        """Pencereyle kesişen duruşları ekipman ve istasyon bilgisiyle yükle"""
+        rows = (
+            session.query(
+                EquipmentDowntime.equipment_id,
+                Equipment.work_station_id,
+                EquipmentDowntime.start_time,
+                EquipmentDowntime.end_time,
+            )
+            .join(Equipment, Equipment.id == EquipmentDowntime.equipment_id)
+            .filter(
+                EquipmentDowntime.start_time < window_end,
+                or_(
+                    EquipmentDowntime.end_time == None,
+                    EquipmentDowntime.end_time > window_start,
+                ),
+            )
+            .all()
+        )
+
+        df = pd.DataFrame(
+            rows, columns=["equipment_id", "work_station_id", "start", "end"]
+        )
+        if df.empty:
+            return df
+
+        # Açık duruşlar şu ana kadar sürüyor kabul edilir
+        now = min(datetime.utcnow(), window_end)
+        df["start"] = pd.to_datetime(df["start"]).clip(lower=window_start)
+        df["end"] = pd.to_datetime(df["end"]).fillna(pd.Timestamp(now))
+        df["end"] = df["end"].clip(upper=window_end)
+        return df[df["end"] > df["start"]]
+
+    @staticmethod
+    def merge_intervals(df: pd.DataFrame, key: str) -> pd.DataFrame:
+        """Aynı anahtara ait çakışan [start, end) aralıklarını birleştir"""
+        if df.empty:
+            return pd.DataFrame(columns=[key, "start", "end"])
+
+        df = df.dropna(subset=[key]).sort_values([key, "start"])
+        running_end = df.groupby(key)["end"].cummax()
+        previous_end = running_end.groupby(df[key]).shift()
+        new_block = previous_end.isna() | (df["start"] > previous_end)
+        block = new_block.cumsum()
+
+        return (
+            df.groupby([df[key], block])
+            .agg(start=("start", "min"), end=("end", "max"))
+            .reset_index(level=0)
+            .reset_index(drop=True)
+        )
+
+    @staticmethod
+    def split_by_day(intervals: pd.DataFrame, key: str) -> pd.DataFrame:
+        """Aralıkları gün sınırlarından bölerek gün bazında saat üret"""
+        if intervals.empty:
+            return pd.DataFrame(columns=[key, "day", "hours"])
+
+        first_day = intervals["start"].dt.floor("D")
+        last_day = (intervals["end"] - pd.Timedelta(microseconds=1)).dt.floor("D")
+        spans = ((last_day - first_day).dt.days + 1).to_numpy()
+
+        idx = np.repeat(intervals.index.to_numpy(), spans)
+        parts = intervals.loc[idx].reset_index(drop=True)
+        offset = parts.groupby(idx).cumcount().to_numpy()
+        parts["day"] = first_day.loc[idx].to_numpy() + pd.to_timedelta(
+            offset, unit="D"
+        )
+
+        day_end = parts["day"] + pd.Timedelta(days=1)
+        start = parts["start"].where(parts["start"] > parts["day"], parts["day"])
+        end = parts["end"].where(parts["end"] < day_end, day_end)
+        parts["hours"] = (end - start).dt.total_seconds() / 3600
+
+        return (
+            parts.groupby([key, "day"], as_index=False)["hours"].sum()
+        )
+
+    # ==================== EKİPMAN KPI ====================
+
+    @classmethod
+    def equipment_kpis(
+        cls, session: Session, period_days: int = 30, active_only: bool = True
+    ) -> pd.DataFrame:
+        """Tüm ekipmanlar için MTBF, MTTR, kullanılabilirlik ve maliyet"""
+        return cls._cached(
+            ("equipment", period_days, active_only),
+            lambda: cls._compute_equipment_kpis(session, period_days, active_only),
+        )
+
+    @classmethod
+    def _compute_equipment_kpis(
+        cls, session: Session, period_days: int, active_only: bool
+    ) -> pd.DataFrame:
+        window_end = datetime.utcnow()
+        window_start = window_end - timedelta(days=period_days)
+        total_hours = period_days * 24
+
+        eq_query = session.query(
+            Equipment.id, Equipment.code, Equipment.name, Equipment.work_station_id
+        )
+        if active_only:
+            eq_query = eq_query.filter(Equipment.is_active == True)
+        equipments = pd.DataFrame(
+            eq_query.order_by(Equipment.code).all(),
+            columns=["equipment_id", "equipment_code", "equipment_name", "work_station_id"],
+        )
+        if equipments.empty:
+            return pd.DataFrame(columns=EQUIPMENT_KPI_COLUMNS)
+        equipments["work_station_id"] = equipments["work_station_id"].astype("Int64")
+
+        # Dönem içi tamamlanan bakım iş emirleri (arıza sayısı)
+        failures = pd.DataFrame(
+            session.query(
+                MaintenanceWorkOrder.equipment_id,
+                func.count(MaintenanceWorkOrder.id),
+            )
+            .filter(
+                MaintenanceWorkOrder.status == MaintenanceWorkOrderStatus.COMPLETED,
+                MaintenanceWorkOrder.created_at >= window_start,
+            )
+            .group_by(MaintenanceWorkOrder.equipment_id)
+            .all(),
+            columns=["equipment_id", "failure_count"],
+        )
+
+        # Tüm zamanların bakım maliyeti
+        costs = pd.DataFrame(
+            session.query(
+                MaintenanceWorkOrder.equipment_id,
+                func.sum(MaintenanceWorkOrder.total_cost),
+            )
+            .filter(MaintenanceWorkOrder.status == MaintenanceWorkOrderStatus.COMPLETED)
+            .group_by(MaintenanceWorkOrder.equipment_id)
+            .all(),
+            columns=["equipment_id", "total_cost"],
+        )
+
+        merged = cls.merge_intervals(
+            cls._load_downtimes(session, window_start, window_end), "equipment_id"
+        )
+        if merged.empty:
+            downtime = pd.DataFrame(columns=["equipment_id", "total_downtime"])
+        else:
+            merged["hours"] = (merged["end"] - merged["start"]).dt.total_seconds() / 3600
+            downtime = (
+                merged.groupby("equipment_id", as_index=False)["hours"]
+                .sum()
+                .rename(columns={"hours": "total_downtime"})
+            )
+
+        df = (
+            equipments.merge(failures, on="equipment_id", how="left")
+            .merge(downtime, on="equipment_id", how="left")
+            .merge(costs, on="equipment_id", how="left")
+        )
+        df["failure_count"] = df["failure_count"].fillna(0).astype(int)
+        df["total_downtime"] = df["total_downtime"].astype(float).fillna(0.0)
+        df["total_cost"] = df["total_cost"].astype(float).fillna(0.0)
+
+        divisor = df["failure_count"].clip(lower=1)
+        uptime = total_hours - df["total_downtime"]
+        df["mtbf"] = uptime / divisor
+        df["mttr"] = df["total_downtime"] / divisor
+        df["availability"] = uptime / total_hours * 100
+
+        return df[EQUIPMENT_KPI_COLUMNS]
+
+    # ==================== İSTASYON / GÜN OEE ====================
+
+    @classmethod
+    def station_daily_oee(
+        cls, session: Session, start_date: date, end_date: date
+    ) -> pd.DataFrame:
+        """İş istasyonu ve gün bazında OEE (A x P x Q)"""
+        return cls._cached(
+            ("station_oee", start_date, end_date),
+            lambda: cls._compute_station_daily_oee(session, start_date, end_date),
+        )
+
+    @classmethod
+    def _compute_station_daily_oee(
+        cls, session: Session, start_date: date, end_date: date
+    ) -> pd.DataFrame:
+        window_start = datetime.combine(start_date, datetime.min.time())
+        window_end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+
+        # Tamamlanan operasyonlar (performans ve kalite)
+        ops = pd.DataFrame(
+            session.query(
+                WorkOrderOperation.work_station_id,
+                WorkOrderOperation.actual_end,
+                WorkOrderOperation.planned_run_time,
+                WorkOrderOperation.actual_run_time,
+                WorkOrderOperation.completed_quantity,
+                WorkOrderOperation.scrapped_quantity,
+            )
+            .filter(
+                WorkOrderOperation.work_station_id != None,
+                WorkOrderOperation.actual_end >= window_start,
+                WorkOrderOperation.actual_end < window_end,
+            )
+            .all(),
+            columns=[
+                "work_station_id",
+                "actual_end",
+                "planned_run",
+                "actual_run",
+                "completed",
+                "scrapped",
+            ],
+        )
+
+        merged = cls.merge_intervals(
+            cls._load_downtimes(session, window_start, window_end), "work_station_id"
+        )
+        downtime = cls.split_by_day(merged, "work_station_id").rename(
+            columns={"hours": "downtime_hours"}
+        )
+
+        if ops.empty and downtime.empty:
+            return pd.DataFrame(columns=STATION_OEE_COLUMNS)
+
+        if not ops.empty:
+            ops["day"] = pd.to_datetime(ops["actual_end"]).dt.floor("D")
+            for col in ("planned_run", "actual_run", "completed", "scrapped"):
+                ops[col] = ops[col].astype(float).fillna(0.0)
+            production = ops.groupby(["work_station_id", "day"], as_index=False)[
+                ["planned_run", "actual_run", "completed", "scrapped"]
+            ].sum()
+        else:
+            production = pd.DataFrame(
+                columns=[
+                    "work_station_id", "day", "planned_run",
+                    "actual_run", "completed", "scrapped",
+                ]
+            )
+
+        df = production.merge(downtime, on=["work_station_id", "day"], how="outer")
+
+        stations = pd.DataFrame(
+            session.query(
+                WorkStation.id,
+                WorkStation.code,
+                WorkStation.name,
+                WorkStation.working_hours_per_day,
+            ).all(),
+            columns=["work_station_id", "station_code", "station_name", "planned_hours"],
+        )
+        df = df.merge(stations, on="work_station_id", how="left")
+
+        for col in ("planned_run", "actual_run", "completed", "scrapped", "downtime_hours"):
+            df[col] = df[col].astype(float).fillna(0.0)
+        df["planned_hours"] = df["planned_hours"].astype(float).fillna(8.0)
+
+        # Kullanılabilirlik = (Planlanan - Duruş) / Planlanan
+        run_hours = (df["planned_hours"] - df["downtime_hours"]).clip(lower=0)
+        df["availability"] = np.where(
+            df["planned_hours"] > 0, run_hours / df["planned_hours"] * 100, 0.0
+        )
+        # Performans = Planlanan çalışma süresi / Gerçek çalışma süresi
+        df["performance"] = np.where(
+            df["actual_run"] > 0,
+            (df["planned_run"] / df["actual_run"] * 100).clip(upper=100),
+            0.0,
+        )
+        # Kalite = Sağlam / (Sağlam + Fire)
+        produced = df["completed"] + df["scrapped"]
+        df["quality"] = np.where(produced > 0, df["completed"] / produced * 100, 100.0)
+        df["oee"] = df["availability"] * df["performance"] * df["quality"] / 10000
+
+        df["day"] = pd.to_datetime(df["day"]).dt.date
+        return df.sort_values(["day", "station_code"])[STATION_OEE_COLUMNS].reset_index(
+            drop=True
+        )
+
+    # ==================== ÜRETİM OEE (İŞ EMRİ) ====================
+
+    @classmethod
+    def work_order_oee(
+        cls, session: Session, start_date: date, end_date: date
+    ) -> pd.DataFrame:
+        """Dönemde tamamlanan iş emirleri (ürün adıyla tek sorgu)"""
+        return cls._cached(
+            ("work_orders", start_date, end_date),
+            lambda: cls._load_completed_work_orders(session, start_date, end_date),
+        )
+
+    @staticmethod
+    def _load_completed_work_orders(
+        session: Session, start_date: date, end_date: date
+    ) -> pd.DataFrame:
+        rows = (
+            session.query(
+                WorkOrder.order_no,
+                Item.name,
+                WorkOrder.planned_quantity,
+                WorkOrder.completed_quantity,
+                WorkOrder.scrapped_quantity,
+                WorkOrder.planned_end,
+                WorkOrder.actual_end,
+            )
+            .outerjoin(Item, Item.id == WorkOrder.item_id)
+            .filter(
+                WorkOrder.status == WorkOrderStatus.COMPLETED,
+                WorkOrder.actual_end >= start_date,
+                WorkOrder.actual_end <= end_date,
+            )
+            .order_by(WorkOrder.actual_end)
+            .all()
+        )
+
+        df = pd.DataFrame(
+            rows,
+            columns=[
+                "work_order_no",
+                "item_name",
+                "planned_qty",
+                "actual_qty",
+                "scrapped_qty",
+                "planned_end",
+                "actual_end",
+            ],
+        )
+        for col in ("planned_qty", "actual_qty", "scrapped_qty"):
+            df[col] = df[col].astype(float).fillna(0.0)
+        df["item_name"] = df["item_name"].fillna("")
+        df["on_time"] = (
+            df["planned_end"].notna()
+            & df["actual_end"].notna()
+            & (pd.to_datetime(df["actual_end"]) <= pd.to_datetime(df["planned_end"]))
+        )
+        df["performance"] = np.where(
+            df["planned_qty"] > 0, df["actual_qty"] / df["planned_qty"] * 100, 0.0
+        )
+        return df
+
+    @staticmethod
+    def records(df: pd.DataFrame) -> list:
+        """DataFrame'i Python tiplerinde sözlük listesine çevir"""
+        if df.empty:
+            return []
+        out = df.astype(object).where(df.notna(), None)
+        for col in out.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                out[col] = [v.to_pydatetime() if v is not None else None for v in out[col]]
+        return out.to_dict("records")
@@ -0,0 +1,388 @@
+"""
+Akıllı İş - Periyodik Bakım Zamanlayıcısı
+Aktif bakım planlarını tek geçişte değerlendirip vadesi gelen iş emirlerini
+toplu oluşturur.
+
+Takvim bazlı planlar next_maintenance_date indeksi üzerinden, sayaç bazlı
+planlar ise üretim operasyonlarından türetilen çalışma saati ile
+değerlendirilir. Oluşturulan iş emirleri için kontrol listesi sonuçları
+açılır ve ekipmanın önerilen yedek parçaları stokta rezerve edilir.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from database.models.inventory import StockBalance
+from database.models.maintenance import (
+    Equipment,
+    EquipmentSparePart,
+    MaintenanceChecklistItem,
+    MaintenancePartReservation,
+    MaintenancePlan,
+    MaintenancePriority,
+    MaintenanceWorkOrder,
+    WorkOrderChecklistResult,
+    WorkOrderStatus,
+)
+from database.models.production import WorkOrderOperation
+from modules.maintenance.services import MaintenanceService
+
+
+CLOSED_WORK_ORDER_STATUSES = [
+    WorkOrderStatus.COMPLETED,
+    WorkOrderStatus.CLOSED,
+    WorkOrderStatus.CANCELLED,
+]
+
+
+class PreventiveMaintenanceScheduler:
+    """Vadesi gelen periyodik bakım iş emirlerini toplu oluşturur"""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+        self.service = MaintenanceService(db_session)
+
+    # ==================== SAYAÇLAR ====================
+
+    def sync_meters(self, equipment_ids: List[int] = None) -> Dict[int, Decimal]:
+        """
+        Ekipman çalışma saatlerini üretim operasyonlarından güncelle
+
+        Son sayaç okumasından sonra ekipmanın iş istasyonunda tamamlanan
+        operasyonların gerçek çalışma süreleri running_hours'a eklenir.
+        Operasyon bitişleri yerel saatle yazıldığından (datetime.now)
+        last_meter_date de yerel saatle damgalanır; her çalışma yalnızca
+        (last_meter_date, şimdi] aralığında sayılır, tekrar senkronizasyon
+        aynı süreyi ikinci kez eklemez.
+
+        Returns:
+            Dict[int, Decimal]: ekipman_id -> güncel çalışma saati
+        """
+        query = self.db.query(Equipment).filter(Equipment.is_active == True)
+        if equipment_ids is not None:
+            if not equipment_ids:
+                return {}
+            query = query.filter(Equipment.id.in_(equipment_ids))
+        equipments = query.all()
+
+        station_ids = {eq.work_station_id for eq in equipments if eq.work_station_id}
+        now = datetime.now()
+        since = min(
+            (eq.last_meter_date or datetime.min for eq in equipments if eq.work_station_id),
+            default=None,
+        )
+
+        # İstasyon bazlı operasyonlar tek sorguda (bitiş zamanıyla)
+        runs: Dict[int, List] = {}
+        if station_ids:
+            rows = (
+                self.db.query(
+                    WorkOrderOperation.work_station_id,
+                    WorkOrderOperation.actual_end,
+                    WorkOrderOperation.actual_run_time,
+                )
+                .filter(
+                    WorkOrderOperation.work_station_id.in_(station_ids),
+                    WorkOrderOperation.actual_end != None,
+                    WorkOrderOperation.actual_end > since,
+                    WorkOrderOperation.actual_end <= now,
+                )
+                .all()
+            )
+            for station_id, actual_end, run_minutes in rows:
+                runs.setdefault(station_id, []).append((actual_end, run_minutes or 0))
+
+        meters = {}
+        for eq in equipments:
+            hours = Decimal(str(eq.running_hours or 0))
+            last = eq.last_meter_date or datetime.min
+            minutes = sum(
+                m for end, m in runs.get(eq.work_station_id, []) if end > last
+            )
+            if minutes:
+                hours += Decimal(minutes) / Decimal(60)
+                eq.running_hours = hours
+            if eq.work_station_id:
+                eq.last_meter_date = now
+            meters[eq.id] = hours
+
+        return meters
+
+    # ==================== VADE DEĞERLENDİRME ====================
+
+    def get_due_plans(self, now: datetime = None) -> List[MaintenancePlan]:
+        """Takvim veya sayaç bakımından vadesi gelmiş aktif planlar"""
+        now = now or datetime.utcnow()
+
+        # Takvim: yalnızca ufuk içindeki planlara indeks üzerinden dokun
+        max_lead = (
+            self.db.query(func.max(MaintenancePlan.lead_days))
+            .filter(MaintenancePlan.is_active == True)
+            .scalar()
+            or 0
+        )
+        horizon = now + timedelta(days=max_lead)
+        calendar_plans = (
+            self.db.query(MaintenancePlan)
+            .filter(
+                MaintenancePlan.is_active == True,
+                MaintenancePlan.next_maintenance_date <= horizon,
+            )
+            .order_by(MaintenancePlan.next_maintenance_date)
+            .all()
+        )
+        due = {
+            plan.id: plan
+            for plan in calendar_plans
+            if plan.next_maintenance_date - timedelta(days=plan.lead_days or 0) <= now
+        }
+
+        # Sayaç: ilgili ekipmanların çalışma saatlerini güncelle ve karşılaştır
+        counter_plans = (
+            self.db.query(MaintenancePlan)
+            .filter(
+                MaintenancePlan.is_active == True,
+                MaintenancePlan.is_counter_based == True,
+                MaintenancePlan.counter_interval > 0,
+            )
+            .all()
+        )
+        if counter_plans:
+            meters = self.sync_meters(list({p.equipment_id for p in counter_plans}))
+            for plan in counter_plans:
+                meter = meters.get(plan.equipment_id)
+                if meter is not None and meter >= self._due_counter(plan):
+                    due[plan.id] = plan
+
+        if not due:
+            return []
+
+        # Açık iş emri olan planları atla
+        open_plan_ids = {
+            row[0]
+            for row in self.db.query(MaintenanceWorkOrder.plan_id)
+            .filter(
+                MaintenanceWorkOrder.plan_id.in_(list(due)),
+                MaintenanceWorkOrder.status.notin_(CLOSED_WORK_ORDER_STATUSES),
+            )
+            .distinct()
+        }
+        return [plan for plan_id, plan in due.items() if plan_id not in open_plan_ids]
+
+    @staticmethod
+    def _due_counter(plan: MaintenancePlan) -> Decimal:
+        if plan.next_due_counter is not None:
+            return Decimal(str(plan.next_due_counter))
+        return Decimal(str(plan.last_counter_value or 0)) + Decimal(plan.counter_interval)
+
+    # ==================== TOPLU ÇALIŞTIRMA ====================
+
+    def run(self, now: datetime = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Tüm aktif planları değerlendir ve vadesi gelen iş emirlerini oluştur
+
+        Args:
+            now: Değerlendirme zamanı (varsayılan: şimdi)
+            dry_run: True ise hiçbir kayıt oluşturulmaz
+
+        Returns:
+            dict: due_plans, work_orders, checklist_results, reserved, shortages
+        """
+        now = now or datetime.utcnow()
+        summary = {
+            "due_plans": 0,
+            "work_orders": [],
+            "checklist_results": 0,
+            "reserved": 0,
+            "shortages": [],
+            "dry_run": dry_run,
+        }
+
+        try:
+            plans = self.get_due_plans(now)
+            summary["due_plans"] = len(plans)
+            plans = [p for p in plans if p.auto_generate_work_order]
+            if dry_run or not plans:
+                self.db.rollback()
+                summary["work_orders"] = [p.id for p in plans] if dry_run else []
+                return summary
+
+            order_nos = self.service.allocate_work_order_numbers(len(plans))
+            self.db.execute(
+                insert(MaintenanceWorkOrder),
+                [
+                    {
+                        "order_no": order_no,
+                        "equipment_id": plan.equipment_id,
+                        "plan_id": plan.id,
+                        "checklist_id": plan.checklist_id,
+                        "description": f"Periyodik Bakım: {plan.name}",
+                        "status": WorkOrderStatus.DRAFT,
+                        "priority": MaintenancePriority.NORMAL,
+                        "planned_start_date": plan.next_maintenance_date or now,
+                        "due_date": plan.next_maintenance_date or now,
+                    }
+                    for plan, order_no in zip(plans, order_nos)
+                ],
+            )
+            wo_ids = dict(
+                self.db.query(MaintenanceWorkOrder.order_no, MaintenanceWorkOrder.id)
+                .filter(MaintenanceWorkOrder.order_no.in_(order_nos))
+                .all()
+            )
+            created = [
+                (plan, wo_ids[order_no]) for plan, order_no in zip(plans, order_nos)
+            ]
+
+            summary["checklist_results"] = self._create_checklist_results(created)
+            summary["reserved"], summary["shortages"] = self._reserve_spare_parts(created)
+
+            for plan, _ in created:
+                self._advance_plan(plan, now)
+
+            self.db.commit()
+            summary["work_orders"] = order_nos
+            return summary
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _create_checklist_results(self, created) -> int:
+        checklist_ids = {plan.checklist_id for plan, _ in created if plan.checklist_id}
+        if not checklist_ids:
+            return 0
+
+        items: Dict[int, List[int]] = {}
+        for checklist_id, item_id in (
+            self.db.query(MaintenanceChecklistItem.checklist_id, MaintenanceChecklistItem.id)
+            .filter(MaintenanceChecklistItem.checklist_id.in_(checklist_ids))
+            .order_by(MaintenanceChecklistItem.order_no)
+        ):
+            items.setdefault(checklist_id, []).append(item_id)
+
+        rows = [
+            {"work_order_id": wo_id, "checklist_item_id": item_id, "is_checked": False}
+            for plan, wo_id in created
+            for item_id in items.get(plan.checklist_id, [])
+        ]
+        if rows:
+            self.db.execute(insert(WorkOrderChecklistResult), rows)
+        return len(rows)
+
+    def _reserve_spare_parts(self, created):
+        """Önerilen yedek parçaları en çok kullanılabilir stoğu olan depodan rezerve et"""
+        equipment_ids = {plan.equipment_id for plan, _ in created}
+        parts: Dict[int, List] = {}
+        for part in self.db.query(EquipmentSparePart).filter(
+            EquipmentSparePart.equipment_id.in_(equipment_ids)
+        ):
+            parts.setdefault(part.equipment_id, []).append(part)
+        if not parts:
+            return 0, []
+
+        item_ids = {p.item_id for plist in parts.values() for p in plist}
+        balances: Dict[int, List[StockBalance]] = {}
+        for balance in self.db.query(StockBalance).filter(
+            StockBalance.item_id.in_(item_ids)
+        ):
+            balances.setdefault(balance.item_id, []).append(balance)
+
+        reservations = []
+        shortages = []
+        for plan, wo_id in created:
+            for part in parts.get(plan.equipment_id, []):
+                needed = Decimal(str(part.recommended_quantity or part.min_quantity or 0))
+                candidates = sorted(
+                    balances.get(part.item_id, []),
+                    key=lambda b: b.available_quantity,
+                    reverse=True,
+                )
+                for balance in candidates:
+                    if needed <= 0:
+                        break
+                    take = min(needed, balance.available_quantity)
+                    if take <= 0:
+                        break
+                    balance.reserved_quantity = (balance.reserved_quantity or Decimal(0)) + take
+                    reservations.append(
+                        {
+                            "work_order_id": wo_id,
+                            "item_id": part.item_id,
+                            "warehouse_id": balance.warehouse_id,
+                            "quantity": take,
+                            "released_quantity": Decimal(0),
+                        }
+                    )
+                    needed -= take
+                if needed > 0:
+                    shortages.append(
+                        {"work_order_id": wo_id, "item_id": part.item_id, "missing": float(needed)}
+                    )
+
+        if reservations:
+            self.db.execute(insert(MaintenancePartReservation), reservations)
+        return len(reservations), shortages
+
+    def _advance_plan(self, plan: MaintenancePlan, now: datetime):
+        plan.last_maintenance_date = now
+        if plan.next_maintenance_date is not None or not plan.is_counter_based:
+            plan.next_maintenance_date = self.service._calculate_next_maintenance_date(
+                now, plan.frequency_type, plan.frequency_value
+            )
+        if plan.is_counter_based and plan.counter_interval:
+            equipment = self.db.query(Equipment).get(plan.equipment_id)
+            meter = Decimal(str(equipment.running_hours or 0)) if equipment else Decimal(0)
+            plan.last_counter_value = meter
+            plan.next_due_counter = meter + Decimal(plan.counter_interval)
+
+
+class MaintenanceSchedulerThread(threading.Thread):
+    """
+    Zamanlayıcıyı belirli aralıklarla arka planda çalıştırır
+
+    Bakım planları site genelinde bir kez değerlendirilmelidir. Bu yüzden
+    thread zamanlayıcıyı doğrudan çağırmaz; maintenance_plans işini
+    scheduled_jobs kilidiyle ve yalnızca vadesi geldiyse çalıştırır.
+    Böylece birden fazla istemci ve jobs.py aynı anda yoklasa da iş
+    emirleri tek bir yerde oluşturulur.
+    """
+
+    JOB_NAME = "maintenance_plans"
+
+    def __init__(self, interval_seconds: int = 900, on_result=None):
+        super().__init__(name="maintenance-scheduler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.on_result = on_result
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval_seconds)
+
+    def run_once(self):
+        # İş kendi session_scope'unda çalışır (UI thread'inin session'ından bağımsız)
+        from core.job_scheduler import job_scheduler
+        import core.batch_jobs  # noqa: F401  (işleri kaydeder)
+
+        try:
+            summary = job_scheduler.run_job(self.JOB_NAME, only_if_due=True)
+            if summary is None:
+                return
+            self.last_result = summary
+            self.last_error = summary["error"]
+            if self.on_result:
+                self.on_result(self.last_result)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Bakım zamanlayıcı hatası: {e}")
+
+    def stop(self):
+        self._stop_event.set()
@@ -6,7 +6,7 @@ Kapsamlı CMMS işlevleri: KPI hesaplamaları, duruş takibi, kontrol listeleri
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, func, and_, or_
 import shutil
 import os
@@ -22,6 +22,7 @@ from database.models.maintenance import (
     MaintenanceChecklistItem,
     MaintenanceWorkOrder,
     MaintenanceWorkOrderPart,
+    MaintenancePartReservation,
     WorkOrderAttachment,
     WorkOrderChecklistResult,
     MaintenancePlan,
@@ -43,6 +44,14 @@ from database.models.purchasing import PurchaseRequest, PurchaseRequestItem, Sup
 from database.models.production import WorkStation
 from database.models.user import User, Role
 from database.models.hr import Employee, Department, Position
+from database.instrumentation import tracked
+from core.reference_data import (
+    SupplierRef,
+    WarehouseRef,
+    WorkStationRef,
+    reference_cache,
+)
+from modules.maintenance.kpi_engine import KPIEngine
 
 
 class MaintenanceService:
@@ -115,6 +124,7 @@ class MaintenanceService:
 
     # ==================== YEDEK PARÇA ====================
 
+    @tracked()
     def get_equipment_spare_parts(self, equipment_id: int) -> List[EquipmentSparePart]:
         """Ekipmanın yedek parça listesini getirir"""
         return (
@@ -174,6 +184,7 @@ class MaintenanceService:
         )
         self.db.add(downtime)
         self.db.commit()
+        KPIEngine.invalidate()
         return downtime
 
     def end_downtime(self, downtime_id: int) -> EquipmentDowntime:
@@ -188,12 +199,31 @@ class MaintenanceService:
                 equipment.current_status = EquipmentStatus.RUNNING
 
             self.db.commit()
+            KPIEngine.invalidate()
         return downtime
 
     def get_downtime_by_id(self, downtime_id: int) -> Optional[EquipmentDowntime]:
         """ID'ye göre duruş kaydı getirir"""
         return self.db.query(EquipmentDowntime).get(downtime_id)
 
+    def get_downtimes_by_ids(self, downtime_ids: List[int]) -> List[EquipmentDowntime]:
+        """
+        Kimliği verilen duruşlar (canlı güncelleme). Ekran uzun ömürlü
+        session kullandığı için kayıtlar veritabanından yeniden okunur.
+        """
+        if not downtime_ids:
+            return []
+        return (
+            self.db.query(EquipmentDowntime)
+            .options(
+                joinedload(EquipmentDowntime.equipment),
+                joinedload(EquipmentDowntime.work_order),
+            )
+            .populate_existing()
+            .filter(EquipmentDowntime.id.in_(downtime_ids))
+            .all()
+        )
+
     def get_equipment_downtimes(
         self, equipment_id: int, start_date: datetime = None, end_date: datetime = None
     ) -> List[EquipmentDowntime]:
@@ -238,6 +268,7 @@ class MaintenanceService:
             .all()
         )
 
+    @tracked()
     def get_all_downtimes(self, limit: int = 100) -> List[EquipmentDowntime]:
         """Tüm duruşları getirir"""
         return (
@@ -291,20 +322,21 @@ class MaintenanceService:
 
     # ==================== TEDARİKÇİ / İŞ İSTASYONU ====================
 
-    def get_all_suppliers(self) -> List[Supplier]:
-        """Tüm tedarikçileri getirir"""
-        return self.db.query(Supplier).filter(Supplier.is_active == True).all()
+    def get_all_suppliers(self) -> List[SupplierRef]:
+        """Aktif tedarikçiler (referans veri önbelleğinden)"""
+        return reference_cache.suppliers()
 
-    def get_all_workstations(self) -> List[WorkStation]:
-        """Tüm iş istasyonlarını getirir"""
-        return self.db.query(WorkStation).filter(WorkStation.is_active == True).all()
+    def get_all_workstations(self) -> List[WorkStationRef]:
+        """Aktif iş istasyonları (referans veri önbelleğinden)"""
+        return reference_cache.work_stations()
 
     # ==================== ENVANTER ====================
 
-    def get_all_warehouses(self) -> List[Warehouse]:
-        """Tüm depoları getirir"""
-        return self.db.query(Warehouse).filter(Warehouse.is_active == True).all()
+    def get_all_warehouses(self) -> List[WarehouseRef]:
+        """Aktif depolar (referans veri önbelleğinden)"""
+        return reference_cache.warehouses()
 
+    @tracked()
     def get_items_with_stock(self, warehouse_id: int) -> List[Tuple[Item, float]]:
         """Depodaki stoklu ürünleri getirir"""
         return (
@@ -398,6 +430,7 @@ class MaintenanceService:
 
         return query.order_by(desc(MaintenanceRequest.completed_date)).all()
 
+    @tracked()
     def get_all_requests(
         self, priority: MaintenancePriority = None
     ) -> List[MaintenanceRequest]:
@@ -447,15 +480,10 @@ class MaintenanceService:
         estimated_hours: float = None,
         checklist_id: int = None,
         description: str = None,
+        plan_id: int = None,
     ) -> MaintenanceWorkOrder:
         """Yeni iş emri oluşturur"""
-        today_str = datetime.now().strftime("%Y%m%d")
-        count = (
-            self.db.query(MaintenanceWorkOrder)
-            .filter(MaintenanceWorkOrder.order_no.like(f"WO-{today_str}-%"))
-            .count()
-        )
-        order_no = f"WO-{today_str}-{count + 1:03d}"
+        order_no = self.allocate_work_order_numbers(1)[0]
 
         status = WorkOrderStatus.ASSIGNED if assigned_to_id else WorkOrderStatus.DRAFT
 
@@ -471,6 +499,7 @@ class MaintenanceService:
             checklist_id=checklist_id,
             description=description,
             status=status,
+            plan_id=plan_id,
         )
         self.db.add(work_order)
 
@@ -489,6 +518,19 @@ class MaintenanceService:
 
         return work_order
 
+    def allocate_work_order_numbers(self, count: int) -> List[str]:
+        """Günün iş emri numaralarından ardışık bir blok ayırır (WO-YYYYMMDD-NNN)"""
+        prefix = f"WO-{datetime.now().strftime('%Y%m%d')}-"
+        last = 0
+        for (order_no,) in self.db.query(MaintenanceWorkOrder.order_no).filter(
+            MaintenanceWorkOrder.order_no.like(f"{prefix}%")
+        ):
+            try:
+                last = max(last, int(order_no[len(prefix):]))
+            except ValueError:
+                continue
+        return [f"{prefix}{last + i:03d}" for i in range(1, count + 1)]
+
     def _create_checklist_results(self, work_order_id: int, checklist_id: int):
         """İş emri için kontrol listesi sonuç kayıtlarını oluşturur"""
         checklist = self.db.query(MaintenanceChecklist).get(checklist_id)
@@ -532,6 +574,7 @@ class MaintenanceService:
             .all()
         )
 
+    @tracked()
     def get_all_work_orders(self) -> List[MaintenanceWorkOrder]:
         """Tüm iş emirlerini listeler"""
         return (
@@ -563,6 +606,7 @@ class MaintenanceService:
         if wo:
             wo.status = WorkOrderStatus.COMPLETED
             wo.completed_date = datetime.utcnow()
+            self._release_reservations(work_order_id)
             if notes:
                 wo.notes = notes
             if actual_hours:
@@ -585,6 +629,7 @@ class MaintenanceService:
                 equipment.current_status = EquipmentStatus.RUNNING
 
             self.db.commit()
+            KPIEngine.invalidate()
         return wo
 
     def update_work_order_notes(self, work_order_id: int, notes: str) -> MaintenanceWorkOrder:
@@ -644,9 +689,66 @@ class MaintenanceService:
         if balance:
             balance.quantity -= Decimal(str(quantity))
 
+        # Bu parça için rezervasyon varsa kullanılan kadarını serbest bırak
+        self._release_reservations(
+            work_order_id, item_id=item_id, warehouse_id=warehouse_id,
+            quantity=Decimal(str(quantity)),
+        )
+
         self.db.commit()
+        KPIEngine.invalidate()
         return part
 
+    def get_work_order_reservations(self, work_order_id: int) -> List[MaintenancePartReservation]:
+        """İş emri için rezerve edilmiş yedek parçaları getirir"""
+        return (
+            self.db.query(MaintenancePartReservation)
+            .filter(MaintenancePartReservation.work_order_id == work_order_id)
+            .all()
+        )
+
+    def _release_reservations(
+        self,
+        work_order_id: int,
+        item_id: int = None,
+        warehouse_id: int = None,
+        quantity: Decimal = None,
+    ):
+        """Açık rezervasyonları (tamamen veya verilen miktar kadar) serbest bırakır"""
+        query = self.db.query(MaintenancePartReservation).filter(
+            MaintenancePartReservation.work_order_id == work_order_id
+        )
+        if item_id:
+            query = query.filter(MaintenancePartReservation.item_id == item_id)
+        if warehouse_id:
+            query = query.filter(MaintenancePartReservation.warehouse_id == warehouse_id)
+
+        for reservation in query.all():
+            open_qty = Decimal(str(reservation.open_quantity))
+            if open_qty <= 0:
+                continue
+            release = open_qty if quantity is None else min(open_qty, quantity)
+            if release <= 0:
+                break
+
+            balance = (
+                self.db.query(StockBalance)
+                .filter(
+                    StockBalance.item_id == reservation.item_id,
+                    StockBalance.warehouse_id == reservation.warehouse_id,
+                )
+                .first()
+            )
+            if balance:
+                balance.reserved_quantity = max(
+                    Decimal(0), (balance.reserved_quantity or Decimal(0)) - release
+                )
+            reservation.released_quantity = (
+                Decimal(str(reservation.released_quantity or 0)) + release
+            )
+            if quantity is not None:
+                quantity -= release
+
     def get_work_order_attachments(self, work_order_id: int) -> List[WorkOrderAttachment]:
         """İş emri eklerini getirir"""
         return (
@@ -878,6 +980,7 @@ class MaintenanceService:
             equipment_id=plan.equipment_id,
             checklist_id=plan.checklist_id,
             description=f"Periyodik Bakım: {plan.name}",
+            plan_id=plan.id,
         )
 
         # Plan tarihlerini güncelle
@@ -945,68 +1048,26 @@ class MaintenanceService:
 
     def get_equipment_kpis(self, equipment_id: int, period_days: int = 30) -> Dict[str, Any]:
         """Ekipman KPI'larını hesaplar (MTBF, MTTR, Kullanılabilirlik)"""
-        start_date = datetime.utcnow() - timedelta(days=period_days)
-
-        # Arıza sayısı
-        failures = (
-            self.db.query(MaintenanceWorkOrder)
-            .filter(
-                MaintenanceWorkOrder.equipment_id == equipment_id,
-                MaintenanceWorkOrder.status == WorkOrderStatus.COMPLETED,
-                MaintenanceWorkOrder.created_at >= start_date,
-            )
-            .count()
-        )
-
-        # Toplam duruş süresi (dakika)
-        downtimes = (
-            self.db.query(EquipmentDowntime)
-            .filter(
-                EquipmentDowntime.equipment_id == equipment_id,
-                EquipmentDowntime.start_time >= start_date,
-            )
-            .all()
-        )
-
-        total_downtime_hours = sum(d.duration_hours for d in downtimes)
-
-        # Toplam çalışma saati (varsayım: 24/7 çalışma)
-        total_hours = period_days * 24
-
-        # MTBF (Mean Time Between Failures)
-        mtbf = (total_hours - total_downtime_hours) / max(failures, 1)
-
-        # MTTR (Mean Time To Repair)
-        mttr = total_downtime_hours / max(failures, 1)
-
-        # Kullanılabilirlik
-        availability = ((total_hours - total_downtime_hours) / total_hours) * 100
-
-        # Toplam maliyet
-        costs = self.get_equipment_total_cost(equipment_id)
-
-        return {
-            "mtbf": mtbf,
-            "mttr": mttr,
-            "availability": availability,
-            "failure_count": failures,
-            "total_downtime": total_downtime_hours,
-            "total_cost": costs["total_cost"],
-        }
+        df = KPIEngine.equipment_kpis(self.db, period_days, active_only=False)
+        rows = KPIEngine.records(df[df["equipment_id"] == equipment_id])
+        if not rows:
+            return {
+                "mtbf": period_days * 24,
+                "mttr": 0,
+                "availability": 100.0,
+                "failure_count": 0,
+                "total_downtime": 0,
+                "total_cost": 0,
+            }
+        return rows[0]
 
     def get_all_equipment_kpis(self, period_days: int = 30) -> List[Dict[str, Any]]:
         """Tüm ekipmanların KPI'larını hesaplar"""
-        equipments = self.get_equipment_list(active_only=True)
-        result = []
-
-        for eq in equipments:
-            kpis = self.get_equipment_kpis(eq.id, period_days)
-            kpis["equipment_id"] = eq.id
-            kpis["equipment_code"] = eq.code
-            kpis["equipment_name"] = eq.name
-            result.append(kpis)
+        return KPIEngine.records(KPIEngine.equipment_kpis(self.db, period_days))
 
-        return result
+    def get_station_oee(self, start_date, end_date) -> List[Dict[str, Any]]:
+        """İş istasyonu ve gün bazında OEE değerlerini getirir"""
+        return KPIEngine.records(KPIEngine.station_daily_oee(self.db, start_date, end_date))
 
     # ==================== RAPORLAR ====================
 
@@ -2,8 +2,8 @@
 Bakım Modülü - Duruş Takibi
 """
 
-from typing import Optional
-from datetime import datetime
+from typing import Dict, Optional
+from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -25,7 +25,30 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QDateTime, QTimer
 
+from config import LIVE_UPDATE_FALLBACK_SECONDS
 from modules.maintenance.views.base import MaintenanceBaseWidget
+from ui.components.live_watcher import LiveTableWatcher
+
+
+# Duruş sebebi etiketleri
+REASON_LABELS = {
+    "breakdown": "Arıza",
+    "maintenance": "Bakım",
+    "setup": "Kurulum/Ayar",
+    "no_material": "Malzeme Yok",
+    "no_operator": "Operatör Yok",
+    "quality_issue": "Kalite Sorunu",
+    "other": "Diğer",
+}
+
+# Başlangıç/bitiş hücrelerinde saklanan zaman (süre hesabı ve sıralama için)
+TIME_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def _format_duration(start_time: datetime, end_time: Optional[datetime] = None) -> str:
+    duration = (end_time or datetime.now()) - start_time
+    minutes = int(duration.total_seconds() / 60)
+    return f"{minutes // 60}s {minutes % 60}dk"
 
 
 class DowntimeTrackerWidget(MaintenanceBaseWidget):
@@ -33,13 +56,23 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
 
     def __init__(self, parent=None):
         super().__init__("Duruş Takibi", parent)
+        # Aktif duruş özet kartları için bellekteki kopya (id -> özet)
+        self._active: Dict[int, Dict] = {}
         self.setup_ui()
 
-        # Aktif duruşları periyodik güncelle
+        # Değişen duruşlar satır bazında güncellenir
+        self.watcher = LiveTableWatcher(["equipment_downtimes"], self._apply_changes, self)
+
+        # Süreler her dakika bellekteki başlangıç zamanından yeniden hesaplanır
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_active_downtimes)
         self.timer.start(60000)  # Her dakika
 
+        # Diğer istemcilerin bildirimleri gelmiyorsa seyrek tam yenileme
+        self.fallback_timer = QTimer()
+        self.fallback_timer.timeout.connect(self._fallback_refresh)
+        self.fallback_timer.start(LIVE_UPDATE_FALLBACK_SECONDS * 1000)
+
     def setup_ui(self):
         # Üst Butonlar
         btn_layout = QHBoxLayout()
@@ -92,8 +125,9 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
     def refresh_data(self):
         filter_type = self.cmb_filter.currentData()
 
+        active_downtimes = self.service.get_active_downtimes()
         if filter_type == "active":
-            downtimes = self.service.get_active_downtimes()
+            downtimes = active_downtimes
         elif filter_type == "today":
             downtimes = self.service.get_today_downtimes()
         elif filter_type == "week":
@@ -101,18 +135,86 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
         else:
             downtimes = self.service.get_all_downtimes()
 
+        self._active = {dt.id: self._summary(dt) for dt in active_downtimes}
         self._refresh_active_summary()
         self._populate_table(downtimes)
 
+    def _apply_changes(self, changes):
+        """Değişen duruşları tabloda ve özet kartlarında günceller"""
+        if "equipment_downtimes" not in changes:
+            return
+        ids = changes["equipment_downtimes"]
+        if ids is None:
+            self.refresh_data()
+            return
+
+        downtimes = {dt.id: dt for dt in self.service.get_downtimes_by_ids(sorted(ids))}
+        for downtime_id in ids:
+            dt = downtimes.get(downtime_id)
+            if dt is not None and dt.end_time is None:
+                self._active[downtime_id] = self._summary(dt)
+            else:
+                self._active.pop(downtime_id, None)
+
+            row = self._find_row(downtime_id)
+            if dt is None or not self._matches_filter(dt):
+                if row >= 0:
+                    self.table.removeRow(row)
+            elif row >= 0 and self.table.item(row, 1).data(TIME_ROLE) == dt.start_time:
+                self._set_row(row, dt)
+            else:
+                # Yeni satır veya başlangıcı değişmiş: sıralı konuma yerleştir
+                if row >= 0:
+                    self.table.removeRow(row)
+                row = self._insert_position(dt.start_time)
+                self.table.insertRow(row)
+                self._set_row(row, dt)
+
+        self._refresh_active_summary()
+
+    def _matches_filter(self, downtime) -> bool:
+        filter_type = self.cmb_filter.currentData()
+        if filter_type == "active":
+            return downtime.end_time is None
+        if filter_type == "today":
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            return downtime.start_time >= today
+        if filter_type == "week":
+            return downtime.start_time >= datetime.now() - timedelta(days=7)
+        return True
+
+    def _find_row(self, downtime_id: int) -> int:
+        for i in range(self.table.rowCount()):
+            if self.table.item(i, 0).data(Qt.ItemDataRole.UserRole) == downtime_id:
+                return i
+        return -1
+
+    def _insert_position(self, start_time: datetime) -> int:
+        """Tablo başlangıç zamanına göre yeniden eskiye sıralıdır"""
+        for i in range(self.table.rowCount()):
+            if self.table.item(i, 1).data(TIME_ROLE) < start_time:
+                return i
+        return self.table.rowCount()
+
+    @staticmethod
+    def _summary(downtime) -> Dict:
+        return {
+            "equipment_code": downtime.equipment.code if downtime.equipment else "-",
+            "start_time": downtime.start_time,
+            "reason": downtime.reason,
+        }
+
     def _refresh_active_summary(self):
-        """Aktif duruş özet kartlarını güncelle"""
+        """Aktif duruş özet kartlarını bellekteki kopyadan çiz"""
         # Temizle
         while self.active_summary_layout.count():
             item = self.active_summary_layout.takeAt(0)
             if item.widget():
                 item.widget().deleteLater()
 
-        active_downtimes = self.service.get_active_downtimes()
+        active_downtimes = sorted(
+            self._active.values(), key=lambda d: d["start_time"], reverse=True
+        )
         if not active_downtimes:
             label = QLabel("Aktif duruş yok")
             label.setStyleSheet("color: #22c55e; font-weight: bold;")
@@ -130,7 +232,7 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
 
         self.active_summary_layout.addStretch()
 
-    def _create_active_downtime_card(self, downtime) -> QWidget:
+    def _create_active_downtime_card(self, downtime: Dict) -> QWidget:
         """Aktif duruş kartı oluştur"""
         card = QGroupBox()
         card.setStyleSheet("""
@@ -145,22 +247,18 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
         card_layout = QVBoxLayout(card)
         card_layout.setContentsMargins(8, 8, 8, 8)
 
-        # Ekipman adı
-        lbl_equipment = QLabel(downtime.equipment.code if downtime.equipment else "-")
+        # Ekipman kodu
+        lbl_equipment = QLabel(downtime["equipment_code"])
         lbl_equipment.setStyleSheet("font-weight: bold; color: #dc2626;")
         card_layout.addWidget(lbl_equipment)
 
         # Süre
-        duration = datetime.now() - downtime.start_time
-        minutes = int(duration.total_seconds() / 60)
-        hours = minutes // 60
-        mins = minutes % 60
-        lbl_duration = QLabel(f"{hours}s {mins}dk")
+        lbl_duration = QLabel(_format_duration(downtime["start_time"]))
         lbl_duration.setStyleSheet("font-size: 18px; font-weight: bold;")
         card_layout.addWidget(lbl_duration)
 
         # Sebep
-        lbl_reason = QLabel(downtime.reason or "-")
+        lbl_reason = QLabel(downtime["reason"] or "-")
         lbl_reason.setStyleSheet("color: #6b7280; font-size: 11px;")
         card_layout.addWidget(lbl_reason)
 
@@ -171,77 +269,60 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
         self.table.setRowCount(len(downtimes))
 
         for i, dt in enumerate(downtimes):
-            self.table.setItem(i, 0, QTableWidgetItem(
-                dt.equipment.name if dt.equipment else "-"
-            ))
-            self.table.item(i, 0).setData(Qt.ItemDataRole.UserRole, dt.id)
-
-            self.table.setItem(i, 1, QTableWidgetItem(
-                dt.start_time.strftime("%d.%m.%Y %H:%M")
-            ))
-
-            self.table.setItem(i, 2, QTableWidgetItem(
-                dt.end_time.strftime("%d.%m.%Y %H:%M") if dt.end_time else "-"
-            ))
-
-            # Süre hesapla
-            if dt.end_time:
-                duration = dt.end_time - dt.start_time
-            else:
-                duration = datetime.now() - dt.start_time
-            minutes = int(duration.total_seconds() / 60)
-            hours = minutes // 60
-            mins = minutes % 60
-            duration_item = QTableWidgetItem(f"{hours}s {mins}dk")
-            if not dt.end_time:
-                duration_item.setForeground(Qt.GlobalColor.red)
-            self.table.setItem(i, 3, duration_item)
-
-            # Sebep
-            reason_labels = {
-                "breakdown": "Arıza",
-                "maintenance": "Bakım",
-                "setup": "Kurulum/Ayar",
-                "no_material": "Malzeme Yok",
-                "no_operator": "Operatör Yok",
-                "quality_issue": "Kalite Sorunu",
-                "other": "Diğer",
-            }
-            self.table.setItem(i, 4, QTableWidgetItem(
-                reason_labels.get(dt.reason, dt.reason or "-")
-            ))
-
-            self.table.setItem(i, 5, QTableWidgetItem(
-                dt.work_order.order_no if dt.work_order else "-"
-            ))
-
-            # Durum
-            status_item = QTableWidgetItem("Devam Ediyor" if not dt.end_time else "Tamamlandı")
-            if not dt.end_time:
-                status_item.setForeground(Qt.GlobalColor.red)
-            else:
-                status_item.setForeground(Qt.GlobalColor.darkGreen)
-            self.table.setItem(i, 6, status_item)
+            self._set_row(i, dt)
+
+    def _set_row(self, i: int, dt):
+        """Tablo satırını duruş kaydıyla doldur"""
+        self.table.setItem(i, 0, QTableWidgetItem(
+            dt.equipment.name if dt.equipment else "-"
+        ))
+        self.table.item(i, 0).setData(Qt.ItemDataRole.UserRole, dt.id)
+
+        start_item = QTableWidgetItem(dt.start_time.strftime("%d.%m.%Y %H:%M"))
+        start_item.setData(TIME_ROLE, dt.start_time)
+        self.table.setItem(i, 1, start_item)
+
+        end_item = QTableWidgetItem(
+            dt.end_time.strftime("%d.%m.%Y %H:%M") if dt.end_time else "-"
+        )
+        end_item.setData(TIME_ROLE, dt.end_time)
+        self.table.setItem(i, 2, end_item)
+
+        # Süre
+        duration_item = QTableWidgetItem(_format_duration(dt.start_time, dt.end_time))
+        if not dt.end_time:
+            duration_item.setForeground(Qt.GlobalColor.red)
+        self.table.setItem(i, 3, duration_item)
+
+        # Sebep
+        self.table.setItem(i, 4, QTableWidgetItem(
+            REASON_LABELS.get(dt.reason, dt.reason or "-")
+        ))
+
+        self.table.setItem(i, 5, QTableWidgetItem(
+            dt.work_order.order_no if dt.work_order else "-"
+        ))
+
+        # Durum
+        status_item = QTableWidgetItem("Devam Ediyor" if not dt.end_time else "Tamamlandı")
+        if not dt.end_time:
+            status_item.setForeground(Qt.GlobalColor.red)
+        else:
+            status_item.setForeground(Qt.GlobalColor.darkGreen)
+        self.table.setItem(i, 6, status_item)
 
     def update_active_downtimes(self):
-        """Aktif duruşları güncelle (timer callback)"""
-        if self.cmb_filter.currentData() == "active":
-            self._refresh_active_summary()
-            # Süre sütunlarını güncelle
-            for i in range(self.table.rowCount()):
-                status_item = self.table.item(i, 6)
-                if status_item and status_item.text() == "Devam Ediyor":
-                    # Başlangıç zamanından süreyi yeniden hesapla
-                    start_text = self.table.item(i, 1).text()
-                    try:
-                        start_time = datetime.strptime(start_text, "%d.%m.%Y %H:%M")
-                        duration = datetime.now() - start_time
-                        minutes = int(duration.total_seconds() / 60)
-                        hours = minutes // 60
-                        mins = minutes % 60
-                        self.table.item(i, 3).setText(f"{hours}s {mins}dk")
-                    except:
-                        pass
+        """Aktif duruş sürelerini güncelle (timer callback, veritabanına gitmez)"""
+        self._refresh_active_summary()
+        for i in range(self.table.rowCount()):
+            if self.table.item(i, 2).data(TIME_ROLE) is None:
+                start_time = self.table.item(i, 1).data(TIME_ROLE)
+                self.table.item(i, 3).setText(_format_duration(start_time))
+
+    def _fallback_refresh(self):
+        """Diğer istemcilerin bildirimleri gelmiyorsa tabloyu tamamen yenile"""
+        if not self.watcher.is_live:
+            self.refresh_data()
 
     def get_selected_downtime_id(self) -> Optional[int]:
         current_row = self.table.currentRow()
@@ -250,9 +331,9 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
         return self.table.item(current_row, 0).data(Qt.ItemDataRole.UserRole)
 
     def start_downtime(self):
+        # Tablo, kaydın commit bildirimiyle (LiveTableWatcher) güncellenir
         dialog = DowntimeStartDialog(self.service, self)
-        if dialog.exec():
-            self.refresh_data()
+        dialog.exec()
 
     def end_downtime(self):
         downtime_id = self.get_selected_downtime_id()
@@ -276,12 +357,13 @@ class DowntimeTrackerWidget(MaintenanceBaseWidget):
             try:
                 self.service.end_downtime(downtime_id)
                 QMessageBox.information(self, "Bilgi", "Duruş sonlandırıldı.")
-                self.refresh_data()
             except Exception as e:
                 QMessageBox.critical(self, "Hata", str(e))
 
     def closeEvent(self, event):
+        self.watcher.stop()
         self.timer.stop()
+        self.fallback_timer.stop()
         super().closeEvent(event)
 
 
@@ -64,6 +64,10 @@ class MaintenancePlanWidget(MaintenanceBaseWidget):
         self.btn_generate.clicked.connect(self.generate_work_order)
         btn_layout.addWidget(self.btn_generate)
 
+        self.btn_generate_due = QPushButton("Vadesi Gelenleri Oluştur")
+        self.btn_generate_due.clicked.connect(self.generate_due_work_orders)
+        btn_layout.addWidget(self.btn_generate_due)
+
         btn_layout.addStretch()
 
         # Filtre
@@ -196,6 +200,20 @@ class MaintenancePlanWidget(MaintenanceBaseWidget):
         except Exception as e:
             QMessageBox.critical(self, "Hata", str(e))
 
+    def generate_due_work_orders(self):
+        """Vadesi gelen tüm planlar için iş emirlerini toplu oluştur"""
+        from modules.maintenance.scheduler import PreventiveMaintenanceScheduler
+
+        try:
+            result = PreventiveMaintenanceScheduler(self.service.db).run()
+            message = f"{len(result['work_orders'])} iş emri oluşturuldu."
+            if result["shortages"]:
+                message += f"\n{len(result['shortages'])} yedek parça için yeterli stok yok."
+            QMessageBox.information(self, "Başarılı", message)
+            self.refresh_data()
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", str(e))
+
 
 class PlanDialog(QDialog):
     """Bakım Planı Ekleme/Düzenleme Dialogu"""
@@ -0,0 +1,501 @@
+"""
+Akıllı İş - MRP Önerilerinin Toplu Uygulanması
+
+Bir MRP çalışmasının tüm önerilerini tek transaction içinde uygular:
+- Satınalma önerileri tercih edilen tedarikçiye (son satınalma siparişi)
+  ve ihtiyaç tarihi penceresine göre gruplanır; her grup ayrı bir
+  Satınalma Talebi olur
+- Üretim önerileri için aktif reçeteler, reçete satırları ve
+  operasyonlar tek seferde önbelleğe alınır; WorkOrder / WorkOrderLine /
+  WorkOrderOperation satırları toplu INSERT ile yazılır
+- Belge numaraları blok halinde ayrılır
+- İlerleme progress(tamamlanan, toplam, mesaj) ile bildirilir
+
+Kullanım:
+    with session_scope():
+        result = MRPService().apply_all_suggestions(run_id, progress=callback)
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from database.models.inventory import Item
+from database.models.mrp import MRPLine, MRPRun, SuggestionType
+from database.models.production import (
+    BillOfMaterials,
+    BOMLine,
+    BOMOperation,
+    BOMStatus,
+    WorkOrder,
+    WorkOrderLine,
+    WorkOrderOperation,
+    WorkOrderPriority,
+    WorkOrderStatus,
+)
+from database.models.purchasing import (
+    PurchaseOrder,
+    PurchaseOrderItem,
+    PurchaseRequest,
+    PurchaseRequestItem,
+    PurchaseRequestStatus,
+    Supplier,
+)
+
+
+ProgressCallback = Callable[[int, int, str], None]
+
+# Aynı tedarikçinin bu kadar gün içindeki ihtiyaçları tek talepte toplanır
+DATE_WINDOW_DAYS = 7
+
+
+def _chunks(values: List, size: int) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class SuggestionBatchApplier:
+    """MRP önerilerini toplu uygulayan servis (commit çağırana aittir)"""
+
+    CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        session: Session,
+        progress: Optional[ProgressCallback] = None,
+        date_window_days: int = DATE_WINDOW_DAYS,
+    ):
+        self.session = session
+        self.progress = progress
+        self.date_window_days = date_window_days
+        self._done = 0
+        self._total = 0
+
+    def _report(self, count: int, message: str) -> None:
+        self._done += count
+        if self.progress:
+            self.progress(self._done, self._total, message)
+
+    # =====================
+    # GİRİŞ
+    # =====================
+
+    def apply(self, run_id: int, auto_create: bool = True) -> Dict:
+        """
+        Çalışmanın uygulanmamış önerilerini uygular.
+
+        Returns:
+            dict: total, purchase_requests, work_orders, purchase_request_ids,
+            work_order_ids, skipped (reçetesiz üretim önerisi), errors
+        """
+        run_no = self.session.execute(
+            select(MRPRun.run_no).where(MRPRun.id == run_id)
+        ).scalar() or ""
+
+        suggestions = self.session.execute(
+            select(
+                MRPLine.id,
+                MRPLine.item_id,
+                MRPLine.suggestion_type,
+                MRPLine.suggested_qty,
+                MRPLine.suggested_date,
+                MRPLine.requirement_date,
+                MRPLine.demand_source_ref,
+            )
+            .where(
+                MRPLine.mrp_run_id == run_id,
+                MRPLine.suggestion_type.isnot(None),
+                MRPLine.is_applied == False,
+            )
+            .order_by(MRPLine.suggested_date, MRPLine.item_id)
+        ).all()
+
+        result = {
+            "total": len(suggestions),
+            "purchase_requests": 0,
+            "work_orders": 0,
+            "purchase_request_ids": [],
+            "work_order_ids": [],
+            "skipped": 0,
+            "errors": [],
+        }
+        self._done = 0
+        self._total = len(suggestions)
+        if not suggestions:
+            return result
+
+        purchase = [s for s in suggestions if s.suggestion_type == SuggestionType.PURCHASE]
+        manufacture = [
+            s for s in suggestions if s.suggestion_type == SuggestionType.MANUFACTURE
+        ]
+
+        # MRP satırı id -> (belge tipi, belge id)
+        applied: Dict[int, Tuple[str, Optional[int]]] = {}
+
+        if not auto_create:
+            applied.update((s.id, ("purchase_request", None)) for s in purchase)
+            applied.update((s.id, ("work_order", None)) for s in manufacture)
+            self._report(len(suggestions), "Öneriler işaretlendi")
+        else:
+            if purchase:
+                self._create_purchase_requests(purchase, run_no, applied, result)
+            if manufacture:
+                self._create_work_orders(manufacture, run_no, applied, result)
+
+        self._mark_applied(applied)
+        return result
+
+    def _mark_applied(self, applied: Dict[int, Tuple[str, Optional[int]]]) -> None:
+        now = datetime.now()
+        rows = [
+            {
+                "id": line_id,
+                "is_applied": True,
+                "applied_at": now,
+                "applied_order_type": order_type,
+                "applied_order_id": order_id,
+            }
+            for line_id, (order_type, order_id) in applied.items()
+        ]
+        for chunk in _chunks(rows, self.CHUNK_SIZE):
+            self.session.execute(update(MRPLine), chunk)
+
+    # =====================
+    # SATINALMA TALEPLERİ
+    # =====================
+
+    def _preferred_suppliers(self, item_ids: List[int]) -> Dict[int, Tuple[int, Decimal]]:
+        """Ürün -> (son satınalma siparişinin tedarikçisi, birim fiyatı)"""
+        preferred: Dict[int, Tuple[int, Decimal]] = {}
+        for chunk in _chunks(item_ids, self.CHUNK_SIZE):
+            rows = self.session.execute(
+                select(PurchaseOrderItem.item_id, PurchaseOrder.supplier_id, PurchaseOrderItem.unit_price)
+                .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.order_id)
+                .where(PurchaseOrderItem.item_id.in_(chunk))
+                .order_by(PurchaseOrder.order_date.desc(), PurchaseOrder.id.desc())
+            )
+            for item_id, supplier_id, unit_price in rows:
+                preferred.setdefault(item_id, (supplier_id, unit_price))
+        return preferred
+
+    def _group_purchases(self, suggestions: List, preferred: Dict) -> List[Tuple[Optional[int], List]]:
+        """Tedarikçi + ihtiyaç tarihi penceresi grupları"""
+        by_supplier: Dict[Optional[int], List] = {}
+        for suggestion in suggestions:
+            supplier_id = preferred.get(suggestion.item_id, (None, None))[0]
+            by_supplier.setdefault(supplier_id, []).append(suggestion)
+
+        groups = []
+        for supplier_id, lines in by_supplier.items():
+            lines.sort(key=lambda s: s.suggested_date or date.max)
+            window_start = None
+            for suggestion in lines:
+                need_date = suggestion.suggested_date or date.today()
+                if (
+                    window_start is None
+                    or (need_date - window_start).days > self.date_window_days
+                ):
+                    window_start = need_date
+                    groups.append((supplier_id, []))
+                groups[-1][1].append(suggestion)
+        return groups
+
+    def _create_purchase_requests(
+        self, suggestions: List, run_no: str, applied: Dict, result: Dict
+    ) -> None:
+        from modules.purchasing.services import PurchaseRequestService
+
+        item_ids = sorted({s.item_id for s in suggestions})
+        preferred = self._preferred_suppliers(item_ids)
+        items = self._item_info(item_ids)
+        supplier_names = dict(
+            self.session.execute(
+                select(Supplier.id, Supplier.name).where(
+                    Supplier.id.in_({supplier_id for supplier_id, _ in preferred.values()})
+                )
+            ).all()
+        )
+
+        groups = self._group_purchases(suggestions, preferred)
+        request_nos = PurchaseRequestService().allocate_request_numbers(len(groups))
+        today = date.today()
+
+        headers = []
+        for (supplier_id, lines), request_no in zip(groups, request_nos):
+            supplier = supplier_names.get(supplier_id, "Tedarikçi belirsiz")
+            headers.append(
+                {
+                    "request_no": request_no,
+                    "request_date": today,
+                    "requested_by": "MRP Sistem",
+                    "status": PurchaseRequestStatus.DRAFT,
+                    "priority": 2,
+                    "required_date": min(s.suggested_date or today for s in lines),
+                    "notes": f"MRP Run #{run_no} - {supplier} - {len(lines)} kalem",
+                }
+            )
+        for chunk in _chunks(headers, self.CHUNK_SIZE):
+            self.session.execute(insert(PurchaseRequest), chunk)
+        ids = self._ids(PurchaseRequest.request_no, PurchaseRequest.id, request_nos)
+
+        rows = []
+        for (supplier_id, lines), request_no in zip(groups, request_nos):
+            request_id = ids[request_no]
+            for suggestion in lines:
+                unit_id, purchase_price, _ = items.get(suggestion.item_id, (None, None, None))
+                last_price = preferred.get(suggestion.item_id, (None, None))[1]
+                need_date = suggestion.suggested_date
+                rows.append(
+                    {
+                        "request_id": request_id,
+                        "item_id": suggestion.item_id,
+                        "quantity": suggestion.suggested_qty,
+                        "unit_id": unit_id,
+                        "specification": (
+                            f"MRP: {suggestion.demand_source_ref or ''}"
+                            + (f" (ihtiyaç {need_date:%d.%m.%Y})" if need_date else "")
+                        ),
+                        "suggested_supplier_id": supplier_id,
+                        "estimated_price": last_price if last_price is not None else purchase_price,
+                    }
+                )
+                applied[suggestion.id] = ("purchase_request", request_id)
+        for chunk in _chunks(rows, self.CHUNK_SIZE):
+            self.session.execute(insert(PurchaseRequestItem), chunk)
+
+        result["purchase_requests"] = len(groups)
+        result["purchase_request_ids"] = [ids[no] for no in request_nos]
+        self._report(len(suggestions), f"{len(groups)} satınalma talebi oluşturuldu")
+
+    # =====================
+    # İŞ EMİRLERİ
+    # =====================
+
+    def _load_boms(self, item_ids: List[int]) -> Dict[int, Dict]:
+        """Ürün -> aktif reçete (satırlar ve operasyonlarla birlikte)"""
+        boms: Dict[int, Dict] = {}
+        for chunk in _chunks(item_ids, self.CHUNK_SIZE):
+            rows = self.session.execute(
+                select(
+                    BillOfMaterials.id,
+                    BillOfMaterials.item_id,
+                    BillOfMaterials.base_quantity,
+                    BillOfMaterials.labor_cost,
+                    BillOfMaterials.overhead_cost,
+                )
+                .where(
+                    BillOfMaterials.item_id.in_(chunk),
+                    BillOfMaterials.status == BOMStatus.ACTIVE,
+                    BillOfMaterials.is_active == True,
+                )
+                .order_by(BillOfMaterials.id)
+            )
+            for bom_id, item_id, base_quantity, labor_cost, overhead_cost in rows:
+                boms.setdefault(
+                    item_id,
+                    {
+                        "id": bom_id,
+                        "base_quantity": base_quantity or Decimal(1),
+                        "labor_cost": labor_cost or Decimal(0),
+                        "overhead_cost": overhead_cost or Decimal(0),
+                        "material_cost": Decimal(0),
+                        "lines": [],
+                        "operations": [],
+                    },
+                )
+
+        by_id = {bom["id"]: bom for bom in boms.values()}
+        for chunk in _chunks(list(by_id), self.CHUNK_SIZE):
+            lines = self.session.execute(
+                select(
+                    BOMLine.bom_id,
+                    BOMLine.id,
+                    BOMLine.item_id,
+                    BOMLine.quantity,
+                    BOMLine.scrap_rate,
+                    BOMLine.unit_id,
+                    Item.purchase_price,
+                )
+                .outerjoin(Item, Item.id == BOMLine.item_id)
+                .where(BOMLine.bom_id.in_(chunk))
+                .order_by(BOMLine.bom_id, BOMLine.id)
+            )
+            for bom_id, line_id, item_id, quantity, scrap_rate, unit_id, price in lines:
+                bom = by_id[bom_id]
+                # BOMLine.effective_quantity ile aynı
+                effective = (quantity or Decimal(0)) * (1 + (scrap_rate or Decimal(0)) / 100)
+                bom["lines"].append((line_id, item_id, effective, unit_id, price or Decimal(0)))
+
+            operations = self.session.execute(
+                select(
+                    BOMOperation.bom_id,
+                    BOMOperation.id,
+                    BOMOperation.operation_no,
+                    BOMOperation.name,
+                    BOMOperation.work_station_id,
+                    BOMOperation.setup_time,
+                    BOMOperation.run_time,
+                )
+                .where(BOMOperation.bom_id.in_(chunk))
+                .order_by(BOMOperation.bom_id, BOMOperation.operation_no)
+            )
+            for bom_id, *operation in operations:
+                by_id[bom_id]["operations"].append(tuple(operation))
+
+        self._apply_standard_costs(boms)
+        return boms
+
+    def _apply_standard_costs(self, boms: Dict[int, Dict]) -> None:
+        """
+        Satır birim maliyetlerini ve planlanan maliyetleri standart
+        maliyetlerden alır (bkz. modules/production/costing.py).
+
+        İşçilik ve genel gider, ürünün anlık görüntüsü aynı reçeteden
+        hesaplandıysa standart maliyetten (makine maliyeti işçiliğe dahil)
+        gelir; tutarlar reçetenin base_quantity miktarı içindir.
+        """
+        from modules.production.costing import cost_rollup
+
+        components = {line[1] for bom in boms.values() for line in bom["lines"]}
+        unit_costs = cost_rollup.unit_costs(self.session, components)
+        standards = cost_rollup.get_costs(self.session, list(boms))
+
+        for item_id, bom in boms.items():
+            bom["lines"] = [
+                (line_id, component_id, effective, unit_id, unit_costs.get(component_id, price))
+                for line_id, component_id, effective, unit_id, price in bom["lines"]
+            ]
+            bom["material_cost"] = sum(
+                (line[2] * line[4] for line in bom["lines"]), Decimal(0)
+            )
+
+            standard = standards.get(item_id)
+            if standard and standard["bom_id"] == bom["id"]:
+                base = bom["base_quantity"]
+                bom["labor_cost"] = (standard["labor_cost"] + standard["machine_cost"]) * base
+                bom["overhead_cost"] = standard["overhead_cost"] * base
+
+    def _create_work_orders(
+        self, suggestions: List, run_no: str, applied: Dict, result: Dict
+    ) -> None:
+        from modules.production.services import WorkOrderService
+
+        item_ids = sorted({s.item_id for s in suggestions})
+        boms = self._load_boms(item_ids)
+        items = self._item_info(item_ids)
+
+        planned = []
+        for suggestion in suggestions:
+            if suggestion.item_id not in boms:
+                result["skipped"] += 1
+                code = items.get(suggestion.item_id, (None, None, suggestion.item_id))[2]
+                result["errors"].append(f"İş emri oluşturulamadı ({code}): aktif reçete yok")
+                continue
+            planned.append(suggestion)
+        if len(planned) < len(suggestions):
+            self._report(len(suggestions) - len(planned), "Reçetesiz öneriler atlandı")
+        if not planned:
+            return
+
+        order_nos = WorkOrderService().allocate_order_numbers(len(planned))
+        notes = f"MRP Run #{run_no} tarafından oluşturuldu"
+
+        for chunk in _chunks(list(zip(planned, order_nos)), self.CHUNK_SIZE):
+            headers = []
+            for suggestion, order_no in chunk:
+                bom = boms[suggestion.item_id]
+                quantity = suggestion.suggested_qty
+                multiplier = quantity / bom["base_quantity"]
+                start = suggestion.suggested_date
+                end = suggestion.requirement_date
+                headers.append(
+                    {
+                        "order_no": order_no,
+                        "status": WorkOrderStatus.DRAFT,
+                        "priority": WorkOrderPriority.NORMAL,
+                        "item_id": suggestion.item_id,
+                        "bom_id": bom["id"],
+                        "planned_quantity": quantity,
+                        "unit_id": items.get(suggestion.item_id, (None,))[0],
+                        "planned_start": datetime.combine(start, time()) if start else None,
+                        "planned_end": datetime.combine(end, time()) if end else None,
+                        "planned_material_cost": bom["material_cost"] * multiplier,
+                        "planned_labor_cost": bom["labor_cost"] * multiplier,
+                        "planned_overhead_cost": bom["overhead_cost"] * multiplier,
+                        "notes": notes,
+                    }
+                )
+            self.session.execute(insert(WorkOrder), headers)
+            ids = self._ids(WorkOrder.order_no, WorkOrder.id, [no for _, no in chunk])
+
+            lines, operations = [], []
+            for suggestion, order_no in chunk:
+                order_id = ids[order_no]
+                bom = boms[suggestion.item_id]
+                quantity = suggestion.suggested_qty
+                multiplier = quantity / bom["base_quantity"]
+                for line_id, item_id, effective, unit_id, unit_cost in bom["lines"]:
+                    required = effective * multiplier
+                    lines.append(
+                        {
+                            "work_order_id": order_id,
+                            "bom_line_id": line_id,
+                            "item_id": item_id,
+                            "required_quantity": required,
+                            "issued_quantity": Decimal(0),
+                            "unit_id": unit_id,
+                            "unit_cost": unit_cost,
+                            "line_cost": required * unit_cost,
+                        }
+                    )
+                for op_id, operation_no, name, station_id, setup_time, run_time in bom["operations"]:
+                    operations.append(
+                        {
+                            "work_order_id": order_id,
+                            "bom_operation_id": op_id,
+                            "operation_no": operation_no,
+                            "name": name,
+                            "work_station_id": station_id,
+                            "planned_setup_time": setup_time,
+                            "planned_run_time": int((run_time or 0) * float(quantity)),
+                        }
+                    )
+                applied[suggestion.id] = ("work_order", order_id)
+                result["work_order_ids"].append(order_id)
+
+            if lines:
+                self.session.execute(insert(WorkOrderLine), lines)
+            if operations:
+                self.session.execute(insert(WorkOrderOperation), operations)
+            result["work_orders"] += len(chunk)
+            self._report(len(chunk), f"{result['work_orders']} iş emri oluşturuldu")
+
+    # =====================
+    # YARDIMCI
+    # =====================
+
+    def _item_info(self, item_ids: List[int]) -> Dict[int, Tuple[int, Decimal, str]]:
+        """Ürün -> (birim, alış fiyatı, kod)"""
+        info = {}
+        for chunk in _chunks(item_ids, self.CHUNK_SIZE):
+            for item_id, unit_id, purchase_price, code in self.session.execute(
+                select(Item.id, Item.unit_id, Item.purchase_price, Item.code).where(
+                    Item.id.in_(chunk)
+                )
+            ):
+                info[item_id] = (unit_id, purchase_price, code)
+        return info
+
+    def _ids(self, number_column, id_column, numbers: List[str]) -> Dict[str, int]:
+        """Toplu eklenen belgelerin numara -> id eşlemesi"""
+        ids = {}
+        for chunk in _chunks(numbers, self.CHUNK_SIZE):
+            ids.update(
+                self.session.execute(
+                    select(number_column, id_column).where(number_column.in_(chunk))
+                ).all()
+            )
+        return ids
@@ -8,9 +8,10 @@ from typing import List, Dict, Optional, Tuple
 import json
 
 from sqlalchemy import func, and_, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from database.base import get_session
+from database.replica import get_read_session
 from database.models.mrp import (
     MRPRun,
     MRPLine,
@@ -40,8 +41,15 @@ class MRPService:
 
     def __init__(self):
         self.session: Session = get_session()
+        # Veri toplama sorguları (ürün, ihtiyaç, stok, girişler, BOM) okuma
+        # kopyasından yapılır; MRP kayıtları birincile yazılır. Çalıştırma
+        # ekranı ve mrp_run işi session_scope() içinde çalıştığından kopya
+        # kapsamdan bağımsız açılır.
+        self.read_session: Session = get_read_session(ignore_scope=True)
 
     def close(self):
+        if self.read_session is not None and self.read_session is not self.session:
+            self.read_session.close()
         if self.session:
             self.session.close()
 
@@ -165,7 +173,7 @@ class MRPService:
 
     def _get_items_to_plan(self, item_ids: List[int] = None) -> List[Item]:
         """Planlanacak ürünleri getir"""
-        query = self.session.query(Item).filter(Item.is_active == True)
+        query = self.read_session.query(Item).filter(Item.is_active == True)
 
         if item_ids:
             query = query.filter(Item.id.in_(item_ids))
@@ -213,7 +221,7 @@ class MRPService:
         """İş emirlerinden malzeme ihtiyaçları"""
         # Açık iş emirlerinin malzeme satırları
         lines = (
-            self.session.query(WorkOrderLine)
+            self.read_session.query(WorkOrderLine)
             .join(WorkOrder)
             .filter(
                 WorkOrderLine.item_id == item_id,
@@ -246,7 +254,7 @@ class MRPService:
     ) -> List[Dict]:
         """Satış siparişlerinden ürün ihtiyaçları"""
         items = (
-            self.session.query(SalesOrderItem)
+            self.read_session.query(SalesOrderItem)
             .join(SalesOrder)
             .filter(
                 SalesOrderItem.item_id == item_id,
@@ -283,7 +291,7 @@ class MRPService:
         Formül: quantity - reserved_quantity
         """
         result = (
-            self.session.query(
+            self.read_session.query(
                 func.sum(
                     StockBalance.quantity
                     - func.coalesce(StockBalance.reserved_quantity, 0)
@@ -305,7 +313,7 @@ class MRPService:
 
         # Açık satınalma siparişleri
         po_items = (
-            self.session.query(PurchaseOrderItem)
+            self.read_session.query(PurchaseOrderItem)
             .join(PurchaseOrder)
             .filter(
                 PurchaseOrderItem.item_id == item_id,
@@ -462,7 +470,7 @@ class MRPService:
 
         # Aktif BOM bul
         bom = (
-            self.session.query(BillOfMaterials)
+            self.read_session.query(BillOfMaterials)
             .filter(
                 BillOfMaterials.item_id == item_id,
                 BillOfMaterials.status == BOMStatus.ACTIVE,
@@ -530,6 +538,7 @@ class MRPService:
         """Tedarik önerilerini getir"""
         return (
             self.session.query(MRPLine)
+            .options(joinedload(MRPLine.item))
             .filter(
                 MRPLine.mrp_run_id == run_id,
                 MRPLine.suggestion_type.isnot(None),
@@ -660,97 +669,43 @@ class MRPService:
 
         return order.id
 
-    def apply_all_suggestions(self, run_id: int, auto_create: bool = True) -> Dict:
-        """
-        Tüm önerileri uygula
-
-        Satınalma önerileri tek talep altında gruplandı
-        Üretim önerileri ayrı iş emirleri olarak oluşturulur
+    def apply_all_suggestions(
+        self,
+        run_id: int,
+        auto_create: bool = True,
+        progress=None,
+        date_window_days: int = None,
+    ) -> Dict:
         """
-        suggestions = self.get_suggestions(run_id)
-
-        results = {
-            "total": len(suggestions),
-            "purchase_requests": 0,
-            "work_orders": 0,
-            "errors": [],
-        }
-
-        # Satınalma önerilerini grupla (tek talep, çoklu kalem)
-        purchase_lines = [
-            s for s in suggestions if s.suggestion_type == SuggestionType.PURCHASE
-        ]
-        manufacture_lines = [
-            s for s in suggestions if s.suggestion_type == SuggestionType.MANUFACTURE
-        ]
+        Tüm önerileri tek transaction içinde toplu uygula
 
-        # Satınalma taleplerini tek seferde oluştur
-        if purchase_lines and auto_create:
-            try:
-                pr_id = self._create_bulk_purchase_request(purchase_lines, run_id)
-                for line in purchase_lines:
-                    line.is_applied = True
-                    line.applied_at = datetime.now()
-                    line.applied_order_type = "purchase_request"
-                    line.applied_order_id = pr_id
-                results["purchase_requests"] = 1
-                results["purchase_request_id"] = pr_id
-            except Exception as e:
-                results["errors"].append(f"Satınalma hatası: {e}")
-        elif purchase_lines:
-            for line in purchase_lines:
-                line.is_applied = True
-                line.applied_at = datetime.now()
-                line.applied_order_type = "purchase_request"
-
-        # Üretim emirlerini ayrı ayrı oluştur
-        for line in manufacture_lines:
-            try:
-                if auto_create:
-                    wo_id = self._create_work_order(line)
-                    line.applied_order_id = wo_id
-                    results["work_orders"] += 1
-                line.is_applied = True
-                line.applied_at = datetime.now()
-                line.applied_order_type = "work_order"
-            except Exception as e:
-                results["errors"].append(f"İş emri hatası ({line.item.code}): {e}")
+        Satınalma önerileri tercih edilen tedarikçi ve ihtiyaç tarihi
+        penceresine göre ayrı taleplerde gruplanır; üretim önerileri için
+        iş emirleri önbelleğe alınmış reçetelerden toplu oluşturulur.
 
-        self.session.commit()
-        return results
-
-    def _create_bulk_purchase_request(self, lines: List[MRPLine], run_id: int) -> int:
-        """Çoklu MRP satırından tek Satınalma Talebi oluştur"""
-        from modules.purchasing.services import PurchaseRequestService
-
-        service = PurchaseRequestService()
-
-        # Talep kalemleri
-        items_data = []
-        for line in lines:
-            items_data.append(
-                {
-                    "item_id": line.item_id,
-                    "quantity": line.suggested_qty,
-                    "unit_id": line.item.unit_id if line.item else None,
-                    "required_date": line.suggested_date,
-                    "notes": f"MRP: {line.demand_source_ref or ''}",
-                }
-            )
+        Args:
+            run_id: MRP çalışma ID
+            auto_create: False ise öneriler sadece işaretlenir
+            progress: progress(tamamlanan, toplam, mesaj) geri çağrısı
+            date_window_days: Aynı talepte toplanacak ihtiyaç tarihi aralığı
 
-        # MRP run bilgisi al
-        run = self.get_run_by_id(run_id)
-        run_no = run.run_no if run else ""
+        Returns:
+            dict: bkz. SuggestionBatchApplier.apply
+        """
+        from modules.mrp.batch_apply import DATE_WINDOW_DAYS, SuggestionBatchApplier
 
-        # Talep oluştur
-        request = service.create(
-            items_data=items_data,
-            request_date=date.today(),
-            requestor="MRP Sistem",
-            notes=f"MRP Run #{run_no} - {len(lines)} kalem",
+        applier = SuggestionBatchApplier(
+            self.session,
+            progress=progress,
+            date_window_days=date_window_days or DATE_WINDOW_DAYS,
         )
-
-        return request.id
+        try:
+            results = applier.apply(run_id, auto_create=auto_create)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return results
 
     def delete_run(self, run_id: int) -> bool:
         """MRP çalışması sil"""
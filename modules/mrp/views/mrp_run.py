@@ -23,6 +23,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
 
+from database import session_scope
 from modules.mrp.services import MRPService
 from database.models.mrp import MRPRunStatus
 from config.styles import (
@@ -49,22 +50,27 @@ class MRPWorker(QThread):
 
     def run(self):
         try:
-            service = MRPService()
-            result = service.run_mrp(
-                horizon_days=self.horizon,
-                consider_safety=self.safety,
-                include_work_orders=self.work_orders,
-                include_sales_orders=self.sales_orders,
-            )
-            # Session kapatmadan önce gerekli bilgileri al
-            run_data = {
-                "id": result.id,
-                "run_no": result.run_no,
-                "total_items": result.total_items,
-                "items_with_shortage": result.items_with_shortage,
-                "total_suggestions": result.total_suggestions,
-            }
-            service.close()
+            # Worker thread'i kendi iş birimiyle çalışır
+            with session_scope():
+                service = MRPService()
+                try:
+                    result = service.run_mrp(
+                        horizon_days=self.horizon,
+                        consider_safety=self.safety,
+                        include_work_orders=self.work_orders,
+                        include_sales_orders=self.sales_orders,
+                    )
+                    # Session kapatmadan önce gerekli bilgileri al
+                    run_data = {
+                        "id": result.id,
+                        "run_no": result.run_no,
+                        "total_items": result.total_items,
+                        "items_with_shortage": result.items_with_shortage,
+                        "total_suggestions": result.total_suggestions,
+                    }
+                finally:
+                    # Okuma kopyası session'ını kapatır (kapsam session'ı etkilenmez)
+                    service.close()
             self.finished.emit(run_data)
         except Exception as e:
             self.error.emit(str(e))
@@ -14,10 +14,12 @@ from PyQt6.QtWidgets import (
     QAbstractItemView,
     QMessageBox,
     QComboBox,
+    QProgressBar,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
 
+from database import session_scope
 from modules.mrp.services import MRPService
 from database.models.mrp import SuggestionType
 from config.styles import (
@@ -28,12 +30,38 @@ from config.styles import (
     get_table_style, get_button_style, get_input_style
 )
 
+class ApplySuggestionsWorker(QThread):
+    """Önerileri toplu uygulama thread'i"""
+
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, run_id: int, auto_create: bool):
+        super().__init__()
+        self.run_id = run_id
+        self.auto_create = auto_create
+
+    def run(self):
+        try:
+            # Worker thread'i kendi iş birimiyle çalışır
+            with session_scope():
+                result = MRPService().apply_all_suggestions(
+                    self.run_id,
+                    auto_create=self.auto_create,
+                    progress=self.progress.emit,
+                )
+            self.finished.emit(result)
+        except Exception as e:
+            self.error.emit(str(e))
+
 class SuggestionsPage(QWidget):
     """Tedarik önerileri sayfası"""
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_run_id = None
+        self.worker = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -50,12 +78,17 @@ class SuggestionsPage(QWidget):
         header.addStretch()
 
         # Tümünü uygula
-        apply_all_btn = QPushButton("Tumunu Uygula")
-        apply_all_btn.clicked.connect(self._apply_all)
-        header.addWidget(apply_all_btn)
+        self.apply_all_btn = QPushButton("Tumunu Uygula")
+        self.apply_all_btn.clicked.connect(self._apply_all)
+        header.addWidget(self.apply_all_btn)
 
         layout.addLayout(header)
 
+        # Toplu uygulama ilerlemesi
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        layout.addWidget(self.progress)
+
         # Filtre
         filter_row = QHBoxLayout()
         filter_row.addWidget(QLabel("Tür:"))
@@ -221,29 +254,48 @@ class SuggestionsPage(QWidget):
 
         auto_create = reply == QMessageBox.StandardButton.Yes
 
-        try:
-            service = MRPService()
-            result = service.apply_all_suggestions(
-                self.current_run_id, auto_create=auto_create
-            )
-            service.close()
-
-            # Sonuç mesajı
-            msg = f"Toplam: {result['total']} öneri\n"
-            if auto_create:
-                msg += f"Satınalma Talebi: {result['purchase_requests']}\n"
-                msg += f"İş Emri: {result['work_orders']}\n"
-            else:
-                msg += "Tümü işaretlendi (sipariş oluşturulmadı)"
-
-            if result.get("errors"):
-                msg += f"\n\nHatalar:\n" + "\n".join(result["errors"])
+        self.apply_all_btn.setEnabled(False)
+        self.progress.setRange(0, 0)
+        self.progress.setFormat("%v / %m")
+        self.progress.setVisible(True)
 
-            QMessageBox.information(self, "Tamamlandı", msg)
-            self.load_suggestions(self.current_run_id)
-
-        except Exception as e:
-            QMessageBox.warning(self, "Hata", str(e))
+        self.worker = ApplySuggestionsWorker(self.current_run_id, auto_create)
+        self.worker.progress.connect(self._on_apply_progress)
+        self.worker.finished.connect(
+            lambda result: self._on_apply_finished(result, auto_create)
+        )
+        self.worker.error.connect(self._on_apply_error)
+        self.worker.start()
+
+    def _on_apply_progress(self, done: int, total: int, message: str):
+        self.progress.setRange(0, total)
+        self.progress.setValue(done)
+        self.progress.setToolTip(message)
+
+    def _on_apply_finished(self, result: dict, auto_create: bool):
+        """Toplu uygulama tamamlandı"""
+        self.apply_all_btn.setEnabled(True)
+        self.progress.setVisible(False)
+
+        # Sonuç mesajı
+        msg = f"Toplam: {result['total']} öneri\n"
+        if auto_create:
+            msg += f"Satınalma Talebi: {result['purchase_requests']}\n"
+            msg += f"İş Emri: {result['work_orders']}\n"
+        else:
+            msg += "Tümü işaretlendi (sipariş oluşturulmadı)"
+
+        if result.get("errors"):
+            errors = result["errors"]
+            msg += f"\n\nHatalar ({len(errors)}):\n" + "\n".join(errors[:15])
+
+        QMessageBox.information(self, "Tamamlandı", msg)
+        self.load_suggestions(self.current_run_id)
+
+    def _on_apply_error(self, error: str):
+        self.apply_all_btn.setEnabled(True)
+        self.progress.setVisible(False)
+        QMessageBox.warning(self, "Hata", error)
 
     def _filter_changed(self):
         """Filtre değişti"""
@@ -3,12 +3,31 @@ Akıllı İş - Üretim Modülü
 """
 
 from .services import BOMService, WorkStationService, WorkOrderService
-from .views import (
-    BOMModule, BOMListPage, BOMFormPage,
-    WorkOrderModule, WorkOrderListPage, WorkOrderFormPage,
-    PlanningModule, ProductionPlanningPage,
-    WorkStationModule, WorkStationListPage, WorkStationFormPage,
-)
+
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "BOMModule": ".views",
+    "BOMListPage": ".views",
+    "BOMFormPage": ".views",
+    "WorkOrderModule": ".views",
+    "WorkOrderListPage": ".views",
+    "WorkOrderFormPage": ".views",
+    "PlanningModule": ".views",
+    "ProductionPlanningPage": ".views",
+    "WorkStationModule": ".views",
+    "WorkStationListPage": ".views",
+    "WorkStationFormPage": ".views",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     # Services
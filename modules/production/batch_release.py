@@ -0,0 +1,364 @@
+"""
+Akıllı İş - İş Emirlerinin Toplu Serbest Bırakılması
+
+Aday iş emirlerini (Taslak / Planlandı) tek transaction içinde serbest
+bırakır ve malzemelerini rezerve eder:
+- İş emirleri, malzeme satırları ve ilgili stok bakiyeleri birer kez
+  yüklenir; uygulama sırasında bakiye satırları FOR UPDATE ile kilitlenir
+- Kıt stok önceliğe (Acil > Yüksek > Normal > Düşük), sonra termin
+  tarihine göre dağıtılır
+- Bir iş emri ancak tüm malzemeleri karşılanabiliyorsa serbest bırakılır;
+  yarım rezervasyon yapılmaz, böylece karşılanamayan emir sonraki
+  emirlerin stoğunu tutmaz
+- Karşılanamayan emirler için malzeme bazında eksikler, ayrıca tümünü
+  serbest bırakmak için ürün + depo bazında toplam eksik raporlanır
+
+Rezervasyon depo bazındadır: iş emrinin kaynak deposu, yoksa çağıranın
+verdiği varsayılan depo kullanılır.
+
+Kullanım:
+    service = WorkOrderService()
+    preview = service.preview_release_batch(order_ids, warehouse_id=1)
+    result = service.release_batch(order_ids, warehouse_id=1)
+"""
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.models.inventory import Item, StockBalance
+from database.models.production import (
+    WorkOrder,
+    WorkOrderLine,
+    WorkOrderPriority,
+    WorkOrderStatus,
+)
+
+
+ProgressCallback = Callable[[int, int, str], None]
+
+RELEASABLE_STATUSES = (WorkOrderStatus.DRAFT, WorkOrderStatus.PLANNED)
+
+# Küçük değer önce dağıtılır
+PRIORITY_RANK = {
+    WorkOrderPriority.URGENT: 0,
+    WorkOrderPriority.HIGH: 1,
+    WorkOrderPriority.NORMAL: 2,
+    WorkOrderPriority.LOW: 3,
+}
+
+ZERO = Decimal(0)
+
+
+def _chunks(values: List, size: int) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class WorkOrderBatchReleaser:
+    """İş emirlerini toplu serbest bırakan servis (commit çağırana aittir)"""
+
+    CHUNK_SIZE = 500
+
+    def __init__(self, session: Session, progress: Optional[ProgressCallback] = None):
+        self.session = session
+        self.progress = progress
+
+    def _report(self, done: int, total: int, message: str) -> None:
+        if self.progress:
+            self.progress(done, total, message)
+
+    # =====================
+    # GİRİŞ
+    # =====================
+
+    def plan(
+        self,
+        order_ids: List[int] = None,
+        warehouse_id: int = None,
+        start_from: date = None,
+        start_to: date = None,
+    ) -> Dict:
+        """Dağıtımı hesaplar, hiçbir şey yazmaz (önizleme)"""
+        return self._run(order_ids, warehouse_id, start_from, start_to, apply=False)
+
+    def release(
+        self,
+        order_ids: List[int] = None,
+        warehouse_id: int = None,
+        start_from: date = None,
+        start_to: date = None,
+    ) -> Dict:
+        """
+        Karşılanabilen iş emirlerini serbest bırakır ve malzemelerini rezerve eder.
+
+        Args:
+            order_ids: Aday iş emirleri (None ise tarih aralığındaki tüm adaylar)
+            warehouse_id: Kaynak deposu olmayan emirler için varsayılan depo
+            start_from, start_to: Planlanan başlangıç tarihi aralığı (dahil)
+
+        Returns:
+            dict: total, released, short, skipped, released_ids,
+            orders (emir bazında sonuç ve eksikler), shortages (toplam eksik)
+        """
+        return self._run(order_ids, warehouse_id, start_from, start_to, apply=True)
+
+    def _run(
+        self,
+        order_ids: Optional[List[int]],
+        warehouse_id: Optional[int],
+        start_from: Optional[date],
+        start_to: Optional[date],
+        apply: bool,
+    ) -> Dict:
+        result = {
+            "total": 0,
+            "released": 0,
+            "short": 0,
+            "skipped": 0,
+            "released_ids": [],
+            "orders": [],
+            "shortages": [],
+        }
+        orders = self._load_orders(order_ids, start_from, start_to, lock=apply)
+        result["total"] = len(orders)
+        if not orders:
+            return result
+
+        lines = self._load_lines([order.id for order in orders])
+        warehouses = {order.id: order.source_warehouse_id or warehouse_id for order in orders}
+        needs = self._needs(orders, lines, warehouses)
+
+        keys = {key for order_needs in needs.values() for key in order_needs}
+        balances = self._load_balances(keys, lock=apply)
+        pools = {
+            key: sum(
+                ((b.quantity or ZERO) - (b.reserved_quantity or ZERO) for b in rows), ZERO
+            )
+            for key, rows in balances.items()
+        }
+        items = self._item_info(
+            {item_id for item_id, _ in keys} | {order.item_id for order in orders}
+        )
+
+        # Serbest bırakılamayan emirlerin toplam ihtiyacı (ürün + depo)
+        unmet: Dict[Tuple[int, int], Decimal] = {}
+        reserved: Dict[Tuple[int, int], Decimal] = {}
+
+        for order in self._sorted(orders):
+            entry = {
+                "id": order.id,
+                "order_no": order.order_no,
+                "item_code": items.get(order.item_id, ("", ""))[0],
+                "item_name": items.get(order.item_id, ("", ""))[1],
+                "priority": order.priority.value if order.priority else "normal",
+                "due_date": order.planned_end or order.planned_start,
+                "warehouse_id": warehouses[order.id],
+                "result": "released",
+                "shortages": [],
+                "message": "",
+            }
+            result["orders"].append(entry)
+            order_needs = needs[order.id]
+
+            if order_needs and not warehouses[order.id]:
+                entry["result"] = "skipped"
+                entry["message"] = "Kaynak depo belirtilmemiş"
+                result["skipped"] += 1
+                continue
+
+            for (item_id, wh_id), quantity in order_needs.items():
+                available = max(pools.get((item_id, wh_id), ZERO), ZERO)
+                if available < quantity:
+                    code, name = items.get(item_id, (str(item_id), ""))
+                    entry["shortages"].append(
+                        {
+                            "item_id": item_id,
+                            "item_code": code,
+                            "item_name": name,
+                            "required": quantity,
+                            "available": available,
+                            "missing": quantity - available,
+                        }
+                    )
+
+            if entry["shortages"]:
+                entry["result"] = "short"
+                entry["message"] = f"{len(entry['shortages'])} malzeme eksik"
+                result["short"] += 1
+                for key, quantity in order_needs.items():
+                    unmet[key] = unmet.get(key, ZERO) + quantity
+                continue
+
+            for key, quantity in order_needs.items():
+                pools[key] -= quantity
+                reserved[key] = reserved.get(key, ZERO) + quantity
+            result["released"] += 1
+            result["released_ids"].append(order.id)
+
+        for (item_id, wh_id), quantity in sorted(unmet.items()):
+            missing = quantity - max(pools.get((item_id, wh_id), ZERO), ZERO)
+            if missing > 0:
+                code, name = items.get(item_id, (str(item_id), ""))
+                result["shortages"].append(
+                    {
+                        "item_id": item_id,
+                        "item_code": code,
+                        "item_name": name,
+                        "warehouse_id": wh_id,
+                        "required": quantity,
+                        "missing": missing,
+                    }
+                )
+
+        self._report(len(orders), len(orders), f"{len(orders)} iş emri değerlendirildi")
+        if apply and result["released_ids"]:
+            self._apply(orders, lines, balances, reserved, set(result["released_ids"]))
+            self._report(
+                len(orders), len(orders), f"{result['released']} iş emri serbest bırakıldı"
+            )
+        return result
+
+    # =====================
+    # DAĞITIM
+    # =====================
+
+    @staticmethod
+    def _sorted(orders: List[WorkOrder]) -> List[WorkOrder]:
+        """Öncelik, termin, planlanan başlangıç ve numaraya göre sıralar"""
+
+        def key(order: WorkOrder):
+            due = order.planned_end or order.planned_start
+            return (
+                PRIORITY_RANK.get(order.priority, PRIORITY_RANK[WorkOrderPriority.NORMAL]),
+                due is None,
+                due or datetime.max,
+                order.planned_start or datetime.max,
+                order.id,
+            )
+
+        return sorted(orders, key=key)
+
+    @staticmethod
+    def _needs(
+        orders: List[WorkOrder],
+        lines: Dict[int, List[WorkOrderLine]],
+        warehouses: Dict[int, Optional[int]],
+    ) -> Dict[int, Dict[Tuple[int, int], Decimal]]:
+        """İş emri -> (ürün, depo) -> rezerve edilecek miktar"""
+        needs = {}
+        for order in orders:
+            order_needs: Dict[Tuple[int, int], Decimal] = {}
+            for line in lines.get(order.id, ()):
+                if line.is_reserved:
+                    continue
+                quantity = (line.required_quantity or ZERO) - (line.issued_quantity or ZERO)
+                if quantity > 0:
+                    key = (line.item_id, warehouses[order.id])
+                    order_needs[key] = order_needs.get(key, ZERO) + quantity
+            needs[order.id] = order_needs
+        return needs
+
+    def _apply(
+        self,
+        orders: List[WorkOrder],
+        lines: Dict[int, List[WorkOrderLine]],
+        balances: Dict[Tuple[int, int], List[StockBalance]],
+        reserved: Dict[Tuple[int, int], Decimal],
+        released_ids: set,
+    ) -> None:
+        now = datetime.now()
+        for key, quantity in reserved.items():
+            # Rezervasyon ilk bakiye satırına yazılır (StockMovementService.reserve_stock gibi)
+            balance = balances[key][0]
+            balance.reserved_quantity = (balance.reserved_quantity or ZERO) + quantity
+
+        for order in orders:
+            if order.id not in released_ids:
+                continue
+            for line in lines.get(order.id, ()):
+                if (line.required_quantity or ZERO) - (line.issued_quantity or ZERO) > 0:
+                    line.is_reserved = True
+            order.status = WorkOrderStatus.RELEASED
+            order.released_at = now
+        self.session.flush()
+
+    # =====================
+    # YÜKLEME
+    # =====================
+
+    def _load_orders(
+        self,
+        order_ids: Optional[List[int]],
+        start_from: Optional[date],
+        start_to: Optional[date],
+        lock: bool,
+    ) -> List[WorkOrder]:
+        query = self.session.query(WorkOrder).filter(
+            WorkOrder.status.in_(RELEASABLE_STATUSES),
+            WorkOrder.is_active == True,
+        )
+        if start_from:
+            query = query.filter(WorkOrder.planned_start >= datetime.combine(start_from, time()))
+        if start_to:
+            query = query.filter(
+                WorkOrder.planned_start < datetime.combine(start_to + timedelta(days=1), time())
+            )
+        if lock:
+            # Aynı emirleri eşzamanlı serbest bırakan istemciler sırayla çalışır
+            query = query.with_for_update()
+
+        if order_ids is None:
+            return query.all()
+        orders = []
+        for chunk in _chunks(sorted(set(order_ids)), self.CHUNK_SIZE):
+            orders.extend(query.filter(WorkOrder.id.in_(chunk)).all())
+        return orders
+
+    def _load_lines(self, order_ids: List[int]) -> Dict[int, List[WorkOrderLine]]:
+        lines: Dict[int, List[WorkOrderLine]] = {}
+        for chunk in _chunks(order_ids, self.CHUNK_SIZE):
+            for line in (
+                self.session.query(WorkOrderLine)
+                .filter(WorkOrderLine.work_order_id.in_(chunk))
+                .order_by(WorkOrderLine.work_order_id, WorkOrderLine.id)
+            ):
+                lines.setdefault(line.work_order_id, []).append(line)
+        return lines
+
+    def _load_balances(
+        self, keys: set, lock: bool
+    ) -> Dict[Tuple[int, int], List[StockBalance]]:
+        """(ürün, depo) -> bakiye satırları (lot/lokasyon; bakiyesi olmayanlar dönmez)"""
+        keys = {key for key in keys if key[1] is not None}
+        warehouse_ids = sorted({wh_id for _, wh_id in keys})
+        balances = {}
+        for chunk in _chunks(sorted({item_id for item_id, _ in keys}), self.CHUNK_SIZE):
+            query = (
+                self.session.query(StockBalance)
+                .filter(
+                    StockBalance.item_id.in_(chunk),
+                    StockBalance.warehouse_id.in_(warehouse_ids),
+                )
+                .order_by(StockBalance.id)
+            )
+            if lock:
+                query = query.with_for_update()
+            for balance in query:
+                key = (balance.item_id, balance.warehouse_id)
+                if key in keys:
+                    balances.setdefault(key, []).append(balance)
+        return balances
+
+    def _item_info(self, item_ids: set) -> Dict[int, Tuple[str, str]]:
+        """Ürün -> (kod, ad)"""
+        info = {}
+        for chunk in _chunks(sorted(i for i in item_ids if i is not None), self.CHUNK_SIZE):
+            for item_id, code, name in self.session.execute(
+                select(Item.id, Item.code, Item.name).where(Item.id.in_(chunk))
+            ):
+                info[item_id] = (code, name)
+        return info
@@ -0,0 +1,712 @@
+"""
+Akıllı İş - Standart Maliyet Roll-up Motoru
+
+Üretilen ürünlerin standart maliyetini aktif reçete ve rotalarından çok
+seviyeli olarak hesaplar ve standard_costs tablosunda sürümlü anlık
+görüntüler halinde saklar. 1 birim mamul için maliyet kalemleri:
+
+- Malzeme: satır miktarı x bileşen maliyeti (alt montajlarda bileşenin
+  standart maliyeti, satın alınanlarda alış fiyatı)
+- Fire: satır fire oranı kadar ek bileşen tüketimi
+- İşçilik: operasyon işçilik tutarları (operasyonlarda yoksa reçetenin
+  işçilik maliyeti)
+- Makine: istasyon saat ücreti x verimliliğe göre düzeltilmiş çalışma
+  süresi + hazırlık süresi ve hazırlık maliyeti + operasyon makine tutarı
+- Genel gider: reçetenin genel gider maliyeti
+- Yan ürün payı: yan ürünlerin maliyet paylaşım oranları kadar düşülür
+
+Reçete, satır, operasyon ve yan ürünlerdeki tutar ve süreler reçetenin
+base_quantity miktarı içindir; yalnızca çalışma süresi (run_time)
+birim başına dakikadır (iş emri operasyonlarıyla aynı).
+
+Tüm ürünler tek geçişte, bileşenler montajlardan önce gelecek şekilde
+(topolojik sırayla) hesaplanır. Alış fiyatı, reçete, rota veya istasyon
+ücreti değiştiğinde after_flush event'i ilgili ürünleri aynı
+transaction içinde standard_cost_queue tablosuna yazar; standard_cost
+işi yalnızca bu ürünleri ve üst montajlarını yeniden hesaplar. Değerleri
+değişen ürünler için yeni sürüm yazılır, öncekinin geçerliliği kapatılır.
+
+Kullanım:
+    from modules.production.costing import cost_rollup
+    cost_rollup.init_listeners()  # Uygulama başlangıcında çağır
+
+    cost_rollup.process_queue(session)           # standard_cost işi
+    cost_rollup.get_costs(session, [item_id])    # güncel standart maliyetler
+    cost_rollup.get_cost_as_of(session, item_id, tarih)
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm.attributes import get_history
+
+from database.models.inventory import Item
+from database.models.production import (
+    BillOfMaterials,
+    BOMByProduct,
+    BOMLine,
+    BOMOperation,
+    BOMStatus,
+    StandardCost,
+    StandardCostQueue,
+    WorkStation,
+)
+
+
+# IN listesi başına ürün sayısı
+CHUNK_SIZE = 1000
+
+COST_FIELDS = (
+    "material_cost",
+    "scrap_cost",
+    "labor_cost",
+    "machine_cost",
+    "overhead_cost",
+    "by_product_credit",
+    "total_cost",
+)
+
+# Değiştiğinde kullanan ürünlerin yeniden hesaplandığı istasyon alanları
+STATION_COST_FIELDS = ("hourly_rate", "setup_cost", "efficiency_rate")
+
+ZERO = Decimal(0)
+HUNDRED = Decimal(100)
+MINUTES = Decimal(60)
+PRECISION = Decimal("0.000001")
+
+
+def _chunks(values: List, size: int = CHUNK_SIZE) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _dec(value) -> Decimal:
+    if value is None:
+        return ZERO
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class Routing:
+    """Bir ürünün aktif reçetesi ve rotası (maliyet hesabı için gereken alanlar)"""
+
+    __slots__ = (
+        "bom_id",
+        "item_id",
+        "base_quantity",
+        "labor_cost",
+        "overhead_cost",
+        "lines",
+        "operations",
+        "by_product_share",
+    )
+
+    def __init__(self, bom_id, item_id, base_quantity, labor_cost, overhead_cost):
+        self.bom_id = bom_id
+        self.item_id = item_id
+        base = _dec(base_quantity)
+        self.base_quantity = base if base > 0 else Decimal(1)
+        self.labor_cost = _dec(labor_cost)
+        self.overhead_cost = _dec(overhead_cost)
+        # (bileşen, miktar, fire oranı %)
+        self.lines: List[Tuple[int, Decimal, Decimal]] = []
+        # (hazırlık dk, çalışma dk/birim, işçilik, makine, saat ücreti, hazırlık maliyeti, verimlilik %)
+        self.operations: List[Tuple] = []
+        self.by_product_share = ZERO
+
+    @property
+    def components(self) -> Set[int]:
+        return {item_id for item_id, _, _ in self.lines}
+
+    def compute(self, component_costs: Dict[int, Decimal]) -> Dict[str, Decimal]:
+        """1 birim mamulün maliyet kalemleri (bileşen maliyetleri birim başına)"""
+        base = self.base_quantity
+
+        material = scrap = ZERO
+        for item_id, quantity, scrap_rate in self.lines:
+            cost = component_costs.get(item_id, ZERO)
+            material += quantity * cost
+            scrap += quantity * scrap_rate / HUNDRED * cost
+
+        labor = machine = ZERO
+        for setup, run, op_labor, op_machine, rate, setup_cost, efficiency in self.operations:
+            efficiency = efficiency / HUNDRED if efficiency > 0 else Decimal(1)
+            run_hours = run / MINUTES / efficiency
+            setup_hours = setup / MINUTES
+            machine += run_hours * rate + (setup_hours * rate + setup_cost + op_machine) / base
+            labor += op_labor / base
+        if not labor:
+            labor = self.labor_cost / base
+
+        values = {
+            "material_cost": material / base,
+            "scrap_cost": scrap / base,
+            "labor_cost": labor,
+            "machine_cost": machine,
+            "overhead_cost": self.overhead_cost / base,
+        }
+        gross = sum(values.values(), ZERO)
+        values["by_product_credit"] = gross * min(self.by_product_share, HUNDRED) / HUNDRED
+        values["total_cost"] = gross - values["by_product_credit"]
+        return {key: value.quantize(PRECISION) for key, value in values.items()}
+
+
+class CostRollupEngine:
+    """
+    Standart maliyet roll-up motoru (singleton).
+
+    ORM event'lerini atlayan toplu güncellemelerden sonra enqueue()
+    çağrılmalı ya da roll_up_all() ile tam hesaplama yapılmalıdır.
+    """
+
+    _instance: Optional["CostRollupEngine"] = None
+    _listening: bool = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    # =====================
+    # EVENT'LER
+    # =====================
+
+    def init_listeners(self) -> None:
+        """SQLAlchemy event listener'ını kaydeder (tekrar çağrılabilir)"""
+        if self._listening:
+            return
+        event.listen(DBSession, "after_flush", self._after_flush)
+        CostRollupEngine._listening = True
+
+    def _after_flush(self, session: DBSession, flush_context) -> None:
+        """Maliyeti etkileyen değişikliklerin ürünlerini kuyruğa yazar"""
+        items: Dict[int, str] = {}
+        boms: Dict[int, str] = {}
+        stations: Set[int] = set()
+
+        def routing_change(obj, reason: str, old_bom_ids=()) -> None:
+            boms.setdefault(obj.bom_id, reason)
+            for bom_id in old_bom_ids:
+                boms.setdefault(bom_id, reason)
+
+        for obj in session.new:
+            if isinstance(obj, BillOfMaterials):
+                items.setdefault(obj.item_id, "bom")
+            elif isinstance(obj, (BOMLine, BOMByProduct)):
+                routing_change(obj, "bom")
+            elif isinstance(obj, BOMOperation):
+                routing_change(obj, "routing")
+        for obj in session.dirty:
+            if isinstance(obj, Item):
+                if get_history(obj, "purchase_price").has_changes():
+                    items.setdefault(obj.id, "price")
+            elif isinstance(obj, WorkStation):
+                if any(get_history(obj, f).has_changes() for f in STATION_COST_FIELDS):
+                    stations.add(obj.id)
+            elif not session.is_modified(obj):
+                continue
+            elif isinstance(obj, BillOfMaterials):
+                items.setdefault(obj.item_id, "bom")
+                # Reçete başka ürüne taşındıysa eski ürün de yenilenir
+                for item_id in get_history(obj, "item_id").deleted or ():
+                    items.setdefault(item_id, "bom")
+            elif isinstance(obj, (BOMLine, BOMByProduct, BOMOperation)):
+                reason = "routing" if isinstance(obj, BOMOperation) else "bom"
+                routing_change(obj, reason, get_history(obj, "bom_id").deleted or ())
+        for obj in session.deleted:
+            if isinstance(obj, BillOfMaterials):
+                items.setdefault(obj.item_id, "bom")
+            elif isinstance(obj, (BOMLine, BOMByProduct, BOMOperation)):
+                routing_change(obj, "routing" if isinstance(obj, BOMOperation) else "bom")
+
+        boms.pop(None, None)
+        if not (items or boms or stations):
+            return
+
+        connection = session.connection()
+        for chunk in _chunks(sorted(boms)):
+            for bom_id, item_id in connection.execute(
+                select(BillOfMaterials.id, BillOfMaterials.item_id).where(
+                    BillOfMaterials.id.in_(chunk)
+                )
+            ):
+                items.setdefault(item_id, boms[bom_id])
+        for chunk in _chunks(sorted(stations)):
+            for (item_id,) in connection.execute(
+                select(BillOfMaterials.item_id)
+                .join(BOMOperation, BOMOperation.bom_id == BillOfMaterials.id)
+                .where(BOMOperation.work_station_id.in_(chunk))
+                .distinct()
+            ):
+                items.setdefault(item_id, "station")
+
+        items.pop(None, None)
+        if items:
+            self._insert_queue(connection, items)
+
+    @staticmethod
+    def _insert_queue(connection, items: Dict[int, str]) -> None:
+        now = datetime.utcnow()
+        rows = [
+            {
+                "item_id": item_id,
+                "reason": reason,
+                "created_at": now,
+                "updated_at": now,
+                "is_active": True,
+            }
+            for item_id, reason in items.items()
+        ]
+        for chunk in _chunks(rows):
+            connection.execute(insert(StandardCostQueue.__table__), chunk)
+
+    def enqueue(self, session: DBSession, item_ids: Iterable[int], reason: str = None) -> None:
+        """ORM dışı toplu değişikliklerden sonra ürünleri kuyruğa ekler (commit etmez)"""
+        items = {item_id: reason for item_id in item_ids if item_id is not None}
+        if items:
+            self._insert_queue(session.connection(), items)
+
+    # =====================
+    # ROLL-UP
+    # =====================
+
+    def process_queue(self, session: DBSession) -> Dict:
+        """
+        Kuyruktaki ürünleri ve üst montajlarını yeniden hesaplar, commit eder.
+
+        Henüz hiç anlık görüntü yoksa tam roll-up yapılır.
+
+        Returns:
+            Dict: {"rows": yazılan sürüm, "items": hesaplanan ürün, "closed", "cycles", "queued"}
+        """
+        if session.query(StandardCost.id).first() is None:
+            return self.roll_up_all(session)
+
+        try:
+            max_id = session.query(func.max(StandardCostQueue.id)).scalar()
+            if max_id is None:
+                return {"rows": 0, "items": 0, "closed": 0, "cycles": [], "queued": 0}
+
+            queued = {
+                item_id
+                for (item_id,) in session.query(StandardCostQueue.item_id)
+                .filter(StandardCostQueue.id <= max_id)
+                .distinct()
+            }
+            targets = self._with_ancestors(session, queued)
+            result = self._roll_up(session, targets, "change")
+            # Hesaplama sırasında eklenen kayıtlar bir sonraki çalışmaya kalır
+            session.execute(delete(StandardCostQueue).where(StandardCostQueue.id <= max_id))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        result["queued"] = len(queued)
+        return result
+
+    def roll_up_all(self, session: DBSession) -> Dict:
+        """Tüm üretilen ürünleri tek geçişte yeniden hesaplar ve commit eder"""
+        try:
+            max_id = session.query(func.max(StandardCostQueue.id)).scalar()
+            result = self._roll_up(session, None, "full")
+            if max_id is not None:
+                session.execute(
+                    delete(StandardCostQueue).where(StandardCostQueue.id <= max_id)
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        result["queued"] = 0
+        return result
+
+    def _with_ancestors(self, session: DBSession, item_ids: Set[int]) -> Set[int]:
+        """Ürünler ve onları (dolaylı olarak) kullanan tüm üretilen ürünler"""
+        where_used: Dict[int, Set[int]] = {}
+        for parent_id, component_id in self._edges(session):
+            where_used.setdefault(component_id, set()).add(parent_id)
+
+        result = set(item_ids)
+        stack = list(item_ids)
+        while stack:
+            for parent_id in where_used.get(stack.pop(), ()):
+                if parent_id not in result:
+                    result.add(parent_id)
+                    stack.append(parent_id)
+        return result
+
+    def _edges(self, session: DBSession) -> List[Tuple[int, int]]:
+        """Aktif reçete grafiği: (mamul, bileşen) çiftleri"""
+        rows = session.execute(
+            select(
+                BillOfMaterials.item_id,
+                BillOfMaterials.id,
+                BillOfMaterials.version,
+                BOMLine.item_id,
+            )
+            .join(BOMLine, BOMLine.bom_id == BillOfMaterials.id)
+            .where(
+                BillOfMaterials.status == BOMStatus.ACTIVE,
+                BillOfMaterials.is_active == True,
+            )
+        ).all()
+        selected: Dict[int, Tuple] = {}
+        for parent_id, bom_id, version, _ in rows:
+            key = (version or 0, bom_id)
+            if parent_id not in selected or key > selected[parent_id]:
+                selected[parent_id] = key
+        return [
+            (parent_id, component_id)
+            for parent_id, bom_id, version, component_id in rows
+            if selected[parent_id][1] == bom_id
+        ]
+
+    def _roll_up(self, session: DBSession, targets: Optional[Set[int]], trigger: str) -> Dict:
+        """targets (None = tümü) için maliyetleri hesaplar ve değişenleri yazar"""
+        routings = self._load_routings(session, targets)
+        targets = set(routings) if targets is None else set(targets)
+
+        # Hesaplanmayan bileşenler: güncel anlık görüntü ya da alış fiyatı
+        outside = {
+            component
+            for routing in routings.values()
+            for component in routing.components
+            if component not in routings
+        }
+        costs: Dict[int, Decimal] = {}
+        levels: Dict[int, int] = {}
+        for item_id, values in self.get_costs(session, outside).items():
+            costs[item_id] = values["total_cost"]
+            levels[item_id] = values["level"]
+
+        order, cycles = self._topological(routings)
+        computed: Dict[int, Tuple[Routing, int, Dict[str, Decimal]]] = {}
+        for item_id in order:
+            routing = routings[item_id]
+            values = routing.compute(costs)
+            level = 1 + max((levels.get(c, 0) for c in routing.components), default=0)
+            costs[item_id] = values["total_cost"]
+            levels[item_id] = level
+            computed[item_id] = (routing, level, values)
+
+        written, closed = self._write(session, targets, computed, cycles, trigger)
+        return {"rows": written, "items": len(computed), "closed": closed, "cycles": cycles}
+
+    @staticmethod
+    def _topological(routings: Dict[int, Routing]) -> Tuple[List[int], List[int]]:
+        """Bileşenler önce gelecek şekilde sıralar; döngüdeki ürünleri ayırır"""
+        order: List[int] = []
+        cycles: Set[int] = set()
+        state: Dict[int, int] = {}  # 1 = ziyarette, 2 = tamam
+
+        for root in routings:
+            if root in state:
+                continue
+            stack = [(root, iter(sorted(routings[root].components)))]
+            state[root] = 1
+            while stack:
+                item_id, children = stack[-1]
+                for child in children:
+                    if child not in routings:
+                        continue
+                    if state.get(child) == 1:
+                        # Yığındaki döngü üyeleri işaretlenir
+                        members = [entry[0] for entry in stack]
+                        cycles.update(members[members.index(child):])
+                        continue
+                    if child not in state:
+                        state[child] = 1
+                        stack.append((child, iter(sorted(routings[child].components))))
+                        break
+                else:
+                    stack.pop()
+                    state[item_id] = 2
+                    order.append(item_id)
+
+        # Döngüdeki ürünler ve onları kullananlar hesaplanamaz
+        blocked = set(cycles)
+        result = []
+        for item_id in order:
+            if item_id in blocked or routings[item_id].components & blocked:
+                blocked.add(item_id)
+            else:
+                result.append(item_id)
+        return result, sorted(blocked)
+
+    def _write(
+        self,
+        session: DBSession,
+        targets: Set[int],
+        computed: Dict[int, Tuple[Routing, int, Dict[str, Decimal]]],
+        skipped: List[int],
+        trigger: str,
+    ) -> Tuple[int, int]:
+        """Değişen maliyetler için yeni sürüm yazar, geçersiz olanları kapatır"""
+        table = StandardCost.__table__
+        connection = session.connection()
+        now = datetime.now()
+
+        current: Dict[int, Dict] = {}
+        versions: Dict[int, int] = {}
+        ids = sorted(targets)
+        for chunk in _chunks(ids):
+            for row in connection.execute(
+                select(table).where(table.c.item_id.in_(chunk), table.c.is_current == True)
+            ).mappings():
+                current[row["item_id"]] = dict(row)
+            versions.update(
+                connection.execute(
+                    select(table.c.item_id, func.max(table.c.version))
+                    .where(table.c.item_id.in_(chunk))
+                    .group_by(table.c.item_id)
+                ).all()
+            )
+
+        inserts, close_ids = [], []
+        for item_id, (routing, level, values) in computed.items():
+            old = current.get(item_id)
+            if (
+                old is not None
+                and old["bom_id"] == routing.bom_id
+                and old["level"] == level
+                and all(_dec(old[key]).quantize(PRECISION) == values[key] for key in COST_FIELDS)
+            ):
+                continue
+            if old is not None:
+                close_ids.append(old["id"])
+            inserts.append(
+                {
+                    "item_id": item_id,
+                    "bom_id": routing.bom_id,
+                    "version": versions.get(item_id, 0) + 1,
+                    "level": level,
+                    **values,
+                    "valid_from": now,
+                    "valid_to": None,
+                    "is_current": True,
+                    "trigger": trigger,
+                }
+            )
+
+        # Aktif reçetesi kalmayan ürünlerin maliyeti kapatılır (döngüdekiler korunur)
+        skipped = set(skipped)
+        closed = [
+            row["id"]
+            for item_id, row in current.items()
+            if item_id not in computed and item_id not in skipped
+        ]
+        close_ids.extend(closed)
+
+        for chunk in _chunks(close_ids):
+            connection.execute(
+                update(table)
+                .where(table.c.id.in_(chunk))
+                .values(is_current=False, valid_to=now, updated_at=datetime.utcnow())
+            )
+        for chunk in _chunks(inserts):
+            connection.execute(insert(table), chunk)
+        return len(inserts), len(closed)
+
+    def _load_routings(
+        self, session: DBSession, item_ids: Optional[Set[int]] = None
+    ) -> Dict[int, Routing]:
+        """Ürünlerin (None = tümü) aktif reçetelerini rota ve yan ürünleriyle yükler"""
+        query = (
+            select(
+                BillOfMaterials.id,
+                BillOfMaterials.item_id,
+                BillOfMaterials.base_quantity,
+                BillOfMaterials.labor_cost,
+                BillOfMaterials.overhead_cost,
+            )
+            .where(
+                BillOfMaterials.status == BOMStatus.ACTIVE,
+                BillOfMaterials.is_active == True,
+            )
+            .order_by(
+                BillOfMaterials.item_id,
+                BillOfMaterials.version.desc(),
+                BillOfMaterials.id.desc(),
+            )
+        )
+        if item_ids is None:
+            batches = [session.execute(query)]
+        else:
+            batches = (
+                session.execute(query.where(BillOfMaterials.item_id.in_(chunk)))
+                for chunk in _chunks(sorted(i for i in item_ids if i is not None))
+            )
+
+        routings: Dict[int, Routing] = {}
+        for rows in batches:
+            for bom_id, item_id, base_quantity, labor_cost, overhead_cost in rows:
+                # En yüksek sürüm (ATP motoru ile aynı seçim)
+                if item_id not in routings:
+                    routings[item_id] = Routing(
+                        bom_id, item_id, base_quantity, labor_cost, overhead_cost
+                    )
+
+        self._load_details(session, {r.bom_id: r for r in routings.values()})
+        return routings
+
+    @staticmethod
+    def _load_details(session: DBSession, by_bom: Dict[int, Routing]) -> None:
+        for chunk in _chunks(sorted(by_bom)):
+            for bom_id, item_id, quantity, scrap_rate in session.execute(
+                select(BOMLine.bom_id, BOMLine.item_id, BOMLine.quantity, BOMLine.scrap_rate)
+                .where(BOMLine.bom_id.in_(chunk))
+                .order_by(BOMLine.bom_id, BOMLine.id)
+            ):
+                by_bom[bom_id].lines.append((item_id, _dec(quantity), _dec(scrap_rate)))
+
+            for bom_id, *operation in session.execute(
+                select(
+                    BOMOperation.bom_id,
+                    BOMOperation.setup_time,
+                    BOMOperation.run_time,
+                    BOMOperation.labor_cost,
+                    BOMOperation.machine_cost,
+                    WorkStation.hourly_rate,
+                    WorkStation.setup_cost,
+                    WorkStation.efficiency_rate,
+                )
+                .outerjoin(WorkStation, WorkStation.id == BOMOperation.work_station_id)
+                .where(BOMOperation.bom_id.in_(chunk))
+                .order_by(BOMOperation.bom_id, BOMOperation.operation_no)
+            ):
+                by_bom[bom_id].operations.append(tuple(_dec(value) for value in operation))
+
+            for bom_id, share in session.execute(
+                select(BOMByProduct.bom_id, func.sum(BOMByProduct.cost_share_rate))
+                .where(BOMByProduct.bom_id.in_(chunk))
+                .group_by(BOMByProduct.bom_id)
+            ):
+                by_bom[bom_id].by_product_share = _dec(share)
+
+    # =====================
+    # OKUMA
+    # =====================
+
+    def get_costs(self, session: DBSession, item_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Ürünlerin güncel standart maliyetleri (1 birim için).
+
+        Anlık görüntüsü olmayan (satın alınan) ürünlerde alış fiyatı
+        malzeme maliyeti olarak döner.
+
+        Returns:
+            Dict[int, Dict]: item_id -> maliyet kalemleri, "level", "version",
+            "valid_from", "bom_id", "source" ("standard" / "purchase")
+        """
+        ids = sorted({i for i in item_ids if i is not None})
+        result: Dict[int, Dict] = {}
+        table = StandardCost.__table__
+
+        for chunk in _chunks(ids):
+            for row in session.execute(
+                select(table).where(table.c.item_id.in_(chunk), table.c.is_current == True)
+            ).mappings():
+                result[row["item_id"]] = self._snapshot(row)
+
+            missing = [i for i in chunk if i not in result]
+            if missing:
+                for item_id, price in session.execute(
+                    select(Item.id, Item.purchase_price).where(Item.id.in_(missing))
+                ):
+                    result[item_id] = self._purchased(item_id, price)
+        return result
+
+    def unit_costs(self, session: DBSession, item_ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Ürün -> birim standart maliyet (satın alınanlarda alış fiyatı)"""
+        return {
+            item_id: values["total_cost"]
+            for item_id, values in self.get_costs(session, item_ids).items()
+        }
+
+    def get_cost_as_of(self, session: DBSession, item_id: int, at: datetime) -> Optional[Dict]:
+        """at anında geçerli olan standart maliyet (o tarihte anlık görüntü yoksa None)"""
+        row = (
+            session.execute(
+                select(StandardCost.__table__)
+                .where(
+                    StandardCost.item_id == item_id,
+                    StandardCost.valid_from <= at,
+                    (StandardCost.valid_to == None) | (StandardCost.valid_to > at),
+                )
+                .order_by(StandardCost.version.desc())
+                .limit(1)
+            )
+            .mappings()
+            .first()
+        )
+        return self._snapshot(row) if row else None
+
+    def get_history(self, session: DBSession, item_id: int) -> List[Dict]:
+        """Ürünün tüm standart maliyet sürümleri (yeniden eskiye)"""
+        rows = session.execute(
+            select(StandardCost.__table__)
+            .where(StandardCost.item_id == item_id)
+            .order_by(StandardCost.version.desc())
+        ).mappings()
+        return [self._snapshot(row) for row in rows]
+
+    def bom_cost(self, session: DBSession, bom_id: int) -> Optional[Dict]:
+        """
+        Belirli bir reçetenin 1 birim maliyeti (bileşenlerin güncel standart
+        maliyetleriyle). Aktif olmayan reçeteler için de kullanılabilir.
+
+        Returns:
+            Dict: maliyet kalemleri, "base_quantity" ve "components"
+            (bileşen -> birim maliyet); reçete yoksa None
+        """
+        row = session.execute(
+            select(
+                BillOfMaterials.id,
+                BillOfMaterials.item_id,
+                BillOfMaterials.base_quantity,
+                BillOfMaterials.labor_cost,
+                BillOfMaterials.overhead_cost,
+            ).where(BillOfMaterials.id == bom_id)
+        ).first()
+        if row is None:
+            return None
+
+        routing = Routing(*row)
+        self._load_details(session, {routing.bom_id: routing})
+        components = self.unit_costs(session, routing.components)
+        values = routing.compute(components)
+        values["base_quantity"] = routing.base_quantity
+        values["components"] = components
+        return values
+
+    @staticmethod
+    def _snapshot(row) -> Dict:
+        values = {key: _dec(row[key]) for key in COST_FIELDS}
+        values.update(
+            item_id=row["item_id"],
+            bom_id=row["bom_id"],
+            version=row["version"],
+            level=row["level"],
+            valid_from=row["valid_from"],
+            valid_to=row["valid_to"],
+            trigger=row["trigger"],
+            source="standard",
+        )
+        return values
+
+    @staticmethod
+    def _purchased(item_id: int, price) -> Dict:
+        values = {key: ZERO for key in COST_FIELDS}
+        values["material_cost"] = values["total_cost"] = _dec(price)
+        values.update(
+            item_id=item_id,
+            bom_id=None, version=None, level=0, valid_from=None, valid_to=None,
+            trigger=None, source="purchase",
+        )
+        return values
+
+
+# Singleton instance
+cost_rollup = CostRollupEngine()
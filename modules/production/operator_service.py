@@ -0,0 +1,233 @@
+"""
+Akıllı İş - Operatör Paneli Servisi
+
+Operatör panelinin ihtiyaç duyduğu verileri ORM nesneleri yerine düz
+sözlükler olarak döndürür. Böylece aynı arayüz yerelde (doğrudan
+veritabanı) veya uygulama sunucusu üzerinden (api.client) çalışır.
+
+    service = get_operator_service()  # API_SERVER_URL tanımlıysa uzak
+    for op in service.get_station_operations(station_id): ...
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from core.reference_data import reference_cache
+from database.base import get_session
+from database.models.inventory import StockMovement
+from database.models.production import (
+    WorkOrder,
+    WorkOrderOperation,
+    WorkOrderOperationPersonnel,
+)
+
+
+# Panelde listelenen operasyon durumları
+PANEL_STATUSES = ("pending", "in_progress", "paused", "completed")
+
+
+class OperatorPanelService:
+    """Operatör paneli veri servisi (sözlük döndürür)"""
+
+    def __init__(self):
+        self.session: Session = get_session()
+
+    def _work_orders(self):
+        from modules.production.services import WorkOrderService
+
+        return WorkOrderService()
+
+    # ==================== OKUMA ====================
+
+    def get_stations(self) -> List[Dict[str, Any]]:
+        """İş istasyonları (referans veri)"""
+        return [
+            {"id": ws.id, "code": ws.code, "name": ws.name}
+            for ws in reference_cache.work_stations()
+        ]
+
+    def get_station_operations(self, station_id: int) -> List[Dict[str, Any]]:
+        """İstasyondaki bekleyen/devam eden/tamamlanan operasyonlar"""
+        rows = (
+            self._operation_rows()
+            .filter(
+                WorkOrderOperation.work_station_id == station_id,
+                WorkOrderOperation.status.in_(PANEL_STATUSES),
+            )
+            .order_by(WorkOrder.order_no, WorkOrderOperation.operation_no)
+            .all()
+        )
+        return [self._operation_row(r) for r in rows]
+
+    def get_operations(self, operation_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Kimliği verilen operasyonların liste satırları (canlı güncelleme).
+        Silinen operasyonlar sonuçta yer almaz; istasyon ve durum filtresi
+        uygulanmaz, panel satırı kendi listesine göre ekler veya çıkarır.
+        """
+        if not operation_ids:
+            return []
+        rows = self._operation_rows().filter(WorkOrderOperation.id.in_(operation_ids)).all()
+        return [self._operation_row(r) for r in rows]
+
+    def _operation_rows(self):
+        return self.session.query(
+            WorkOrderOperation.id,
+            WorkOrderOperation.name,
+            WorkOrderOperation.status,
+            WorkOrderOperation.operation_no,
+            WorkOrderOperation.work_station_id,
+            WorkOrder.order_no,
+        ).join(WorkOrder, WorkOrder.id == WorkOrderOperation.work_order_id)
+
+    @staticmethod
+    def _operation_row(r) -> Dict[str, Any]:
+        return {
+            "id": r.id,
+            "name": r.name,
+            "status": r.status,
+            "order_no": r.order_no,
+            "operation_no": r.operation_no,
+            "work_station_id": r.work_station_id,
+        }
+
+    def get_operation(self, operation_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Operasyon kartı verisi
+
+        run_seconds, sorgu anına kadar geçen toplam çalışma süresidir;
+        istemci sayacı kendi saatiyle buradan devam ettirir (saat farkı
+        olan terminallerde de doğru süre gösterilir).
+        """
+        op = (
+            self.session.query(WorkOrderOperation)
+            .options(
+                joinedload(WorkOrderOperation.work_order).joinedload(WorkOrder.item),
+                joinedload(WorkOrderOperation.work_order).joinedload(WorkOrder.unit),
+            )
+            # Uzun ömürlü session: başka istemcinin değişikliği kimlik haritasını ezsin
+            .populate_existing()
+            .filter(WorkOrderOperation.id == operation_id)
+            .first()
+        )
+        if not op:
+            return None
+
+        run_seconds = (op.actual_run_time or 0) * 60
+        if op.status == "in_progress" and op.last_start_time:
+            run_seconds += (datetime.now() - op.last_start_time).total_seconds()
+
+        wo = op.work_order
+        return {
+            "id": op.id,
+            "name": op.name,
+            "status": op.status,
+            "order_no": wo.order_no,
+            "operation_no": op.operation_no,
+            "work_station_id": op.work_station_id,
+            "item_name": wo.item.name if wo.item else "",
+            "planned_quantity": wo.planned_quantity,
+            "unit_code": wo.unit.code if wo.unit else "",
+            "completed_quantity": op.completed_quantity or Decimal(0),
+            "production_notes": wo.production_notes,
+            "quality_notes": wo.quality_notes,
+            "shipping_notes": wo.shipping_notes,
+            "run_seconds": int(run_seconds),
+        }
+
+    def get_operation_scraps(self, operation_id: int) -> List[Dict[str, Any]]:
+        """Operasyonun hurda kayıtları (en yeni önce)"""
+        rows = (
+            self.session.query(StockMovement.quantity, StockMovement.notes)
+            .filter(
+                StockMovement.document_type == "production_scrap",
+                StockMovement.document_no == str(operation_id),
+            )
+            .order_by(StockMovement.movement_date.desc())
+            .all()
+        )
+        return [{"quantity": r.quantity, "notes": r.notes} for r in rows]
+
+    def get_active_personnel(self, operation_id: int) -> List[Dict[str, Any]]:
+        """Operasyonda çalışan aktif personel"""
+        rows = (
+            self.session.query(WorkOrderOperationPersonnel)
+            .options(joinedload(WorkOrderOperationPersonnel.user))
+            .filter_by(operation_id=operation_id, end_time=None)
+            .all()
+        )
+        return [
+            {
+                "id": p.id,
+                "user_id": p.user_id,
+                "name": f"{p.user.first_name} {p.user.last_name}",
+                "role": p.role,
+            }
+            for p in rows
+            if p.user
+        ]
+
+    def get_shift_teams(self) -> List[Dict[str, Any]]:
+        """Vardiya ekipleri (referans veri)"""
+        return [
+            {"id": t.id, "name": t.name}
+            for t in reference_cache.shift_teams(active_only=False)
+        ]
+
+    def get_users(self, team_id: int = None) -> List[Dict[str, Any]]:
+        """Atanabilir personel (ekip verilirse meşgul olmayan ekip üyeleri)"""
+        service = self._work_orders()
+        users = service.get_users_by_team(team_id) if team_id else service.get_all_users()
+        return [
+            {
+                "id": u.id,
+                "username": u.username,
+                "first_name": u.first_name,
+                "last_name": u.last_name,
+            }
+            for u in users
+        ]
+
+    # ==================== İŞLEMLER ====================
+
+    def start_operation(self, operation_id: int) -> Optional[Dict[str, Any]]:
+        self._work_orders().start_operation(operation_id)
+        return self.get_operation(operation_id)
+
+    def pause_operation(self, operation_id: int) -> Optional[Dict[str, Any]]:
+        self._work_orders().pause_operation(operation_id)
+        return self.get_operation(operation_id)
+
+    def complete_operation(self, operation_id: int) -> Optional[Dict[str, Any]]:
+        self._work_orders().complete_operation(operation_id)
+        return self.get_operation(operation_id)
+
+    def report_scrap(self, operation_id: int, quantity, reason: str = None) -> None:
+        self._work_orders().report_scrap(
+            operation_id=operation_id, quantity=Decimal(str(quantity)), reason=reason
+        )
+
+    def create_partial_production(self, operation_id: int, quantity) -> Dict[str, Any]:
+        return self._work_orders().create_partial_production(
+            operation_id, Decimal(str(quantity))
+        )
+
+    def assign_personnel(self, operation_id: int, user_id: int) -> None:
+        self._work_orders().assign_personnel(operation_id, user_id)
+
+    def remove_personnel(self, operation_id: int, user_id: int) -> None:
+        self._work_orders().remove_personnel(operation_id, user_id)
+
+
+def get_operator_service():
+    """API_SERVER_URL tanımlıysa uygulama sunucusu istemcisi, değilse yerel servis"""
+    from config import API_SERVER_URL
+
+    if API_SERVER_URL:
+        from api.client import get_api_client
+
+        return get_api_client().service("production.operator")
+    return OperatorPanelService()
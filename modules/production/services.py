@@ -11,6 +11,7 @@ DÜZELTMELER (V2 -> V3):
 from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from database.base import get_session
@@ -326,24 +327,28 @@ class BOMService:
         return new_bom
 
     def calculate_cost(self, bom_id: int) -> dict:
-        """Reçete maliyetini hesapla"""
-        bom = self.get_by_id(bom_id)
-        if not bom:
-            return {}
+        """
+        Reçete maliyetini hesapla (base_quantity için)
 
-        material_cost = Decimal(0)
-        for line in bom.lines:
-            if line.item and line.item.purchase_price:
-                qty = line.effective_quantity
-                material_cost += qty * line.item.purchase_price
+        Alt montajlar standart maliyetleriyle, operasyonlar istasyon saat
+        ücretleriyle hesaplanır (bkz. modules/production/costing.py).
+        """
+        from modules.production.costing import cost_rollup
+
+        costs = cost_rollup.bom_cost(self.session, bom_id)
+        if not costs:
+            return {}
 
+        base = costs["base_quantity"]
         return {
-            "material_cost": material_cost,
-            "labor_cost": bom.labor_cost or Decimal(0),
-            "overhead_cost": bom.overhead_cost or Decimal(0),
-            "total_cost": material_cost
-            + (bom.labor_cost or Decimal(0))
-            + (bom.overhead_cost or Decimal(0)),
+            "material_cost": (costs["material_cost"] + costs["scrap_cost"]) * base,
+            "scrap_cost": costs["scrap_cost"] * base,
+            "labor_cost": costs["labor_cost"] * base,
+            "machine_cost": costs["machine_cost"] * base,
+            "overhead_cost": costs["overhead_cost"] * base,
+            "by_product_credit": costs["by_product_credit"] * base,
+            "total_cost": costs["total_cost"] * base,
+            "unit_cost": costs["total_cost"],
         }
 
     def generate_code(self) -> str:
@@ -522,6 +527,12 @@ class WorkOrderService:
 
         multiplier = planned_quantity / (bom.base_quantity or Decimal(1))
 
+        # Standart maliyetler (alt montajlar roll-up sonucundan)
+        from modules.production.costing import cost_rollup
+
+        costs = cost_rollup.bom_cost(self.session, bom.id)
+        component_costs = costs["components"]
+
         # Malzeme satırlarını oluştur
         for line in bom.lines:
             wo_line = WorkOrderLine(
@@ -531,7 +542,7 @@ class WorkOrderService:
                 required_quantity=line.effective_quantity * multiplier,
                 issued_quantity=Decimal(0),  # Henüz çıkış yapılmadı
                 unit_id=line.unit_id,
-                unit_cost=line.item.purchase_price if line.item else Decimal(0),
+                unit_cost=component_costs.get(line.item_id, Decimal(0)),
             )
             wo_line.line_cost = wo_line.required_quantity * wo_line.unit_cost
             self.session.add(wo_line)
@@ -549,11 +560,14 @@ class WorkOrderService:
             )
             self.session.add(wo_op)
 
-        # Planlanan maliyetleri hesapla
-        if bom.total_material_cost:
-            order.planned_material_cost = bom.total_material_cost * multiplier
-        order.planned_labor_cost = (bom.labor_cost or Decimal(0)) * multiplier
-        order.planned_overhead_cost = (bom.overhead_cost or Decimal(0)) * multiplier
+        # Planlanan maliyetler (makine maliyeti dönüşüm maliyeti olarak işçiliğe dahil)
+        order.planned_material_cost = (
+            costs["material_cost"] + costs["scrap_cost"]
+        ) * planned_quantity
+        order.planned_labor_cost = (
+            costs["labor_cost"] + costs["machine_cost"]
+        ) * planned_quantity
+        order.planned_overhead_cost = costs["overhead_cost"] * planned_quantity
 
     def update(self, order_id: int, **kwargs) -> Optional[WorkOrder]:
         """İş emri güncelle"""
@@ -659,6 +673,55 @@ class WorkOrderService:
         self.session.commit()
         return order
 
+    def preview_release_batch(
+        self,
+        order_ids: List[int] = None,
+        warehouse_id: int = None,
+        start_from=None,
+        start_to=None,
+    ) -> dict:
+        """Toplu serbest bırakmanın sonucunu hesaplar, hiçbir şey yazmaz"""
+        from modules.production.batch_release import WorkOrderBatchReleaser
+
+        return WorkOrderBatchReleaser(self.session).plan(
+            order_ids, warehouse_id, start_from, start_to
+        )
+
+    def release_batch(
+        self,
+        order_ids: List[int] = None,
+        warehouse_id: int = None,
+        start_from=None,
+        start_to=None,
+        progress=None,
+    ) -> dict:
+        """
+        İş emirlerini toplu serbest bırak (tek transaction)
+
+        Tüm adayların malzeme ihtiyacı ve stok bakiyeleri bir kez yüklenir;
+        kıt stok öncelik ve termin sırasıyla dağıtılır. Malzemesi tam
+        karşılanamayan emirler serbest bırakılmaz, eksikleri raporlanır.
+
+        Args:
+            order_ids: Aday iş emirleri (None ise tarih aralığındaki tüm Taslak/Planlandı emirler)
+            warehouse_id: Kaynak deposu olmayan emirler için varsayılan depo
+            start_from, start_to: Planlanan başlangıç tarihi aralığı (dahil)
+            progress: progress(tamamlanan, toplam, mesaj) geri çağrısı
+
+        Returns:
+            dict: bkz. WorkOrderBatchReleaser.release
+        """
+        from modules.production.batch_release import WorkOrderBatchReleaser
+
+        releaser = WorkOrderBatchReleaser(self.session, progress=progress)
+        try:
+            result = releaser.release(order_ids, warehouse_id, start_from, start_to)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return result
+
     def start_production(self, order_id: int, warehouse_id: int) -> WorkOrder:
         """
         Üretimi başlat (IN_PROGRESS)
@@ -799,14 +862,9 @@ class WorkOrderService:
             # === TRANSACTION BAŞLANGICI ===
 
             # Birim maliyet hesapla
+            labor_cost, overhead_cost = self._conversion_costs(order, completed_quantity)
             total_cost = (
-                (order.actual_material_cost or Decimal(0))
-                + (order.actual_labor_cost or order.planned_labor_cost or Decimal(0))
-                + (
-                    order.actual_overhead_cost
-                    or order.planned_overhead_cost
-                    or Decimal(0)
-                )
+                (order.actual_material_cost or Decimal(0)) + labor_cost + overhead_cost
             )
             unit_cost = (
                 total_cost / completed_quantity
@@ -958,6 +1016,33 @@ class WorkOrderService:
         self.session.commit()
         return order
 
+    def _conversion_costs(self, order: WorkOrder, quantity: Decimal) -> tuple:
+        """
+        Mamul maliyetine eklenecek (işçilik + makine, genel gider) tutarları
+
+        Gerçekleşen tutar girilmemişse standart maliyet x üretilen miktar,
+        standart maliyet de yoksa iş emrinin planlanan tutarı kullanılır.
+        """
+        labor = order.actual_labor_cost
+        overhead = order.actual_overhead_cost
+        if not (labor and overhead):
+            from modules.production.costing import cost_rollup
+
+            standard = cost_rollup.get_costs(self.session, [order.item_id]).get(
+                order.item_id
+            )
+            if standard and standard["source"] == "standard":
+                quantity = quantity or Decimal(0)
+                labor = labor or (
+                    standard["labor_cost"] + standard["machine_cost"]
+                ) * quantity
+                overhead = overhead or standard["overhead_cost"] * quantity
+
+        return (
+            labor or order.planned_labor_cost or Decimal(0),
+            overhead or order.planned_overhead_cost or Decimal(0),
+        )
+
     def approve_quality_check(
         self,
         order_id: int,
@@ -991,14 +1076,11 @@ class WorkOrderService:
 
         try:
             # Birim maliyet hesapla
+            labor_cost, overhead_cost = self._conversion_costs(
+                order, order.completed_quantity
+            )
             total_cost = (
-                (order.actual_material_cost or Decimal(0))
-                + (order.actual_labor_cost or order.planned_labor_cost or Decimal(0))
-                + (
-                    order.actual_overhead_cost
-                    or order.planned_overhead_cost
-                    or Decimal(0)
-                )
+                (order.actual_material_cost or Decimal(0)) + labor_cost + overhead_cost
             )
             unit_cost = (
                 total_cost / order.completed_quantity
@@ -1534,36 +1616,73 @@ class WorkOrderService:
 
     def generate_order_no(self) -> str:
         """Otomatik iş emri numarası üret"""
+        return self.allocate_order_numbers(1)[0]
+
+    def allocate_order_numbers(self, count: int) -> List[str]:
+        """Ardışık iş emri numaralarını blok halinde ayır (tek sorgu)"""
         today = datetime.now()
         prefix = f"WO{today.strftime('%Y%m')}"
 
+        # 9999'dan sonra numara uzar; önce uzunluğa göre sırala
         last = (
-            self.session.query(WorkOrder)
+            self.session.query(WorkOrder.order_no)
             .filter(WorkOrder.order_no.like(f"{prefix}%"))
-            .order_by(WorkOrder.order_no.desc())
+            .order_by(func.length(WorkOrder.order_no).desc(), WorkOrder.order_no.desc())
             .first()
         )
 
-        if last:
-            try:
-                num = int(last.order_no[-4:]) + 1
-            except:
-                num = 1
-        else:
-            num = 1
+        try:
+            start = int(last.order_no[len(prefix):]) + 1 if last else 1
+        except ValueError:
+            start = 1
 
-        return f"{prefix}{num:04d}"
+        return [f"{prefix}{num:04d}" for num in range(start, start + count)]
 
     # ----------------------------------------------------------
     # RAPORLAMA
     # ----------------------------------------------------------
 
     def get_production_summary(self, order_id: int) -> dict:
-        """Üretim özeti"""
+        """Üretim özeti (sapmalar üretim başlangıcında geçerli standart maliyete göre)"""
         order = self.get_by_id(order_id)
         if not order:
             return {}
 
+        from modules.production.costing import cost_rollup
+
+        standard = None
+        if order.actual_start:
+            standard = cost_rollup.get_cost_as_of(
+                self.session, order.item_id, order.actual_start
+            )
+        if standard is None:
+            standard = cost_rollup.get_costs(self.session, [order.item_id]).get(
+                order.item_id
+            )
+        quantity = order.completed_quantity or order.planned_quantity or Decimal(0)
+        standard_cost = {
+            "version": standard["version"] if standard else None,
+            "unit": float(standard["total_cost"]) if standard else 0.0,
+            "material": 0.0,
+            "labor": 0.0,
+            "overhead": 0.0,
+            "total": 0.0,
+        }
+        if standard:
+            standard_cost.update(
+                material=float(
+                    (standard["material_cost"] + standard["scrap_cost"]) * quantity
+                ),
+                labor=float((standard["labor_cost"] + standard["machine_cost"]) * quantity),
+                overhead=float(standard["overhead_cost"] * quantity),
+                total=float(standard["total_cost"] * quantity),
+            )
+        actual_total = float(
+            (order.actual_material_cost or 0)
+            + (order.actual_labor_cost or 0)
+            + (order.actual_overhead_cost or 0)
+        )
+
         return {
             "order_no": order.order_no,
             "item": order.item.name if order.item else "",
@@ -1571,7 +1690,7 @@ class WorkOrderService:
             "planned_quantity": float(order.planned_quantity),
             "completed_quantity": float(order.completed_quantity or 0),  # DÜZELTME
             "scrapped_quantity": float(order.scrapped_quantity or 0),  # DÜZELTME
-            "efficiency_rate": float(order.efficiency_rate or 0),
+            "efficiency_rate": float(order.progress_rate or 0),
             "planned_cost": {
                 "material": float(order.planned_material_cost or 0),
                 "labor": float(order.planned_labor_cost or 0),
@@ -1600,7 +1719,16 @@ class WorkOrderService:
                 "quantity": float(
                     (order.completed_quantity or 0) - order.planned_quantity  # DÜZELTME
                 ),
+                # Gerçekleşen - standart (gerçekleşen miktar için)
+                "standard_material": float(order.actual_material_cost or 0)
+                - standard_cost["material"],
+                "standard_labor": float(order.actual_labor_cost or 0)
+                - standard_cost["labor"],
+                "standard_overhead": float(order.actual_overhead_cost or 0)
+                - standard_cost["overhead"],
+                "standard_total": actual_total - standard_cost["total"],
             },
+            "standard_cost": standard_cost,
             "duration": {
                 "planned_start": (
                     order.planned_start.isoformat() if order.planned_start else None
@@ -4,6 +4,7 @@ Akıllı İş - BOM (Ürün Reçeteleri) Modülü
 
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QStackedWidget, QMessageBox
 
+from core.reference_data import reference_cache
 from .bom_list import BOMListPage
 from .bom_form import BOMFormPage
 
@@ -16,7 +17,6 @@ class BOMModule(QWidget):
         super().__init__(parent)
         self.bom_service = None
         self.item_service = None
-        self.unit_service = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -48,10 +48,9 @@ class BOMModule(QWidget):
         if not self.bom_service:
             try:
                 from modules.production.services import BOMService
-                from modules.inventory.services import ItemService, UnitService
+                from modules.inventory.services import ItemService
                 self.bom_service = BOMService()
                 self.item_service = ItemService()
-                self.unit_service = UnitService()
             except Exception as e:
                 print(f"Servis yükleme hatası: {e}")
                 
@@ -175,7 +174,7 @@ class BOMModule(QWidget):
             form.set_items(products)
             
             # Birimler
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             form.set_units(units)
             
         except Exception as e:
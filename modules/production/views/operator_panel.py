@@ -14,10 +14,20 @@ from PyQt6.QtWidgets import (
     QListWidgetItem,
     QTabWidget,
 )
+import time
+
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
-from modules.production.services import WorkOrderService
+from config import LIVE_UPDATE_FALLBACK_SECONDS
+from api.client import RemoteService
+from modules.production.operator_service import PANEL_STATUSES, get_operator_service
+from ui.components.live_watcher import LiveTableWatcher
+
+# Liste öğesindeki sıralama anahtarı (iş emri no, operasyon no)
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+STATUS_ICONS = {"in_progress": "▶️", "paused": "⏸", "completed": "✅"}
 
 # --- STYLES ---
 TOUCH_BTN_STYLE = """
@@ -106,7 +116,7 @@ class StationSelectDialog(QDialog):
         self.combo.setFixedHeight(50)
         self.combo.setFont(QFont("Segoe UI", 14))
         for s in self.stations:
-            self.combo.addItem(f"{s.code} - {s.name}", s)
+            self.combo.addItem(f"{s['code']} - {s['name']}", s)
 
         layout.addWidget(self.combo)
         layout.addStretch()
@@ -125,14 +135,29 @@ class OperatorPanel(QWidget):
 
     def __init__(self):
         super().__init__()
-        self.service = WorkOrderService()
+        # Yerel servis veya API_SERVER_URL tanımlıysa uygulama sunucusu
+        self.service = get_operator_service()
         self.current_station = None
         self.active_operation = None
+        # Sayaç: son yüklemedeki süre + o andan beri geçen (yerel saat)
+        self._loaded_at = 0.0
         self.timer = QTimer()
         self.timer.timeout.connect(self._update_timer)
         self.selected_team_id = None
         self.setup_ui()
 
+        # Canlı güncelleme: yalnızca değişen operasyon satırları yenilenir.
+        # Diğer istemcilerin değişiklikleri gelmiyorsa liste seyrek aralıkla yenilenir.
+        self.watcher = LiveTableWatcher(
+            ["work_order_operations"],
+            self._apply_changes,
+            self,
+            remote=isinstance(self.service, RemoteService),
+        )
+        self.fallback_timer = QTimer(self)
+        self.fallback_timer.timeout.connect(self._fallback_refresh)
+        self.fallback_timer.start(LIVE_UPDATE_FALLBACK_SECONDS * 1000)
+
     def setup_ui(self):
         layout = QHBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
@@ -312,20 +337,17 @@ class OperatorPanel(QWidget):
         )
 
     def _select_station(self):
-        # Tüm istasyonları getir
-        # Not: Service'e get_stations eklenmeli veya generic service kullanılmalı.
-        # Şimdilik dummy data veya direkt DB sorgusu yapabiliriz ama service'den çekmek doğru.
-        # Hızlıca WorkStation modelini import edip sorgulayalım
-        from database.models.production import WorkStation
-
-        with self.service.session as session:
-            stations = session.query(WorkStation).all()
+        try:
+            stations = self.service.get_stations()
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", str(e))
+            return
 
         dialog = StationSelectDialog(stations, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.current_station = dialog.get_selected()
             self.station_label.setText(
-                f"🔧 {self.current_station.code} - {self.current_station.name}"
+                f"🔧 {self.current_station['code']} - {self.current_station['name']}"
             )
             self._load_jobs()
 
@@ -336,82 +358,123 @@ class OperatorPanel(QWidget):
         self.pending_list.clear()
         self.completed_list.clear()
 
-        from database.models.production import WorkOrderOperation
-        from sqlalchemy.orm import joinedload
-
-        # Tüm operasyonları çek
-        ops = (
-            self.service.session.query(WorkOrderOperation)
-            .options(joinedload(WorkOrderOperation.work_order))
-            .filter(WorkOrderOperation.work_station_id == self.current_station.id)
-            .all()
-        )
+        ops = self.service.get_station_operations(self.current_station["id"])
 
+        # Servis sıralı döndürür; sona eklemek yeterli
         for op in ops:
-            status_icon = "⏳"
-            target_list = self.pending_list
-
-            if op.status == "in_progress":
-                status_icon = "▶️"
-            elif op.status == "paused":
-                status_icon = "⏸"
-            elif op.status == "completed":
-                status_icon = "✅"
-                target_list = self.completed_list
-
-            # Tamamlanmamış ve bitmişleri ilgili listeye at
-            if op.status in ["pending", "in_progress", "paused"]:
-                target_list = self.pending_list
-            elif op.status == "completed":
-                target_list = self.completed_list
-            else:
-                continue  # Diğer durumlar (cancelled vs) gösterilmesin
+            target_list = self._target_list(op)
+            target_list.addItem(self._job_item(op))
+
+    def _target_list(self, op) -> QListWidget:
+        return self.completed_list if op["status"] == "completed" else self.pending_list
+
+    def _job_item(self, op) -> QListWidgetItem:
+        icon = STATUS_ICONS.get(op["status"], "⏳")
+        item = QListWidgetItem(f"{icon} {op['order_no']} - {op['name']}")
+        item.setData(Qt.ItemDataRole.UserRole, op["id"])
+        item.setData(SORT_ROLE, (op["order_no"], op["operation_no"]))
+        return item
+
+    def _take_job(self, op_id):
+        """Operasyon satırını bulunduğu listeden çıkarır"""
+        for job_list in (self.pending_list, self.completed_list):
+            for row in range(job_list.count()):
+                if job_list.item(row).data(Qt.ItemDataRole.UserRole) == op_id:
+                    return job_list.takeItem(row)
+        return None
+
+    def _upsert_job(self, op):
+        """Operasyon satırını sırasını koruyarak ekler veya günceller"""
+        self._take_job(op["id"])
+        if op["work_station_id"] != self.current_station["id"] or op["status"] not in PANEL_STATUSES:
+            return
 
-            item = QListWidgetItem(
-                f"{status_icon} {op.work_order.order_no} - {op.name}"
-            )
-            item.setData(Qt.ItemDataRole.UserRole, op.id)
-            target_list.addItem(item)
+        target_list = self._target_list(op)
+        item = self._job_item(op)
+        key = tuple(item.data(SORT_ROLE))
+        row = 0
+        while row < target_list.count() and tuple(target_list.item(row).data(SORT_ROLE)) < key:
+            row += 1
+        target_list.insertItem(row, item)
+
+    def _apply_changes(self, changes):
+        """Değişen operasyonları listede ve aktif kartta günceller"""
+        if not self.current_station or "work_order_operations" not in changes:
+            return
+
+        ids = changes["work_order_operations"]
+        if ids is None:
+            self._load_jobs()
+        else:
+            rows = {op["id"]: op for op in self.service.get_operations(sorted(ids))}
+            for op_id in ids:
+                if op_id in rows:
+                    self._upsert_job(rows[op_id])
+                else:
+                    self._take_job(op_id)
+
+        if self.active_operation and (ids is None or self.active_operation["id"] in ids):
+            self._reload_active_operation()
+
+    def _reload_active_operation(self):
+        op = self.service.get_operation(self.active_operation["id"])
+        if op and op["work_station_id"] == self.current_station["id"]:
+            self._show_operation(op)
+        else:
+            # Operasyon silinmiş veya başka istasyona taşınmış
+            self._clear_active_operation()
+
+    def _clear_active_operation(self):
+        self.active_operation = None
+        self.timer.stop()
+        self.active_job_card.hide()
+        self.empty_state.show()
+        self.personnel_list.clear()
+        self.scrap_list.clear()
+
+    def _fallback_refresh(self):
+        """Diğer istemcilerin bildirimleri gelmiyorsa listeyi tamamen yenile"""
+        if self.watcher.is_live or not self.current_station:
+            return
+        try:
+            self._load_jobs()
+        except Exception as e:
+            print(f"Operasyon listesi yenilenemedi: {e}")
 
     def _on_job_select(self, item):
         op_id = item.data(Qt.ItemDataRole.UserRole)
         self._load_job_details(op_id)
 
     def _load_job_details(self, op_id):
-        # Detayları service üzerinden alabiliriz veya query
-        from database.models.production import WorkOrderOperation, WorkOrder
-        from sqlalchemy.orm import joinedload
-
-        op = (
-            self.service.session.query(WorkOrderOperation)
-            .options(
-                joinedload(WorkOrderOperation.work_order).joinedload(WorkOrder.item)
-            )
-            .get(op_id)
-        )
+        self._show_operation(self.service.get_operation(op_id))
 
+    def _show_operation(self, op):
+        """Operasyon kartını servis verisiyle güncelle"""
+        if not op:
+            return
         self.active_operation = op
+        self._loaded_at = time.monotonic()
 
         # UI Güncelle
         self.empty_state.hide()
         self.active_job_card.show()
 
-        self.job_title.setText(f"{op.work_order.order_no}")
+        self.job_title.setText(f"{op['order_no']}")
         self.job_detail.setText(
-            f"Ürün: {op.work_order.item.name}\n"
-            f"Operasyon: {op.name}\n"
-            f"Miktar: {op.work_order.planned_quantity} {op.work_order.unit.code if op.work_order.unit else ''}\n"
-            f"Tamamlanan: {op.completed_quantity or 0}"
+            f"Ürün: {op['item_name']}\n"
+            f"Operasyon: {op['name']}\n"
+            f"Miktar: {op['planned_quantity']} {op['unit_code']}\n"
+            f"Tamamlanan: {op['completed_quantity']}"
         )
 
         # Özel Notlar Gösterimi
         notes_text = ""
-        if op.work_order.production_notes:
-            notes_text += f"🔧 ÜRETİM: {op.work_order.production_notes}\n"
-        if op.work_order.quality_notes:
-            notes_text += f"🛡️ KALİTE: {op.work_order.quality_notes}\n"
-        if op.work_order.shipping_notes:
-            notes_text += f"📦 SEVKİYAT: {op.work_order.shipping_notes}"
+        if op["production_notes"]:
+            notes_text += f"🔧 ÜRETİM: {op['production_notes']}\n"
+        if op["quality_notes"]:
+            notes_text += f"🛡️ KALİTE: {op['quality_notes']}\n"
+        if op["shipping_notes"]:
+            notes_text += f"📦 SEVKİYAT: {op['shipping_notes']}"
 
         if notes_text:
             self.notes_label.setText(notes_text)
@@ -419,12 +482,12 @@ class OperatorPanel(QWidget):
         else:
             self.notes_label.hide()
 
-        self._update_buttons(op.status)
+        self._update_buttons(op["status"])
         self._update_personnel_list()
         self._update_scrap_list()
 
         # Timer başlat
-        if op.status == "in_progress":
+        if op["status"] == "in_progress":
             self.timer.start(1000)
         else:
             self.timer.stop()
@@ -472,16 +535,9 @@ class OperatorPanel(QWidget):
         if not self.active_operation:
             return
 
-        total_seconds = (self.active_operation.actual_run_time or 0) * 60
-
-        if (
-            self.active_operation.status == "in_progress"
-            and self.active_operation.last_start_time
-        ):
-            from datetime import datetime
-
-            delta = datetime.now() - self.active_operation.last_start_time
-            total_seconds += delta.total_seconds()
+        total_seconds = self.active_operation["run_seconds"]
+        if self.active_operation["status"] == "in_progress":
+            total_seconds += time.monotonic() - self._loaded_at
 
         hours = int(total_seconds // 3600)
         minutes = int((total_seconds % 3600) // 60)
@@ -493,9 +549,9 @@ class OperatorPanel(QWidget):
         if not self.active_operation:
             return
         try:
-            self.service.start_operation(self.active_operation.id)
-            self._load_job_details(self.active_operation.id)
-            self._load_jobs()  # Listeyi güncelle (ikon değişimi)
+            op = self.service.start_operation(self.active_operation["id"])
+            self._show_operation(op)
+            self._upsert_job(op)  # Listeyi güncelle (ikon değişimi)
         except Exception as e:
             QMessageBox.critical(self, "Hata", str(e))
 
@@ -503,9 +559,9 @@ class OperatorPanel(QWidget):
         if not self.active_operation:
             return
         try:
-            self.service.pause_operation(self.active_operation.id)
-            self._load_job_details(self.active_operation.id)
-            self._load_jobs()
+            op = self.service.pause_operation(self.active_operation["id"])
+            self._show_operation(op)
+            self._upsert_job(op)
         except Exception as e:
             QMessageBox.critical(self, "Hata", str(e))
 
@@ -519,7 +575,7 @@ class OperatorPanel(QWidget):
         if ok:
             try:
                 result = self.service.create_partial_production(
-                    self.active_operation.id, qty
+                    self.active_operation["id"], qty
                 )
                 QMessageBox.information(
                     self,
@@ -528,7 +584,7 @@ class OperatorPanel(QWidget):
                     f"Ürün: {result['item_name']}\n"
                     f"Miktar: {result['quantity']}",
                 )
-                self._load_job_details(self.active_operation.id)
+                self._load_job_details(self.active_operation["id"])
             except Exception as e:
                 QMessageBox.critical(self, "Hata", str(e))
 
@@ -547,7 +603,7 @@ class OperatorPanel(QWidget):
 
                 # Service layer report_scrap calls for operation_id
                 self.service.report_scrap(
-                    operation_id=self.active_operation.id, quantity=qty, reason=reason
+                    operation_id=self.active_operation["id"], quantity=qty, reason=reason
                 )
                 QMessageBox.information(self, "Başarılı", "Hurda kaydı alındı.")
                 self._update_scrap_list()  # Refresh list
@@ -568,11 +624,11 @@ class OperatorPanel(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 # Tamamla
-                self.service.complete_operation(self.active_operation.id)
+                op = self.service.complete_operation(self.active_operation["id"])
                 QMessageBox.information(self, "Başarılı", "İş emri tamamlandı.")
-                self.active_job_card.hide()
-                self.empty_state.show()
-                self._load_jobs()
+                self._clear_active_operation()
+                if op:
+                    self._upsert_job(op)
             except Exception as e:
                 QMessageBox.critical(self, "Hata", str(e))
 
@@ -589,9 +645,9 @@ class OperatorPanel(QWidget):
                         self, "Uyarı", "Tanımlı vardiya ekibi bulunamadı!"
                     )
                     # Fallback: Tüm personeli getir
-                    users = self.service.get_all_users()
+                    users = self.service.get_users()
                 else:
-                    team_list = [f"{t.name}" for t in teams]
+                    team_list = [f"{t['name']}" for t in teams]
                     # Vardiya Seçimi
                     team_name, ok_team = QInputDialog.getItem(
                         self,
@@ -608,10 +664,10 @@ class OperatorPanel(QWidget):
                     # Seçilen ekibe göre personeli filtrele
                     idx_team = team_list.index(team_name)
                     selected_team = teams[idx_team]
-                    self.selected_team_id = selected_team.id
-                    users = self.service.get_users_by_team(self.selected_team_id)
+                    self.selected_team_id = selected_team["id"]
+                    users = self.service.get_users(team_id=self.selected_team_id)
             else:
-                users = self.service.get_users_by_team(self.selected_team_id)
+                users = self.service.get_users(team_id=self.selected_team_id)
 
             if not users:
                 QMessageBox.warning(
@@ -622,7 +678,9 @@ class OperatorPanel(QWidget):
                 return
 
             # 2. Personel Seçimi
-            user_list = [f"{u.first_name} {u.last_name} ({u.username})" for u in users]
+            user_list = [
+                f"{u['first_name']} {u['last_name']} ({u['username']})" for u in users
+            ]
 
             item, ok = QInputDialog.getItem(
                 self, "Personel Ekle", "Personel Seçiniz:", user_list, 0, False
@@ -633,9 +691,9 @@ class OperatorPanel(QWidget):
                 idx = user_list.index(item)
                 user = users[idx]
 
-                self.service.assign_personnel(self.active_operation.id, user.id)
+                self.service.assign_personnel(self.active_operation["id"], user["id"])
                 QMessageBox.information(
-                    self, "Başarılı", f"{user.first_name} {user.last_name} atandı."
+                    self, "Başarılı", f"{user['first_name']} {user['last_name']} atandı."
                 )
                 self._update_personnel_list()
 
@@ -650,13 +708,11 @@ class OperatorPanel(QWidget):
 
         try:
             self.personnel_list.clear()
-            active_p = self.service.get_active_personnel(self.active_operation.id)
+            active_p = self.service.get_active_personnel(self.active_operation["id"])
             for p in active_p:
-                if p.user:
-                    name = f"{p.user.first_name} {p.user.last_name}"
-                    item = QListWidgetItem(f"👤 {name}\n({p.role.upper()})")
-                    item.setData(Qt.ItemDataRole.UserRole, p.id)  # Use assignment ID
-                    self.personnel_list.addItem(item)
+                item = QListWidgetItem(f"👤 {p['name']}\n({p['role'].upper()})")
+                item.setData(Qt.ItemDataRole.UserRole, p["id"])  # Use assignment ID
+                self.personnel_list.addItem(item)
         except Exception as e:
             print(f"Personel listesi güncellenirken hata: {e}")
 
@@ -668,22 +724,18 @@ class OperatorPanel(QWidget):
 
         try:
             self.scrap_list.clear()
-            from database.models.inventory import StockMovement
-
-            scraps = (
-                self.service.session.query(StockMovement)
-                .filter(
-                    StockMovement.document_type == "production_scrap",
-                    StockMovement.document_no == str(self.active_operation.id),
-                )
-                .order_by(StockMovement.movement_date.desc())
-                .all()
-            )
+            scraps = self.service.get_operation_scraps(self.active_operation["id"])
 
             for s in scraps:
                 item = QListWidgetItem(
-                    f"{s.quantity:.2f} - {s.notes or 'Neden Belirtilmedi'}"
+                    f"{float(s['quantity']):.2f} - {s['notes'] or 'Neden Belirtilmedi'}"
                 )
                 self.scrap_list.addItem(item)
         except Exception as e:
             print(f"Hurda listesi hatası: {e}")
+
+    def closeEvent(self, event):
+        self.watcher.stop()
+        self.timer.stop()
+        self.fallback_timer.stop()
+        super().closeEvent(event)
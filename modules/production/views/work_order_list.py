@@ -23,6 +23,7 @@ from PyQt6.QtGui import QColor, QAction
 from ui.components.stat_cards import MiniStatCard
 from config.styles import get_button_style, BTN_HEIGHT_NORMAL, ICONS
 from core.export_manager import ExportManager
+from core.label_data import work_order_source
 from core.label_manager import LabelManager
 
 
@@ -34,6 +35,7 @@ class WorkOrderListPage(QWidget):
     view_clicked = pyqtSignal(int)
     delete_clicked = pyqtSignal(int)
     status_change_requested = pyqtSignal(int, str)
+    batch_release_requested = pyqtSignal(list)
     refresh_requested = pyqtSignal()
 
     def __init__(self, parent=None):
@@ -100,6 +102,15 @@ class WorkOrderListPage(QWidget):
         refresh_btn.clicked.connect(self.refresh_requested.emit)
         header_layout.addWidget(refresh_btn)
 
+        # Toplu Serbest Bırak (listede görünen Taslak/Planlandı emirler)
+        release_btn = QPushButton("🚀 Toplu Serbest Bırak")
+        release_btn.setFixedHeight(BTN_HEIGHT_NORMAL)
+        release_btn.setStyleSheet(get_button_style("secondary"))
+        release_btn.clicked.connect(
+            lambda: self.batch_release_requested.emit(self._visible_ids())
+        )
+        header_layout.addWidget(release_btn)
+
         # Yeni İş Emri
         new_btn = QPushButton(f"{ICONS['add']} Yeni İş Emri")
         new_btn.setFixedHeight(BTN_HEIGHT_NORMAL)
@@ -376,5 +387,16 @@ class WorkOrderListPage(QWidget):
         return ExportManager.extract_data_from_table(self.table)
 
     def _print_labels(self):
-        data = self._get_export_data()
-        LabelManager.print_work_order_labels(self, data)
+        # Etiket verisi tablodaki iş emirlerinin id'leriyle veritabanından akıtılır
+        wo_ids = self._visible_ids()
+        LabelManager.print_work_order_labels(
+            self, work_order_source(wo_ids) if wo_ids else []
+        )
+
+    def _visible_ids(self) -> list:
+        """Filtrede görünen satırların iş emri id'leri"""
+        return [
+            self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            for row in range(self.table.rowCount())
+            if not self.table.isRowHidden(row) and self.table.item(row, 0)
+        ]
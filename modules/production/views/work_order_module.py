@@ -39,6 +39,7 @@ from config.styles import (
     get_input_style,
 )
 
+from core.reference_data import reference_cache
 from .work_order_list import WorkOrderListPage
 from .work_order_form import WorkOrderFormPage
 
@@ -369,6 +370,135 @@ class CompleteProductionDialog(QDialog):
         return quantities
 
 
+class BatchReleaseDialog(QDialog):
+    """Toplu serbest bırakma dialogu - Dağıtım önizlemesi ve eksikler"""
+
+    RESULT_LABELS = {
+        "released": ("✅ Serbest bırakılacak", "#10b981"),
+        "short": ("❌ Malzeme eksik", "#ef4444"),
+        "skipped": ("⚠️ Atlandı", "#f59e0b"),
+    }
+
+    def __init__(self, wo_service, order_ids, warehouses, parent=None):
+        super().__init__(parent)
+        self.wo_service = wo_service
+        self.order_ids = order_ids
+        self.warehouses = warehouses
+        self.selected_warehouse_id = None
+        self.preview = {}
+
+        self.setWindowTitle("Toplu Serbest Bırak")
+        self.setMinimumWidth(800)
+        self.setMinimumHeight(500)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(16)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        layout.addWidget(QLabel("🚀 Listede görünen Taslak / Planlandı iş emirleri"))
+        info = QLabel(
+            "Stok öncelik ve termin sırasıyla dağıtılır. Malzemesi tam "
+            "karşılanamayan iş emirleri serbest bırakılmaz."
+        )
+        info.setWordWrap(True)
+        layout.addWidget(info)
+
+        # Varsayılan depo
+        warehouse_layout = QHBoxLayout()
+        warehouse_layout.addWidget(QLabel("Kaynak deposu olmayanlar için depo:"))
+        self.warehouse_combo = QComboBox()
+        self.warehouse_combo.setMinimumWidth(250)
+        self.warehouse_combo.addItem("- Seçilmedi -", None)
+        for w in self.warehouses:
+            self.warehouse_combo.addItem(f"{w.code} - {w.name}", w.id)
+        self.warehouse_combo.currentIndexChanged.connect(self._update_preview)
+        warehouse_layout.addWidget(self.warehouse_combo)
+        warehouse_layout.addStretch()
+        layout.addLayout(warehouse_layout)
+
+        # Önizleme tablosu
+        self.orders_table = QTableWidget()
+        self.orders_table.setColumnCount(6)
+        self.orders_table.setHorizontalHeaderLabels(
+            ["İş Emri", "Ürün", "Öncelik", "Termin", "Sonuç", "Eksikler"]
+        )
+        self.orders_table.horizontalHeader().setSectionResizeMode(
+            5, QHeaderView.ResizeMode.Stretch
+        )
+        self.orders_table.verticalHeader().setVisible(False)
+        self.orders_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.orders_table)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        # Butonlar
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+
+        cancel_btn = QPushButton("İptal")
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(cancel_btn)
+
+        self.release_btn = QPushButton("🚀 Serbest Bırak")
+        self.release_btn.clicked.connect(self._on_release)
+        btn_layout.addWidget(self.release_btn)
+
+        layout.addLayout(btn_layout)
+
+        self._update_preview()
+
+    def _update_preview(self):
+        """Seçili depoya göre dağıtımı yeniden hesapla (yazma yapmaz)"""
+        self.preview = self.wo_service.preview_release_batch(
+            self.order_ids, warehouse_id=self.warehouse_combo.currentData()
+        )
+        orders = self.preview["orders"]
+        self.orders_table.setRowCount(len(orders))
+
+        for row, order in enumerate(orders):
+            due = order["due_date"]
+            label, color = self.RESULT_LABELS[order["result"]]
+            shortages = ", ".join(
+                f"{s['item_code']}: {float(s['missing']):,.4f}" for s in order["shortages"]
+            )
+            values = [
+                order["order_no"],
+                f"{order['item_code']} - {order['item_name']}",
+                order["priority"],
+                due.strftime("%d.%m.%Y") if due else "-",
+                label,
+                shortages or order["message"],
+            ]
+            for col, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                if col == 4:
+                    cell.setForeground(QColor(color))
+                self.orders_table.setItem(row, col, cell)
+
+        text = (
+            f"Toplam {self.preview['total']} | Serbest bırakılacak: {self.preview['released']} "
+            f"| Eksik: {self.preview['short']} | Atlanan: {self.preview['skipped']}"
+        )
+        if self.preview["shortages"]:
+            text += "\nTümü için gereken ek miktar: " + ", ".join(
+                f"{s['item_code']} {float(s['missing']):,.4f}" for s in self.preview["shortages"]
+            )
+        self.summary_label.setText(text)
+        self.release_btn.setText(f"🚀 Serbest Bırak ({self.preview['released']})")
+        self.release_btn.setEnabled(self.preview["released"] > 0)
+
+    def _on_release(self):
+        self.selected_warehouse_id = self.warehouse_combo.currentData()
+        self.accept()
+
+    def get_warehouse_id(self):
+        return self.selected_warehouse_id
+
+
 class WorkOrderModule(QWidget):
     """İş Emirleri modülü"""
 
@@ -379,8 +509,6 @@ class WorkOrderModule(QWidget):
         self.wo_service = None
         self.bom_service = None
         self.item_service = None
-        self.warehouse_service = None
-        self.workstation_service = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -396,6 +524,7 @@ class WorkOrderModule(QWidget):
         self.list_page.view_clicked.connect(self._show_edit_form)
         self.list_page.delete_clicked.connect(self._delete_work_order)
         self.list_page.status_change_requested.connect(self._change_status)
+        self.list_page.batch_release_requested.connect(self._batch_release)
         self.list_page.refresh_requested.connect(self._load_data)
         self.stack.addWidget(self.list_page)
 
@@ -410,18 +539,12 @@ class WorkOrderModule(QWidget):
         """Servisleri yükle"""
         if not self.wo_service:
             try:
-                from modules.production.services import (
-                    WorkOrderService,
-                    BOMService,
-                    WorkStationService,
-                )
-                from modules.inventory.services import ItemService, WarehouseService
+                from modules.production.services import WorkOrderService, BOMService
+                from modules.inventory.services import ItemService
 
                 self.wo_service = WorkOrderService()
                 self.bom_service = BOMService()
-                self.workstation_service = WorkStationService()
                 self.item_service = ItemService()
-                self.warehouse_service = WarehouseService()
             except Exception as e:
                 ErrorHandler.handle_error(
                     e,
@@ -580,11 +703,11 @@ class WorkOrderModule(QWidget):
             form.set_products(mamul_products if mamul_products else products)
 
             # Depolar
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
             form.set_warehouses(warehouses)
 
             # İş istasyonları
-            work_stations = self.workstation_service.get_all(active_only=True)
+            work_stations = reference_cache.work_stations()
             ws_list = []
             for ws in work_stations:
                 ws_list.append(
@@ -864,6 +987,43 @@ class WorkOrderModule(QWidget):
                 parent_widget=self,
             )
 
+    def _batch_release(self, wo_ids: list):
+        """Listede görünen iş emirlerini toplu serbest bırak"""
+        self._ensure_services()
+        if not self.wo_service:
+            return
+        try:
+            dialog = BatchReleaseDialog(
+                self.wo_service, wo_ids, reference_cache.warehouses(), self
+            )
+            if not dialog.preview["total"]:
+                QMessageBox.information(
+                    self, "Bilgi", "Serbest bırakılabilecek (Taslak/Planlandı) iş emri yok!"
+                )
+                return
+            if dialog.exec() != QDialog.DialogCode.Accepted:
+                return
+
+            result = self.wo_service.release_batch(
+                wo_ids, warehouse_id=dialog.get_warehouse_id()
+            )
+            QMessageBox.information(
+                self,
+                "Başarılı",
+                f"{result['released']} iş emri serbest bırakıldı.\n"
+                f"Malzeme eksik: {result['short']} | Atlanan: {result['skipped']}",
+            )
+            self._load_data()
+
+        except Exception as e:
+            ErrorHandler.handle_error(
+                e,
+                module="production",
+                screen="WorkOrderModule",
+                function="_batch_release",
+                parent_widget=self,
+            )
+
     def _start_production(self, wo_id: int):
         """Üretime başla - Depo seçimi ve stok kontrolü"""
         try:
@@ -873,7 +1033,7 @@ class WorkOrderModule(QWidget):
                 return
 
             # Depoları al
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
 
             # Malzemeleri al
             materials = []
@@ -944,7 +1104,7 @@ class WorkOrderModule(QWidget):
                 QMessageBox.warning(self, "Hata", "İş emri bulunamadı!")
                 return
 
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
 
             dialog = CompleteProductionDialog(wo, warehouses, self)
             if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -4,6 +4,7 @@ Akıllı İş - İş İstasyonları Modülü
 
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QStackedWidget, QMessageBox
 
+from core.reference_data import reference_cache
 from .work_station_list import WorkStationListPage
 from .work_station_form import WorkStationFormPage
 
@@ -16,7 +17,6 @@ class WorkStationModule(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.station_service = None
-        self.warehouse_service = None
         self.supplier_service = None
         self.setup_ui()
 
@@ -47,11 +47,9 @@ class WorkStationModule(QWidget):
         if not self.station_service:
             try:
                 from modules.production.services import WorkStationService
-                from modules.inventory.services import WarehouseService
                 from modules.purchasing.services import SupplierService
 
                 self.station_service = WorkStationService()
-                self.warehouse_service = WarehouseService()
                 self.supplier_service = SupplierService()
             except Exception as e:
                 print(f"Servis yükleme hatası: {e}")
@@ -201,7 +199,7 @@ class WorkStationModule(QWidget):
     def _load_form_data(self, form: WorkStationFormPage):
         """Form verilerini yükle"""
         try:
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
             form.set_warehouses(warehouses)
 
             # Tedarikçileri yükle
@@ -10,13 +10,24 @@ from .services import (
     PurchaseInvoiceService,
 )
 
-from .views import (
-    SupplierModule,
-    PurchaseRequestModule,
-    PurchaseOrderModule,
-    GoodsReceiptModule,
-    PurchaseInvoiceModule,
-)
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "SupplierModule": ".views",
+    "PurchaseRequestModule": ".views",
+    "PurchaseOrderModule": ".views",
+    "GoodsReceiptModule": ".views",
+    "PurchaseInvoiceModule": ".views",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     "SupplierService",
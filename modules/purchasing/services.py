@@ -227,25 +227,27 @@ class PurchaseRequestService:
 
     def generate_request_no(self) -> str:
         """Talep numarası üret"""
+        return self.allocate_request_numbers(1)[0]
+
+    def allocate_request_numbers(self, count: int) -> List[str]:
+        """Ardışık talep numaralarını blok halinde ayır (tek sorgu)"""
         today = date.today()
         prefix = f"PR{today.strftime('%y%m')}"
 
+        # 9999'dan sonra numara uzar; önce uzunluğa göre sırala
         last = (
-            self.session.query(PurchaseRequest)
+            self.session.query(PurchaseRequest.request_no)
             .filter(PurchaseRequest.request_no.like(f"{prefix}%"))
-            .order_by(desc(PurchaseRequest.request_no))
+            .order_by(desc(func.length(PurchaseRequest.request_no)), desc(PurchaseRequest.request_no))
             .first()
         )
 
-        if last:
-            try:
-                num = int(last.request_no[-4:]) + 1
-            except:
-                num = 1
-        else:
-            num = 1
+        try:
+            start = int(last.request_no[len(prefix):]) + 1 if last else 1
+        except ValueError:
+            start = 1
 
-        return f"{prefix}{num:04d}"
+        return [f"{prefix}{num:04d}" for num in range(start, start + count)]
 
 
 class PurchaseOrderService:
@@ -868,11 +870,10 @@ class PurchaseInvoiceService:
             return True
         return False
 
-    def mark_overdue(self):
-        """Vadesi geçmiş faturaları işaretle"""
-        from datetime import date as dt_date
-
-        overdue = (
+    def mark_overdue(self, today: date = None) -> int:
+        """Vadesi geçmiş faturaları tek UPDATE ile işaretle"""
+        today = today or date.today()
+        count = (
             self.session.query(PurchaseInvoice)
             .filter(
                 PurchaseInvoice.status.in_(
@@ -881,16 +882,12 @@ class PurchaseInvoiceService:
                         PurchaseInvoiceStatus.PARTIAL,
                     ]
                 ),
-                PurchaseInvoice.due_date < dt_date.today(),
+                PurchaseInvoice.due_date < today,
             )
-            .all()
+            .update({"status": PurchaseInvoiceStatus.OVERDUE}, synchronize_session=False)
         )
-
-        for inv in overdue:
-            inv.status = PurchaseInvoiceStatus.OVERDUE
-
         self.session.commit()
-        return len(overdue)
+        return count
 
     def generate_invoice_no(self) -> str:
         """Fatura numarası üret"""
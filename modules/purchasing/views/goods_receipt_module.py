@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal, Qt
 
+from core.reference_data import reference_cache
 from .goods_receipt_list import GoodsReceiptListPage
 from .goods_receipt_form import GoodsReceiptFormPage
 from .purchase_order_module import CreateReceiptDialog
@@ -173,7 +174,6 @@ class GoodsReceiptModule(QWidget):
         super().__init__(parent)
         self.service = None
         self.supplier_service = None
-        self.warehouse_service = None
         self.item_service = None
         self.setup_ui()
         
@@ -212,13 +212,6 @@ class GoodsReceiptModule(QWidget):
             except Exception as e:
                 print(f"Satın alma servisi yükleme hatası: {e}")
                 
-        if not self.warehouse_service:
-            try:
-                from modules.inventory.services import WarehouseService
-                self.warehouse_service = WarehouseService()
-            except Exception as e:
-                print(f"Depo servisi yükleme hatası: {e}")
-                
         if not self.item_service:
             try:
                 from modules.inventory.services import ItemService
@@ -261,10 +254,8 @@ class GoodsReceiptModule(QWidget):
             return []
             
     def _get_warehouses(self) -> list:
-        if not self.warehouse_service:
-            return []
         try:
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
             return [{"id": w.id, "name": w.name, "code": w.code} for w in warehouses]
         except:
             return []
@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal, Qt
 
+from core.reference_data import reference_cache
 from .purchase_order_list import PurchaseOrderListPage
 from .purchase_order_form import PurchaseOrderFormPage
 
@@ -208,7 +209,6 @@ class PurchaseOrderModule(QWidget):
         super().__init__(parent)
         self.service = None
         self.supplier_service = None
-        self.warehouse_service = None
         self.item_service = None
         self.setup_ui()
         
@@ -247,13 +247,6 @@ class PurchaseOrderModule(QWidget):
             except Exception as e:
                 print(f"Satın alma servisi yükleme hatası: {e}")
                 
-        if not self.warehouse_service:
-            try:
-                from modules.inventory.services import WarehouseService
-                self.warehouse_service = WarehouseService()
-            except Exception as e:
-                print(f"Depo servisi yükleme hatası: {e}")
-                
         if not self.item_service:
             try:
                 from modules.inventory.services import ItemService
@@ -304,10 +297,8 @@ class PurchaseOrderModule(QWidget):
             return []
             
     def _get_warehouses(self) -> list:
-        if not self.warehouse_service:
-            return []
         try:
-            warehouses = self.warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
             return [{"id": w.id, "name": w.name, "code": w.code} for w in warehouses]
         except:
             return []
@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal, Qt
 
+from core.reference_data import reference_cache
 from .purchase_request_list import PurchaseRequestListPage
 from .purchase_request_form import PurchaseRequestFormPage
 
@@ -209,7 +210,6 @@ class PurchaseRequestModule(QWidget):
         self.service = None
         self.item_service = None
         self.supplier_service = None
-        self.unit_service = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -255,13 +255,6 @@ class PurchaseRequestModule(QWidget):
             except Exception as e:
                 print(f"Stok servisi yükleme hatası: {e}")
                 
-        if not self.unit_service:
-            try:
-                from modules.inventory.services import UnitService
-                self.unit_service = UnitService()
-            except Exception as e:
-                print(f"Birim servisi yükleme hatası: {e}")
-                
     def _load_data(self):
         if not self.service:
             return
@@ -317,10 +310,8 @@ class PurchaseRequestModule(QWidget):
             
     def _get_units(self) -> list:
         """Birimleri getir"""
-        if not self.unit_service:
-            return []
         try:
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             return [{"id": u.id, "name": u.name, "code": u.code} for u in units]
         except:
             return []
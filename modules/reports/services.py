@@ -10,7 +10,8 @@ from typing import List, Dict, Optional
 from sqlalchemy import func, and_, or_, desc, extract, cast, String
 from sqlalchemy.orm import Session
 
-from database.base import get_session
+from database.replica import get_read_session
+from database.instrumentation import tracked
 from database.models import Item, StockMovement, StockBalance, Warehouse
 from database.models.sales import Customer, Invoice, InvoiceItem, InvoiceStatus
 from database.models.purchasing import (
@@ -19,14 +20,15 @@ from database.models.purchasing import (
     GoodsReceiptItem,
     PurchaseOrder,
 )
-from database.models.production import WorkOrder, WorkOrderStatus
+from modules.maintenance.kpi_engine import KPIEngine
 
 
 class ReportsService:
     """Merkezi raporlama servisi"""
 
     def __init__(self):
-        self.session: Session = get_session()
+        # Salt okunur: okuma kopyası varsa oradan okunur
+        self.session: Session = get_read_session()
 
     def close(self):
         if self.session:
@@ -42,6 +44,7 @@ class ReportsService:
     # SATIŞ RAPORLARI
     # =====================
 
+    @tracked()
     def get_sales_by_customer(
         self, start_date: date = None, end_date: date = None, limit: int = 50
     ) -> List[Dict]:
@@ -88,6 +91,7 @@ class ReportsService:
             )
         return results
 
+    @tracked()
     def get_sales_by_product(
         self, start_date: date = None, end_date: date = None, limit: int = 50
     ) -> List[Dict]:
@@ -135,6 +139,7 @@ class ReportsService:
             )
         return results
 
+    @tracked()
     def get_sales_by_period(
         self, period: str = "monthly", months: int = 12
     ) -> List[Dict]:
@@ -184,6 +189,7 @@ class ReportsService:
     # STOK YAŞLANDIRMA
     # =====================
 
+    @tracked()
     def get_stock_aging(self, warehouse_id: int = None) -> Dict:
         """Stok yaşlandırma raporu"""
         today = date.today()
@@ -261,6 +267,7 @@ class ReportsService:
     # ÜRETİM OEE
     # =====================
 
+    @tracked()
     def get_production_oee(
         self, start_date: date = None, end_date: date = None
     ) -> Dict:
@@ -270,18 +277,10 @@ class ReportsService:
         if not end_date:
             end_date = date.today()
 
-        # Tamamlanan iş emirleri
-        work_orders = (
-            self.session.query(WorkOrder)
-            .filter(
-                WorkOrder.status == WorkOrderStatus.COMPLETED,
-                WorkOrder.actual_end >= start_date,
-                WorkOrder.actual_end <= end_date,
-            )
-            .all()
-        )
+        # Tamamlanan iş emirleri (ürün adıyla tek sorgu, pandas ile toplu hesap)
+        df = KPIEngine.work_order_oee(self.session, start_date, end_date)
 
-        if not work_orders:
+        if df.empty:
             return {
                 "availability": 0,
                 "performance": 0,
@@ -289,76 +288,55 @@ class ReportsService:
                 "oee": 0,
                 "total_orders": 0,
                 "details": [],
+                "stations": [],
             }
 
-        total_planned_qty = Decimal(0)
-        total_actual_qty = Decimal(0)
-        total_good_qty = Decimal(0)
-        on_time_count = 0
-
-        details = []
-        for wo in work_orders:
-            planned = wo.quantity or Decimal(0)
-            actual = wo.completed_quantity or Decimal(0)
-            # Kabul edilen = tamamlanan (kalite kontrolü varsa ayarlanabilir)
-            good = actual
-
-            total_planned_qty += planned
-            total_actual_qty += actual
-            total_good_qty += good
-
-            # Zamanında tamamlandı mı?
-            if wo.planned_end and wo.actual_end:
-                if wo.actual_end <= wo.planned_end:
-                    on_time_count += 1
-
-            details.append(
-                {
-                    "work_order_no": wo.work_order_no,
-                    "item_name": wo.item.name if wo.item else "",
-                    "planned_qty": float(planned),
-                    "actual_qty": float(actual),
-                    "performance": float(actual / planned * 100) if planned > 0 else 0,
-                }
-            )
+        total_orders = len(df)
+        total_planned_qty = float(df["planned_qty"].sum())
+        total_actual_qty = float(df["actual_qty"].sum())
+        total_scrapped_qty = float(df["scrapped_qty"].sum())
+        on_time_count = int(df["on_time"].sum())
 
         # OEE Hesaplama
         # Kullanılabilirlik = Zamanında tamamlanan / Toplam
-        availability = (on_time_count / len(work_orders) * 100) if work_orders else 0
+        availability = on_time_count / total_orders * 100
 
         # Performans = Gerçek Üretim / Planlanan Üretim
         performance = (
-            float(total_actual_qty / total_planned_qty * 100)
-            if total_planned_qty > 0
-            else 0
+            total_actual_qty / total_planned_qty * 100 if total_planned_qty > 0 else 0
         )
 
-        # Kalite = Kabul Edilen / Toplam Üretim
-        quality = (
-            float(total_good_qty / total_actual_qty * 100)
-            if total_actual_qty > 0
-            else 100
-        )
+        # Kalite = Sağlam Üretim / (Sağlam + Fire)
+        produced = total_actual_qty + total_scrapped_qty
+        quality = total_actual_qty / produced * 100 if produced > 0 else 100
 
         # OEE = Kullanılabilirlik x Performans x Kalite / 10000
         oee = (availability * performance * quality) / 10000
 
+        details = KPIEngine.records(
+            df[["work_order_no", "item_name", "planned_qty", "actual_qty", "performance"]]
+        )
+
         return {
             "availability": round(availability, 1),
             "performance": round(performance, 1),
             "quality": round(quality, 1),
             "oee": round(oee, 1),
-            "total_orders": len(work_orders),
+            "total_orders": total_orders,
             "on_time_count": on_time_count,
-            "total_planned": float(total_planned_qty),
-            "total_actual": float(total_actual_qty),
+            "total_planned": total_planned_qty,
+            "total_actual": total_actual_qty,
             "details": details,
+            "stations": KPIEngine.records(
+                KPIEngine.station_daily_oee(self.session, start_date, end_date)
+            ),
         }
 
     # =====================
     # TEDARİKÇİ PERFORMANS
     # =====================
 
+    @tracked()
     def get_supplier_performance(self) -> List[Dict]:
         """Tedarikçi performans raporu"""
         suppliers = (
@@ -443,6 +421,7 @@ class ReportsService:
     # ALACAK YAŞLANDIRMA
     # =====================
 
+    @tracked()
     def get_receivables_aging(self) -> Dict:
         """Alacak yaşlandırma raporu"""
         today = date.today()
@@ -572,6 +551,7 @@ class ReportsService:
     # DASHBOARD ÖZETİ
     # =====================
 
+    @tracked()
     def get_reports_summary(self) -> Dict:
         """Tüm raporların özeti"""
         today = date.today()
@@ -11,14 +11,25 @@ from .services import (
     InvoiceService,
 )
 
-from .views import (
-    CustomerModule,
-    PriceListModule,
-    SalesQuoteModule,
-    SalesOrderModule,
-    DeliveryNoteModule,
-    InvoiceModule,
-)
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "CustomerModule": ".views",
+    "PriceListModule": ".views",
+    "SalesQuoteModule": ".views",
+    "SalesOrderModule": ".views",
+    "DeliveryNoteModule": ".views",
+    "InvoiceModule": ".views",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     # Services
@@ -0,0 +1,752 @@
+"""
+Akıllı İş - Teslim Edilebilir Miktar (ATP / CTP)
+
+Her ürün için bellekte zaman fazlı bir arz/talep projeksiyonu tutar:
+- Eldeki: StockBalance miktarı - rezerve
+- Arz (+): açık satınalma siparişi kalemleri, açık iş emri çıktıları
+- Talep (-): açık satış siparişi kalemleri, açık iş emri malzeme satırları
+
+Projeksiyon tarih kovalarına toplanır; her kovanın kümülatif bakiyesi ve
+"o tarihten sonra en düşük bakiye" (kümülatif ATP) önceden hesaplanır.
+"X üründen N adet ne zaman teslim edilebilir?" sorusu bu dizide ikili
+arama ile (mikrosaniyeler içinde) cevaplanır.
+
+Belgeler değiştiğinde after_flush event'i etkilenen ürünleri toplar,
+commit sonrası sadece bu ürünlerin projeksiyonu bayatlamış işaretlenir ve
+bir sonraki sorguda yeniden yüklenir. Session üzerinden yapılan toplu
+INSERT/UPDATE/DELETE'ler (stok yeniden hesaplama, sayım) do_orm_execute
+ile, diğer istemcilerin değişiklikleri core.change_bus bildirimleriyle
+yakalanır; ATP_CACHE_MAX_AGE'den eski projeksiyonlar ayrıca yenilenir. CTP modunda stok yetmeyen üretilen
+ürünlerin reçetesi patlatılır ve bileşenlerin ATP'sine göre üretim
+tarihi hesaplanır.
+
+Kullanım:
+    from modules.sales.atp import atp_engine
+    atp_engine.init_listeners()  # Uygulama başlangıcında çağır
+    atp_engine.warm()            # İsteğe bağlı: tüm ürünleri önden yükle
+
+    atp_engine.earliest_date(item_id, Decimal("25"))
+    atp_engine.quote([{"item_id": 1, "quantity": 25}, ...], ctp=True)
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session as DBSession
+from sqlalchemy.orm.attributes import get_history
+
+from config import ATP_CACHE_MAX_AGE
+from database.base import session_scope
+from database.models.inventory import Item, StockBalance
+from database.models.production import (
+    BillOfMaterials,
+    BOMLine,
+    BOMStatus,
+    WorkOrder,
+    WorkOrderLine,
+    WorkOrderStatus,
+)
+from database.models.purchasing import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
+from database.models.sales import SalesOrder, SalesOrderItem, SalesOrderStatus
+
+
+# Projeksiyona giren belge durumları
+OPEN_SALES_STATUSES = (SalesOrderStatus.CONFIRMED, SalesOrderStatus.PARTIAL)
+OPEN_PURCHASE_STATUSES = (
+    PurchaseOrderStatus.SENT,
+    PurchaseOrderStatus.CONFIRMED,
+    PurchaseOrderStatus.PARTIAL,
+)
+OPEN_WORK_ORDER_STATUSES = (
+    WorkOrderStatus.PLANNED,
+    WorkOrderStatus.RELEASED,
+    WorkOrderStatus.IN_PROGRESS,
+    WorkOrderStatus.QUALITY_CHECK,
+)
+
+# CTP reçete patlatma derinliği
+MAX_CTP_LEVEL = 10
+# IN listesi başına ürün sayısı
+CHUNK_SIZE = 1000
+
+# Bekleyen değişikliklerin session.info anahtarı
+_PENDING_KEY = "atp_pending"
+
+# Projeksiyonu etkileyen modeller (toplu DML yakalama)
+ATP_MODELS = (
+    StockBalance,
+    SalesOrder,
+    SalesOrderItem,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    WorkOrder,
+    WorkOrderLine,
+)
+
+# Diğer istemcilerden gelen bildirimler: tablo -> bayat kayıt türü
+# (kimlikler _resolve_headers'da ürünlere çevrilir)
+ATP_TABLES = {
+    "stock_balances": "sb",
+    "sales_orders": "so",
+    "sales_order_items": "soi",
+    "purchase_orders": "po",
+    "purchase_order_items": "poi",
+    "work_orders": "wo",
+    "work_order_lines": "wol",
+}
+
+ZERO = Decimal(0)
+
+# Teklif kopyalarına eklenen kayıtlar için benzersiz anahtar sayacı
+_quote_keys = count()
+
+
+def _day(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class ItemProjection:
+    """
+    Tek ürünün zaman fazlı projeksiyonu.
+
+    entries: belge satırı anahtarı -> (tarih, işaretli miktar). Geçmiş
+    tarihli (gecikmiş) kayıtlar bugüne sayılır.
+    """
+
+    __slots__ = ("item_id", "on_hand", "entries", "dates", "balances", "atp", "loaded_at")
+
+    def __init__(self, item_id: int, on_hand: Decimal = ZERO):
+        self.item_id = item_id
+        self.on_hand = on_hand
+        self.loaded_at = time.monotonic()
+        self.entries: Dict[tuple, Tuple[date, Decimal]] = {}
+        self.dates: List[date] = []
+        self.balances: List[Decimal] = []
+        self.atp: List[Decimal] = []
+
+    def copy(self) -> "ItemProjection":
+        clone = ItemProjection(self.item_id, self.on_hand)
+        clone.loaded_at = self.loaded_at
+        clone.entries = dict(self.entries)
+        clone.dates, clone.balances, clone.atp = self.dates, self.balances, self.atp
+        return clone
+
+    def rebuild(self, today: date) -> None:
+        """Kovaları, kümülatif bakiyeyi ve kümülatif ATP'yi yeniden hesaplar"""
+        buckets: Dict[date, Decimal] = {today: ZERO}
+        for day, qty in self.entries.values():
+            day = today if day is None or day < today else day
+            buckets[day] = buckets.get(day, ZERO) + qty
+
+        dates = sorted(buckets)
+        balances = []
+        balance = self.on_hand
+        for day in dates:
+            balance += buckets[day]
+            balances.append(balance)
+
+        # atp[i]: i. kovadan sonraki en düşük bakiye (i. tarihte söz verilebilecek miktar)
+        atp = balances[:]
+        for i in range(len(atp) - 2, -1, -1):
+            if atp[i + 1] < atp[i]:
+                atp[i] = atp[i + 1]
+
+        self.dates, self.balances, self.atp = dates, balances, atp
+
+    def available(self, on_date: date) -> Decimal:
+        """on_date'te söz verilebilecek miktar"""
+        index = max(bisect_right(self.dates, on_date) - 1, 0)
+        return max(self.atp[index], ZERO)
+
+    def earliest(self, quantity: Decimal) -> Optional[date]:
+        """quantity kadarının söz verilebileceği ilk tarih (yoksa None)"""
+        # atp azalmayan bir dizi olduğundan ikili arama yeterli
+        index = bisect_left(self.atp, quantity)
+        if index >= len(self.atp):
+            return None
+        return self.dates[index]
+
+    def projection(self) -> List[Dict]:
+        return [
+            {"date": day, "balance": balance, "atp": max(atp, ZERO)}
+            for day, balance, atp in zip(self.dates, self.balances, self.atp)
+        ]
+
+
+class ATPEngine:
+    """
+    ATP / CTP motoru (singleton).
+
+    Projeksiyonlar ilk sorguda (veya warm() ile) yüklenir ve belge
+    değişikliklerinde ürün bazında yenilenir. Session'ı atlayan
+    (doğrudan bağlantı üzerinden) yazımlardan sonra invalidate()
+    çağrılmalıdır.
+    """
+
+    _instance: Optional["ATPEngine"] = None
+    _listening: bool = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._setup()
+        return cls._instance
+
+    def _setup(self) -> None:
+        self._lock = threading.RLock()
+        self._projections: Dict[int, ItemProjection] = {}
+        self._routings: Dict[int, Tuple[int, List[Tuple[int, Decimal]]]] = {}
+        self._stale_items: Set[int] = set()
+        self._stale_headers: Set[Tuple[str, int]] = set()
+        self._complete = False
+        self._day: Optional[date] = None
+
+    # =====================
+    # EVENT'LER
+    # =====================
+
+    def init_listeners(self) -> None:
+        """SQLAlchemy event listener'larını kaydeder (tekrar çağrılabilir)"""
+        if self._listening:
+            return
+        event.listen(DBSession, "after_flush", self._after_flush)
+        event.listen(DBSession, "do_orm_execute", self._on_execute)
+        event.listen(DBSession, "after_commit", self._after_commit)
+        event.listen(DBSession, "after_rollback", self._after_rollback)
+        ATPEngine._listening = True
+
+    def _after_flush(self, session: DBSession, flush_context) -> None:
+        """Flush edilen belge değişikliklerinin ürünlerini toplar"""
+        if not self._projections:
+            return
+
+        pending = session.info.setdefault(_PENDING_KEY, {"items": set(), "headers": set()})
+        items, headers = pending["items"], pending["headers"]
+        changed = list(session.new) + list(session.deleted) + [
+            obj for obj in session.dirty if session.is_modified(obj)
+        ]
+        for obj in changed:
+            if isinstance(obj, (StockBalance, SalesOrderItem, PurchaseOrderItem, WorkOrderLine)):
+                items.add(obj.item_id)
+                items.update(get_history(obj, "item_id").deleted or ())
+            elif isinstance(obj, WorkOrder):
+                items.add(obj.item_id)
+                items.update(get_history(obj, "item_id").deleted or ())
+                headers.add(("wo", obj.id))
+            elif isinstance(obj, SalesOrder):
+                headers.add(("so", obj.id))
+            elif isinstance(obj, PurchaseOrder):
+                headers.add(("po", obj.id))
+            elif isinstance(obj, (BillOfMaterials, BOMLine)):
+                headers.add(("bom", 0))
+        items.discard(None)
+
+    def _on_execute(self, orm_execute_state) -> None:
+        """
+        Session üzerinden toplu INSERT/UPDATE/DELETE: parametrelerde ürün
+        varsa o ürünler, yoksa (ör. koşullu UPDATE) tüm projeksiyonlar bayatlar
+        """
+        state = orm_execute_state
+        if not self._projections or not (state.is_insert or state.is_update or state.is_delete):
+            return
+        mapper = state.bind_mapper
+        if mapper is None or not issubclass(mapper.class_, ATP_MODELS):
+            return
+
+        pending = state.session.info.setdefault(_PENDING_KEY, {"items": set(), "headers": set()})
+        params = state.parameters
+        rows = params if isinstance(params, list) else [params] if params else []
+        item_ids = {row.get("item_id") for row in rows}
+        if not rows or None in item_ids or state.is_delete:
+            pending["all"] = True
+        else:
+            pending["items"].update(item_ids)
+
+    def _after_commit(self, session: DBSession) -> None:
+        pending = session.info.pop(_PENDING_KEY, None)
+        if pending:
+            if pending.get("all"):
+                self.invalidate()
+                return
+            with self._lock:
+                self._stale_items.update(pending["items"])
+                self._stale_headers.update(pending["headers"])
+
+    def _after_rollback(self, session: DBSession) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    def invalidate_rows(self, table: str, ids: Optional[Iterable[int]]) -> None:
+        """
+        Başka istemcide değişen satırların ürünlerini bayatlatır (change_bus).
+        ids None ise (toplu değişiklik) tüm projeksiyonlar bayatlar.
+        """
+        kind = ATP_TABLES.get(table)
+        if kind is None:
+            return
+        if ids is None:
+            self.invalidate()
+            return
+        with self._lock:
+            self._stale_headers.update((kind, row_id) for row_id in ids)
+
+    def invalidate_routings(self) -> None:
+        """Reçete rotalarını bayatlatır (başka istemcide reçete değiştiğinde)"""
+        with self._lock:
+            self._stale_headers.add(("bom", 0))
+
+    def invalidate(self, item_ids: Iterable[int] = None) -> None:
+        """Verilen ürünlerin (None ise tümünün) projeksiyonunu bayatlatır"""
+        with self._lock:
+            if item_ids is None:
+                self._projections.clear()
+                self._routings.clear()
+                self._complete = False
+            else:
+                self._stale_items.update(item_ids)
+
+    # =====================
+    # YÜKLEME
+    # =====================
+
+    def warm(self) -> int:
+        """
+        Tüm ürünlerin projeksiyonunu tek seferde yükler.
+
+        Returns:
+            int: Yüklenen ürün sayısı
+        """
+        with self._lock:
+            self._projections.clear()
+            self._stale_items.clear()
+            self._stale_headers.clear()
+            self._load(None)
+            self._complete = True
+            return len(self._projections)
+
+    def _ensure(self, item_ids: Iterable[int]) -> None:
+        """Bayat veya yüklenmemiş ürünleri yükler"""
+        item_ids = list(item_ids)
+        today = date.today()
+        if self._day != today:
+            # Gün dönünce gecikmiş kayıtlar bugüne kayar
+            self._day = today
+            for projection in self._projections.values():
+                projection.rebuild(today)
+
+        if self._stale_headers:
+            self._resolve_headers()
+        if self._stale_items:
+            for item_id in self._stale_items:
+                self._projections.pop(item_id, None)
+            self._stale_items.clear()
+        if ATP_CACHE_MAX_AGE > 0:
+            # Bildirimi kaçırılmış değişikliklere karşı eski projeksiyonlar yenilenir
+            oldest = time.monotonic() - ATP_CACHE_MAX_AGE
+            for item_id in item_ids:
+                projection = self._projections.get(item_id)
+                if projection is not None and projection.loaded_at < oldest:
+                    del self._projections[item_id]
+
+        missing = {i for i in item_ids if i is not None and i not in self._projections}
+        if missing:
+            self._load(missing)
+
+    def _resolve_headers(self) -> None:
+        """Değişen belge başlıklarının kalemlerindeki ürünleri bayatlatır"""
+        headers, self._stale_headers = self._stale_headers, set()
+        if ("bom", 0) in headers:
+            self._routings.clear()
+
+        queries = (
+            ("so", SalesOrderItem.item_id, SalesOrderItem.order_id),
+            ("po", PurchaseOrderItem.item_id, PurchaseOrderItem.order_id),
+            ("wo", WorkOrderLine.item_id, WorkOrderLine.work_order_id),
+            # Diğer istemcilerden gelen satır kimlikleri
+            ("wo", WorkOrder.item_id, WorkOrder.id),
+            ("sb", StockBalance.item_id, StockBalance.id),
+            ("soi", SalesOrderItem.item_id, SalesOrderItem.id),
+            ("poi", PurchaseOrderItem.item_id, PurchaseOrderItem.id),
+            ("wol", WorkOrderLine.item_id, WorkOrderLine.id),
+        )
+        with session_scope(commit=False) as session:
+            for kind, item_column, header_column in queries:
+                ids = [header_id for k, header_id in headers if k == kind]
+                for start in range(0, len(ids), CHUNK_SIZE):
+                    rows = session.execute(
+                        select(item_column)
+                        .where(header_column.in_(ids[start : start + CHUNK_SIZE]))
+                        .distinct()
+                    )
+                    for (item_id,) in rows:
+                        self._projections.pop(item_id, None)
+
+    def _load(self, item_ids: Optional[Set[int]]) -> None:
+        """Ürünlerin (None ise tümünün) projeksiyonunu veritabanından kurar"""
+        today = date.today()
+        self._day = today
+        if item_ids is None:
+            chunks = [None]
+        else:
+            ids = sorted(item_ids)
+            chunks = [ids[start : start + CHUNK_SIZE] for start in range(0, len(ids), CHUNK_SIZE)]
+
+        with session_scope(commit=False) as session:
+            for chunk in chunks:
+                projections = {i: ItemProjection(i) for i in chunk or ()}
+
+                def projection(item_id: int) -> ItemProjection:
+                    if item_id not in projections:
+                        projections[item_id] = ItemProjection(item_id)
+                    return projections[item_id]
+
+                for item_id, on_hand in session.execute(self._on_hand_query(chunk)):
+                    projection(item_id).on_hand = Decimal(str(on_hand or 0))
+                for key, item_id, day, qty in self._entry_rows(session, chunk):
+                    projection(item_id).entries[key] = (_day(day), qty)
+
+                for item_id, item_projection in projections.items():
+                    item_projection.rebuild(today)
+                    self._projections[item_id] = item_projection
+
+    @staticmethod
+    def _on_hand_query(item_ids: Optional[List[int]]):
+        query = select(
+            StockBalance.item_id,
+            func.sum(StockBalance.quantity - func.coalesce(StockBalance.reserved_quantity, 0)),
+        ).group_by(StockBalance.item_id)
+        if item_ids is not None:
+            query = query.where(StockBalance.item_id.in_(item_ids))
+        return query
+
+    @staticmethod
+    def _entry_rows(session: DBSession, item_ids: Optional[List[int]]):
+        """(anahtar, ürün, tarih, işaretli miktar) satırları"""
+
+        def restrict(query, column):
+            return query.where(column.in_(item_ids)) if item_ids is not None else query
+
+        # Satış siparişleri (talep)
+        so_pending = SalesOrderItem.quantity - func.coalesce(SalesOrderItem.delivered_quantity, 0)
+        query = (
+            select(
+                SalesOrderItem.id,
+                SalesOrderItem.order_id,
+                SalesOrderItem.item_id,
+                func.coalesce(
+                    SalesOrderItem.delivery_date, SalesOrder.delivery_date, SalesOrder.order_date
+                ),
+                so_pending,
+            )
+            .join(SalesOrder, SalesOrder.id == SalesOrderItem.order_id)
+            .where(SalesOrder.status.in_(OPEN_SALES_STATUSES), so_pending > 0)
+        )
+        for line_id, order_id, item_id, day, qty in session.execute(
+            restrict(query, SalesOrderItem.item_id)
+        ):
+            yield ("so", order_id, line_id), item_id, day, -Decimal(str(qty))
+
+        # Satınalma siparişleri (arz)
+        po_pending = PurchaseOrderItem.quantity - func.coalesce(
+            PurchaseOrderItem.received_quantity, 0
+        )
+        query = (
+            select(
+                PurchaseOrderItem.id,
+                PurchaseOrderItem.item_id,
+                func.coalesce(
+                    PurchaseOrderItem.delivery_date,
+                    PurchaseOrder.delivery_date,
+                    PurchaseOrder.order_date,
+                ),
+                po_pending,
+            )
+            .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.order_id)
+            .where(PurchaseOrder.status.in_(OPEN_PURCHASE_STATUSES), po_pending > 0)
+        )
+        for line_id, item_id, day, qty in session.execute(
+            restrict(query, PurchaseOrderItem.item_id)
+        ):
+            yield ("po", line_id), item_id, day, Decimal(str(qty))
+
+        # İş emri çıktıları (arz)
+        wo_pending = WorkOrder.planned_quantity - func.coalesce(WorkOrder.completed_quantity, 0)
+        query = select(
+            WorkOrder.id,
+            WorkOrder.item_id,
+            func.coalesce(WorkOrder.planned_end, WorkOrder.planned_start),
+            wo_pending,
+        ).where(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES), wo_pending > 0)
+        for order_id, item_id, day, qty in session.execute(restrict(query, WorkOrder.item_id)):
+            yield ("wo", order_id), item_id, day, Decimal(str(qty))
+
+        # İş emri malzemeleri (talep)
+        line_pending = WorkOrderLine.required_quantity - func.coalesce(
+            WorkOrderLine.issued_quantity, 0
+        )
+        query = (
+            select(
+                WorkOrderLine.id,
+                WorkOrderLine.item_id,
+                WorkOrder.planned_start,
+                line_pending,
+            )
+            .join(WorkOrder, WorkOrder.id == WorkOrderLine.work_order_id)
+            .where(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES), line_pending > 0)
+        )
+        for line_id, item_id, day, qty in session.execute(
+            restrict(query, WorkOrderLine.item_id)
+        ):
+            yield ("wol", line_id), item_id, day, -Decimal(str(qty))
+
+    def _routing(self, item_id: int) -> Tuple[int, List[Tuple[int, Decimal]]]:
+        """
+        (tedarik/üretim süresi gün, [(bileşen, birim başına miktar)]).
+
+        Aktif reçetesi olmayan ürünlerde bileşen listesi boştur ve süre
+        ürün kartındaki tedarik süresidir.
+        """
+        if item_id in self._routings:
+            return self._routings[item_id]
+
+        with session_scope(commit=False) as session:
+            item_lead = session.execute(
+                select(Item.lead_time_days).where(Item.id == item_id)
+            ).scalar()
+            result = (int(item_lead or 0), [])
+
+            bom = session.execute(
+                select(
+                    BillOfMaterials.id,
+                    BillOfMaterials.base_quantity,
+                    BillOfMaterials.lead_time_days,
+                )
+                .where(
+                    BillOfMaterials.item_id == item_id,
+                    BillOfMaterials.status == BOMStatus.ACTIVE,
+                    BillOfMaterials.is_active == True,
+                )
+                .order_by(BillOfMaterials.version.desc())
+            ).first()
+            if bom:
+                bom_id, base_quantity, bom_lead = bom
+                base = Decimal(str(base_quantity or 1)) or Decimal(1)
+                components = [
+                    (
+                        component_id,
+                        Decimal(str(quantity))
+                        * (1 + Decimal(str(scrap_rate or 0)) / 100)
+                        / base,
+                    )
+                    for component_id, quantity, scrap_rate in session.execute(
+                        select(BOMLine.item_id, BOMLine.quantity, BOMLine.scrap_rate).where(
+                            BOMLine.bom_id == bom_id, BOMLine.is_optional != True
+                        )
+                    )
+                ]
+                result = (int(bom_lead or item_lead or 0), components)
+
+        self._routings[item_id] = result
+        return result
+
+    def _get(self, item_id: int) -> ItemProjection:
+        projection = self._projections.get(item_id)
+        if projection is None:
+            if self._complete:
+                # Hiç hareketi olmayan ürün
+                projection = self._projections[item_id] = ItemProjection(item_id)
+                projection.rebuild(self._day or date.today())
+            else:
+                self._ensure([item_id])
+                projection = self._projections[item_id]
+        return projection
+
+    # =====================
+    # SORGULAR
+    # =====================
+
+    def available(self, item_id: int, on_date: date = None) -> Decimal:
+        """on_date'te (varsayılan bugün) söz verilebilecek miktar"""
+        with self._lock:
+            self._ensure([item_id])
+            return self._get(item_id).available(on_date or date.today())
+
+    def earliest_date(self, item_id: int, quantity: Decimal) -> Optional[date]:
+        """quantity kadarının teslim edilebileceği ilk tarih (mevcut arzla yoksa None)"""
+        with self._lock:
+            self._ensure([item_id])
+            return self._get(item_id).earliest(Decimal(str(quantity)))
+
+    def projection(self, item_id: int) -> List[Dict]:
+        """Ürünün tarih kovaları: {"date", "balance", "atp"}"""
+        with self._lock:
+            self._ensure([item_id])
+            return self._get(item_id).projection()
+
+    def quote(
+        self,
+        lines: List[Dict],
+        requested_date: date = None,
+        ctp: bool = False,
+        exclude_order_id: int = None,
+    ) -> List[Dict]:
+        """
+        Sipariş kalemleri için toplu teslim tarihi teklifi.
+
+        Kalemler sırayla değerlendirilir; her kalemin sözü sonraki kalemlerin
+        (ve CTP'de bileşenlerin) kullanılabilir miktarından düşülür.
+
+        Args:
+            lines: [{"item_id", "quantity", "date" (opsiyonel)}]
+            requested_date: Kalemde tarih yoksa istenen teslim tarihi
+            ctp: Stok yetmezse reçete / tedarik süresiyle tarih hesapla
+            exclude_order_id: Düzenlenen siparişin kendi talebi hariç tutulur
+
+        Returns:
+            List[Dict]: {"item_id", "quantity", "requested_date",
+                "available_on_request", "promised_date", "source"
+                ("atp" / "ctp" / "lead_time" / None), "on_time"}
+        """
+        today = date.today()
+        requested_date = requested_date or today
+        with self._lock:
+            self._ensure(line.get("item_id") for line in lines)
+            scratch: Dict[int, ItemProjection] = {}
+            results = []
+
+            for index, line in enumerate(lines):
+                item_id = line.get("item_id")
+                quantity = Decimal(str(line.get("quantity") or 0))
+                wanted = line.get("date") or requested_date
+                result = {
+                    "item_id": item_id,
+                    "quantity": quantity,
+                    "requested_date": wanted,
+                    "available_on_request": ZERO,
+                    "promised_date": None,
+                    "source": None,
+                    "on_time": False,
+                }
+                results.append(result)
+                if item_id is None:
+                    continue
+
+                projection = self._scratch(scratch, item_id, exclude_order_id)
+                result["available_on_request"] = projection.available(wanted)
+
+                promised = projection.earliest(quantity)
+                if promised is not None:
+                    result["source"] = "atp"
+                elif ctp:
+                    promised, result["source"] = self._capable(
+                        scratch, item_id, quantity, exclude_order_id, 0
+                    )
+                if promised is None:
+                    continue
+
+                # Söz verilen tarih istenen tarihten önce olamaz
+                promised = max(promised, wanted)
+                result["promised_date"] = promised
+                result["on_time"] = promised <= wanted
+                self._consume(projection, ("quote", next(_quote_keys)), promised, quantity)
+
+            return results
+
+    def _scratch(
+        self, scratch: Dict[int, ItemProjection], item_id: int, exclude_order_id: int = None
+    ) -> ItemProjection:
+        """Teklif boyunca kullanılan, tüketimle değişebilen kopya projeksiyon"""
+        projection = scratch.get(item_id)
+        if projection is None:
+            projection = self._get(item_id).copy()
+            if exclude_order_id is not None:
+                own = [
+                    key for key in projection.entries
+                    if key[0] == "so" and key[1] == exclude_order_id
+                ]
+                for key in own:
+                    del projection.entries[key]
+                if own:
+                    projection.rebuild(date.today())
+            scratch[item_id] = projection
+        return projection
+
+    @staticmethod
+    def _consume(projection: ItemProjection, key: tuple, day: date, quantity: Decimal) -> None:
+        projection.entries[key] = (day, -quantity)
+        projection.rebuild(date.today())
+
+    def _capable(
+        self,
+        scratch: Dict[int, ItemProjection],
+        item_id: int,
+        quantity: Decimal,
+        exclude_order_id: Optional[int],
+        level: int,
+    ) -> Tuple[Optional[date], Optional[str]]:
+        """
+        CTP: eksik miktarın üretim (reçete) veya tedarik süresiyle
+        karşılanabileceği tarih.
+
+        Eksik miktar temkinli olarak projeksiyondaki en düşük bakiyeye göre
+        hesaplanır. Bileşen tüketimi ve planlanan girişler teklif kopyasına
+        yazılır.
+        """
+        projection = self._scratch(scratch, item_id, exclude_order_id)
+        shortage = quantity - projection.atp[0]
+        lead_days, components = self._routing(item_id)
+
+        if not components or level >= MAX_CTP_LEVEL:
+            # Satın alınan ürün: tedarik süresi kadar sonra gelir
+            if lead_days <= 0:
+                return None, None
+            ready = date.today() + timedelta(days=lead_days)
+            self._consume(projection, ("planned", next(_quote_keys)), ready, -shortage)
+            return ready, "lead_time"
+
+        self._ensure(component_id for component_id, _ in components)
+
+        # Önce tüm bileşenlerin hazır olacağı tarih bulunur, sonra tüketilir
+        ready = date.today()
+        needs = []
+        for component_id, per_unit in components:
+            need = per_unit * shortage
+            component = self._scratch(scratch, component_id, exclude_order_id)
+            component_date = component.earliest(need)
+            if component_date is None:
+                component_date, _ = self._capable(
+                    scratch, component_id, need, exclude_order_id, level + 1
+                )
+                if component_date is None:
+                    return None, None
+            ready = max(ready, component_date)
+            needs.append((component, need))
+
+        for component, need in needs:
+            self._consume(component, ("ctp", next(_quote_keys)), ready, need)
+
+        finished = ready + timedelta(days=lead_days)
+        # Üretilecek miktar ürünün arzına eklenir
+        self._consume(projection, ("planned", next(_quote_keys)), finished, -shortage)
+        return finished, "ctp"
+
+    def status(self) -> Dict:
+        """Önbellek durumu"""
+        with self._lock:
+            return {
+                "items": len(self._projections),
+                "complete": self._complete,
+                "stale_items": len(self._stale_items),
+                "stale_documents": len(self._stale_headers),
+            }
+
+
+# Singleton instance
+atp_engine = ATPEngine()
@@ -0,0 +1,658 @@
+"""
+Akıllı İş - Toplu Satış Siparişi Aktarımı (CSV / EDI)
+
+B2B müşterilerden gelen sipariş dosyalarını akış halinde işler:
+- Dosya satır satır okunur (ayraç ve başlık sütunları otomatik algılanır)
+- Müşteri, stok kodu / barkod, birim ve müşteri fiyatları parça başına
+  birkaç toplu sorgu ile çözülür (sonuçlar aktarım boyunca önbellekte)
+- Her satır doğrulanır; hatalar satır numarasıyla raporlanır, hatalı
+  satırı olan sipariş hiç oluşturulmaz
+- Sipariş başlıkları ve kalemleri parça parça toplu INSERT ile yazılır,
+  sipariş numaraları blok halinde ayrılır
+- İstenirse siparişler toplu kredi kontrolüyle onaylanır (cari defter
+  ve ATP projeksiyonu güncellenir)
+
+Aynı müşteri + sipariş referansına ait satırlar ardışık olmalıdır; her
+ardışık grup bir sipariş olur. Referans sütunu yoksa müşterinin ardışık
+satırları tek sipariş olur.
+
+Dosya biçimi (başlık satırı zorunlu, sütun adları Türkçe veya İngilizce):
+    musteri;siparis;stok;miktar;birim;fiyat;iskonto;kdv;teslim;aciklama
+    M001;PO-1001;8690000000017;24;ADET;;5;;15.11.2026;
+    M001;PO-1001;VIDA-M8;100;;1,25;;;;
+
+Fiyat boşsa: müşteri fiyat listesi (miktar kademeli), varsayılan satış
+fiyat listesi, stok kartı satış fiyatı (PriceListService.get_customer_price
+ile aynı öncelik). KDV boşsa stok kartındaki oran kullanılır.
+
+Kullanım:
+    result = SalesOrderService().import_file("siparisler.csv", confirm=True)
+    result["orders"], result["errors"][:10]
+"""
+
+import csv
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import desc, insert, or_, update
+
+from database.models.inventory import Item, ItemBarcode, Unit
+from database.models.sales import (
+    Customer,
+    PriceList,
+    PriceListItem,
+    PriceListType,
+    SalesOrder,
+    SalesOrderItem,
+    SalesOrderStatus,
+)
+
+
+# Sütun adı eşlemesi (küçük harf, boşluklar "_")
+COLUMN_ALIASES = {
+    "customer": ("musteri", "müşteri", "musteri_kodu", "müşteri_kodu", "cari", "customer", "customer_code"),
+    "ref": ("siparis", "sipariş", "siparis_no", "sipariş_no", "referans", "ref", "po", "order_ref"),
+    "item": ("stok", "stok_kodu", "urun", "ürün", "barkod", "item", "item_code", "barcode", "code"),
+    "quantity": ("miktar", "adet", "qty", "quantity"),
+    "unit": ("birim", "unit"),
+    "unit_price": ("fiyat", "birim_fiyat", "price", "unit_price"),
+    "discount_rate": ("iskonto", "iskonto_orani", "discount", "discount_rate"),
+    "tax_rate": ("kdv", "kdv_orani", "vat", "tax_rate"),
+    "delivery_date": ("teslim", "teslim_tarihi", "delivery_date"),
+    "description": ("aciklama", "açıklama", "description", "notes"),
+}
+REQUIRED_COLUMNS = ("customer", "item", "quantity")
+
+DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y%m%d")
+
+# Varsayılan fiyat listesi henüz aranmadı işareti
+_UNSET = object()
+
+
+# =====================
+# DOSYA OKUMA
+# =====================
+
+
+def _normalize_header(name: str) -> str:
+    return name.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def read_order_file(
+    path: str, delimiter: Optional[str] = None, encoding: str = "utf-8-sig"
+) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Sipariş dosyasını satır satır okur: (satır no, {alan: metin}).
+
+    Alan adları COLUMN_ALIASES anahtarlarıdır; boş satırlar atlanır.
+    """
+    aliases = {
+        alias: field for field, names in COLUMN_ALIASES.items() for alias in names
+    }
+
+    with open(path, newline="", encoding=encoding) as f:
+        if delimiter is None:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+            except csv.Error:
+                delimiter = ";"
+
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if not header:
+            return
+
+        columns = [(index, aliases.get(_normalize_header(name))) for index, name in enumerate(header)]
+        columns = [(index, field) for index, field in columns if field]
+        found = {field for _, field in columns}
+        missing = [field for field in REQUIRED_COLUMNS if field not in found]
+        if missing:
+            raise ValueError(
+                "Sipariş dosyasında zorunlu sütunlar eksik: "
+                + ", ".join(COLUMN_ALIASES[field][0] for field in missing)
+            )
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield reader.line_num, {
+                field: row[index].strip() if index < len(row) else ""
+                for index, field in columns
+            }
+
+
+def _decimal(text: str) -> Optional[Decimal]:
+    """'1.234,50', '1234.5', '12,5' biçimlerini Decimal'e çevirir (boş -> None)"""
+    if not text:
+        return None
+    if "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    return Decimal(text)
+
+
+def _date(text: str) -> Optional[date]:
+    if not text:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(text)
+
+
+def _group_orders(rows: Iterable[Tuple[int, Dict[str, str]]]) -> Iterator[Dict]:
+    """Ardışık aynı müşteri + referans satırlarını sipariş olarak gruplar"""
+    order = None
+    for line_no, row in rows:
+        key = (row.get("customer", ""), row.get("ref", ""))
+        if order is None or order["key"] != key:
+            if order is not None:
+                yield order
+            order = {"key": key, "customer": key[0], "ref": key[1], "lines": []}
+        order["lines"].append((line_no, row))
+    if order is not None:
+        yield order
+
+
+# =====================
+# AKTARIM
+# =====================
+
+
+class SalesOrderImporter:
+    """
+    Satış siparişi dosyası aktarıcısı.
+
+    Siparişler CHUNK_SIZE satırlık parçalar halinde işlenir; her parça
+    kendi transaction'ında yazılır (hatalı parça geri alınır, önceki
+    parçalar kalır).
+    """
+
+    CHUNK_SIZE = 2000
+    MAX_ERRORS = 1000
+
+    def __init__(self, service, chunk_size: int = None):
+        self.service = service
+        self.session = service.session
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+        # Aktarım boyunca tutulan çözümleme önbellekleri (None = bulunamadı)
+        self._customers: Dict[str, Optional[tuple]] = {}
+        self._codes: Dict[str, Optional[Tuple[int, Decimal]]] = {}
+        self._item_info: Dict[int, tuple] = {}
+        self._units: Dict[str, Optional[int]] = {}
+        self._tiers: Dict[Tuple[int, int], List[Tuple[Decimal, Decimal]]] = {}
+        self._priced: Set[Tuple[int, int]] = set()
+        self._default_list = _UNSET
+
+    def import_file(
+        self,
+        path: str,
+        confirm: bool = False,
+        skip_credit_check: bool = False,
+        order_date: date = None,
+        delimiter: str = None,
+    ) -> Dict:
+        """Dosyadaki siparişleri aktarır (bkz. import_rows)"""
+        return self.import_rows(
+            read_order_file(path, delimiter),
+            confirm=confirm,
+            skip_credit_check=skip_credit_check,
+            order_date=order_date,
+        )
+
+    def import_rows(
+        self,
+        rows: Iterable[Tuple[int, Dict[str, str]]],
+        confirm: bool = False,
+        skip_credit_check: bool = False,
+        order_date: date = None,
+    ) -> Dict:
+        """
+        (satır no, {alan: metin}) satırlarından sipariş oluşturur.
+
+        Returns:
+            dict: lines (okunan satır), orders, order_lines, rejected_orders,
+            confirmed, credit_rejected (onaylanamayan sipariş no'ları),
+            error_count, errors ([{line, order, message}], ilk MAX_ERRORS)
+        """
+        summary = {
+            "lines": 0,
+            "orders": 0,
+            "order_lines": 0,
+            "rejected_orders": 0,
+            "confirmed": 0,
+            "credit_rejected": [],
+            "error_count": 0,
+            "errors": [],
+        }
+        options = {
+            "confirm": confirm,
+            "skip_credit_check": skip_credit_check,
+            "order_date": order_date or date.today(),
+        }
+
+        chunk, chunk_lines = [], 0
+        for order in _group_orders(rows):
+            chunk.append(order)
+            chunk_lines += len(order["lines"])
+            if chunk_lines >= self.chunk_size:
+                self._import_chunk(chunk, summary, **options)
+                chunk, chunk_lines = [], 0
+        if chunk:
+            self._import_chunk(chunk, summary, **options)
+        return summary
+
+    def _error(self, summary: Dict, line_no: int, order: Dict, message: str) -> None:
+        summary["error_count"] += 1
+        if len(summary["errors"]) < self.MAX_ERRORS:
+            summary["errors"].append(
+                {"line": line_no, "order": order["ref"] or order["customer"], "message": message}
+            )
+
+    def _import_chunk(
+        self,
+        orders: List[Dict],
+        summary: Dict,
+        confirm: bool,
+        skip_credit_check: bool,
+        order_date: date,
+    ) -> None:
+        self._resolve_customers({order["customer"] for order in orders})
+        self._resolve_items(
+            {row["item"] for order in orders for _, row in order["lines"]}
+        )
+        self._resolve_units(
+            {row["unit"] for order in orders for _, row in order["lines"] if row.get("unit")}
+        )
+
+        prepared = []
+        for order in orders:
+            summary["lines"] += len(order["lines"])
+            result = self._validate(order, summary)
+            if result is None:
+                summary["rejected_orders"] += 1
+            else:
+                prepared.append(result)
+        if not prepared:
+            return
+
+        self._apply_prices(prepared)
+
+        try:
+            order_ids = self._insert(prepared, order_date)
+            if confirm:
+                self._confirm(prepared, order_ids, summary, skip_credit_check)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        summary["orders"] += len(prepared)
+        summary["order_lines"] += sum(len(lines) for _, _, lines in prepared)
+
+        if confirm:
+            # Toplu yazım ORM event'lerini atlar; onaylı talep ATP'ye yansımalı
+            from modules.sales.atp import atp_engine
+            atp_engine.invalidate(
+                {line["item_id"] for _, _, lines in prepared for line in lines}
+            )
+
+    # =====================
+    # TOPLU ÇÖZÜMLEME
+    # =====================
+
+    def _resolve_customers(self, codes: Set[str]) -> None:
+        codes = [code for code in codes if code not in self._customers]
+        if not codes:
+            return
+        for row in self.session.query(
+            Customer.code,
+            Customer.id,
+            Customer.is_active,
+            Customer.price_list_id,
+            Customer.credit_limit,
+            Customer.currency,
+            Customer.payment_term_days,
+        ).filter(Customer.code.in_(codes)):
+            self._customers[row[0]] = tuple(row[1:])
+        for code in codes:
+            self._customers.setdefault(code, None)
+
+    def _resolve_items(self, codes: Set[str]) -> None:
+        """Stok kodu / barkod -> (item_id, çarpan); InventoryCountService ile aynı öncelik"""
+        codes = [code for code in codes if code not in self._codes]
+        if not codes:
+            return
+        for barcode, item_id, multiplier in self.session.query(
+            ItemBarcode.barcode, ItemBarcode.item_id, ItemBarcode.quantity
+        ).filter(ItemBarcode.barcode.in_(codes)):
+            self._codes[barcode] = (item_id, Decimal(str(multiplier or 1)))
+        for barcode, item_id in self.session.query(Item.barcode, Item.id).filter(
+            Item.barcode.in_(codes)
+        ):
+            self._codes[barcode] = (item_id, Decimal(1))
+        for code, item_id in self.session.query(Item.code, Item.id).filter(
+            Item.code.in_(codes)
+        ):
+            self._codes[code] = (item_id, Decimal(1))
+        for code in codes:
+            self._codes.setdefault(code, None)
+
+        item_ids = {
+            self._codes[code][0] for code in codes if self._codes[code]
+        } - set(self._item_info)
+        if item_ids:
+            for item_id, *info in self.session.query(
+                Item.id, Item.is_active, Item.unit_id, Item.sale_price, Item.vat_rate
+            ).filter(Item.id.in_(item_ids)):
+                self._item_info[item_id] = tuple(info)
+
+    def _resolve_units(self, codes: Set[str]) -> None:
+        codes = [code for code in codes if code not in self._units]
+        if not codes:
+            return
+        for code, short_name, unit_id in self.session.query(
+            Unit.code, Unit.short_name, Unit.id
+        ).filter(or_(Unit.code.in_(codes), Unit.short_name.in_(codes))):
+            self._units[code] = unit_id
+            if short_name:
+                self._units.setdefault(short_name, unit_id)
+        for code in codes:
+            self._units.setdefault(code, None)
+
+    def _load_prices(self, pairs: Set[Tuple[int, int]]) -> None:
+        """(fiyat listesi, ürün) kademelerini yükler (yüksek min. miktar önce)"""
+        missing = pairs - self._priced
+        if not missing:
+            return
+        list_ids = {list_id for list_id, _ in missing}
+        item_ids = {item_id for _, item_id in missing}
+        loaded = {(list_id, item_id) for list_id in list_ids for item_id in item_ids}
+
+        for list_id, item_id, min_quantity, price, discount in (
+            self.session.query(
+                PriceListItem.price_list_id,
+                PriceListItem.item_id,
+                PriceListItem.min_quantity,
+                PriceListItem.unit_price,
+                PriceListItem.discount_rate,
+            )
+            .filter(
+                PriceListItem.price_list_id.in_(list_ids),
+                PriceListItem.item_id.in_(item_ids),
+            )
+            .order_by(desc(PriceListItem.min_quantity))
+        ):
+            if (list_id, item_id) in self._priced:
+                continue
+            if discount:
+                price = price - price * discount / 100
+            self._tiers.setdefault((list_id, item_id), []).append(
+                (Decimal(min_quantity or 0), price)
+            )
+        self._priced |= loaded
+
+    def _get_default_list(self) -> Optional[int]:
+        if self._default_list is _UNSET:
+            row = (
+                self.session.query(PriceList.id)
+                .filter(
+                    PriceList.is_active == True,
+                    PriceList.is_default == True,
+                    PriceList.list_type == PriceListType.SALES,
+                )
+                .first()
+            )
+            self._default_list = row[0] if row else None
+        return self._default_list
+
+    # =====================
+    # DOĞRULAMA / FİYAT
+    # =====================
+
+    def _validate(self, order: Dict, summary: Dict) -> Optional[tuple]:
+        """Siparişin satırlarını ayrıştırır; hata varsa None (hatalar raporlanır)"""
+        first_line = order["lines"][0][0]
+        valid = True
+
+        customer = self._customers.get(order["customer"])
+        if not order["customer"]:
+            self._error(summary, first_line, order, "Müşteri kodu boş")
+            valid = False
+        elif customer is None:
+            self._error(summary, first_line, order, f"Tanımsız müşteri: {order['customer']}")
+            valid = False
+        elif customer[1] is False:
+            self._error(summary, first_line, order, f"Pasif müşteri: {order['customer']}")
+            valid = False
+
+        lines = []
+        for line_no, row in order["lines"]:
+            errors = []
+
+            match = self._codes.get(row["item"])
+            info = self._item_info.get(match[0]) if match else None
+            if not row["item"]:
+                errors.append("Stok kodu boş")
+            elif info is None:
+                errors.append(f"Tanımsız stok kodu / barkod: {row['item']}")
+            elif info[0] is False:
+                errors.append(f"Pasif stok kartı: {row['item']}")
+
+            values = {}
+            invalid = set()
+            for field, label in (
+                ("quantity", "miktar"),
+                ("unit_price", "fiyat"),
+                ("discount_rate", "iskonto"),
+                ("tax_rate", "KDV"),
+            ):
+                try:
+                    values[field] = _decimal(row.get(field, ""))
+                except (InvalidOperation, ValueError):
+                    errors.append(f"Geçersiz {label}: {row.get(field)}")
+                    values[field] = None
+                    invalid.add(field)
+
+            quantity = values["quantity"]
+            if quantity is not None and quantity <= 0:
+                errors.append(f"Miktar sıfırdan büyük olmalı: {row['quantity']}")
+            elif quantity is None and "quantity" not in invalid:
+                errors.append("Miktar boş")
+            if values["unit_price"] is not None and values["unit_price"] < 0:
+                errors.append(f"Fiyat negatif olamaz: {row['unit_price']}")
+            discount = values["discount_rate"] or Decimal(0)
+            if not 0 <= discount <= 100:
+                errors.append(f"İskonto 0-100 arasında olmalı: {row['discount_rate']}")
+
+            unit_id = None
+            if row.get("unit"):
+                unit_id = self._units.get(row["unit"])
+                if unit_id is None:
+                    errors.append(f"Tanımsız birim: {row['unit']}")
+
+            try:
+                delivery_date = _date(row.get("delivery_date", ""))
+            except ValueError:
+                errors.append(f"Geçersiz teslim tarihi: {row['delivery_date']}")
+                delivery_date = None
+
+            if errors:
+                for message in errors:
+                    self._error(summary, line_no, order, message)
+                valid = False
+                continue
+            if not valid:
+                continue
+
+            item_id, multiplier = match
+            _, item_unit_id, sale_price, vat_rate = info
+            price = values["unit_price"]
+            if multiplier != 1:
+                # Koli / paket barkodu: temel birime çevrilir
+                quantity *= multiplier
+                unit_id = None
+                if price is not None:
+                    price /= multiplier
+            tax_rate = values["tax_rate"]
+
+            lines.append(
+                {
+                    "item_id": item_id,
+                    "quantity": quantity,
+                    "unit_id": unit_id or item_unit_id,
+                    "unit_price": price,
+                    "discount_rate": discount,
+                    "tax_rate": tax_rate if tax_rate is not None else Decimal(vat_rate or 0),
+                    "description": row.get("description") or None,
+                    "delivery_date": delivery_date,
+                    "_sale_price": sale_price,
+                }
+            )
+
+        return (order, customer, lines) if valid else None
+
+    def _apply_prices(self, prepared: List[tuple]) -> None:
+        """Fiyatı verilmeyen satırlara müşteri / varsayılan liste fiyatı atar"""
+        default_list = self._get_default_list()
+        pairs = set()
+        for _, customer, lines in prepared:
+            list_ids = [list_id for list_id in (customer[2], default_list) if list_id]
+            for line in lines:
+                if line["unit_price"] is None:
+                    pairs.update((list_id, line["item_id"]) for list_id in list_ids)
+        self._load_prices(pairs)
+
+        for _, customer, lines in prepared:
+            list_ids = [list_id for list_id in (customer[2], default_list) if list_id]
+            for line in lines:
+                sale_price = line.pop("_sale_price")
+                if line["unit_price"] is None:
+                    line["unit_price"] = self._price(
+                        list_ids, line["item_id"], line["quantity"], sale_price
+                    )
+
+    def _price(
+        self, list_ids: List[int], item_id: int, quantity: Decimal, sale_price
+    ) -> Decimal:
+        for list_id in list_ids:
+            for min_quantity, price in self._tiers.get((list_id, item_id), ()):
+                if min_quantity <= quantity:
+                    if price:
+                        return Decimal(price)
+                    break
+        return Decimal(sale_price or 0)
+
+    # =====================
+    # YAZMA / ONAY
+    # =====================
+
+    def _insert(self, prepared: List[tuple], order_date: date) -> List[int]:
+        """Başlık ve kalemleri toplu INSERT ile yazar; sipariş id'lerini döner"""
+        order_nos = self.service.allocate_order_numbers(len(prepared))
+
+        headers = []
+        for (order, customer, lines), order_no in zip(prepared, order_nos):
+            subtotal = Decimal(0)
+            tax_amount = Decimal(0)
+            for line in lines:
+                amount = line["quantity"] * line["unit_price"]
+                line["line_total"] = amount - amount * line["discount_rate"] / 100
+                subtotal += amount
+                tax_amount += amount * line["tax_rate"] / 100
+
+            dates = [line["delivery_date"] for line in lines if line["delivery_date"]]
+            order["order_no"] = order_no
+            order["total"] = subtotal + tax_amount
+            headers.append(
+                {
+                    "order_no": order_no,
+                    "order_date": order_date,
+                    "customer_id": customer[0],
+                    "status": SalesOrderStatus.DRAFT,
+                    "delivery_date": min(dates) if dates else None,
+                    "currency": customer[4] or "TRY",
+                    "payment_term_days": customer[5],
+                    "subtotal": subtotal,
+                    "discount_rate": Decimal(0),
+                    "discount_amount": Decimal(0),
+                    "tax_amount": tax_amount,
+                    "total": order["total"],
+                    "notes": f"Müşteri sipariş no: {order['ref']}" if order["ref"] else None,
+                }
+            )
+
+        self.session.execute(insert(SalesOrder), headers)
+        ids = dict(
+            self.session.query(SalesOrder.order_no, SalesOrder.id).filter(
+                SalesOrder.order_no.in_(order_nos)
+            )
+        )
+
+        rows = []
+        order_ids = []
+        for order, _, lines in prepared:
+            order_id = ids[order["order_no"]]
+            order_ids.append(order_id)
+            for line in lines:
+                line["order_id"] = order_id
+                line["delivered_quantity"] = Decimal(0)
+                rows.append(line)
+        self.session.execute(insert(SalesOrderItem), rows)
+        return order_ids
+
+    def _confirm(
+        self,
+        prepared: List[tuple],
+        order_ids: List[int],
+        summary: Dict,
+        skip_credit_check: bool,
+    ) -> None:
+        """Siparişleri toplu kredi kontrolüyle onaylar (tek risk sorgusu)"""
+        from modules.finance.balance_ledger import counterparty_ledger
+
+        exposures = {}
+        if not skip_credit_check:
+            exposures = counterparty_ledger.get_customer_exposures(
+                self.session,
+                {customer[0] for _, customer, _ in prepared if (customer[3] or 0) > 0},
+            )
+
+        confirmed = []
+        deltas = {}
+        for (order, customer, lines), order_id in zip(prepared, order_ids):
+            customer_id, credit_limit = customer[0], Decimal(customer[3] or 0)
+            if customer_id in exposures:
+                if exposures[customer_id] + order["total"] > credit_limit:
+                    summary["credit_rejected"].append(order["order_no"])
+                    self._error(
+                        summary,
+                        order["lines"][0][0],
+                        order,
+                        f"{order['order_no']} kredi limiti aşıldığı için onaylanmadı "
+                        f"(limit {credit_limit:,.2f}, risk {exposures[customer_id]:,.2f}, "
+                        f"sipariş {order['total']:,.2f})",
+                    )
+                    continue
+                exposures[customer_id] += order["total"]
+
+            confirmed.append(order_id)
+            values = deltas.setdefault(("customer", customer_id), [Decimal(0)] * 3)
+            values[1] += order["total"]
+
+        if not confirmed:
+            return
+        # Defter satırı olmayan cari, onay öncesi durumdan hesaplanmalı
+        counterparty_ledger.apply_deltas(self.session, deltas)
+        self.session.execute(
+            update(SalesOrder)
+            .where(SalesOrder.id.in_(confirmed))
+            .values(status=SalesOrderStatus.CONFIRMED)
+            .execution_options(synchronize_session=False)
+        )
+        summary["confirmed"] += len(confirmed)
@@ -5,7 +5,7 @@ Akıllı İş - Satış Modülü Servisleri
 from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional, Dict
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import desc, and_, or_, func
 from sqlalchemy.orm import joinedload
 
 from database.base import get_session
@@ -509,16 +509,68 @@ class SalesQuoteService:
 
         return order
 
-    def mark_expired(self) -> int:
-        """Süresi dolan teklifleri işaretle"""
-        today = date.today()
+    def get_margin_analysis(self, quote_id: int) -> Dict:
+        """
+        Teklif kalemlerinin standart maliyete göre brüt kâr analizi
+
+        Maliyetler standart maliyet anlık görüntülerinden okunur
+        (satın alınan ürünlerde alış fiyatı).
+
+        Returns:
+            Dict: {"lines": [...], "revenue", "cost", "margin", "margin_rate"}
+        """
+        from modules.production.costing import cost_rollup
+
+        quote = self.get_by_id(quote_id)
+        if not quote:
+            return {}
+
+        costs = cost_rollup.get_costs(self.session, [line.item_id for line in quote.items])
+        lines = []
+        revenue = cost = Decimal(0)
+        for line in quote.items:
+            standard = costs.get(line.item_id)
+            unit_cost = standard["total_cost"] if standard else Decimal(0)
+            line_revenue = Decimal(str(line.line_total or 0))
+            line_cost = unit_cost * Decimal(str(line.quantity or 0))
+            revenue += line_revenue
+            cost += line_cost
+            lines.append(
+                {
+                    "item_id": line.item_id,
+                    "quantity": line.quantity,
+                    "revenue": line_revenue,
+                    "unit_cost": unit_cost,
+                    "cost": line_cost,
+                    "margin": line_revenue - line_cost,
+                    "margin_rate": (
+                        (line_revenue - line_cost) / line_revenue * 100
+                        if line_revenue
+                        else Decimal(0)
+                    ),
+                    "cost_source": standard["source"] if standard else None,
+                    "cost_version": standard["version"] if standard else None,
+                }
+            )
+
+        return {
+            "lines": lines,
+            "revenue": revenue,
+            "cost": cost,
+            "margin": revenue - cost,
+            "margin_rate": (revenue - cost) / revenue * 100 if revenue else Decimal(0),
+        }
+
+    def mark_expired(self, today: date = None) -> int:
+        """Süresi dolan teklifleri tek UPDATE ile işaretle"""
+        today = today or date.today()
         count = (
             self.session.query(SalesQuote)
             .filter(
                 SalesQuote.status == SalesQuoteStatus.SENT,
                 SalesQuote.valid_until < today
             )
-            .update({"status": SalesQuoteStatus.EXPIRED})
+            .update({"status": SalesQuoteStatus.EXPIRED}, synchronize_session=False)
         )
         self.session.commit()
         return count
@@ -560,6 +612,10 @@ class SalesOrderService:
 
     def __init__(self):
         self.session = get_session()
+        from modules.finance.balance_ledger import counterparty_ledger
+        counterparty_ledger.init_listeners()
+        from modules.sales.atp import atp_engine
+        atp_engine.init_listeners()
 
     def get_all(self, status: SalesOrderStatus = None, customer_id: int = None) -> List[SalesOrder]:
         """Tüm siparişleri getir"""
@@ -686,37 +742,28 @@ class SalesOrderService:
         self.session.commit()
         return order
 
-    def _get_customer_open_balance(self, customer_id: int) -> float:
-        """Müşterinin açık bakiyesini hesapla"""
-        # Onaylı/bekleyen siparişlerin toplamı
-        from sqlalchemy import func
-        orders_total = (
-            self.session.query(func.coalesce(func.sum(SalesOrder.total), 0))
-            .filter(
-                SalesOrder.customer_id == customer_id,
-                SalesOrder.status.in_([
-                    SalesOrderStatus.CONFIRMED,
-                    SalesOrderStatus.PARTIAL
-                ])
-            )
-            .scalar()
-        )
-
-        # Ödenmemiş faturaların bakiyesi
-        invoices_balance = (
-            self.session.query(func.coalesce(func.sum(Invoice.balance), 0))
-            .filter(
-                Invoice.customer_id == customer_id,
-                Invoice.status.in_([
-                    InvoiceStatus.ISSUED,
-                    InvoiceStatus.PARTIAL,
-                    InvoiceStatus.OVERDUE
-                ])
-            )
-            .scalar()
+    def quote_availability(
+        self,
+        lines: List[Dict],
+        requested_date: date = None,
+        ctp: bool = False,
+        order_id: int = None,
+    ) -> List[Dict]:
+        """
+        Sipariş kalemleri için teslim tarihi teklifi (ATP, istenirse CTP).
+
+        Düzenlenen siparişin (order_id) kendi talebi hesaba katılmaz.
+        Dönen alanlar için bkz. ATPEngine.quote.
+        """
+        from modules.sales.atp import atp_engine
+        return atp_engine.quote(
+            lines, requested_date=requested_date, ctp=ctp, exclude_order_id=order_id
         )
 
-        return float(orders_total) + float(invoices_balance)
+    def _get_customer_open_balance(self, customer_id: int) -> float:
+        """Müşterinin açık bakiyesi (onaylı siparişler + açık faturalar, cari defterden)"""
+        from modules.finance.balance_ledger import counterparty_ledger
+        return float(counterparty_ledger.get_customer_exposure(self.session, customer_id))
 
     def cancel(self, order_id: int) -> Optional[SalesOrder]:
         """Sipariş iptal"""
@@ -766,27 +813,56 @@ class SalesOrderService:
             return True
         return False
 
+    def import_file(
+        self,
+        file_path: str,
+        confirm: bool = False,
+        skip_credit_check: bool = False,
+        order_date: date = None,
+    ) -> Dict:
+        """
+        CSV / EDI sipariş dosyasını toplu aktar
+
+        Args:
+            file_path: Dosya yolu (başlık satırlı; ayraç otomatik algılanır)
+            confirm: Oluşan siparişler kredi kontrolüyle onaylansın mı
+            skip_credit_check: Onayda kredi limiti kontrol edilmesin
+            order_date: Sipariş tarihi (varsayılan bugün)
+
+        Returns:
+            dict: bkz. SalesOrderImporter.import_rows
+        """
+        from modules.sales.order_import import SalesOrderImporter
+        return SalesOrderImporter(self).import_file(
+            file_path,
+            confirm=confirm,
+            skip_credit_check=skip_credit_check,
+            order_date=order_date,
+        )
+
     def generate_order_no(self) -> str:
         """Sipariş numarası üret"""
+        return self.allocate_order_numbers(1)[0]
+
+    def allocate_order_numbers(self, count: int) -> List[str]:
+        """Ardışık sipariş numaralarını blok halinde ayır (tek sorgu)"""
         today = date.today()
         prefix = f"SO{today.strftime('%y%m')}"
 
+        # 9999'dan sonra numara uzar; önce uzunluğa göre sırala
         last = (
-            self.session.query(SalesOrder)
+            self.session.query(SalesOrder.order_no)
             .filter(SalesOrder.order_no.like(f"{prefix}%"))
-            .order_by(desc(SalesOrder.order_no))
+            .order_by(desc(func.length(SalesOrder.order_no)), desc(SalesOrder.order_no))
             .first()
         )
 
-        if last:
-            try:
-                num = int(last.order_no[-4:]) + 1
-            except:
-                num = 1
-        else:
-            num = 1
+        try:
+            start = int(last.order_no[len(prefix):]) + 1 if last else 1
+        except ValueError:
+            start = 1
 
-        return f"{prefix}{num:04d}"
+        return [f"{prefix}{num:04d}" for num in range(start, start + count)]
 
 
 class DeliveryNoteService:
@@ -1228,16 +1304,21 @@ class InvoiceService:
         self.session.commit()
         return invoice
 
-    def check_overdue(self) -> int:
-        """Vadesi geçmiş faturaları işaretle"""
-        today = date.today()
+    def check_overdue(self, today: date = None) -> int:
+        """
+        Vadesi geçmiş faturaları tek UPDATE ile işaretle
+
+        ISSUED/PARTIAL -> OVERDUE geçişi açık fatura tutarını değiştirmez;
+        cari bakiye defterine delta gerekmez.
+        """
+        today = today or date.today()
         count = (
             self.session.query(Invoice)
             .filter(
                 Invoice.status.in_([InvoiceStatus.ISSUED, InvoiceStatus.PARTIAL]),
                 Invoice.due_date < today
             )
-            .update({"status": InvoiceStatus.OVERDUE})
+            .update({"status": InvoiceStatus.OVERDUE}, synchronize_session=False)
         )
         self.session.commit()
         return count
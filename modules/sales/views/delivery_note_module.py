@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QStackedWidget, QMessageBox
 )
 
+from core.reference_data import reference_cache
 from .delivery_note_list import DeliveryNoteListPage
 from .delivery_note_form import DeliveryNoteFormPage
 
@@ -24,7 +25,6 @@ class DeliveryNoteModule(QWidget):
         self.service = None
         self.customer_service = None
         self.item_service = None
-        self.unit_service = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -79,17 +79,6 @@ class DeliveryNoteModule(QWidget):
                     )
                 print(f"Stok servisi yükleme hatası: {e}")
 
-        if not self.unit_service:
-            try:
-                from modules.inventory.services import UnitService
-                self.unit_service = UnitService()
-            except Exception as e:
-                if ErrorHandler:
-                    ErrorHandler.log_error(
-                        e, "DeliveryNoteModule._ensure_services"
-                    )
-                print(f"Birim servisi yükleme hatası: {e}")
-
     def _load_data(self):
         if not self.service:
             return
@@ -156,10 +145,8 @@ class DeliveryNoteModule(QWidget):
 
     def _get_units(self) -> list:
         """Birimleri getir"""
-        if not self.unit_service:
-            return []
         try:
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             return [{"id": u.id, "name": u.name, "code": u.code} for u in units]
         except Exception as e:
             if ErrorHandler:
@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import QDate
 
+from core.reference_data import reference_cache
 from .invoice_list import InvoiceListPage
 from .invoice_form import InvoiceFormPage
 
@@ -74,7 +75,6 @@ class InvoiceModule(QWidget):
         self.service = None
         self.customer_service = None
         self.item_service = None
-        self.unit_service = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -122,15 +122,6 @@ class InvoiceModule(QWidget):
                     ErrorHandler.log_error(e, "InvoiceModule._ensure_services")
                 print(f"Stok servisi yükleme hatası: {e}")
 
-        if not self.unit_service:
-            try:
-                from modules.inventory.services import UnitService
-                self.unit_service = UnitService()
-            except Exception as e:
-                if ErrorHandler:
-                    ErrorHandler.log_error(e, "InvoiceModule._ensure_services")
-                print(f"Birim servisi yükleme hatası: {e}")
-
     def _load_data(self):
         if not self.service:
             return
@@ -206,10 +197,8 @@ class InvoiceModule(QWidget):
 
     def _get_units(self) -> list:
         """Birimleri getir"""
-        if not self.unit_service:
-            return []
         try:
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             return [{"id": u.id, "name": u.name, "code": u.code} for u in units]
         except Exception as e:
             if ErrorHandler:
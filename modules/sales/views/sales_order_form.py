@@ -26,8 +26,10 @@ from PyQt6.QtWidgets import (
     QAbstractItemView,
     QDialog,
     QDialogButtonBox,
+    QCheckBox,
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QDate
+from PyQt6.QtGui import QColor
 
 class ItemSelectorDialog(QDialog):
     """Stok kartı seçim dialogu"""
@@ -217,6 +219,7 @@ class SalesOrderFormPage(QWidget):
     saved = pyqtSignal(dict)
     cancelled = pyqtSignal()
     confirm_order = pyqtSignal(int)
+    availability_requested = pyqtSignal(dict)
 
     def __init__(
         self,
@@ -350,19 +353,31 @@ class SalesOrderFormPage(QWidget):
         items_frame = self._create_section("📦 Sipariş Kalemleri")
         items_layout = QVBoxLayout()
 
-        # Kalem ekleme butonu
+        # Kalem ekleme ve teslim tarihi kontrolü
+        item_buttons = QHBoxLayout()
         add_item_btn = QPushButton("➕ Kalem Ekle")
         add_item_btn.clicked.connect(self._add_item_row)
-        items_layout.addWidget(
-            add_item_btn, alignment=Qt.AlignmentFlag.AlignLeft
+        item_buttons.addWidget(add_item_btn)
+
+        item_buttons.addStretch()
+
+        self.ctp_check = QCheckBox("Üretim/tedarik ile (CTP)")
+        self.ctp_check.setToolTip(
+            "Stok yetmeyen kalemlerde reçete ve tedarik süresine göre tarih hesaplar"
         )
+        item_buttons.addWidget(self.ctp_check)
+
+        atp_btn = QPushButton("📅 Teslim Tarihi Kontrolü")
+        atp_btn.clicked.connect(self._on_check_availability)
+        item_buttons.addWidget(atp_btn)
+        items_layout.addLayout(item_buttons)
 
         # Kalemler tablosu
         self.items_table = QTableWidget()
-        self.items_table.setColumnCount(8)
+        self.items_table.setColumnCount(9)
         self.items_table.setHorizontalHeaderLabels([
             "Stok Kodu", "Stok Adı", "Miktar", "Birim",
-            "Birim Fiyat", "İskonto %", "Tutar", "İşlem"
+            "Birim Fiyat", "İskonto %", "Tutar", "İşlem", "Teslim"
         ])
         self.items_table.setMinimumHeight(200)
         self.items_table.verticalHeader().setVisible(False)
@@ -376,6 +391,7 @@ class SalesOrderFormPage(QWidget):
         self.items_table.setColumnWidth(5, 80)
         self.items_table.setColumnWidth(6, 100)
         self.items_table.setColumnWidth(7, 60)
+        self.items_table.setColumnWidth(8, 130)
 
         items_layout.addWidget(self.items_table)
 
@@ -714,6 +730,56 @@ class SalesOrderFormPage(QWidget):
 
         self.saved.emit(data)
 
+    def _on_check_availability(self):
+        """Kalemlerin teslim edilebileceği tarihleri iste"""
+        lines = []
+        for row in range(self.items_table.rowCount()):
+            code_item = self.items_table.item(row, 0)
+            qty_widget = self.items_table.cellWidget(row, 2)
+            lines.append({
+                "item_id": code_item.data(Qt.ItemDataRole.UserRole) if code_item else None,
+                "quantity": Decimal(str(qty_widget.value())) if qty_widget else Decimal(0),
+            })
+
+        if not lines:
+            QMessageBox.warning(self, "Uyarı", "Kontrol edilecek kalem yok!")
+            return
+
+        delivery_qdate = self.delivery_date_input.date()
+        self.availability_requested.emit({
+            "lines": lines,
+            "requested_date": date(
+                delivery_qdate.year(), delivery_qdate.month(), delivery_qdate.day()
+            ),
+            "ctp": self.ctp_check.isChecked(),
+            "order_id": self.order_data.get("id") if self.order_data else None,
+        })
+
+    def show_availability(self, results: list):
+        """Teslim tarihi teklifini kalemlerin yanında göster"""
+        source_names = {
+            "atp": "Stok / planlı giriş",
+            "ctp": "Üretim (reçete)",
+            "lead_time": "Tedarik süresi",
+        }
+        for row, result in enumerate(results[: self.items_table.rowCount()]):
+            promised = result.get("promised_date")
+            if promised is None:
+                text, color = "❌ Karşılanamaz", "#ef4444"
+            elif result.get("on_time"):
+                text, color = f"✅ {promised.strftime('%d.%m.%Y')}", "#10b981"
+            else:
+                text, color = f"⚠️ {promised.strftime('%d.%m.%Y')}", "#f59e0b"
+
+            cell = QTableWidgetItem(text)
+            cell.setFlags(cell.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            cell.setForeground(QColor(color))
+            cell.setToolTip(
+                f"İstenen tarihte kullanılabilir: {result.get('available_on_request', 0):,.2f}\n"
+                f"Kaynak: {source_names.get(result.get('source'), '-')}"
+            )
+            self.items_table.setItem(row, 8, cell)
+
     def _on_confirm_order(self):
         """Siparişi onayla"""
         if self.order_data:
@@ -33,6 +33,7 @@ class SalesOrderListPage(QWidget):
     confirm_clicked = pyqtSignal(int)
     cancel_clicked = pyqtSignal(int)
     create_delivery_clicked = pyqtSignal(int)
+    import_clicked = pyqtSignal()
     refresh_requested = pyqtSignal()
 
     def __init__(self, parent=None):
@@ -81,6 +82,14 @@ class SalesOrderListPage(QWidget):
         refresh_btn.clicked.connect(self.refresh_requested.emit)
         header_layout.addWidget(refresh_btn)
 
+        # Dosyadan aktar butonu
+        import_btn = QPushButton(f"{ICONS['import']} İçe Aktar")
+        import_btn.setFixedHeight(BTN_HEIGHT_NORMAL)
+        import_btn.setStyleSheet(get_button_style("secondary"))
+        import_btn.setToolTip("CSV / EDI sipariş dosyasından toplu sipariş oluştur")
+        import_btn.clicked.connect(self.import_clicked.emit)
+        header_layout.addWidget(import_btn)
+
         # Yeni ekle butonu
         add_btn = QPushButton(f"{ICONS['add']} Yeni Sipariş")
         add_btn.setFixedHeight(BTN_HEIGHT_NORMAL)
@@ -4,9 +4,12 @@ Akıllı İş - Satış Sipariş Modülü
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QStackedWidget, QMessageBox,
-    QDialog, QFormLayout, QComboBox, QDialogButtonBox
+    QDialog, QFormLayout, QComboBox, QDialogButtonBox, QFileDialog,
+    QApplication
 )
+from PyQt6.QtCore import Qt
 
+from core.reference_data import reference_cache
 from .sales_order_list import SalesOrderListPage
 from .sales_order_form import SalesOrderFormPage
 
@@ -57,7 +60,6 @@ class SalesOrderModule(QWidget):
         self.service = None
         self.customer_service = None
         self.item_service = None
-        self.unit_service = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -75,6 +77,7 @@ class SalesOrderModule(QWidget):
         self.list_page.confirm_clicked.connect(self._confirm_order)
         self.list_page.cancel_clicked.connect(self._cancel_order)
         self.list_page.create_delivery_clicked.connect(self._create_delivery)
+        self.list_page.import_clicked.connect(self._import_orders)
         self.list_page.refresh_requested.connect(self._load_data)
         self.stack.addWidget(self.list_page)
 
@@ -111,17 +114,6 @@ class SalesOrderModule(QWidget):
                     )
                 print(f"Stok servisi yükleme hatası: {e}")
 
-        if not self.unit_service:
-            try:
-                from modules.inventory.services import UnitService
-                self.unit_service = UnitService()
-            except Exception as e:
-                if ErrorHandler:
-                    ErrorHandler.log_error(
-                        e, "SalesOrderModule._ensure_services"
-                    )
-                print(f"Birim servisi yükleme hatası: {e}")
-
     def _load_data(self):
         if not self.service:
             return
@@ -189,10 +181,8 @@ class SalesOrderModule(QWidget):
 
     def _get_units(self) -> list:
         """Birimleri getir"""
-        if not self.unit_service:
-            return []
         try:
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             return [{"id": u.id, "name": u.name, "code": u.code} for u in units]
         except Exception as e:
             if ErrorHandler:
@@ -211,6 +201,9 @@ class SalesOrderModule(QWidget):
         )
         form.saved.connect(self._save_order)
         form.cancelled.connect(self._back_to_list)
+        form.availability_requested.connect(
+            lambda request, f=form: self._quote_availability(f, request)
+        )
         self.stack.addWidget(form)
         self.stack.setCurrentWidget(form)
 
@@ -263,6 +256,9 @@ class SalesOrderModule(QWidget):
                 form.saved.connect(self._save_order)
                 form.cancelled.connect(self._back_to_list)
                 form.confirm_order.connect(self._confirm_order)
+                form.availability_requested.connect(
+                    lambda request, f=form: self._quote_availability(f, request)
+                )
                 self.stack.addWidget(form)
                 self.stack.setCurrentWidget(form)
 
@@ -276,6 +272,17 @@ class SalesOrderModule(QWidget):
     def _show_view(self, order_id: int):
         self._show_edit_form(order_id)
 
+    def _quote_availability(self, form, request: dict):
+        if not self.service:
+            return
+
+        try:
+            form.show_availability(self.service.quote_availability(**request))
+        except Exception as e:
+            if ErrorHandler:
+                ErrorHandler.log_error(e, "SalesOrderModule._quote_availability")
+            QMessageBox.critical(self, "Hata", f"Teslim tarihi hesaplanamadı:\n{e}")
+
     def _save_order(self, data: dict):
         if not self.service:
             return
@@ -325,6 +332,65 @@ class SalesOrderModule(QWidget):
                     ErrorHandler.log_error(e, "SalesOrderModule._confirm_order")
                 QMessageBox.critical(self, "Hata", f"Hata: {e}")
 
+    def _import_orders(self):
+        """CSV / EDI dosyasından toplu sipariş aktar"""
+        if not self.service:
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Sipariş Dosyası Seç", "",
+            "Sipariş Dosyaları (*.csv *.txt *.edi);;Tüm Dosyalar (*)"
+        )
+        if not file_path:
+            return
+
+        reply = QMessageBox.question(
+            self, "Onay",
+            "Aktarılan siparişler onaylansın mı?\n"
+            "(Kredi limiti aşan siparişler taslak olarak kalır)",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            | QMessageBox.StandardButton.Cancel
+        )
+        if reply == QMessageBox.StandardButton.Cancel:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            result = self.service.import_file(
+                file_path, confirm=reply == QMessageBox.StandardButton.Yes
+            )
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            if ErrorHandler:
+                ErrorHandler.log_error(e, "SalesOrderModule._import_orders")
+            QMessageBox.critical(self, "Hata", f"Aktarım hatası:\n{e}")
+            self._load_data()
+            return
+        QApplication.restoreOverrideCursor()
+
+        message = (
+            f"{result['lines']:,} satır okundu.\n"
+            f"{result['orders']:,} sipariş ({result['order_lines']:,} kalem) oluşturuldu, "
+            f"{result['confirmed']:,} sipariş onaylandı."
+        )
+        if result["rejected_orders"]:
+            message += f"\n{result['rejected_orders']:,} sipariş hatalı satır nedeniyle aktarılmadı."
+        if result["credit_rejected"]:
+            message += (
+                f"\n{len(result['credit_rejected']):,} sipariş kredi limiti nedeniyle taslakta kaldı."
+            )
+        if result["errors"]:
+            message += f"\n\nHatalar ({result['error_count']:,}):\n" + "\n".join(
+                f"Satır {error['line']} [{error['order']}]: {error['message']}"
+                for error in result["errors"][:15]
+            )
+
+        if result["error_count"]:
+            QMessageBox.warning(self, "Aktarım Tamamlandı", message)
+        else:
+            QMessageBox.information(self, "Aktarım Tamamlandı", message)
+        self._load_data()
+
     def _cancel_order(self, order_id: int):
         """Siparişi iptal et"""
         if not self.service:
@@ -420,9 +486,7 @@ class SalesOrderModule(QWidget):
     def _get_warehouses(self) -> list:
         """Depoları getir"""
         try:
-            from modules.inventory.services import WarehouseService
-            warehouse_service = WarehouseService()
-            warehouses = warehouse_service.get_all()
+            warehouses = reference_cache.warehouses()
             return [{
                 "id": w.id,
                 "code": w.code,
@@ -206,6 +206,7 @@ class SalesQuoteFormPage(QWidget):
         self.quote_data = quote_data
         self.is_edit_mode = quote_data is not None
         self.items = items or []
+        self.item_costs = {i["id"]: i.get("standard_cost", 0) for i in self.items}
         self.customers = customers or []
         self.units = units or []
         self.currencies = currencies or [
@@ -373,6 +374,15 @@ class SalesQuoteFormPage(QWidget):
         self.total_label = QLabel("0.00")
         total_inner.addWidget(self.total_label, 3, 1)
 
+        # Standart maliyete göre brüt kâr (KDV hariç, iskonto sonrası)
+        total_inner.addWidget(QLabel("Standart Maliyet:"), 4, 0)
+        self.cost_label = QLabel("0.00")
+        total_inner.addWidget(self.cost_label, 4, 1)
+
+        total_inner.addWidget(QLabel("Brüt Kâr:"), 5, 0)
+        self.margin_label = QLabel("0.00")
+        total_inner.addWidget(self.margin_label, 5, 1)
+
         total_layout.addWidget(total_frame)
         items_layout.addLayout(total_layout)
 
@@ -509,6 +519,7 @@ class SalesQuoteFormPage(QWidget):
         """Toplamları güncelle"""
         subtotal = Decimal("0")
         total_discount = Decimal("0")
+        total_cost = Decimal("0")
 
         for row in range(self.items_table.rowCount()):
             qty_widget = self.items_table.cellWidget(row, 2)
@@ -527,6 +538,10 @@ class SalesQuoteFormPage(QWidget):
                 subtotal += line_total
                 total_discount += line_discount
 
+                code_item = self.items_table.item(row, 0)
+                item_id = code_item.data(Qt.ItemDataRole.UserRole) if code_item else None
+                total_cost += qty * Decimal(str(self.item_costs.get(item_id, 0)))
+
                 # Satır tutarını güncelle
                 amount_item = self.items_table.item(row, 6)
                 if amount_item:
@@ -542,6 +557,11 @@ class SalesQuoteFormPage(QWidget):
         self.tax_label.setText(f"{tax:,.2f}")
         self.total_label.setText(f"{total:,.2f}")
 
+        margin = taxable - total_cost
+        margin_rate = margin / taxable * 100 if taxable else Decimal("0")
+        self.cost_label.setText(f"{total_cost:,.2f}")
+        self.margin_label.setText(f"{margin:,.2f} (%{margin_rate:.1f})")
+
     def load_data(self):
         """Düzenleme modunda verileri yükle"""
         if not self.quote_data:
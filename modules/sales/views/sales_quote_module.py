@@ -7,6 +7,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal
 
+from core.reference_data import reference_cache
 from .sales_quote_list import SalesQuoteListPage
 from .sales_quote_form import SalesQuoteFormPage
 
@@ -25,7 +26,6 @@ class SalesQuoteModule(QWidget):
         self.service = None
         self.customer_service = None
         self.item_service = None
-        self.unit_service = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -74,15 +74,6 @@ class SalesQuoteModule(QWidget):
                     ErrorHandler.log_error(e, "SalesQuoteModule._ensure_services")
                 print(f"Stok servisi yükleme hatası: {e}")
 
-        if not self.unit_service:
-            try:
-                from modules.inventory.services import UnitService
-                self.unit_service = UnitService()
-            except Exception as e:
-                if ErrorHandler:
-                    ErrorHandler.log_error(e, "SalesQuoteModule._ensure_services")
-                print(f"Birim servisi yükleme hatası: {e}")
-
     def _load_data(self):
         if not self.service:
             return
@@ -117,6 +108,9 @@ class SalesQuoteModule(QWidget):
             return []
         try:
             items = self.item_service.get_all()
+            # Kâr hesabı için standart maliyetler (satın alınanlarda alış fiyatı)
+            from modules.production.costing import cost_rollup
+            costs = cost_rollup.unit_costs(self.item_service.session, [i.id for i in items])
             return [{
                 "id": i.id,
                 "code": i.code,
@@ -125,6 +119,7 @@ class SalesQuoteModule(QWidget):
                 "unit_name": i.unit.name if i.unit else "",
                 "sale_price": float(i.sale_price or 0),
                 "vat_rate": float(i.vat_rate or 0),
+                "standard_cost": float(costs.get(i.id, 0)),
                 "stock": 0,
             } for i in items]
         except Exception as e:
@@ -152,10 +147,8 @@ class SalesQuoteModule(QWidget):
 
     def _get_units(self) -> list:
         """Birimleri getir"""
-        if not self.unit_service:
-            return []
         try:
-            units = self.unit_service.get_all()
+            units = reference_cache.units()
             return [{"id": u.id, "name": u.name, "code": u.code} for u in units]
         except Exception as e:
             if ErrorHandler:
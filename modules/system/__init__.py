@@ -2,8 +2,21 @@
 Akıllı İş ERP - Sistem Yönetimi
 """
 
-from .views.user_management import UserManagement
-from .views.label_templates import LabelTemplatesPage
-from .views.audit_log_viewer import AuditLogViewer
+# Arayüz sınıfları ilk erişimde yüklenir; böylece servisler PyQt6
+# olmadan (ör. jobs.py iş çalıştırıcısı) içe aktarılabilir.
+_LAZY = {
+    "UserManagement": ".views.user_management",
+    "LabelTemplatesPage": ".views.label_templates",
+    "AuditLogViewer": ".views.audit_log_viewer",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = ["UserManagement", "LabelTemplatesPage", "AuditLogViewer"]
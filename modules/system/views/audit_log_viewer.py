@@ -4,6 +4,7 @@ Akıllı İş ERP - Audit Log Görüntüleme Ekranı
 İşlem geçmişini görüntüleme, filtreleme ve export özellikleri.
 """
 
+import json
 from datetime import datetime, timedelta
 from typing import Optional, List
 
@@ -32,7 +33,11 @@ from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QColor
 import qtawesome as qta
 
+from sqlalchemy.orm import load_only
+
 from database.base import get_session
+from database.partitioning import estimate_count
+from modules.auth.services import AuthService
 from database.models.user import AuditLog, User
 from config.themes import get_theme
 
@@ -66,6 +71,34 @@ MODULE_NAMES = {
 }
 
 
+# Liste için yüklenen kolonlar (JSON değerler detayda ayrıca okunur)
+LIST_COLUMNS = (
+    AuditLog.id,
+    AuditLog.created_at,
+    AuditLog.username,
+    AuditLog.action,
+    AuditLog.module,
+    AuditLog.table_name,
+    AuditLog.record_id,
+    AuditLog.description,
+)
+
+# Dışa aktarımda kolon başlıkları
+EXPORT_HEADER = "ID;Tarih;Kullanıcı;IP Adresi;İşlem;Modül;Tablo;Kayıt ID;Açıklama\n"
+
+
+def compute_diff(old_values: Optional[dict], new_values: Optional[dict]) -> List[tuple]:
+    """Değişen alanlar: [(alan, eski, yeni)] (sadece farklı olanlar)"""
+    old_values = old_values or {}
+    new_values = new_values or {}
+    diff = []
+    for key in sorted(set(old_values) | set(new_values)):
+        old, new = old_values.get(key), new_values.get(key)
+        if old != new:
+            diff.append((key, old, new))
+    return diff
+
+
 class AuditLogDetailDialog(QDialog):
     """Audit log detay dialogu"""
 
@@ -99,6 +132,23 @@ class AuditLogDetailDialog(QDialog):
 
         layout.addWidget(info_group)
 
+        # Değişiklikler (sadece farklı alanlar)
+        diff = compute_diff(self.log.old_values, self.log.new_values)
+        if diff and self.log.old_values and self.log.new_values:
+            diff_group = QGroupBox(f"Değişiklikler ({len(diff)} alan)")
+            diff_layout = QVBoxLayout(diff_group)
+            diff_table = QTableWidget(len(diff), 3)
+            diff_table.setHorizontalHeaderLabels(["Alan", "Eski", "Yeni"])
+            diff_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            diff_table.verticalHeader().setVisible(False)
+            diff_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            for row, (field, old, new) in enumerate(diff):
+                diff_table.setItem(row, 0, QTableWidgetItem(str(field)))
+                diff_table.setItem(row, 1, QTableWidgetItem("-" if old is None else str(old)))
+                diff_table.setItem(row, 2, QTableWidgetItem("-" if new is None else str(new)))
+            diff_layout.addWidget(diff_table)
+            layout.addWidget(diff_group, 1)
+
         # Değerler
         if self.log.old_values or self.log.new_values:
             values_splitter = QSplitter(Qt.Orientation.Horizontal)
@@ -146,12 +196,19 @@ class AuditLogDetailDialog(QDialog):
 class AuditLogViewer(QWidget):
     """Audit Log Görüntüleme Widget'ı"""
 
+    # Bu sayının üzerindeki sonuçlarda toplam tahmini gösterilir
+    EXACT_COUNT_LIMIT = 10000
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.logs: List[AuditLog] = []
         self.current_page = 0
         self.page_size = 50
         self.total_count = 0
+        self.count_is_estimate = False
+        self._count_key = None
+        # Keyset imleçleri: sayfa i için bir önceki sayfanın son (created_at, id)
+        self._page_cursors: List[Optional[tuple]] = [None]
 
         self.setup_ui()
         self.load_data()
@@ -172,13 +229,13 @@ class AuditLogViewer(QWidget):
         btn_refresh = QPushButton()
         btn_refresh.setIcon(qta.icon("fa5s.sync-alt"))
         btn_refresh.setToolTip("Yenile")
-        btn_refresh.clicked.connect(self.load_data)
+        btn_refresh.clicked.connect(self.refresh)
         header.addWidget(btn_refresh)
 
         # Export butonu
         btn_export = QPushButton()
         btn_export.setIcon(qta.icon("fa5s.file-export"))
-        btn_export.setToolTip("CSV Olarak Dışa Aktar")
+        btn_export.setToolTip("Dışa Aktar (CSV / JSON Lines)")
         btn_export.clicked.connect(self.export_csv)
         header.addWidget(btn_export)
 
@@ -237,7 +294,7 @@ class AuditLogViewer(QWidget):
         # Filtrele butonu
         btn_filter = QPushButton("Filtrele")
         btn_filter.setIcon(qta.icon("fa5s.filter"))
-        btn_filter.clicked.connect(self.load_data)
+        btn_filter.clicked.connect(self.apply_filters)
         filter_layout.addWidget(btn_filter)
 
         # Temizle butonu
@@ -313,51 +370,87 @@ class AuditLogViewer(QWidget):
         finally:
             session.close()
 
+    def _build_query(self, session):
+        """Filtrelere göre sorgu (tarih aralığı yarı açık: bölüm budamaya uygun)"""
+        query = session.query(AuditLog)
+
+        # Tarih filtresi
+        start_date = self.date_start.date().toPyDate()
+        end_date = self.date_end.date().toPyDate()
+        # Bitiş gününü dahil et: [başlangıç, bitiş + 1 gün)
+        query = query.filter(AuditLog.created_at >= datetime.combine(start_date, datetime.min.time()))
+        query = query.filter(
+            AuditLog.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        )
+
+        # Kullanıcı filtresi
+        user_id = self.cmb_user.currentData()
+        if user_id:
+            query = query.filter(AuditLog.user_id == user_id)
+
+        # Modül filtresi
+        module = self.cmb_module.currentData()
+        if module:
+            query = query.filter(AuditLog.module == module)
+
+        # İşlem filtresi
+        action = self.cmb_action.currentData()
+        if action:
+            query = query.filter(AuditLog.action == action)
+
+        # Arama filtresi
+        search = self.txt_search.text().strip()
+        if search:
+            search_filter = f"%{search}%"
+            query = query.filter(
+                (AuditLog.table_name.ilike(search_filter)) |
+                (AuditLog.description.ilike(search_filter))
+            )
+
+        return query
+
+    def _filter_key(self) -> tuple:
+        return (
+            self.date_start.date().toPyDate(),
+            self.date_end.date().toPyDate(),
+            self.cmb_user.currentData(),
+            self.cmb_module.currentData(),
+            self.cmb_action.currentData(),
+            self.txt_search.text().strip(),
+        )
+
+    def apply_filters(self):
+        """Filtre değişti: ilk sayfaya dön ve toplamı yeniden hesapla"""
+        self.current_page = 0
+        self._page_cursors = [None]
+        self._count_key = None
+        self.load_data()
+
+    def refresh(self):
+        """Yenile: toplam yeniden hesaplanır, sayfa korunur"""
+        self._count_key = None
+        self.load_data()
+
     def load_data(self):
         """Verileri yükler"""
         session = get_session()
         try:
-            query = session.query(AuditLog)
-
-            # Tarih filtresi
-            start_date = self.date_start.date().toPyDate()
-            end_date = self.date_end.date().toPyDate()
-            # Bitiş tarihinin sonuna kadar dahil et
-            end_datetime = datetime.combine(end_date, datetime.max.time())
-
-            query = query.filter(AuditLog.created_at >= start_date)
-            query = query.filter(AuditLog.created_at <= end_datetime)
-
-            # Kullanıcı filtresi
-            user_id = self.cmb_user.currentData()
-            if user_id:
-                query = query.filter(AuditLog.user_id == user_id)
-
-            # Modül filtresi
-            module = self.cmb_module.currentData()
-            if module:
-                query = query.filter(AuditLog.module == module)
-
-            # İşlem filtresi
-            action = self.cmb_action.currentData()
-            if action:
-                query = query.filter(AuditLog.action == action)
-
-            # Arama filtresi
-            search = self.txt_search.text().strip()
-            if search:
-                search_filter = f"%{search}%"
-                query = query.filter(
-                    (AuditLog.table_name.ilike(search_filter)) |
-                    (AuditLog.description.ilike(search_filter))
+            query = self._build_query(session)
+
+            # Toplam sayı: filtre değişmedikçe tekrar hesaplanmaz; büyük
+            # sonuçlarda tam COUNT(*) yerine tahmin kullanılır
+            key = self._filter_key()
+            if key != self._count_key:
+                self.total_count, self.count_is_estimate = estimate_count(
+                    session, query, self.EXACT_COUNT_LIMIT
                 )
+                self._count_key = key
 
-            # Toplam sayı
-            self.total_count = query.count()
-
-            # Sayfalama
-            offset = self.current_page * self.page_size
-            self.logs = query.order_by(AuditLog.created_at.desc()).offset(offset).limit(self.page_size).all()
+            # Sayfalama (keyset: önceki sayfaları taramaz)
+            query = query.options(load_only(*LIST_COLUMNS))
+            self.logs = AuthService.audit_page(
+                query, self._page_cursors[self.current_page], self.page_size
+            )
 
             self._populate_table()
             self._update_pagination()
@@ -410,21 +503,28 @@ class AuditLogViewer(QWidget):
         total_pages = max(1, (self.total_count + self.page_size - 1) // self.page_size)
 
         self.lbl_page.setText(f"Sayfa {self.current_page + 1} / {total_pages}")
-        self.lbl_info.setText(f"Toplam {self.total_count} kayıt")
+        if self.count_is_estimate:
+            self.lbl_info.setText(f"Toplam ~{self.total_count:,} kayıt (tahmini)")
+        else:
+            self.lbl_info.setText(f"Toplam {self.total_count} kayıt")
 
         self.btn_prev.setEnabled(self.current_page > 0)
-        self.btn_next.setEnabled(self.current_page < total_pages - 1)
+        # Tahmin eksik kalabilir; sayfa doluysa ileri gitmeye izin ver
+        self.btn_next.setEnabled(
+            self.current_page < total_pages - 1 or len(self.logs) == self.page_size
+        )
 
     def prev_page(self):
         """Önceki sayfa"""
         if self.current_page > 0:
             self.current_page -= 1
+            del self._page_cursors[self.current_page + 1 :]
             self.load_data()
 
     def next_page(self):
         """Sonraki sayfa"""
-        total_pages = (self.total_count + self.page_size - 1) // self.page_size
-        if self.current_page < total_pages - 1:
+        if self.btn_next.isEnabled() and self.logs:
+            self._page_cursors.append(AuthService.audit_cursor(self.logs[-1]))
             self.current_page += 1
             self.load_data()
 
@@ -436,8 +536,7 @@ class AuditLogViewer(QWidget):
         self.cmb_module.setCurrentIndex(0)
         self.cmb_action.setCurrentIndex(0)
         self.txt_search.clear()
-        self.current_page = 0
-        self.load_data()
+        self.apply_filters()
 
     def show_detail(self):
         """Seçili kaydın detayını gösterir"""
@@ -445,74 +544,58 @@ class AuditLogViewer(QWidget):
         if row < 0 or row >= len(self.logs):
             return
 
-        log = self.logs[row]
+        # JSON değerler sadece açılan kayıt için okunur
+        session = get_session()
+        try:
+            log = session.get(AuditLog, self.logs[row].id, populate_existing=True)
+        finally:
+            session.close()
+        if log is None:
+            return
         dialog = AuditLogDetailDialog(log, self)
         dialog.exec()
 
     def export_csv(self):
-        """CSV olarak dışa aktarır"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "CSV Kaydet", "", "CSV Dosyası (*.csv)"
+        """CSV veya JSON Lines olarak dışa aktarır (akış halinde, satır sınırı yok)"""
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Dışa Aktar", "", "CSV Dosyası (*.csv);;JSON Lines (*.jsonl)"
         )
 
         if not file_path:
             return
 
+        as_jsonl = file_path.endswith(".jsonl") or "jsonl" in selected_filter
+        session = get_session()
         try:
-            session = get_session()
-
             # Filtreleri uygula (sayfalama olmadan)
-            query = session.query(AuditLog)
-
-            start_date = self.date_start.date().toPyDate()
-            end_date = self.date_end.date().toPyDate()
-            end_datetime = datetime.combine(end_date, datetime.max.time())
-
-            query = query.filter(AuditLog.created_at >= start_date)
-            query = query.filter(AuditLog.created_at <= end_datetime)
-
-            user_id = self.cmb_user.currentData()
-            if user_id:
-                query = query.filter(AuditLog.user_id == user_id)
-
-            module = self.cmb_module.currentData()
-            if module:
-                query = query.filter(AuditLog.module == module)
-
-            action = self.cmb_action.currentData()
-            if action:
-                query = query.filter(AuditLog.action == action)
-
-            search = self.txt_search.text().strip()
-            if search:
-                search_filter = f"%{search}%"
-                query = query.filter(
-                    (AuditLog.table_name.ilike(search_filter)) |
-                    (AuditLog.description.ilike(search_filter))
-                )
-
-            logs = query.order_by(AuditLog.created_at.desc()).limit(10000).all()
-
-            # CSV yaz
-            with open(file_path, "w", encoding="utf-8-sig") as f:
-                # Header
-                f.write("ID;Tarih;Kullanıcı;IP Adresi;İşlem;Modül;Tablo;Kayıt ID;Açıklama\n")
-
-                for log in logs:
-                    date_str = log.created_at.strftime("%d.%m.%Y %H:%M:%S")
-                    module_name = MODULE_NAMES.get(log.module, log.module)
-                    desc = (log.description or "").replace(";", ",").replace("\n", " ")
-
-                    f.write(f"{log.id};{date_str};{log.username or ''};{log.ip_address or ''};"
-                           f"{log.action};{module_name};{log.table_name or ''};{log.record_id or ''};"
-                           f"{desc}\n")
-
-            session.close()
+            query = self._build_query(session)
+
+            count = 0
+            if as_jsonl:
+                with open(file_path, "w", encoding="utf-8") as f:
+                    for row in AuthService.iter_audit_logs(query):
+                        f.write(json.dumps(dict(row._mapping), default=str, ensure_ascii=False))
+                        f.write("\n")
+                        count += 1
+            else:
+                with open(file_path, "w", encoding="utf-8-sig") as f:
+                    f.write(EXPORT_HEADER)
+                    for row in AuthService.iter_audit_logs(query):
+                        date_str = row.created_at.strftime("%d.%m.%Y %H:%M:%S")
+                        module_name = MODULE_NAMES.get(row.module, row.module)
+                        desc = (row.description or "").replace(";", ",").replace("\n", " ")
+
+                        f.write(f"{row.id};{date_str};{row.username or ''};{row.ip_address or ''};"
+                               f"{row.action};{module_name};{row.table_name or ''};{row.record_id or ''};"
+                               f"{desc}\n")
+                        count += 1
 
             QMessageBox.information(
                 self, "Başarılı",
-                f"{len(logs)} kayıt dışa aktarıldı:\n{file_path}"
+                f"{count} kayıt dışa aktarıldı:\n{file_path}"
             )
 
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Dışa aktarma hatası: {e}")
+        finally:
+            session.close()
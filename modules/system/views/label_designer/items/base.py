@@ -10,6 +10,8 @@ from PyQt6.QtWidgets import QGraphicsObject, QGraphicsItem, QStyleOptionGraphics
 from PyQt6.QtCore import Qt, QRectF, QPointF, pyqtSignal
 from PyQt6.QtGui import QPainter, QPen, QColor, QBrush
 
+from core.label_template import compile_template
+
 if TYPE_CHECKING:
     from ..canvas.resize_handle import ResizeHandle
 
@@ -204,13 +206,7 @@ class LabelItem(QGraphicsObject):
         if not self._data_key:
             return ""
 
-        result = self._data_key
-        for key, value in context.items():
-            # {key} formatı
-            result = result.replace(f"{{{key}}}", str(value))
-            # {{ key }} formatı (boşluklu)
-            result = result.replace(f"{{{{ {key} }}}}", str(value))
-        return result
+        return compile_template(self._data_key).render(context)
 
     def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value):
         """Eleman değişikliklerini yakalar"""
@@ -7,6 +7,8 @@ from dataclasses import dataclass, field
 from typing import Dict, Any, Optional, List, Union
 from pathlib import Path
 
+from core.label_template import compile_template
+
 from ..items.base import LabelItem, LabelSize
 from ..unit_converter import UnitConverter
 
@@ -37,11 +39,8 @@ class RenderContext:
         Örnek:
             "{Urun_Adi} - {SKT}" -> "Elma - 2026-12-31"
         """
-        result = template
-        # Basit {key} formatı
-        for key, value in self.data.items():
-            result = result.replace(f"{{{key}}}", str(value))
-        return result
+        # Şablon bir kez derlenir; biçimlendiriciler de desteklenir ({SKT|date})
+        return compile_template(template).render(self.data)
 
 
 @dataclass
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Akıllı İş ERP - Cari Bakiye Defteri Kontrol / Yeniden Oluşturma
+Kullanım:
+    python scripts/rebuild_counterparty_balances.py          # Sadece kontrol
+    python scripts/rebuild_counterparty_balances.py --fix    # Farkları düzelt
+"""
+
+import sys
+from pathlib import Path
+
+# Proje kök dizinini Python path'ine ekle
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from database.base import get_session
+from modules.finance.balance_ledger import counterparty_ledger
+
+
+def main():
+    session = get_session()
+    try:
+        drifts = counterparty_ledger.check_consistency(session)
+        if not drifts:
+            print("✓ Cari bakiye defteri tutarlı")
+            return
+
+        for drift in drifts:
+            print(
+                f"✗ {drift['kind']} #{drift['id']} {drift['field']}: "
+                f"defter={drift['ledger']} gerçek={drift['actual']}"
+            )
+
+        if "--fix" in sys.argv:
+            fixed = counterparty_ledger.rebuild(session)
+            print(f"✓ {fixed} alan düzeltildi")
+        else:
+            print("Düzeltmek için --fix ile çalıştırın")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Akıllı İş - Uygulama Sunucusu giriş noktası
+
+Stok, üretim operasyonları ve bakım servislerini HTTP/JSON API olarak
+sunar (PyQt6 gerekmez). İstemcilerde API_SERVER_URL ayarlanınca operatör
+paneli veritabanına bağlanmadan bu sunucuyu kullanır.
+
+Kullanım:
+    python server.py                       # API_SERVER_HOST:API_SERVER_PORT
+    python server.py --host 0.0.0.0 --port 8765
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Proje kök dizinini Python path'ine ekle
+ROOT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config import API_SERVER_HOST, API_SERVER_PORT, API_SERVER_WORKERS, API_TOKEN
+from core.bootstrap import init_listeners
+from api.server import ApiServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Akıllı İş uygulama sunucusu")
+    parser.add_argument("--host", default=API_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=API_SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=API_SERVER_WORKERS)
+    args = parser.parse_args()
+
+    if not API_TOKEN and args.host not in ("127.0.0.1", "localhost", "::1"):
+        print("! API_TOKEN tanımlı değil: sunucu ağa doğrulamasız açılıyor")
+
+    init_listeners()
+    from core.change_bus import change_bus
+
+    if change_bus.start_listener():
+        print("✓ Değişiklik bildirimleri dinleniyor")
+    server = ApiServer(args.host, args.port, workers=args.workers)
+
+    async def run():
+        await server.start()
+        print(f"✓ Uygulama sunucusu http://{args.host}:{server.port} ({args.workers} iş parçacığı)")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Akıllı İş ERP - Canlı Tablo İzleyici
+Ekranların tam yeniden yükleme yerine yalnızca değişen satırları
+güncellemesi için tablo değişikliklerini arayüz thread'ine taşır.
+
+Kaynak:
+- Yerel (veritabanına bağlı istemci): core.change_bus. Aynı süreçteki
+  commit'ler her zaman, diğer istemcilerinkiler PostgreSQL LISTEN/NOTIFY
+  dinleyicisi çalışıyorsa gelir.
+- Uzak (remote=True): uygulama sunucusunun /changes akışı. Ekranın
+  servisi sunucu üzerinden çalışıyorsa verilir; API_SERVER_URL tanımlı
+  olsa da yerel veritabanını kullanan ekranlar yerel kaynağı dinler.
+
+Kullanım:
+    self.watcher = LiveTableWatcher(["equipment_downtimes"], self._apply_changes, self)
+    self.watcher = LiveTableWatcher(
+        ["work_order_operations"], self._apply_changes, self, remote=True
+    )
+    def _apply_changes(self, changes):   # {tablo: frozenset(id) | None}
+        ...
+"""
+
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from config import LIVE_UPDATE_DEBOUNCE_MS
+
+
+# ids None ise tablonun tamamı değişmiş sayılır (ekran tamamen yenilenmeli)
+Changes = Dict[str, Optional[FrozenSet[int]]]
+
+
+class LiveTableWatcher(QObject):
+    """
+    Tablo değişikliklerini dinler, kısa pencerede birleştirir ve
+    handler(changes) ile arayüz thread'inde bildirir.
+    """
+
+    _arrived = pyqtSignal(str, object)
+
+    def __init__(
+        self,
+        tables: Iterable[str],
+        handler: Callable[[Changes], None],
+        parent: QObject = None,
+        debounce_ms: int = LIVE_UPDATE_DEBOUNCE_MS,
+        remote: bool = False,
+    ):
+        super().__init__(parent)
+        self.tables = frozenset(tables)
+        self._handler = handler
+        self._pending: Dict[str, Optional[set]] = {}
+        self._poller = None
+        self._stopped = False
+        self._lock = threading.Lock()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(debounce_ms)
+        self._flush_timer.timeout.connect(self._flush)
+        # Diğer thread'lerden gelen sinyal kuyruklanarak arayüz thread'inde işlenir
+        self._arrived.connect(self._on_arrived)
+
+        if remote:
+            from api.client import ChangePoller
+
+            self._poller = ChangePoller(self.tables, self._notify)
+            self._poller.start()
+        else:
+            from core.change_bus import change_bus
+
+            change_bus.subscribe(self.tables, self._notify)
+
+    @property
+    def is_live(self) -> bool:
+        """Diğer istemcilerdeki değişiklikler de geliyor mu"""
+        if self._poller is not None:
+            # Thread sunucuya ulaşamasa da yeniden dener; bağlantı durumuna bakılır
+            return self._poller.connected
+        from core.change_bus import change_bus
+
+        return change_bus.is_live
+
+    def stop(self) -> None:
+        """Aboneliği bırakır (ekran kapanırken çağrılmalı)"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        if self._poller is not None:
+            self._poller.stop()
+        else:
+            from core.change_bus import change_bus
+
+            change_bus.unsubscribe(self._notify)
+
+    def _notify(self, table: str, ids: Optional[FrozenSet[int]]) -> None:
+        """Bildirim callback'i (herhangi bir thread'den çağrılabilir)"""
+        if self._stopped:
+            return
+        try:
+            self._arrived.emit(table, ids)
+        except RuntimeError:
+            # Ekran stop() çağrılmadan silinmiş
+            self.stop()
+
+    def _on_arrived(self, table: str, ids) -> None:
+        if ids is None or self._pending.get(table, set()) is None:
+            self._pending[table] = None
+        else:
+            self._pending.setdefault(table, set()).update(ids)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        if not pending or self._stopped:
+            return
+        try:
+            self._handler({t: None if ids is None else frozenset(ids) for t, ids in pending.items()})
+        except Exception as e:
+            # Slot içindeki yakalanmamış hata uygulamayı sonlandırır
+            print(f"Canlı güncelleme hatası: {e}")